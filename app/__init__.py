@@ -127,46 +127,42 @@ def create_app():
                 
         # Authorization flag for templates (admin/owner can write)
         can_write = False
+        _org_ctx = None
         try:
             from flask_login import current_user
             from flask import session as _session
-            from app.models.org_membership import OrgMembership
-            from app.extensions import db as _db
+            from app.security.org_context import get_org_context
             if getattr(current_user, "is_authenticated", False):
                 _org_id = _session.get("current_org_id") or getattr(current_user, "org_id", None)
                 if _org_id:
-                    _m = _db.session.query(OrgMembership).filter_by(org_id=_org_id, user_id=current_user.id).one_or_none()
-                    can_write = bool(_m and _m.role in ("admin", "owner"))
+                    # Same request-scoped context the guards used; no extra queries
+                    _org_ctx = get_org_context(_org_id)
+                    can_write = _org_ctx.can_write
         except Exception:
             can_write = False
 
         # Subscription banner (contextual)
         billing_banner = {"show": False}
         try:
-            from flask_login import current_user  # already imported above; safe to repeat locally
-            from flask import session as _session, url_for as _url_for
-            from app.models.subscription import Subscription as _Sub
-            if getattr(current_user, "is_authenticated", False):
-                _org_id = _session.get("current_org_id") or getattr(current_user, "org_id", None)
-                if _org_id:
-                    _s = _Sub.query.filter_by(org_id=_org_id).first()
-                    is_active = bool(_s and (_s.status in {"active","trialing"}))
-                    if not is_active:
-                        # Admins (can_write) get CTA to plans; non-admins get a heads-up only.
-                        if can_write:
-                            billing_banner = {
-                                "show": True,
-                                "message": "Unlock Estimator with Pro to use the app.",
-                                "cta_url": _url_for("billing.index"),
-                                "cta_text": "View plans",
-                            }
-                        else:
-                            billing_banner = {
-                                "show": True,
-                                "message": "Your organization doesn’t have an active subscription. Please contact an admin.",
-                                "cta_url": None,
-                                "cta_text": None,
-                            }
+            from flask import url_for as _url_for
+            if _org_ctx is not None:
+                is_active = _org_ctx.has_active_subscription
+                if not is_active:
+                    # Admins (can_write) get CTA to plans; non-admins get a heads-up only.
+                    if can_write:
+                        billing_banner = {
+                            "show": True,
+                            "message": "Unlock Estimator with Pro to use the app.",
+                            "cta_url": _url_for("billing.index"),
+                            "cta_text": "View plans",
+                        }
+                    else:
+                        billing_banner = {
+                            "show": True,
+                            "message": "Your organization doesn’t have an active subscription. Please contact an admin.",
+                            "cta_url": None,
+                            "cta_text": None,
+                        }
         except Exception:
             billing_banner = {"show": False}
         
@@ -269,4 +265,6 @@ def create_app():
             "Stripe secret key missing; billing features will not work"
         )
 
+    # PDF_WARMUP_ON_BOOT runs per web worker from gunicorn.conf.py (not for CLI commands)
+
     return app
@@ -10,6 +10,8 @@ from app.models.assembly import Assembly, AssemblyComponent
 from app.models.material import Material
 from app.models.org_membership import OrgMembership, ROLE_ADMIN, ROLE_OWNER
 from app.services.policy import require_member, role_required
+from app.services.catalog import bump_catalog_version
+from app.services.search import text_search
 
 from app.services.assemblies import (
     ServiceError,
@@ -25,6 +27,11 @@ from app.services.assemblies import (
     set_component_active as svc_set_component_active,
 )
 
+# Assemblies table rows per page
+ASSEMBLIES_PAGE_SIZE = 50
+# Rows returned by the component picker typeahead
+MATERIAL_PICKER_LIMIT = 50
+
 @bp.before_request
 def _acl_assemblies_readonly_for_members():
     if not getattr(current_user, "is_authenticated", False):
@@ -41,89 +48,46 @@ def _acl_assemblies_readonly_for_members():
 @require_member
 @bp.get("/assemblies")
 def list_assemblies():
-    # Rows for the table
+    q = (request.args.get("q") or "").strip()
+    try:
+        page = max(int(request.args.get("page") or 1), 1)
+    except ValueError:
+        page = 1
+
+    # Rows for the table: one page (plus one row to know whether there is a next page)
+    query = Assembly.query.filter(Assembly.org_id == current_user.org_id)
+    order = [func.lower(Assembly.name).asc(), Assembly.id.asc()]
+    if q:
+        match, rank = text_search((Assembly.name, Assembly.assembly_code), q)
+        query = query.filter(match)
+        order.insert(0, rank.desc())
     rows = (
-        Assembly.query
-        .filter(Assembly.org_id == current_user.org_id)
-        .order_by(func.lower(Assembly.name).asc())
+        query.order_by(*order)
+        .offset((page - 1) * ASSEMBLIES_PAGE_SIZE)
+        .limit(ASSEMBLIES_PAGE_SIZE + 1)
         .all()
     )
+    has_next = len(rows) > ASSEMBLIES_PAGE_SIZE
+    rows = rows[:ASSEMBLIES_PAGE_SIZE]
 
-    # Build categories (DISTINCT first, then ORDER BY lower(...) in outer query)
-    cat_subq = (
-        db.session.query(Assembly.category.label("category"))
-        .filter(
-            Assembly.org_id == current_user.org_id,
-            Assembly.category.isnot(None), Assembly.category != ""
-        )
-        .distinct()
-        .subquery()
-    )
-    cat_rows = (
-        db.session.query(cat_subq.c.category)
-        .order_by(func.lower(cat_subq.c.category).asc())
-        .all()
-    )
-    categories = [r[0] for r in cat_rows if r[0]]
-
-    # Build { category: [sub1, sub2, ...] } map for the Inline Add Subcategory <select>
-    pair_subq = (
-        db.session.query(
-            Assembly.category.label("category"),
-            Assembly.subcategory.label("subcategory"),
-        )
+    # Categories and { category: [sub1, sub2, ...] } for the Inline Add selects, from one GROUP BY
+    pair_rows = (
+        db.session.query(Assembly.category, Assembly.subcategory)
         .filter(
             Assembly.org_id == current_user.org_id,
             Assembly.category.isnot(None), Assembly.category != "",
-            Assembly.subcategory.isnot(None), Assembly.subcategory != "",
-        )
-        .distinct()
-        .subquery()
-    )
-    pair_rows = (
-        db.session.query(pair_subq.c.category, pair_subq.c.subcategory)
-        .order_by(
-            func.lower(pair_subq.c.category).asc(),
-            func.lower(pair_subq.c.subcategory).asc(),
         )
+        .group_by(Assembly.category, Assembly.subcategory)
         .all()
     )
     asm_subcats_map = {}
-    for cat, sub in pair_rows:
-        asm_subcats_map.setdefault(cat, []).append(sub)
-        
-    # Material categories (case-insensitive sorted)
-    mat_type_subq = (
-        db.session.query(Material.material_type.label("type"))
-        .filter(
-            Material.org_id == current_user.org_id,
-            Material.material_type.isnot(None), Material.material_type != ""
-        )
-        .distinct()
-        .subquery()
-    )
-    type_rows = (
-        db.session.query(mat_type_subq.c.type)
-        .order_by(func.lower(mat_type_subq.c.type).asc())
-        .all()
-    )
-    mat_types = [r[0] for r in type_rows if r[0]]
+    for cat, sub in sorted(pair_rows, key=lambda r: (r[0].lower(), (r[1] or "").lower())):
+        subs = asm_subcats_map.setdefault(cat, [])
+        if sub:
+            subs.append(sub)
+    categories = list(asm_subcats_map)
+    asm_subcats_map = {cat: subs for cat, subs in asm_subcats_map.items() if subs}
 
-    # Materials (id, type, description) — used by the modal Description dropdown
-    materials = (
-        db.session.query(
-            Material.id,
-            Material.material_type,
-            Material.item_description,
-        )
-        .filter(Material.org_id == current_user.org_id)
-        .order_by(
-            func.lower(Material.material_type).asc(),
-            func.lower(Material.item_description).asc(),
-        )
-        .all()
-    )
-    
     # Back-link handoff (query-param handshake)
     rt = (request.args.get("rt") or "").strip()
     back_label = None
@@ -139,15 +103,65 @@ def list_assemblies():
     return render_template(
         "admin/assemblies_index.html",
         rows=rows,
+        q=q,
+        page=page,
+        has_next=has_next,
         categories=categories,
         asm_subcats_map=asm_subcats_map,
-        materials=materials,
-        mat_types=mat_types,
-         back_label=back_label,
+        back_label=back_label,
         back_href=back_href,
         rt=rt,
     )
 
+def _component_materials_query():
+    # Same eligibility as add_component / create_assembly_bundle: the org's own materials
+    return db.session.query(Material).filter(Material.org_id == current_user.org_id)
+
+@require_member
+@bp.get("/assemblies/material-types.json")
+def material_types_json():
+    """Material categories for the component picker (loaded when the modal first opens)."""
+    rows = (
+        _component_materials_query()
+        .with_entities(Material.material_type)
+        .filter(Material.material_type.isnot(None), Material.material_type != "")
+        .group_by(Material.material_type)
+        .all()
+    )
+    return jsonify({"ok": True, "types": sorted((r[0] for r in rows), key=str.lower)})
+
+@require_member
+@bp.get("/assemblies/materials.json")
+def component_materials_json():
+    """
+    Typeahead for the component picker: ?q= (prefix/substring/trigram over description and SKU),
+    ?type= (material category). At most MATERIAL_PICKER_LIMIT rows, best matches first.
+    """
+    q = (request.args.get("q") or "").strip()
+    mat_type = (request.args.get("type") or "").strip()
+
+    query = _component_materials_query()
+    if mat_type:
+        query = query.filter(func.lower(Material.material_type) == mat_type.lower())
+    order = [func.lower(Material.item_description).asc(), Material.id.asc()]
+    if q:
+        match, rank = text_search((Material.item_description, Material.sku), q)
+        query = query.filter(match)
+        order.insert(0, rank.desc())
+    elif not mat_type:
+        return jsonify({"ok": True, "rows": []})
+
+    items = (
+        query.with_entities(Material.id, Material.material_type, Material.item_description, Material.sku)
+        .order_by(*order)
+        .limit(MATERIAL_PICKER_LIMIT)
+        .all()
+    )
+    return jsonify({"ok": True, "rows": [
+        {"id": mid, "material_type": mtype, "item_description": desc, "sku": sku}
+        for mid, mtype, desc, sku in items
+    ]})
+
 @role_required(ROLE_ADMIN, ROLE_OWNER)
 @bp.get("/assemblies/new")
 def new_assembly():
@@ -169,6 +183,7 @@ def create_assembly():
             is_featured=(request.form.get("is_featured") in ("on", "true", "1")),
         )
         asm.org_id = current_user.org_id  # ← stamp owner org
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
         flash("Assembly created.", "success")
         return redirect(url_for(
@@ -292,6 +307,7 @@ def create_assembly_bundle():
                 is_active=True,
             ))
 
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
@@ -328,6 +344,7 @@ def edit_assembly(assembly_id: int):
         a.is_featured = is_featured
         a.is_active = is_active
 
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
 
         return jsonify({
@@ -465,6 +482,7 @@ def add_component(assembly_id: int):
             qty_per_assembly=qty_per_assembly,
             sort_order=sort_order,
         )
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
         flash("Component added.", "success")
     except ServiceError as e:
@@ -500,6 +518,7 @@ def delete_assembly(assembly_id: int):
 
         # 2) Now hard delete the assembly (service keeps the rules/side-effects)
         svc_hard_delete_assembly(db.session, assembly_id=assembly_id)
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
 
         flash("Assembly and its components deleted.", "success")
@@ -538,6 +557,7 @@ def deactivate_component(assembly_id: int, component_id: int):
         ))
     try:
         svc_set_component_active(db.session, component_id=component_id, active=False)
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
         flash("Component deactivated.", "success")
     except ServiceError as e:
@@ -570,6 +590,7 @@ def activate_component(assembly_id: int, component_id: int):
         return redirect(url_for("admin.list_assemblies", assembly_id=assembly_id))
     try:
         svc_set_component_active(db.session, component_id=component_id, active=True)
+        bump_catalog_version(org_id=current_user.org_id)
         db.session.commit()
         flash("Component reactivated.", "success")
     except ServiceError as e:
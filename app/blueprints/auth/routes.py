@@ -7,6 +7,8 @@ from app.models.org import Org
 from app.models.org_membership import OrgMembership, ROLE_OWNER, ROLE_MEMBER
 from . import bp
 from app.services import tokens
+from app.services.catalog import refresh_resolved_catalog
+from app.security.entitlement_cache import invalidate_entitlements
 from app.services.email import send_verification_email, send_password_reset_email
 from flask_wtf.csrf import generate_csrf
 from app.extensions import csrf
@@ -53,6 +55,7 @@ def login_post():
         # create a simple org label; you can rename later in an account screen
         org = Org(name=(user.email or f"Org {user.id}"))
         db.session.add(org); db.session.flush()
+        refresh_resolved_catalog(org.id)
         user.org_id = org.id
         db.session.commit()
 
@@ -101,6 +104,7 @@ def resend_verification():
     if getattr(current_user, "email_verified_at", None):
         return redirect(url_for("main.home"))
     send_verification_email(current_user)
+    db.session.commit()
     return redirect(url_for("main.home"))
 
 @bp.get("/verify")
@@ -133,6 +137,7 @@ def reset_request():
         user = User.query.filter(func.lower(User.email) == email).first()
         if user:
             send_password_reset_email(user)  # TTL default is 120 minutes in email.py
+            db.session.commit()
     # Always respond the same way
     return redirect(url_for("auth.login_get"))
 
@@ -182,6 +187,7 @@ def register_post():
     org = Org(name=email)  # simple default; user can rename later
     db.session.add(org)
     db.session.flush()
+    refresh_resolved_catalog(org.id)
 
     user.org_id = org.id
     membership = OrgMembership(org_id=org.id, user_id=user.id, role=ROLE_OWNER)
@@ -261,6 +267,7 @@ def set_password_post():
             org = Org(name=email)
             db.session.add(org)
             db.session.flush()               # <-- single flush after user has a hash
+            refresh_resolved_catalog(org.id)
 
             user.org_id = org.id
             db.session.add(OrgMembership(org_id=org.id, user_id=user.id, role=ROLE_OWNER))
@@ -271,6 +278,7 @@ def set_password_post():
                 org = Org(name=email)
                 db.session.add(org)
                 db.session.flush()
+                refresh_resolved_catalog(org.id)
                 user.org_id = org.id
                 db.session.add(OrgMembership(org_id=org.id, user_id=user.id, role=ROLE_OWNER))
             else:
@@ -412,6 +420,7 @@ def set_password_post():
     # --- END: Post-checkout Stripe reconcile ---
 
     db.session.commit()
+    invalidate_entitlements(user.org_id)
 
     # One-time post-checkout nudge on Home
     session["post_checkout_nudge"] = True
@@ -1,11 +1,13 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, current_app, make_response, send_file, abort
-import csv, io, os
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, current_app, make_response, send_file, abort, stream_with_context
+import base64, csv, io, json, os
 from decimal import Decimal, ROUND_HALF_UP
 from app.models.material import Material
 from app.models.dje_item import DjeItem
 from app.models.assembly import Assembly
 from app.services.assemblies import get_assembly_rollup, ServiceError
-from sqlalchemy import func, or_
+from app.services.calculations import price_estimate
+from app.services.catalog import build_catalog_bundle
+from sqlalchemy import func, or_, tuple_
 from datetime import datetime
 from . import bp
 from .validators import validate_fast_export_payload
@@ -15,8 +17,47 @@ from app.extensions import db, limiter
 from app.models.estimate import Estimate
 from app.models.app_settings import AppSettings
 from app.models.customer import Customer
-from weasyprint import HTML, CSS
 from io import BytesIO
+from sqlalchemy.orm import defer
+from app.models.export_job import ExportJob, EXPORT_JOB_DONE, EXPORT_JOB_FAILED
+from app.services.exports import (
+    get_pdf_cache,
+    render_fast_summary_html,
+    render_pdf_bytes,
+    render_saved_summary_html,
+    summary_pdf_cache_key,
+    summary_pdf_stylesheets,
+)
+from app.services.export_jobs import enqueue_pdf, recover_local_jobs
+from app.services.payload_patch import PatchError, apply_json_patch, apply_row_delta
+from app.services.estimate_lines import (
+    PricedValueError,
+    check_priced_values,
+    estimate_totals,
+    price_saved_payload,
+    replace_estimate_lines,
+)
+from app.services.search import like_contains, text_search
+
+# Rows fetched per server-side cursor round trip for the streamed index export
+INDEX_CSV_BATCH_SIZE = 1000
+
+PAYLOAD_PATCH_CONTENT_TYPE = "application/json-patch+json"
+
+# list.json ?sort= keys → (column, cursor value kind); default updated_at
+LIST_SORT_COLUMNS = {
+    "updated_at": (Estimate.updated_at, "ts"),
+    "created_at": (Estimate.created_at, "ts"),
+    "name": (func.lower(Estimate.name), "str"),
+    "material_total": (Estimate.material_total, "num"),
+    "labor_hours_total": (Estimate.labor_hours_total, "num"),
+    "break_even": (Estimate.break_even, "num"),
+    "sell_price": (Estimate.sell_price, "num"),
+}
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 500
+# Filtered sets the planner puts above this size get its estimate instead of an exact COUNT(*)
+LIST_EXACT_COUNT_THRESHOLD = 10000
 
 @bp.before_request
 def _require_login_estimates():
@@ -82,6 +123,57 @@ def create():
     # JSON response for fetch() caller; front-end will navigate
     return jsonify({"id": est.id})
 
+def _encode_list_cursor(sort: str, ascending: bool, value, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    raw = json.dumps([sort, "asc" if ascending else "desc", value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_list_cursor(cursor: str, sort: str, ascending: bool, kind: str):
+    """(sort value, id) from an opaque cursor; ValueError if malformed or for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_dir, value, row_id = json.loads(raw)
+        if kind == "ts":
+            value = datetime.fromisoformat(value)
+        elif kind == "num":
+            value = Decimal(value)
+    except Exception as e:
+        raise ValueError("malformed cursor") from e
+    if c_sort != sort or c_dir != ("asc" if ascending else "desc"):
+        raise ValueError("cursor belongs to another sort")
+    if not isinstance(row_id, int) or (kind == "str" and not isinstance(value, str)) \
+            or (kind == "num" and not value.is_finite()):
+        raise ValueError("malformed cursor")
+    return value, row_id
+
+def _estimated_total(query):
+    """
+    (count, is_estimate) for the filtered list. On Postgres the planner's row estimate is used
+    when it is above LIST_EXACT_COUNT_THRESHOLD (no full scan); smaller sets get COUNT(*).
+    """
+    ids = query.with_entities(Estimate.id).order_by(None)
+    if db.engine.dialect.name == "postgresql":
+        compiled = ids.statement.compile(dialect=db.engine.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > LIST_EXACT_COUNT_THRESHOLD:
+            return estimate, True
+    return ids.count(), False
+
+def _decimal_arg(name: str):
+    try:
+        value = Decimal((request.args.get(name) or "").strip())
+    except Exception:
+        return None
+    return value if value.is_finite() else None
+
 @bp.get("/list.json")
 def list_json():
     q = (request.args.get("q") or "").strip()
@@ -93,12 +185,10 @@ def list_json():
     
     query = query.filter(Estimate.org_id == current_user.org_id)
 
+    rank = None
     if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(or_(
-            func.lower(Estimate.name).like(like),
-            func.lower(Estimate.project_ref).like(like),
-        ))
+        match, rank = text_search((Estimate.name, Estimate.project_ref), q)
+        query = query.filter(match)
     if customer_id.isdigit():
         query = query.filter(Estimate.customer_id == int(customer_id))
     if status in ("draft", "submitted", "awarded", "lost"):
@@ -109,8 +199,54 @@ def list_json():
             query = query.filter(Estimate.updated_at >= dt)
         except Exception:
             pass
-
-    rows = query.order_by(Estimate.updated_at.desc()).limit(500).all()
+    min_sell = _decimal_arg("min_sell_price")
+    if min_sell is not None:
+        query = query.filter(Estimate.sell_price >= min_sell)
+    max_sell = _decimal_arg("max_sell_price")
+    if max_sell is not None:
+        query = query.filter(Estimate.sell_price <= max_sell)
+
+    sort = (request.args.get("sort") or "").strip()
+    if sort not in LIST_SORT_COLUMNS:
+        sort = "updated_at"
+    sort_col, kind = LIST_SORT_COLUMNS[sort]
+    ascending = (request.args.get("dir") or "desc").strip().lower() == "asc"
+    try:
+        limit = min(max(int(request.args.get("limit") or LIST_PAGE_SIZE), 1), LIST_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = LIST_PAGE_SIZE
+
+    total = None
+    if request.args.get("with_total") in ("1", "true"):
+        total = _estimated_total(query)
+
+    if rank is not None and not request.args.get("sort"):
+        # Search without an explicit sort: the `limit` best matches by relevance, not paged
+        rows = (
+            query.add_columns(rank.label("sort_key"))
+            .order_by(rank.desc(), Estimate.updated_at.desc(), Estimate.id.desc())
+            .limit(limit)
+            .all()
+        )
+        next_cursor = None
+    else:
+        cursor = (request.args.get("cursor") or "").strip()
+        if cursor:
+            try:
+                after_value, after_id = _decode_list_cursor(cursor, sort, ascending, kind)
+            except ValueError:
+                return jsonify({"error": "invalid_cursor"}), 400
+            key = tuple_(sort_col, Estimate.id)
+            query = query.filter(key > (after_value, after_id) if ascending else key < (after_value, after_id))
+
+        # Keyset order: (sort key, id) in one direction, so the next page starts strictly after the last row
+        order = (sort_col.asc(), Estimate.id.asc()) if ascending else (sort_col.desc(), Estimate.id.desc())
+        rows = query.add_columns(sort_col.label("sort_key")).order_by(*order).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_list_cursor(sort, ascending, last[2], last[0].id)
 
     data = [{
         "id": e.id,
@@ -118,11 +254,18 @@ def list_json():
         "customer_id": e.customer_id,
         "customer_name": cname,
         "status": e.status,
+        "material_total": float(e.material_total or 0),
+        "labor_hours_total": float(e.labor_hours_total or 0),
+        "break_even": float(e.break_even or 0),
+        "sell_price": float(e.sell_price or 0),
         "created_at": e.created_at.isoformat() if e.created_at else None,
         "updated_at": e.updated_at.isoformat() if e.updated_at else None,
-    } for (e, cname) in rows]
+    } for (e, cname, _) in rows]
 
-    return jsonify(ok=True, rows=data)
+    body = {"ok": True, "rows": data, "next_cursor": next_cursor}
+    if total is not None:
+        body["total"], body["total_is_estimate"] = total
+    return jsonify(body)
 
 @bp.get("/<int:estimate_id>/edit")
 def edit(estimate_id: int):
@@ -232,19 +375,138 @@ def _csv_summary_like_string(controls, cells):
     return s
 
 
+def _payload_etag(revision: int) -> str:
+    return f'"{int(revision)}"'
+
+def _request_revision(data=None):
+    """Writer's base revision: If-Match ("7" / W/"7") wins, else the body's "revision"."""
+    raw = (request.headers.get("If-Match") or "").strip()
+    if raw.startswith("W/"):
+        raw = raw[2:]
+    raw = raw.strip('"')
+    if not raw and isinstance(data, dict) and data.get("revision") is not None:
+        raw = str(data["revision"])
+    return int(raw) if raw.isdigit() else None
+
+def _write_payload(est: Estimate, payload: dict, base_revision):
+    """
+    Store payload, its priced totals and a bumped payload_revision in one conditional UPDATE,
+    and rewrite the estimate_lines rows in the same transaction.
+    Returns the new revision, or None when base_revision is stale (another writer won).
+    Raises PricedValueError (nothing written) when a priced value overflows its column.
+    """
+    pricing = price_saved_payload(est.org_id, payload, est.settings_snapshot or {})
+    check_priced_values(pricing)
+    stmt = (
+        db.update(Estimate)
+        .where(Estimate.id == est.id)
+        .values(
+            work_payload=payload,
+            payload_revision=Estimate.payload_revision + 1,
+            **estimate_totals(pricing),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if base_revision is not None:
+        stmt = stmt.where(Estimate.payload_revision == base_revision)
+    if db.session.execute(stmt).rowcount != 1:
+        db.session.rollback()
+        return None
+    replace_estimate_lines(est.id, est.org_id, payload, pricing)
+    revision = db.session.execute(
+        db.select(Estimate.payload_revision).where(Estimate.id == est.id)
+    ).scalar_one()
+    db.session.commit()
+    return revision
+
+def _stale_payload_response(estimate_id: int):
+    current = db.session.execute(
+        db.select(Estimate.payload_revision).where(Estimate.id == estimate_id)
+    ).scalar()
+    resp = jsonify(error="stale_revision", revision=current)
+    resp.status_code = 409
+    resp.headers["ETag"] = _payload_etag(current or 0)
+    return resp
+
+def _out_of_range_response(e: PricedValueError):
+    return jsonify({"error": "value_out_of_range", "field": e.column, "row": e.position, "detail": str(e)}), 400
+
+def _saved_payload_response(est: Estimate, revision: int):
+    resp = jsonify(ok=True, id=est.id, revision=revision)
+    resp.headers["ETag"] = _payload_etag(revision)
+    return resp
+
 @bp.put("/<int:estimate_id>/payload")
 def save_payload(estimate_id: int):
     est = Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
     data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "invalid_payload", "detail": "work_payload must be an object"}), 400
     # NOTE: full tenant scoping lands in 03b.8; for now, auth is enforced by blueprint guard
-    est.work_payload = data
-    db.session.commit()
-    return jsonify(ok=True, id=est.id)
+    # Full replace; If-Match is optional here (legacy clients send none)
+    try:
+        revision = _write_payload(est, data, _request_revision())
+    except PricedValueError as e:
+        return _out_of_range_response(e)
+    if revision is None:
+        return _stale_payload_response(est.id)
+    return _saved_payload_response(est, revision)
+
+@bp.patch("/<int:estimate_id>/payload")
+def patch_payload(estimate_id: int):
+    """
+    Incremental save: JSON Patch (application/json-patch+json, revision in If-Match) or a
+    row delta object (revision in If-Match or body). Stale revisions get 409 + current revision.
+    """
+    est = Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": "invalid_json"}), 400
+
+    base_revision = _request_revision(data)
+    if base_revision is None:
+        return jsonify({"error": "revision_required"}), 428
+    if base_revision != est.payload_revision:
+        return _stale_payload_response(est.id)
+
+    try:
+        if request.mimetype == PAYLOAD_PATCH_CONTENT_TYPE or isinstance(data, list):
+            payload = apply_json_patch(est.work_payload or {}, data)
+            if not isinstance(payload, dict):
+                raise PatchError("work_payload must remain an object")
+        else:
+            payload = apply_row_delta(est.work_payload or {}, data)
+    except PatchError as e:
+        return jsonify({"error": "invalid_patch", "detail": str(e)}), 400
+
+    try:
+        revision = _write_payload(est, payload, base_revision)
+    except PricedValueError as e:
+        return _out_of_range_response(e)
+    if revision is None:
+        return _stale_payload_response(est.id)
+    return _saved_payload_response(est, revision)
 
 @bp.get("/<int:estimate_id>/payload.json")
 def get_payload_json(estimate_id: int):
     est = Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
-    return jsonify(ok=True, id=est.id, payload=est.work_payload or {})
+    resp = jsonify(ok=True, id=est.id, revision=est.payload_revision, payload=est.work_payload or {})
+    resp.headers["ETag"] = _payload_etag(est.payload_revision)
+    return resp
+
+@bp.get("/<int:estimate_id>/pricing.json")
+def get_pricing_json(estimate_id: int):
+    """
+    Server-side pricing of the saved grid + settings snapshot against the current catalog
+    (lines + Steps A–L + Summary cells, computed the way the Estimator/Summary pages do).
+    """
+    est = Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
+    pricing = price_estimate(
+        est.work_payload or {},
+        est.settings_snapshot or {},
+        build_catalog_bundle(current_user.org_id),
+    )
+    return jsonify(ok=True, id=est.id, pricing=pricing)
 
 @bp.get("/<int:estimate_id>/export/summary.csv")
 @limiter.limit("30 per minute")
@@ -309,74 +571,144 @@ def export_summary_csv(estimate_id: int):
 def export_estimates_index_csv():
     # Org-scoped list of estimates; optional query-string filters may be appended by the UI.
     q = (request.args.get("q") or "").strip()
-
-    # Base query (tenant isolation)
-    rows = (
-        db.session.query(Estimate, Customer)
+    org_id = current_user.org_id
+
+    # Only the exported columns; totals come from the typed columns maintained on every save
+    stmt = (
+        db.select(
+            Estimate.id,
+            Estimate.name,
+            Customer.company_name,
+            Estimate.status,
+            Estimate.created_at,
+            Estimate.updated_at,
+            Estimate.material_total,
+            Estimate.labor_hours_total,
+        )
+        .select_from(Estimate)
         .outerjoin(Customer, Estimate.customer_id == Customer.id)
-        .filter(Estimate.org_id == current_user.org_id)
-        .order_by(Estimate.created_at.desc())
-        .all()
+        .where(Estimate.org_id == org_id)
+        .order_by(Estimate.created_at.desc(), Estimate.id.desc())
     )
 
-    # Simple 'q' filter if present (matches name/title and customer company, case-insensitive)
+    # Simple 'q' filter if present (matches name and customer company, case-insensitive)
     if q:
-        q_lc = q.lower()
-        rows = [
-            (est, cust)
-            for (est, cust) in rows
-            if (
-                (getattr(est, "name", "") or getattr(est, "title", "") or "").lower().find(q_lc) != -1
-                or ((cust.company_name if cust else "") or "").lower().find(q_lc) != -1
-            )
-        ]
-
-    # CSV buffer
-    buf = io.StringIO(newline="")
-    w = csv.writer(buf)
+        # Literal substring, as the in-Python filter was
+        stmt = stmt.where(or_(
+            like_contains(func.coalesce(Estimate.name, ""), q),
+            like_contains(func.coalesce(Customer.company_name, ""), q),
+        ))
 
-    # Header
     header = [
         "id","name","customer","status","created_at","updated_at","material_total","labor_hours_total"
     ]
-    w.writerow(header)
 
-    q2 = lambda d: f"{(Decimal(d) if d is not None else Decimal('0')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)}"
-    q4 = lambda d: f"{(Decimal(d) if d is not None else Decimal('0')).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)}"
+    q2 = lambda d: f"{d.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)}"
+    q4 = lambda d: f"{d.quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)}"
     to_dec = lambda v: (Decimal(str(v)) if v not in (None, "") else Decimal("0"))
-
-    for est, cust in rows:
-        payload = est.work_payload or {}
-        totals = payload.get("totals") or {}
-
-        mat_total = to_dec(totals.get("material_cost_price_sheet"))
-        labor_total = to_dec(totals.get("labor_hours_pricing_sheet"))
-
-        name = (getattr(est, "name", None) or getattr(est, "title", None) or "").strip()
-        customer = (cust.company_name if cust else "") or ""
-        # Graceful status fallback (string if available; else active/inactive)
-        status = getattr(est, "status", None)
-        if status is None:
-            status = "active" if getattr(est, "is_active", True) else "inactive"
-
-        created = est.created_at.strftime("%Y-%m-%d %H:%M:%S") if getattr(est, "created_at", None) else ""
-        updated = est.updated_at.strftime("%Y-%m-%d %H:%M:%S") if getattr(est, "updated_at", None) else ""
-
-        w.writerow([
-            est.id, name, customer, status, created, updated, q2(mat_total), q4(labor_total)
-        ])
-
-    csv_str = buf.getvalue()
-    buf.close()
+    fmt_ts = lambda ts: ts.strftime("%Y-%m-%d %H:%M:%S") if ts else ""
+
+    def generate():
+        buf = io.StringIO(newline="")
+        w = csv.writer(buf)
+
+        def flush():
+            chunk = buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            return chunk
+
+        w.writerow(header)
+        yield flush()
+
+        # Server-side cursor: rows arrive in batches instead of one .all()
+        result = db.session.execute(stmt.execution_options(yield_per=INDEX_CSV_BATCH_SIZE))
+        for batch in result.partitions():
+            for (eid, name, company, status, created, updated, mat_total, labor_total) in batch:
+                w.writerow([
+                    eid,
+                    (name or "").strip(),
+                    company or "",
+                    status or "",
+                    fmt_ts(created),
+                    fmt_ts(updated),
+                    q2(to_dec(mat_total)),
+                    q4(to_dec(labor_total)),
+                ])
+            yield flush()
 
     stamp = datetime.now().strftime("%Y%m%d")
     filename = f"estimates_index_{stamp}.csv"
 
-    resp = make_response(csv_str)
+    resp = current_app.response_class(stream_with_context(generate()), mimetype="text/csv")
     resp.headers["Content-Type"] = "text/csv; charset=utf-8"
     resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
     return resp
 
+def _pdf_response(pdf_bytes: bytes, filename: str, cache_key=None, rendered_at=None):
+    resp = make_response(pdf_bytes)
+    resp.headers["Content-Type"] = "application/pdf"
+    resp.headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    if cache_key:
+        # Content-addressed: same ETag ⇔ same estimate/payload/settings/templates
+        resp.set_etag(cache_key)
+        if rendered_at is not None:
+            resp.last_modified = datetime.utcfromtimestamp(rendered_at)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        resp.make_conditional(request)
+    return resp
+
+def _wants_async_pdf(html: str) -> bool:
+    """
+    Explicit opt-in: ?async=1 or `Prefer: respond-async`; explicit opt-out: ?async=0.
+    Otherwise only documents above PDF_SYNC_MAX_HTML_BYTES go to the job queue.
+    """
+    flag = (request.args.get("async") or "").strip().lower()
+    if flag in ("1", "true", "yes"):
+        return True
+    if flag in ("0", "false", "no"):
+        return False
+    if "respond-async" in (request.headers.get("Prefer") or "").lower():
+        return True
+    return len(html.encode("utf-8")) > current_app.config.get("PDF_SYNC_MAX_HTML_BYTES", 65536)
+
+def _export_job_body(job: ExportJob) -> dict:
+    body = job.to_dict()
+    body["ok"] = True
+    body["status_url"] = url_for("estimates.export_job_status", job_id=job.id)
+    if job.status == EXPORT_JOB_DONE:
+        body["download_url"] = url_for("estimates.export_job_download", job_id=job.id)
+    return body
+
+def _render_or_enqueue_pdf(html: str, filename: str, estimate_id=None, cache_key=None):
+    """Sync mode renders in-request (small docs); async returns 202 + job for polling."""
+    if not _wants_async_pdf(html):
+        pdf_bytes = render_pdf_bytes(html, request.host_url, summary_pdf_stylesheets(current_app.root_path))
+        rendered_at = None
+        cache = get_pdf_cache(current_app) if cache_key else None
+        if cache is not None:
+            try:
+                rendered_at = cache.put(cache_key, pdf_bytes)
+            except OSError:
+                current_app.logger.warning("pdf cache write failed for %s", cache_key, exc_info=True)
+        return _pdf_response(pdf_bytes, filename, cache_key=cache_key, rendered_at=rendered_at)
+
+    job = enqueue_pdf(
+        org_id=current_user.org_id,
+        user_id=getattr(current_user, "id", None),
+        estimate_id=estimate_id,
+        html=html,
+        base_url=request.host_url,
+        filename=filename,
+        cache_key=cache_key,
+    )
+    body = _export_job_body(job)
+    resp = jsonify(body)
+    resp.status_code = 202
+    resp.headers["Location"] = body["status_url"]
+    resp.headers["Retry-After"] = "1"
+    return resp
+
 @bp.get("/<int:estimate_id>/export/summary.pdf")
 @limiter.limit("8 per minute")
 @require_entitlement("exports.pdf")
@@ -389,41 +721,27 @@ def export_summary_pdf(estimate_id: int):
     - Temporary minimal PDF content; HF2 will render the real Summary clone.
     """
     est = Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
-    payload = est.work_payload or {}
 
-    # Try common summary snapshot locations (prefer summary_export)
-    summary = ((payload.get("estimateData") or {}).get("summary_export")
-            or payload.get("summary_export")
-            or payload.get("summary_totals")
-            or payload.get("summary")
-            or payload.get("summary_snapshot")
-            or payload)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    filename = f"estimate_{estimate_id}_summary_{stamp}.pdf"
 
-    # HF2a: gracefully fall back to full payload so Saved Export still works.
-    # No math here — the Jinja template renders defensively for now.
-    if not summary:
-        summary = payload
-
-    # Render via Jinja template (structural step)
-    html = render_template(
-        "exports/summary_pdf.html",
-        estimate=est,
-        summary=summary,   # saved snapshot we already located
-        mode="SAVED"
-    )
+    # Repeat downloads: browser revalidation → 304; otherwise serve the cached render
+    cache = get_pdf_cache(current_app)
+    cache_key = summary_pdf_cache_key(current_app.root_path, est) if cache is not None else None
+    if cache_key:
+        if request.if_none_match.contains(cache_key):
+            resp = make_response("", 304)
+            resp.set_etag(cache_key)
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        hit = cache.get(cache_key)
+        if hit is not None:
+            pdf_bytes, rendered_at = hit
+            return _pdf_response(pdf_bytes, filename, cache_key=cache_key, rendered_at=rendered_at)
 
-    site_css = os.path.join(current_app.root_path, "static", "css", "site.css")
-    pdf_css  = os.path.join(current_app.root_path, "static", "css", "pdf.css")
-    pdf_bytes = HTML(string=html, base_url=request.host_url).write_pdf(
-        stylesheets=[CSS(filename=site_css), CSS(filename=pdf_css)]
-    )
+    html = render_saved_summary_html(est)
 
-    stamp = datetime.utcnow().strftime("%Y%m%d")
-    filename = f"estimate_{estimate_id}_summary_{stamp}.pdf"
-    resp = make_response(pdf_bytes)
-    resp.headers["Content-Type"] = "application/pdf"
-    resp.headers["Content-Disposition"] = f'inline; filename="{filename}"'
-    return resp
+    return _render_or_enqueue_pdf(html, filename, estimate_id=est.id, cache_key=cache_key)
 
 @bp.post("/exports/summary.csv")
 @limiter.limit("30 per minute")
@@ -490,27 +808,46 @@ def fast_export_summary_pdf():
     if errors:
         return jsonify({"error": "invalid_payload", "fields": errors}), 422
 
-    # Render via Jinja template (structural step)
-    html = render_template(
-        "exports/summary_pdf.html",
-        estimate=None,     # not saved; no Estimate record
-        summary=data,      # validated fast payload
-        mode="FAST"
-    )
-
-    site_css = os.path.join(current_app.root_path, "static", "css", "site.css")
-    pdf_css  = os.path.join(current_app.root_path, "static", "css", "pdf.css")
-    pdf_bytes = HTML(string=html, base_url=request.host_url).write_pdf(
-        stylesheets=[CSS(filename=site_css), CSS(filename=pdf_css)]
-    )
+    html = render_fast_summary_html(data)
 
     stamp = datetime.utcnow().strftime("%Y%m%d")
     filename = f"estimate_fast_summary_{stamp}.pdf"
-    resp = make_response(pdf_bytes)
-    resp.headers["Content-Type"] = "application/pdf"
-    resp.headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    return _render_or_enqueue_pdf(html, filename)
+
+@bp.get("/exports/jobs/<job_id>.json")
+@require_entitlement("exports.pdf")
+def export_job_status(job_id: str):
+    job = (
+        db.session.query(ExportJob)
+        .options(defer(ExportJob.html), defer(ExportJob.result))
+        .filter_by(id=job_id, org_id=current_user.org_id)
+        .first_or_404()
+    )
+    resp = jsonify(_export_job_body(job))
+    if job.status not in (EXPORT_JOB_DONE, EXPORT_JOB_FAILED):
+        resp.headers["Retry-After"] = "1"
+        recover_local_jobs()  # local backend: a restarted web worker may have orphaned it
     return resp
 
+@bp.get("/exports/jobs/<job_id>.pdf")
+@require_entitlement("exports.pdf")
+def export_job_download(job_id: str):
+    job = (
+        db.session.query(ExportJob)
+        .options(defer(ExportJob.html))
+        .filter_by(id=job_id, org_id=current_user.org_id)
+        .first_or_404()
+    )
+    if job.status == EXPORT_JOB_FAILED:
+        return jsonify({"error": "render_failed", "detail": job.error}), 500
+    if job.status != EXPORT_JOB_DONE:
+        resp = jsonify(_export_job_body(job))
+        resp.status_code = 202
+        resp.headers["Location"] = url_for("estimates.export_job_status", job_id=job.id)
+        resp.headers["Retry-After"] = "1"
+        return resp
+    return _pdf_response(job.result, job.filename, cache_key=job.cache_key)
+
 @bp.post("/<int:estimate_id>/clone")
 def clone_estimate(estimate_id: int):
     e =Estimate.query.filter_by(id=estimate_id, org_id=current_user.org_id).first_or_404()
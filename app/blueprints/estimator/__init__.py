@@ -5,4 +5,5 @@ bp = Blueprint("estimator", __name__, template_folder="templates")
 from . import routes          # page views: /estimator, /estimator/dje, etc.
 from . import api_materials   # /estimator/api/material-types, /material_descriptions
 from . import api_dje         # /estimator/api/dje-*
-from . import api_assemblies
\ No newline at end of file
+from . import api_assemblies
+from . import api_catalog     # /estimator/api/catalog.json (one-shot hydrate bundle)
\ No newline at end of file
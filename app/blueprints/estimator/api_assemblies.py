@@ -5,9 +5,13 @@ from app.extensions import db
 from app.services.assemblies import (
     list_assemblies as svc_list_assemblies,
     get_assembly_rollup as svc_get_assembly_rollup,
+    get_assembly_rollups as svc_get_assembly_rollups,
 )
 from app.services.assemblies import ServiceError
 
+# Upper bound on ids per batch rollup request (a very large estimate stays well below this)
+MAX_ROLLUP_IDS = 1000
+
 @bp.get("/api/assemblies")
 def get_assemblies():
     """Return active assemblies for the Estimator (flat list)."""
@@ -65,3 +69,40 @@ def get_assembly_rollup(assembly_id: int):
     except Exception as e:
         current_app.logger.exception("GET /api/assemblies/<id>/rollup failed")
         return jsonify({"error": "server_error", "detail": str(e)}), 500
+
+
+@bp.post("/api/assemblies/rollups")
+def get_assembly_rollups():
+    """
+    Batch rollups for the Estimator grid hydrate.
+    Body: {"ids": [<assembly_id>, ...]}  → [{assembly_id, material_cost_total, labor_hours_total, component_count}, ...]
+    Ids outside the caller's org (or unknown) are omitted from the result.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        raw_ids = data.get("ids") if isinstance(data, dict) else data
+        if not isinstance(raw_ids, list):
+            return jsonify({"error": "invalid_payload", "detail": "ids must be a list"}), 400
+        try:
+            ids = {int(i) for i in raw_ids}
+        except (TypeError, ValueError):
+            return jsonify({"error": "invalid_payload", "detail": "ids must be integers"}), 400
+        if len(ids) > MAX_ROLLUP_IDS:
+            return jsonify({"error": "invalid_payload", "detail": f"at most {MAX_ROLLUP_IDS} ids"}), 400
+
+        rollups = svc_get_assembly_rollups(ids, org_id=current_user.org_id)
+        return jsonify(
+            [
+                {
+                    "assembly_id": r["assembly_id"],
+                    "material_cost_total": float(r["material_cost_total"]),
+                    "labor_hours_total": float(r["labor_hours_total"]),
+                    "component_count": r["component_count"],
+                }
+                for r in rollups.values()
+            ]
+        ), 200
+
+    except Exception as e:
+        current_app.logger.exception("POST /api/assemblies/rollups failed")
+        return jsonify({"error": "server_error", "detail": str(e)}), 500
@@ -0,0 +1,21 @@
+from flask import jsonify, current_app
+from . import bp
+from flask_login import current_user
+from app.services.catalog import build_catalog_bundle
+from .catalog_cache import catalog_json_response
+
+
+@bp.get("/api/catalog.json")
+def get_catalog_bundle():
+    """
+    Whole resolved catalog for the Estimator (materials, DJE tree, assemblies + rollups)
+    in one compressed, ETag-cached document; the front end filters locally.
+    """
+    try:
+        org_id = current_user.org_id
+        return catalog_json_response(
+            "catalog.json", (), lambda: build_catalog_bundle(org_id), compress=True
+        )
+    except Exception as e:
+        current_app.logger.exception("GET /api/catalog.json failed")
+        return jsonify({"error": "server_error", "detail": str(e)}), 500
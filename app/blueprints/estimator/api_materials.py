@@ -3,23 +3,27 @@ from . import bp
 from flask_login import current_user
 from app.extensions import db
 from app.models.material import Material
-from sqlalchemy import func, or_, and_, exists
-from sqlalchemy.orm import aliased
+from app.models.resolved_catalog import ResolvedMaterial
+from sqlalchemy import func, or_
+from .catalog_cache import catalog_json_response
 
 
 @bp.get("/api/material-types")
 def get_material_types():
     """Return distinct active material types."""
     try:
-        rows = (
-        db.session.query(Material.material_type)
-        .filter(Material.is_active.is_(True))
-        .filter(or_(Material.org_id == current_user.org_id, Material.org_id.is_(None)))
-        .distinct()
-        .order_by(Material.material_type)
-        .all()
-    )
-        return jsonify([r[0] for r in rows if r[0]]), 200
+        def build():
+            rows = (
+                db.session.query(Material.material_type)
+                .filter(Material.is_active.is_(True))
+                .filter(or_(Material.org_id == current_user.org_id, Material.org_id.is_(None)))
+                .distinct()
+                .order_by(Material.material_type)
+                .all()
+            )
+            return [r[0] for r in rows if r[0]]
+
+        return catalog_json_response("material-types", (), build)
     except Exception as e:
         current_app.logger.exception("GET /api/material-types failed")
         return jsonify({"error": "server_error", "detail": str(e)}), 500
@@ -32,62 +36,52 @@ def get_material_descriptions():
         if not mat_type:
             return jsonify([]), 200
 
-        O = aliased(Material)
-        rows = (
-            db.session.query(
-                Material.id,
-                Material.item_description,
-                Material.price,
-                Material.labor_unit,
-                Material.unit_quantity_size,
-            )
-            .filter(Material.is_active.is_(True))
-            .filter(Material.material_type == mat_type)
-            .filter(
-                or_(
-                    Material.org_id == current_user.org_id,                        # org row (override or org-only)
-                    and_(
-                        Material.org_id.is_(None),                                 # global row
-                        ~exists().where(and_(                                      # not overridden by this org
-                            O.is_active.is_(True),
-                            O.org_id == current_user.org_id,
-                            func.lower(func.trim(O.material_type)) == func.lower(func.trim(Material.material_type)),
-                            func.lower(func.trim(O.item_description)) == func.lower(func.trim(Material.item_description)),
-                        ))
-                    ),
+        def build():
+            # Overlay (org overrides > global) is pre-resolved per org; the type key narrows via index
+            rows = (
+                db.session.query(
+                    Material.id,
+                    Material.item_description,
+                    Material.price,
+                    Material.labor_unit,
+                    Material.unit_quantity_size,
                 )
+                .join(ResolvedMaterial, ResolvedMaterial.material_id == Material.id)
+                .filter(ResolvedMaterial.org_id == current_user.org_id)
+                .filter(ResolvedMaterial.type_key == func.lower(func.trim(mat_type)))
+                .filter(Material.material_type == mat_type)
+                .order_by(func.lower(Material.item_description).asc())
+                .all()
             )
-            .order_by(func.lower(Material.item_description).asc())
-            .all()
-        )
 
-        def per_each(price, labor, unit):
-            try:
-                u = int(unit or 1)
-                if u <= 0:
+            def per_each(price, labor, unit):
+                try:
+                    u = int(unit or 1)
+                    if u <= 0:
+                        u = 1
+                except Exception:
                     u = 1
-            except Exception:
-                u = 1
-            pe = float(price or 0) / u
-            le = float(labor or 0) / u
-            return pe, le
+                pe = float(price or 0) / u
+                le = float(labor or 0) / u
+                return pe, le
 
-        result = []
-        for mid, desc, price, labor, unit in rows:
-            price_each, labor_each = per_each(price, labor, unit)
-            result.append(
-                {
-                    "id": mid,
-                    "item_description": desc,
-                    "price": float(price or 0),
-                    "labor_unit": float(labor or 0),
-                    "unit_quantity_size": unit or 1,
-                    "price_each": round(price_each, 4),
-                    "labor_each": round(labor_each, 4),
-                }
-            )
+            result = []
+            for mid, desc, price, labor, unit in rows:
+                price_each, labor_each = per_each(price, labor, unit)
+                result.append(
+                    {
+                        "id": mid,
+                        "item_description": desc,
+                        "price": float(price or 0),
+                        "labor_unit": float(labor or 0),
+                        "unit_quantity_size": unit or 1,
+                        "price_each": round(price_each, 4),
+                        "labor_each": round(labor_each, 4),
+                    }
+                )
+            return result
 
-        return jsonify(result), 200
+        return catalog_json_response("material-descriptions", (mat_type,), build)
 
     except Exception as e:
         current_app.logger.exception("GET /api/material-descriptions failed")
@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+
+from flask import Response, current_app, request
+from flask_login import current_user
+
+from app.services.catalog import CatalogResponseCache, get_catalog_version
+
+try:  # pinned in requirements (WeasyPrint dep); gzip-only if unavailable
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover
+    brotli = None
+
+
+def _cache() -> CatalogResponseCache:
+    # One LRU per app (i.e., per gunicorn worker process)
+    cache = current_app.extensions.get("catalog_cache")
+    if cache is None:
+        cache = CatalogResponseCache(current_app.config.get("CATALOG_CACHE_MAX_ENTRIES", 512))
+        current_app.extensions["catalog_cache"] = cache
+    return cache
+
+
+def _pick_encoding() -> str:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return "identity"
+
+
+def _encode(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+def catalog_json_response(name: str, params: tuple, build, *, compress: bool = False) -> Response:
+    """
+    Serve a catalog lookup for the current org, keyed on (org_id, catalog_version, name, params).
+      - If-None-Match hit → 304 without running `build` or touching SQL beyond the version read
+      - LRU hit → cached bytes, no SQL or JSON encoding
+      - miss → build(), serialize once, store
+    `build` returns a JSON-serializable value. With compress=True the body is negotiated
+    (br > gzip > identity) and each encoding is cached and tagged separately.
+    """
+    org_id = current_user.org_id
+    encoding = _pick_encoding() if compress else "identity"
+    key = (org_id, get_catalog_version(org_id), name, params)
+    etag = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    if encoding != "identity":
+        etag = f"{etag}-{encoding}"
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        cache = _cache()
+        ckey = key + (encoding,)
+        body = cache.get(ckey)
+        if body is None:
+            raw = cache.get(key + ("identity",))
+            if raw is None:
+                raw = current_app.json.dumps(build(), separators=(",", ":")).encode("utf-8")
+                cache.put(key + ("identity",), raw)
+            body = _encode(raw, encoding)
+            cache.put(ckey, body)
+        resp = Response(body, status=200, mimetype="application/json")
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+
+    resp.set_etag(etag)
+    if compress:
+        resp.vary.add("Accept-Encoding")
+    # Always revalidate; the ETag makes that a cheap 304
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
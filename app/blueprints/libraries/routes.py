@@ -1,10 +1,15 @@
-from flask import render_template, request, jsonify, url_for, redirect, request, abort, session, flash
-from sqlalchemy import func, or_, and_, exists
-from sqlalchemy.orm import aliased
+import base64
+import json
+from decimal import Decimal
+
+from flask import current_app, render_template, request, jsonify, url_for, redirect, request, abort, session, flash
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.orm import defer
 from app.models.material import Material
 from app.models.dje_item import DjeItem
+from app.models.resolved_catalog import ResolvedMaterial, ResolvedDjeItem
 from app.models.customer import Customer
-from app.models.org_membership import OrgMembership, ROLE_ADMIN, ROLE_OWNER
+from app.models.org_membership import ROLE_ADMIN, ROLE_OWNER
 from app.extensions import db, limiter
 from sqlalchemy.exc import IntegrityError
 from app.utils.validators import (
@@ -20,7 +25,31 @@ from . import bp
 from flask_login import current_user
 from app.services.policy import require_member, role_required
 from app.security.entitlements import enforce_active_subscription
-from app.services.persistence import import_materials_starter_pack, import_dje_starter_pack
+from app.security.org_context import get_org_context
+from app.models.import_job import ImportJob, IMPORT_JOB_DONE, IMPORT_JOB_FAILED, IMPORT_SOURCE_STARTER_PACK, IMPORT_SOURCE_UPLOAD
+from app.services.import_jobs import enqueue_import, recover_local_jobs
+from app.services.catalog import (
+    refresh_resolved_materials,
+    refresh_resolved_dje,
+    resolved_material_keys,
+    resolved_dje_keys,
+)
+from app.services.search import text_search
+
+# materials.json ?sort= keys → [(column, cursor value kind)...]; default type (then description).
+# NULLs are coalesced so row-value comparisons in the keyset filter never see them.
+MATERIALS_SORT_COLUMNS = {
+    "type": [
+        (func.coalesce(func.lower(Material.material_type), ""), "str"),
+        (func.coalesce(func.lower(Material.item_description), ""), "str"),
+    ],
+    "description": [(func.coalesce(func.lower(Material.item_description), ""), "str")],
+    "sku": [(func.coalesce(func.lower(Material.sku), ""), "str")],
+    "price": [(func.coalesce(Material.price, 0), "num")],
+    "labor_unit": [(func.coalesce(Material.labor_unit, 0), "num")],
+}
+MATERIALS_PAGE_SIZE = 200
+MATERIALS_MAX_PAGE_SIZE = 1000
 
 
 @bp.before_request
@@ -42,14 +71,14 @@ def _acl_libraries_readonly_for_members():
             abort(401)
         return redirect(url_for("auth.login_get", next=request.url))
 
-    # Membership check
-    m = db.session.query(OrgMembership).filter_by(org_id=org_id, user_id=current_user.id).one_or_none()
-    if not m:
+    # Membership check (request-scoped context; shared with the subscription gate below)
+    ctx = get_org_context(org_id)
+    if not ctx.is_member:
         # anti-enumeration: 404 for both HTML/JSON keeps behavior consistent
         abort(404)
 
     # Writes require admin/owner; reads allowed for members
-    if request.method not in ("GET", "HEAD", "OPTIONS") and m.role not in (ROLE_ADMIN, ROLE_OWNER):
+    if request.method not in ("GET", "HEAD", "OPTIONS") and not ctx.can_write:
         abort(403)
 
 @bp.before_request
@@ -58,65 +87,59 @@ def _require_active_subscription_libraries():
     if resp is not None:
         return resp
 
+def _resolved_materials_query(org_id: int):
+    # Overlay: org overrides OR global (not overridden by this org) — pre-resolved per org
+    return (
+        db.session.query(Material)
+        .join(ResolvedMaterial, ResolvedMaterial.material_id == Material.id)
+        .filter(ResolvedMaterial.org_id == org_id)
+    )
+
+def _material_type_facets(query):
+    """
+    ([{"type", "count"}], total) for the rows of query, grouped by material_type (one GROUP BY).
+    Rows without a material_type get no facet but still count toward total.
+    """
+    rows = (
+        query.with_entities(Material.material_type, func.count(Material.id))
+        .order_by(None)
+        .group_by(Material.material_type)
+        .all()
+    )
+    facets = [{"type": t, "count": n} for t, n in rows if t]
+    facets.sort(key=lambda f: (f["type"].lower(), f["type"]))
+    return facets, sum(n for _, n in rows)
+
+def _encode_materials_cursor(sort: str, ascending: bool, values, row_id: int) -> str:
+    values = [str(v) if isinstance(v, Decimal) else v for v in values]
+    raw = json.dumps([sort, "asc" if ascending else "desc", values, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_materials_cursor(cursor: str, sort: str, ascending: bool, kinds):
+    """(sort values, id) from an opaque cursor; ValueError if malformed or for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_dir, values, row_id = json.loads(raw)
+        values = [Decimal(v) if kind == "num" else v for v, kind in zip(values, kinds)]
+    except Exception as e:
+        raise ValueError("malformed cursor") from e
+    if c_sort != sort or c_dir != ("asc" if ascending else "desc"):
+        raise ValueError("cursor belongs to another sort")
+    if not isinstance(row_id, int) or len(values) != len(kinds):
+        raise ValueError("malformed cursor")
+    for v, kind in zip(values, kinds):
+        if (kind == "str" and not isinstance(v, str)) or (kind == "num" and not v.is_finite()):
+            raise ValueError("malformed cursor")
+    return values, row_id
+
 @require_member
 @bp.get("/materials")
 def materials():
-    # Basic filters (optional)
-    q = (request.args.get("q") or "").strip()
+    # Page shell only: rows are fetched by materials_index.js from materials.json
     mat_type = (request.args.get("type") or "").strip()
+    facets, _ = _material_type_facets(_resolved_materials_query(current_user.org_id))
+    mat_types = [f["type"] for f in facets]
 
-    # Overlay: org overrides OR global (not overridden by this org)
-    O = aliased(Material)
-    query = (
-        db.session.query(Material)
-        .filter(Material.is_active.is_(True))
-        .filter(
-            or_(
-                Material.org_id == current_user.org_id,
-                and_(
-                    Material.org_id.is_(None),
-                    ~exists().where(and_(
-                        O.is_active.is_(True),
-                        O.org_id == current_user.org_id,
-                        func.lower(func.trim(O.material_type)) == func.lower(func.trim(Material.material_type)),
-                        func.lower(func.trim(O.item_description)) == func.lower(func.trim(Material.item_description)),
-                    ))
-                ),
-            )
-        )
-    )
-
-    if mat_type:
-        query = query.filter(Material.material_type == mat_type)
-
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            (Material.item_description.ilike(like))
-            | (Material.sku.ilike(like))
-            | (Material.manufacturer.ilike(like))
-            | (Material.vendor.ilike(like))
-        )   
-
-    # Order by description for stable display
-    items = query.order_by(
-        func.lower(Material.material_type).asc(),
-        func.lower(Material.item_description).asc(),
-    ).all()
-
-    mat_types = [
-        row[0]
-        for row in (
-            db.session.query(Material.material_type)
-            .filter(Material.is_active.is_(True))
-            .filter(or_(Material.org_id == current_user.org_id, Material.org_id.is_(None)))
-            .filter(Material.material_type.isnot(None))
-            .distinct()
-            .order_by(Material.material_type.asc())
-            .all()
-        )
-    ]
-    
     # Back-link handoff
     rt = (request.args.get("rt") or "").strip()
     back_label = None
@@ -129,15 +152,108 @@ def materials():
 
     return render_template(
         "materials/index.html",
-        materials=items,
         mat_types=mat_types,
-        q=q,
+        q=(request.args.get("q") or "").strip(),
         type_filter=mat_type,
         back_label=back_label,
         back_href=back_href,
         rt=rt,
     )
 
+@require_member
+@bp.get("/materials.json")
+def materials_json():
+    """
+    One page of the org's resolved catalog.
+    Query: q, type, sort (MATERIALS_SORT_COLUMNS), dir, limit, cursor (next_cursor of the previous page).
+    The first page (no cursor) also carries the type facets for the q filter and the matching total.
+    """
+    q = (request.args.get("q") or "").strip()
+    mat_type = (request.args.get("type") or "").strip()
+
+    query = _resolved_materials_query(current_user.org_id)
+    rank = None
+    if q:
+        match, rank = text_search(
+            (Material.item_description, Material.sku, Material.manufacturer, Material.vendor), q
+        )
+        query = query.filter(match)
+
+    cursor = (request.args.get("cursor") or "").strip()
+    facets = total = None
+    if not cursor:
+        # Facets ignore the type filter so the picker keeps offering the other types
+        facets, total = _material_type_facets(query)
+    if mat_type:
+        query = query.filter(Material.material_type == mat_type)
+
+    sort = (request.args.get("sort") or "").strip()
+    if sort not in MATERIALS_SORT_COLUMNS:
+        sort = "type"
+    sort_cols = [col for col, _ in MATERIALS_SORT_COLUMNS[sort]]
+    kinds = [kind for _, kind in MATERIALS_SORT_COLUMNS[sort]]
+    ascending = (request.args.get("dir") or "asc").strip().lower() != "desc"
+    try:
+        limit = min(max(int(request.args.get("limit") or MATERIALS_PAGE_SIZE), 1), MATERIALS_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = MATERIALS_PAGE_SIZE
+
+    if rank is not None and not request.args.get("sort"):
+        # Search without an explicit sort: the `limit` best matches by relevance, not paged
+        items = (
+            query.order_by(rank.desc(), func.lower(Material.item_description).asc(), Material.id.asc())
+            .limit(limit)
+            .all()
+        )
+        next_cursor = None
+    else:
+        if cursor:
+            try:
+                after_values, after_id = _decode_materials_cursor(cursor, sort, ascending, kinds)
+            except ValueError:
+                return jsonify({"error": "invalid_cursor"}), 400
+            key = tuple_(*sort_cols, Material.id)
+            after = (*after_values, after_id)
+            query = query.filter(key > after if ascending else key < after)
+
+        # Keyset order: (sort keys..., id) in one direction, so the next page starts strictly after the last row
+        order = [c.asc() if ascending else c.desc() for c in (*sort_cols, Material.id)]
+        rows = (
+            query.add_columns(*(c.label(f"sort_key_{i}") for i, c in enumerate(sort_cols)))
+            .order_by(*order)
+            .limit(limit + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_materials_cursor(sort, ascending, list(last[1:]), last[0].id)
+        items = [r[0] for r in rows]
+
+    data = [{
+        "id": m.id,
+        "material_type": m.material_type,
+        "item_description": m.item_description,
+        "sku": m.sku,
+        "manufacturer": m.manufacturer,
+        "vendor": m.vendor,
+        "price": float(m.price) if m.price is not None else None,
+        "labor_unit": float(m.labor_unit) if m.labor_unit is not None else None,
+        "unit_quantity_size": m.unit_quantity_size,
+        "material_cost_code": m.material_cost_code,
+        "mat_cost_code_desc": m.mat_cost_code_desc,
+        "labor_cost_code": m.labor_cost_code,
+        "labor_cost_code_desc": m.labor_cost_code_desc,
+        "is_active": bool(m.is_active),
+    } for m in items]
+
+    body = {"ok": True, "rows": data, "next_cursor": next_cursor}
+    if facets is not None:
+        body["facets"] = {"material_type": facets}
+        body["total"] = sum(f["count"] for f in facets if f["type"] == mat_type) if mat_type else total
+    return jsonify(body)
+
 @role_required(ROLE_ADMIN, ROLE_OWNER)
 @bp.post("/materials")
 @limiter.limit("120 per minute")
@@ -206,6 +322,8 @@ def materials_create():
 
     db.session.add(m)
     try:
+        db.session.flush()
+        refresh_resolved_materials(org_id=current_user.org_id, material_ids=[m.id])
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
@@ -215,41 +333,114 @@ def materials_create():
         ), 409
     return jsonify(ok=True, id=m.id), 201
 
+def _import_dry_run() -> bool:
+    return (request.args.get("dry_run") or request.form.get("dry_run") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _import_message(report: dict) -> str:
+    """Summary line for a finished import job's report."""
+    parts = [f"{report.get(key) or 0} {label}" for key, label in (
+        ("added", "added"), ("changed", "updated"), ("retired", "retired"),
+    ) if report.get(key)]
+    if report.get("dry_run"):
+        return f"Dry run — would apply: {', '.join(parts) or 'no changes'} ({report.get('unchanged') or 0} unchanged)."
+    if not parts:
+        return "Import complete — no changes (already up to date)."
+    return f"Import complete — {', '.join(parts)}."
+
+
+def _import_job_body(job: ImportJob) -> dict:
+    body = job.to_dict()
+    body["ok"] = True
+    body["status_url"] = url_for("libraries.import_job_status", job_id=job.id)
+    if job.status == IMPORT_JOB_DONE and job.report:
+        body["message"] = _import_message(job.report)
+        # inserted/updated kept for existing callers of the import JSON
+        body["inserted"] = job.report.get("added", 0)
+        body["updated"] = job.report.get("changed", 0)
+    return body
+
+
+def _enqueue_import_response(kind: str, page: str, *, source=IMPORT_SOURCE_STARTER_PACK, filename=None, upload=None):
+    """202 + job JSON for fetch callers; HTML forms go back to the list with ?import_job= to poll."""
+    rt = (request.args.get("rt") or request.form.get("rt") or "").strip()
+    wants_json = "application/json" in (request.headers.get("Accept") or "")
+    job = enqueue_import(
+        org_id=current_user.org_id,
+        user_id=getattr(current_user, "id", None),
+        kind=kind,
+        source=source,
+        dry_run=_import_dry_run(),
+        filename=filename,
+        upload=upload,
+    )
+    if not wants_json:
+        flash("Import started — progress is shown below.", "info")
+        return redirect(url_for(page, rt=rt, import_job=job.id))
+    body = _import_job_body(job)
+    resp = jsonify(body)
+    resp.status_code = 202
+    resp.headers["Location"] = body["status_url"]
+    resp.headers["Retry-After"] = "1"
+    return resp
+
+
+def _enqueue_upload_response(kind: str, page: str):
+    rt = (request.args.get("rt") or request.form.get("rt") or "").strip()
+    wants_json = "application/json" in (request.headers.get("Accept") or "")
+    f = request.files.get("file")
+    filename = (f.filename or "").strip() if f else ""
+    error, status = None, 400
+    if not filename.lower().endswith((".csv", ".xlsx")):
+        error = "Upload a .csv or .xlsx file."
+    else:
+        max_bytes = current_app.config.get("IMPORT_UPLOAD_MAX_BYTES", 20 * 1024 * 1024)
+        data = f.stream.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            error, status = f"File too large (limit {max_bytes // (1024 * 1024)} MB).", 413
+    if error:
+        if wants_json:
+            return jsonify(ok=False, error=error), status
+        flash(error, "danger")
+        return redirect(url_for(page, rt=rt))
+    return _enqueue_import_response(kind, page, source=IMPORT_SOURCE_UPLOAD, filename=filename[:255], upload=data)
+
+
 @role_required(ROLE_ADMIN, ROLE_OWNER)
 @bp.post("/materials/import-starter-pack", endpoint="import_materials_starter_pack")
 @limiter.limit("120 per minute")
 def materials_import_starter_pack_post():
-    try:
-        inserted, updated = import_materials_starter_pack()
-        rt = (request.args.get("rt") or request.form.get("rt") or "").strip()
-        total = (inserted or 0) + (updated or 0)
-        if total == 0:
-            msg = "Import complete — no changes (already up to date)."
-            category = "info"
-        elif inserted and updated:
-            msg = f"Import complete — {inserted} added, {updated} updated."
-            category = "success"
-        elif inserted:
-            msg = f"Import complete — {inserted} item{'s' if inserted != 1 else ''} added."
-            category = "success"
-        else:
-            msg = f"Import complete — {updated} item{'s' if updated != 1 else ''} updated."
-            category = "success"
-        flash(msg, category)
-        if "application/json" in (request.headers.get("Accept") or ""):
-            return jsonify(ok=True, message=msg, inserted=inserted, updated=updated)
-        return redirect(url_for("libraries.materials", rt=rt))
-    except Exception as e:
-        if "application/json" in (request.headers.get("Accept") or ""):
-            return jsonify(ok=False, error=str(e)), 400
-        flash("Import failed — please try again.", "danger")
-        return redirect(url_for("libraries.materials", rt=rt))
+    return _enqueue_import_response("materials", "libraries.materials")
+
+@role_required(ROLE_ADMIN, ROLE_OWNER)
+@bp.post("/materials/import-upload", endpoint="import_materials_upload")
+@limiter.limit("30 per minute")
+def materials_import_upload_post():
+    return _enqueue_upload_response("materials", "libraries.materials")
+
+@bp.get("/imports/<job_id>.json", endpoint="import_job_status")
+def import_job_status(job_id: str):
+    job = (
+        db.session.query(ImportJob)
+        .options(defer(ImportJob.upload))
+        .filter_by(id=job_id, org_id=current_user.org_id)
+        .first_or_404()
+    )
+    resp = jsonify(_import_job_body(job))
+    if job.status not in (IMPORT_JOB_DONE, IMPORT_JOB_FAILED):
+        resp.headers["Retry-After"] = "1"
+        recover_local_jobs()  # local backend: a restarted web worker may have orphaned it
+    return resp
 
 @role_required(ROLE_ADMIN, ROLE_OWNER)
 @bp.route("/materials/<int:material_id>", methods=["DELETE"])
 def materials_delete(material_id: int):
     m = Material.query.filter_by(id=material_id, org_id=current_user.org_id).first_or_404()
+    keys = resolved_material_keys([m.id])
     db.session.delete(m)
+    db.session.flush()
+    # Deleting an override re-exposes the global row for the same key
+    refresh_resolved_materials(org_id=current_user.org_id, keys=keys)
     db.session.commit()
     return jsonify(ok=True), 204
 
@@ -311,6 +502,7 @@ def materials_update(material_id: int):
                 is_active=True,
             )
             db.session.add(clone)
+            target = clone
         else:
             # ORG row → edit in place
             m.item_description = desc
@@ -319,7 +511,10 @@ def materials_update(material_id: int):
             m.unit_quantity_size = unit_q
             # Mark as user-edited to protect from future seed refresh
             m.updated_at = func.now()
+            target = m
 
+        db.session.flush()
+        refresh_resolved_materials(org_id=current_user.org_id, material_ids=[target.id])
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
@@ -333,27 +528,11 @@ def materials_update(material_id: int):
 @require_member
 @bp.get("/dje")
 def dje():
-    # Overlay: org overrides OR global (not overridden by this org)
-    O = aliased(DjeItem)
+    # Overlay: org overrides OR global (not overridden by this org) — pre-resolved per org
     items = (
         db.session.query(DjeItem)
-        .filter(DjeItem.is_active.is_(True))
-        .filter(
-            or_(
-                DjeItem.org_id == current_user.org_id,
-                and_(
-                    DjeItem.org_id.is_(None),
-                    ~exists().where(and_(
-                        O.is_active.is_(True),
-                        O.org_id == current_user.org_id,
-                        func.lower(func.trim(O.category)) == func.lower(func.trim(DjeItem.category)),
-                        func.lower(func.trim(O.description)) == func.lower(func.trim(DjeItem.description)),
-                        func.coalesce(func.lower(func.trim(O.vendor)), "") ==
-                        func.coalesce(func.lower(func.trim(DjeItem.vendor)), "")
-                    ))
-                ),
-            )
-        )
+        .join(ResolvedDjeItem, ResolvedDjeItem.dje_item_id == DjeItem.id)
+        .filter(ResolvedDjeItem.org_id == current_user.org_id)
         .order_by(
             func.lower(DjeItem.category).asc(),
             func.lower(DjeItem.subcategory).asc(),
@@ -462,6 +641,8 @@ def create_dje():
     item.org_id = current_user.org_id
     try:
         db.session.add(item)
+        db.session.flush()
+        refresh_resolved_dje(org_id=current_user.org_id, item_ids=[item.id])
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
@@ -487,31 +668,13 @@ def create_dje():
 @bp.post("/dje/import-starter-pack", endpoint="import_dje_starter_pack")
 @limiter.limit("120 per minute")
 def dje_import_starter_pack_post():
-    try:
-        rt = (request.args.get("rt") or request.form.get("rt") or "").strip()
-        inserted, updated = import_dje_starter_pack()
-        total = (inserted or 0) + (updated or 0)
-        if total == 0:
-            msg = "Import complete — no changes (already up to date)."
-            category = "info"
-        elif inserted and updated:
-            msg = f"Import complete — {inserted} added, {updated} updated."
-            category = "success"
-        elif inserted:
-            msg = f"Import complete — {inserted} item{'s' if inserted != 1 else ''} added."
-            category = "success"
-        else:
-            msg = f"Import complete — {updated} item{'s' if updated != 1 else ''} updated."
-            category = "success"
-        flash(msg, category)
-        if "application/json" in (request.headers.get("Accept") or ""):
-            return jsonify(ok=True, message=msg, inserted=inserted, updated=updated)
-        return redirect(url_for("libraries.dje", rt=rt))
-    except Exception as e:
-        if "application/json" in (request.headers.get("Accept") or ""):
-            return jsonify(ok=False, error=str(e)), 400
-        flash("Import failed — please try again.", "danger")
-        return redirect(url_for("libraries.dje", rt=rt))
+    return _enqueue_import_response("dje_items", "libraries.dje")
+
+@role_required(ROLE_ADMIN, ROLE_OWNER)
+@bp.post("/dje/import-upload", endpoint="import_dje_upload")
+@limiter.limit("30 per minute")
+def dje_import_upload_post():
+    return _enqueue_upload_response("dje_items", "libraries.dje")
 
 @role_required(ROLE_ADMIN, ROLE_OWNER)
 @bp.put("/dje/<int:item_id>")
@@ -556,7 +719,6 @@ def update_dje(item_id):
                 is_active=is_active,
             )
             db.session.add(clone)
-            db.session.commit()
             target = clone
         else:
             # ORG row → edit in place
@@ -566,8 +728,11 @@ def update_dje(item_id):
             item.is_active = is_active
             # Mark as user-edited to protect from future seed refresh
             item.updated_at = func.now()
-            db.session.commit()
             target = item
+
+        db.session.flush()
+        refresh_resolved_dje(org_id=current_user.org_id, item_ids=[target.id])
+        db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({
@@ -593,7 +758,11 @@ def update_dje(item_id):
 @limiter.limit("120 per minute")
 def delete_dje(item_id):
     item = DjeItem.query.filter_by(id=item_id, org_id=current_user.org_id).first_or_404()
+    keys = resolved_dje_keys([item.id])
     db.session.delete(item)
+    db.session.flush()
+    # Deleting an override re-exposes the global row for the same key
+    refresh_resolved_dje(org_id=current_user.org_id, keys=keys)
     db.session.commit()
     return ("", 204)
 
@@ -609,18 +778,16 @@ def customers():
     if active in ("true", "false"):
         query = query.filter(Customer.is_active.is_(active == "true"))
 
+    order = [func.lower(Customer.company_name).asc()]
     if q:
-        pattern = f"%{q.lower()}%"
-        query = query.filter(or_(
-            func.lower(Customer.company_name).like(pattern),
-            func.lower(Customer.contact_name).like(pattern),
-            func.lower(Customer.email).like(pattern),
-        ))
+        match, rank = text_search((Customer.company_name, Customer.contact_name, Customer.email), q)
+        query = query.filter(match)
+        order.insert(0, rank.desc())
 
     if city:
         query = query.filter(func.lower(Customer.city).like(f"%{city.lower()}%"))
 
-    items = query.order_by(func.lower(Customer.company_name).asc()).limit(250).all()
+    items = query.order_by(*order).limit(250).all()
 
     # Back-link handoff (same pattern you use elsewhere)
     rt = (request.args.get("rt") or "").strip()
@@ -654,15 +821,13 @@ def customers_json():
     if active in ("true", "false"):
         query = query.filter(Customer.is_active.is_(active == "true"))
 
+    order = [func.lower(Customer.company_name).asc()]
     if q:
-        pattern = f"%{q.lower()}%"
-        query = query.filter(or_(
-            func.lower(Customer.company_name).like(pattern),
-            func.lower(Customer.contact_name).like(pattern),
-            func.lower(Customer.email).like(pattern),
-        ))
-
-    rows = query.order_by(func.lower(Customer.company_name).asc()).limit(500).all()
+        match, rank = text_search((Customer.company_name, Customer.contact_name, Customer.email), q)
+        query = query.filter(match)
+        order.insert(0, rank.desc())
+
+    rows = query.order_by(*order).limit(500).all()
     data = [{
         "id": c.id,
         "company_name": c.company_name,
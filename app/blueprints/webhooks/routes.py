@@ -10,6 +10,7 @@ import json
 import stripe
 from stripe import StripeClient
 from app.billing.entitlements import resolve_entitlements
+from app.security.entitlement_cache import invalidate_entitlements
 
 def _valid_signature(raw_body: bytes, timestamp: str, sig: str) -> bool:
     secret = os.getenv("EMAIL_WEBHOOK_SECRET")
@@ -247,6 +248,8 @@ def stripe_webhook():
             s.entitlements_json = resolve_entitlements(product_id=product_id, price_id=price_id)
 
         db.session.commit()
+        # After commit, so a concurrent request cannot re-cache the old row
+        invalidate_entitlements(org_id)
 
     def _reconcile_by_subscription_id(sub_id: str, org_from_meta: int | None = None):
         client = _client()
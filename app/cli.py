@@ -4,6 +4,7 @@ from app.extensions import db
 from app.models.user import User
 from app.models.org import Org
 from app.models.org_membership import OrgMembership, ROLE_OWNER, ROLE_ADMIN, ROLE_MEMBER 
+from app.services.catalog import refresh_resolved_catalog
 
 def _get_or_create_org(name: str) -> Org:
     org = db.session.query(Org).filter(Org.name == name).one_or_none()
@@ -12,6 +13,7 @@ def _get_or_create_org(name: str) -> Org:
     org = Org(name=name, is_active=True)
     db.session.add(org)
     db.session.flush()
+    refresh_resolved_catalog(org.id)
     return org
 
 @click.group()
@@ -118,7 +120,148 @@ def members_demote(org_id, email):
     db.session.commit()
     click.echo(f"Demoted {email} in org {org_id} to member")
 
+@click.group()
+def pdf():
+    """PDF export jobs."""
+
+@pdf.command("worker")
+@click.option("--poll-interval", type=float, default=1.0, show_default=True)
+@click.option("--once", is_flag=True, help="Drain queued jobs and exit")
+@with_appcontext
+def pdf_worker(poll_interval, once):
+    from app.services.export_jobs import work
+    processed = work(poll_interval=poll_interval, once=once)
+    click.echo(f"Processed {processed} export job(s)")
+
+@pdf.command("bench")
+@click.option("--runs", type=int, default=20, show_default=True)
+@with_appcontext
+def pdf_bench(runs):
+    """Per-export latency: per-call CSS parse + fresh fonts (before) vs cached (after)."""
+    import statistics
+    import time
+    from flask import current_app
+    from weasyprint import HTML, CSS
+    from app.services.exports import render_fast_summary_html, render_pdf_bytes, summary_pdf_stylesheets
+
+    stylesheets = summary_pdf_stylesheets(current_app.root_path)
+    with current_app.test_request_context("/"):
+        html = render_fast_summary_html({"summary_export": {"cells": {}, "controls": {}}})
+
+    def uncached():
+        HTML(string=html, base_url=None).write_pdf(stylesheets=[CSS(filename=p) for p in stylesheets])
+
+    def cached():
+        render_pdf_bytes(html, None, stylesheets)
+
+    def timed(fn):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return samples
+
+    for label, fn in (("before (parse per export)", uncached), ("after (cached css+fonts)", cached)):
+        samples = timed(fn)
+        p95 = sorted(samples)[max(0, int(len(samples) * 0.95) - 1)]
+        click.echo(
+            f"{label:28s} runs={runs} first={samples[0]:.1f}ms "
+            f"median={statistics.median(samples):.1f}ms p95={p95:.1f}ms"
+        )
+
+@click.group()
+def estimates():
+    """Estimate maintenance."""
+
+@estimates.command("reprice")
+@click.option("--org-id", type=int, default=None, help="Only this org's estimates")
+@click.option("--batch-size", type=int, default=200, show_default=True)
+@with_appcontext
+def estimates_reprice(org_id, batch_size):
+    """Recompute estimate_lines and the totals columns from every estimate's work_payload."""
+    from app.models.estimate import Estimate
+    from app.services.estimate_lines import (
+        PricedValueError, check_priced_values, estimate_totals, price_saved_payload, replace_estimate_lines,
+    )
+
+    stmt = db.select(Estimate.id).order_by(Estimate.id)
+    if org_id is not None:
+        stmt = stmt.where(Estimate.org_id == org_id)
+    ids = db.session.execute(stmt).scalars().all()
+
+    estimates_done = lines = 0
+    for start in range(0, len(ids), batch_size):
+        batch = db.session.execute(
+            db.select(Estimate.id, Estimate.org_id, Estimate.work_payload, Estimate.settings_snapshot)
+            .where(Estimate.id.in_(ids[start:start + batch_size]))
+        ).all()
+        for eid, oid, payload, snapshot in batch:
+            pricing = price_saved_payload(oid, payload or {}, snapshot or {})
+            try:
+                check_priced_values(pricing)
+            except PricedValueError as e:
+                click.echo(f"Skipped estimate {eid}: {e}", err=True)
+                continue
+            db.session.execute(
+                db.update(Estimate).where(Estimate.id == eid).values(**estimate_totals(pricing))
+            )
+            lines += replace_estimate_lines(eid, oid, payload or {}, pricing)
+            estimates_done += 1
+        db.session.commit()
+    click.echo(f"Repriced {estimates_done} estimate(s), {lines} line(s)")
+
+@click.group()
+def imports():
+    """Catalog import jobs."""
+
+@imports.command("worker")
+@click.option("--poll-interval", type=float, default=1.0, show_default=True)
+@click.option("--once", is_flag=True, help="Drain queued jobs and exit")
+@with_appcontext
+def imports_worker(poll_interval, once):
+    from app.services.import_jobs import work
+    processed = work(poll_interval=poll_interval, once=once)
+    click.echo(f"Processed {processed} import job(s)")
+
+@click.group()
+def mail():
+    """Email outbox."""
+
+@mail.command("worker")
+@click.option("--poll-interval", type=float, default=1.0, show_default=True)
+@click.option("--once", is_flag=True, help="Send due messages and exit")
+@click.option("--batch-size", type=int, default=None, help="Messages per SMTP connection (default MAIL_OUTBOX_BATCH_SIZE)")
+@with_appcontext
+def mail_worker(poll_interval, once, batch_size):
+    from app.services.mail_outbox import work
+    processed = work(poll_interval=poll_interval, once=once, batch_size=batch_size)
+    click.echo(f"Processed {processed} message(s)")
+
+@click.group()
+def seeds():
+    """Seed workbook maintenance."""
+
+@seeds.command("cache")
+@with_appcontext
+def seeds_cache():
+    """Build the Parquet copies of data/*.xlsx ahead of the first import (e.g. at deploy)."""
+    from flask import current_app
+    from app.services.seed_cache import read_seed_workbook, seed_cache_dir
+
+    cache_dir = seed_cache_dir(current_app)
+    if cache_dir is None:
+        raise click.ClickException("Seed cache is disabled (SEED_CACHE_ENABLED=false)")
+    for path in ("data/Materials_DB_Seed.xlsx", "data/dje_items.xlsx"):
+        rows = len(read_seed_workbook(path, cache_dir=cache_dir))
+        click.echo(f"Cached {path} rows={rows} dir={cache_dir}")
+
 def register_cli(app):
     # keep existing registrations, then add:
     app.cli.add_command(members)
+    app.cli.add_command(pdf)
+    app.cli.add_command(estimates)
+    app.cli.add_command(seeds)
+    app.cli.add_command(imports)
+    app.cli.add_command(mail)
 
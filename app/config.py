@@ -35,6 +35,13 @@ class BaseConfig:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", 'Electrical Estimator <no-reply@local.test>')
     MAIL_SUPPRESS_SEND = (os.getenv("MAIL_SUPPRESS_SEND", "false").lower() == "true")
+    # Outbox: requests queue rendered mail in email_logs; `flask mail worker` sends it in
+    # batches over one SMTP connection, retrying transient failures with exponential backoff.
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", "50"))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+    MAIL_OUTBOX_RETRY_SECONDS = int(os.getenv("MAIL_OUTBOX_RETRY_SECONDS", "60"))
+    MAIL_OUTBOX_MAX_RETRY_SECONDS = int(os.getenv("MAIL_OUTBOX_MAX_RETRY_SECONDS", "3600"))
+    MAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", "300"))
 
     # Used for absolute links in emails (must be https in prod)
     APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5000")
@@ -63,6 +70,42 @@ class BaseConfig:
     # Taxes: we use exclusive pricing; Stripe Tax computes/collects at checkout/invoice
     ENABLE_STRIPE_TAX = (os.getenv("ENABLE_STRIPE_TAX", "true").lower() == "true")
 
+    # Estimator catalog endpoints: max serialized responses kept per worker (LRU)
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "512"))
+
+    # Summary PDF exports: small documents render inline; larger ones (or clients sending
+    # "Prefer: respond-async") become export jobs. Backend "local" renders in a per-worker
+    # process pool; "worker" leaves jobs for `flask pdf worker`.
+    PDF_JOBS_BACKEND = os.getenv("PDF_JOBS_BACKEND", "local")
+    PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", "2"))
+    PDF_JOB_THREADS = int(os.getenv("PDF_JOB_THREADS", "2"))
+    PDF_RENDER_TIMEOUT_SECONDS = int(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "120"))
+    PDF_JOB_RETENTION_SECONDS = int(os.getenv("PDF_JOB_RETENTION_SECONDS", str(24 * 3600)))
+    PDF_SYNC_MAX_HTML_BYTES = int(os.getenv("PDF_SYNC_MAX_HTML_BYTES", "65536"))
+    PDF_WARMUP_ON_BOOT = (os.getenv("PDF_WARMUP_ON_BOOT", "false").lower() == "true")
+    # Rendered saved-estimate PDFs (content-addressed, LRU on local disk; 0 disables)
+    PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")  # default: <instance>/pdf_cache
+    PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Catalog imports (starter packs, CSV/XLSX uploads) run as import jobs, committing and
+    # reporting progress every IMPORT_CHUNK_ROWS rows. "local": per-worker thread pool;
+    # "worker": jobs wait for `flask imports worker`.
+    IMPORT_JOBS_BACKEND = os.getenv("IMPORT_JOBS_BACKEND", "local")
+    IMPORT_JOB_THREADS = int(os.getenv("IMPORT_JOB_THREADS", "1"))
+    IMPORT_JOB_STALL_SECONDS = int(os.getenv("IMPORT_JOB_STALL_SECONDS", "300"))
+    IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "1000"))
+    IMPORT_UPLOAD_MAX_BYTES = int(os.getenv("IMPORT_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+
+    # Seed workbooks: Parquet copies keyed by the workbook's sha256 (app/services/seed_cache.py)
+    SEED_CACHE_ENABLED = (os.getenv("SEED_CACHE_ENABLED", "true").lower() == "true")
+    SEED_CACHE_DIR = os.getenv("SEED_CACHE_DIR")  # default: <instance>/seed_cache
+
+    # Subscription gates: org_id → (status, entitlements, period end), invalidated by the
+    # Stripe webhook. Shared via Redis when available; 0 disables.
+    ENTITLEMENT_CACHE_TTL_SECONDS = int(os.getenv("ENTITLEMENT_CACHE_TTL_SECONDS", "30"))
+    ENTITLEMENT_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("ENTITLEMENT_CACHE_LOCAL_TTL_SECONDS", "5"))
+    ENTITLEMENT_CACHE_REDIS_URL = os.getenv("ENTITLEMENT_CACHE_REDIS_URL") or os.getenv("REDIS_URL")
+
     # Token salt for email flows
     EMAIL_TOKEN_SALT = os.getenv("EMAIL_TOKEN_SALT", "email-token-v1")
 
@@ -84,6 +127,7 @@ class ProductionConfig(BaseConfig):
     # allow override if you need "Strict" for purely internal apps
     SESSION_COOKIE_SAMESITE = os.environ.get("SESSION_COOKIE_SAMESITE", "Lax")
     MAIL_SUPPRESS_SEND = False
+    PDF_WARMUP_ON_BOOT = (os.getenv("PDF_WARMUP_ON_BOOT", "true").lower() == "true")
 
 class StagingConfig(ProductionConfig):
     # Inherit production-grade security/cookies; override here only if needed for staging
@@ -95,6 +139,16 @@ class TestingConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite:///:memory:")
     SESSION_COOKIE_SECURE = False
     REMEMBER_COOKIE_SECURE = False
+    # Tests drive export jobs explicitly (no background threads/processes)
+    PDF_JOBS_BACKEND = "worker"
+    PDF_RENDER_PROCESSES = 0
+    PDF_CACHE_MAX_BYTES = 0
+    IMPORT_JOBS_BACKEND = "worker"
+    # Tests swap pd.read_excel under a fixed workbook path
+    SEED_CACHE_ENABLED = False
+    # Tests write subscriptions directly (no webhook); cache tests opt in
+    ENTITLEMENT_CACHE_TTL_SECONDS = 0
+    ENTITLEMENT_CACHE_REDIS_URL = None
 
 _ENV_MAP = {
     "development": DevelopmentConfig,
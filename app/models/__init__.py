@@ -1,9 +1,11 @@
 from .assembly import Assembly, AssemblyComponent
 from .material import Material
 from .dje_item import DjeItem
+from .resolved_catalog import ResolvedMaterial, ResolvedDjeItem
 from .app_settings import AppSettings
 from .customer import Customer
 from .estimate import Estimate
+from .estimate_line import EstimateLine
 from .user import User
 from .org import Org
 from .org_membership import OrgMembership
@@ -11,6 +13,8 @@ from .email_log import EmailLog
 from .billing_customer import BillingCustomer
 from .subscription import Subscription
 from .billing_event import BillingEventLog
+from .export_job import ExportJob
+from .import_job import ImportJob
 
 # Re-export role constants for tests and callers expecting them under app.models
 try:
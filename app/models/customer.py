@@ -35,6 +35,8 @@ class Customer(db.Model):
     created_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
     updated_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
 
+    # Trigram GIN indexes on lower(company_name / contact_name / email) are Postgres-only and
+    # live in migration 1c7f0e4b8d62 (see app/services/search.py)
     __table_args__ = (
         Index("ix_customers_company_name", company_name),
         Index("ix_customers_contact_name", contact_name),
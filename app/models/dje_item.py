@@ -8,6 +8,7 @@ from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.sql import func
 
 from app.extensions import db
+from app.models.material import NORM_KEY_SEP, norm_key_part, attach_norm_key_trigger, norm_key_column
 
 """
 Estimator catalog models — critical indexes & constraints (doc only)
@@ -22,10 +23,33 @@ Estimator catalog models — critical indexes & constraints (doc only)
     UNIQUE INDEX (category, description, vendor) WHERE is_active = true
     Rationale: Catalog-level de-dup of active items per vendor.
 
+  - norm_cat_desc_vendor_key (stored, derived):
+    coalesce(lower(trim(category)),'') || U+001F || coalesce(lower(trim(description)),'')
+      || U+001F || coalesce(lower(trim(vendor)),'')
+    Single-column overlay match key; never written by the app.
+
+  - ix_dje_items_org_norm_key_active:
+    (org_id, norm_cat_desc_vendor_key) WHERE is_active = true — overlay anti-join / per-key refresh.
+
+  - content_hash (written by imports only):
+    sha256 of the row's imported fields (app.services.persistence.content_hashes). Imports
+    compare it with the sheet and write only added / changed / retired rows.
+
   - chk_dje_items_unit_cost_nonneg (DB-level check):
     default_unit_cost ≥ 0 (enforced in DB).
 """
 
+DJE_NORM_KEY_SQL = (
+    "coalesce(lower(trim(category)), '') || '" + NORM_KEY_SEP + "' || "
+    "coalesce(lower(trim(description)), '') || '" + NORM_KEY_SEP + "' || "
+    "coalesce(lower(trim(vendor)), '')"
+)
+
+
+def dje_norm_key(category: Optional[str], description: Optional[str], vendor: Optional[str]) -> str:
+    """Python mirror of DJE_NORM_KEY_SQL (for building IN-lists)."""
+    return NORM_KEY_SEP.join((norm_key_part(category), norm_key_part(description), norm_key_part(vendor)))
+
 
 class DjeItem(db.Model):
     __tablename__ = "dje_items"
@@ -59,6 +83,9 @@ class DjeItem(db.Model):
     seed_version = db.Column(db.Integer, nullable=True)
     seed_key = db.Column(db.String, nullable=True)
     seeded_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Overlay match key (see module doc), kept current by trigger trg_dje_items_norm_key
+    norm_cat_desc_vendor_key = norm_key_column()
     created_at = db.Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
@@ -78,6 +105,13 @@ class DjeItem(db.Model):
         Index("ix_dje_items_cat_sub_desc", category, subcategory, description),
         Index("ix_dje_items_lower_description", func.lower(description)),
         Index("ix_dje_items_lower_description_pattern", func.lower(description)),
+        # Overlay anti-join / per-key refresh
+        Index(
+            "ix_dje_items_org_norm_key_active",
+            org_id,
+            norm_cat_desc_vendor_key,
+            postgresql_where=text("is_active = true"),
+        ),
         # Partial-unique across active catalog
         # Per‑org uniqueness for active DJE items (tenant‑scoped)
         Index(
@@ -118,3 +152,6 @@ class DjeItem(db.Model):
       vend = self.vendor or "-"
       desc = (self.description or "")[:40]
       return f"<DjeItem id={self.id} cat={self.category!r} desc={desc!r} vendor={vend!r} active={self.is_active}>"
+
+
+attach_norm_key_trigger(DjeItem.__table__, "norm_cat_desc_vendor_key", DJE_NORM_KEY_SQL, "category, description, vendor")
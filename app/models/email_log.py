@@ -10,9 +10,26 @@ class EmailLog(db.Model):
     template = db.Column(db.String(64), nullable=False)
     subject = db.Column(db.String(200), nullable=False)
     provider_msg_id = db.Column(db.String(128), nullable=True, index=True)
-    status = db.Column(db.String(20), nullable=False, index=True)  # queued|sent|delivered|bounced|complaint|failed
+    status = db.Column(db.String(20), nullable=False, index=True)  # queued|sending|sent|delivered|bounced|complaint|failed
     meta = db.Column(db.JSON, nullable=False, default=dict)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Outbox (app/services/mail_outbox.py): rendered bodies wait here until `flask mail worker`
+    # sends them; cleared once the message is sent or given up on.
+    html_body = db.Column(db.Text, nullable=True)
+    text_body = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = db.Column(db.DateTime, nullable=True)  # queued: due time; sending: lease expiry
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # The outbox worker's poll: due rows only (sent/bounced history stays out of the index)
+        db.Index(
+            "ix_email_logs_outbox",
+            next_attempt_at,
+            postgresql_where=db.text("status IN ('queued', 'sending')"),
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<EmailLog id={self.id} to={self.to_email} status={self.status}>"
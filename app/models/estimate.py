@@ -29,14 +29,26 @@ class Estimate(db.Model):
     settings_snapshot = db.Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
     
     work_payload = db.Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    # Bumped on every payload write; PATCH /payload writers must present the revision they read
+    payload_revision = db.Column(db.Integer, nullable=False, server_default=text("0"))
+
+    # Summary totals priced from work_payload on every payload save (app/services/estimate_lines.py)
+    material_total    = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
+    labor_hours_total = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
+    break_even        = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
+    sell_price        = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
 
     # Timestamps
     created_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
     updated_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
 
+    # Trigram GIN indexes on lower(name) / lower(project_ref) are Postgres-only and live in
+    # migration 1c7f0e4b8d62 (see app/services/search.py)
     __table_args__ = (
         Index("ix_estimates_name", func.lower(name)),
         Index("ix_estimates_created_at", created_at),
+        # list.json default keyset order: WHERE org_id = ? ORDER BY updated_at DESC, id DESC
+        Index("ix_estimates_org_updated_at_id", org_id, updated_at.desc(), id.desc()),
     )
 
     def __repr__(self) -> str:
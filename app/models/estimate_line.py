@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from sqlalchemy import Index, text
+
+from app.extensions import db
+
+"""
+Estimate lines — normalized copy of the Estimator grid (doc only)
+
+• estimate_lines
+  - One row per non-blank grid row of Estimate.work_payload, rewritten in the same transaction
+    as every payload save (app/services/estimate_lines.py). work_payload stays the source of
+    truth for the UI; this table exists so reporting/exports can run as set-based SQL
+    ("which estimates use material X", "labor hours across open bids").
+  - position: index in the grid; row_id: the grid row's stable id (NULL for legacy rows).
+  - source_kind: 'material' | 'assembly'; material_id / assembly_id are set when the row
+    resolves against the org's catalog at save time (NULL when it no longer does).
+  - price_each / labor_each / material_ext / labor_hours are priced with the server engine
+    (app/services/calculations.py), i.e. the same numbers the grid displays.
+
+  - uq_estimate_lines_estimate_position: one line per grid position; also serves estimate_id lookups.
+  - ix_estimate_lines_material_id / ix_estimate_lines_assembly_id: partial, non-NULL only.
+"""
+
+LINE_SOURCE_MATERIAL = "material"
+LINE_SOURCE_ASSEMBLY = "assembly"
+
+
+class EstimateLine(db.Model):
+    __tablename__ = "estimate_lines"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    estimate_id = db.Column(db.Integer, db.ForeignKey("estimates.id", ondelete="CASCADE"), nullable=False)
+    org_id = db.Column(db.Integer, db.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    position = db.Column(db.Integer, nullable=False)
+    row_id = db.Column(db.String(64), nullable=True)
+
+    source_kind = db.Column(db.String(16), nullable=False)
+    item_type = db.Column(db.String(255), nullable=False)
+    material_id = db.Column(db.Integer, db.ForeignKey("materials.id", ondelete="SET NULL"), nullable=True)
+    assembly_id = db.Column(db.Integer, db.ForeignKey("assemblies.id", ondelete="SET NULL"), nullable=True)
+    description = db.Column(db.String(255), nullable=True)
+
+    qty = db.Column(db.Numeric(14, 4), nullable=False, server_default=text("0"))
+    labor_adj = db.Column(db.Numeric(6, 2), nullable=False, server_default=text("1"))
+    price_each = db.Column(db.Numeric(14, 4), nullable=False, server_default=text("0"))
+    labor_each = db.Column(db.Numeric(14, 4), nullable=False, server_default=text("0"))
+    material_ext = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
+    labor_hours = db.Column(db.Numeric(14, 2), nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        Index("uq_estimate_lines_estimate_position", estimate_id, position, unique=True),
+        Index("ix_estimate_lines_material_id", material_id, postgresql_where=text("material_id IS NOT NULL")),
+        Index("ix_estimate_lines_assembly_id", assembly_id, postgresql_where=text("assembly_id IS NOT NULL")),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EstimateLine estimate_id={self.estimate_id} position={self.position} {self.source_kind}>"
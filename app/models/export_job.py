@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+
+from app.extensions import db
+
+"""
+Export jobs — queued PDF renders (doc only)
+
+• export_jobs
+  - One row per requested render. The request renders the Jinja HTML (cheap) and stores it;
+    WeasyPrint runs later in a render process (local pool or `flask pdf worker`).
+  - status: queued → running → done | failed. Claiming is a conditional UPDATE on status so a
+    job is rendered once even with several workers polling the table.
+  - html is cleared once the PDF is stored; result holds the PDF bytes for download.
+  - cache_key (saved-estimate exports): the PdfCache key the finished PDF is also stored under.
+
+  - ix_export_jobs_queued: partial index on created_at for the worker's "oldest queued" poll.
+  - ix_export_jobs_org_id: org-scoped lookups from the poll/download endpoints.
+"""
+
+EXPORT_JOB_QUEUED = "queued"
+EXPORT_JOB_RUNNING = "running"
+EXPORT_JOB_DONE = "done"
+EXPORT_JOB_FAILED = "failed"
+
+
+class ExportJob(db.Model):
+    __tablename__ = "export_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex; not guessable across orgs
+
+    org_id = db.Column(db.Integer, db.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    estimate_id = db.Column(db.Integer, db.ForeignKey("estimates.id", ondelete="CASCADE"), nullable=True)
+
+    kind = db.Column(db.String(32), nullable=False, server_default=text("'summary_pdf'"))
+    status = db.Column(db.String(16), nullable=False, server_default=text("'queued'"))
+    attempts = db.Column(db.Integer, nullable=False, server_default=text("0"))
+
+    filename = db.Column(db.String(255), nullable=False)
+    base_url = db.Column(db.String(255), nullable=True)
+    html = db.Column(db.Text, nullable=True)
+    result = db.Column(db.LargeBinary, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cache_key = db.Column(db.String(64), nullable=True)
+
+    created_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    started_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_export_jobs_queued", created_at, postgresql_where=text("status = 'queued'")),
+        Index("ix_export_jobs_org_id", org_id),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ExportJob id={self.id} status={self.status!r}>"
+
+    def to_dict(self) -> dict:
+        return dict(
+            job_id=self.id,
+            kind=self.kind,
+            status=self.status,
+            estimate_id=self.estimate_id,
+            filename=self.filename,
+            error=self.error,
+            created_at=self.created_at.isoformat() if self.created_at else None,
+            finished_at=self.finished_at.isoformat() if self.finished_at else None,
+        )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP
+
+from app.extensions import db
+
+"""
+Import jobs — queued catalog imports (doc only)
+
+• import_jobs
+  - One row per requested import into materials / dje_items (kind), either the bundled
+    starter pack (source='starter_pack') or an uploaded CSV/XLSX (source='upload').
+  - status: queued → running → done | failed; claimed with a conditional UPDATE on status,
+    same as export_jobs.
+  - upload holds the uploaded file until the job finishes (any worker can process it); it is
+    read in chunks of IMPORT_CHUNK_ROWS rows and cleared when the job ends.
+  - Progress: every committed chunk updates rows_done / chunks_done and report (running
+    added / changed / unchanged / retired counts); rows_total is set when known up front.
+
+  - ix_import_jobs_queued: partial index on created_at for the worker's "oldest queued" poll.
+  - ix_import_jobs_org_id: org-scoped lookups from the progress endpoint.
+"""
+
+IMPORT_JOB_QUEUED = "queued"
+IMPORT_JOB_RUNNING = "running"
+IMPORT_JOB_DONE = "done"
+IMPORT_JOB_FAILED = "failed"
+
+IMPORT_SOURCE_STARTER_PACK = "starter_pack"
+IMPORT_SOURCE_UPLOAD = "upload"
+
+
+class ImportJob(db.Model):
+    __tablename__ = "import_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex; not guessable across orgs
+
+    org_id = db.Column(db.Integer, db.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    kind = db.Column(db.String(32), nullable=False)  # materials | dje_items
+    source = db.Column(db.String(16), nullable=False, server_default=text("'starter_pack'"))
+    status = db.Column(db.String(16), nullable=False, server_default=text("'queued'"))
+    attempts = db.Column(db.Integer, nullable=False, server_default=text("0"))
+    dry_run = db.Column(db.Boolean, nullable=False, server_default=text("false"))
+
+    filename = db.Column(db.String(255), nullable=True)
+    upload = db.Column(db.LargeBinary, nullable=True)
+
+    rows_total = db.Column(db.Integer, nullable=True)
+    rows_done = db.Column(db.Integer, nullable=False, server_default=text("0"))
+    chunks_done = db.Column(db.Integer, nullable=False, server_default=text("0"))
+    report = db.Column(JSONB, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    started_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+    updated_at = db.Column(TIMESTAMP(timezone=True), nullable=True)  # last progress write
+    finished_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_import_jobs_queued", created_at, postgresql_where=text("status = 'queued'")),
+        Index("ix_import_jobs_org_id", org_id),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportJob id={self.id} kind={self.kind!r} status={self.status!r}>"
+
+    def to_dict(self) -> dict:
+        return dict(
+            job_id=self.id,
+            kind=self.kind,
+            source=self.source,
+            status=self.status,
+            dry_run=bool(self.dry_run),
+            filename=self.filename,
+            rows_total=self.rows_total,
+            rows_done=self.rows_done or 0,
+            chunks_done=self.chunks_done or 0,
+            report=self.report,
+            error=self.error,
+            created_at=self.created_at.isoformat() if self.created_at else None,
+            updated_at=self.updated_at.isoformat() if self.updated_at else None,
+            finished_at=self.finished_at.isoformat() if self.finished_at else None,
+        )
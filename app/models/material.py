@@ -3,7 +3,7 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import Index, text
+from sqlalchemy import DDL, FetchedValue, Index, event, text
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.sql import func
 
@@ -16,6 +16,9 @@ Estimator catalog models — critical indexes & constraints (doc only)
   - ix_materials_lower_item_description / ix_materials_lower_item_description_pattern:
     Functional BTREE indexes on lower(item_description) (pattern_ops) for fast ILIKE / prefix search.
 
+  - ix_materials_{item_description,sku,manufacturer,vendor}_trgm (Postgres, migration only):
+    GIN (lower(col) gin_trgm_ops) for substring / similarity search (app/services/search.py).
+
   - ix_materials_material_type / ix_materials_type_active_desc:
     Common filtering/sorting paths for grid views (type + active + description).
 
@@ -23,11 +26,82 @@ Estimator catalog models — critical indexes & constraints (doc only)
     UNIQUE INDEX (material_type, item_description) WHERE is_active = true
     Rationale: Avoid duplicate live SKUs by type/description; allow inactive history.
 
+  - norm_type_desc_key (stored, derived):
+    coalesce(lower(trim(material_type)),'') || U+001F || coalesce(lower(trim(item_description)),'')
+    The overlay match key as one plain column, so org-vs-global anti-joins compare a single
+    indexed value instead of re-evaluating lower(trim()) on both sides. Never written by the app.
+
+  - ix_materials_org_norm_key_active:
+    (org_id, norm_type_desc_key) WHERE is_active = true — backs the overlay anti-join and
+    per-key resolved-catalog refresh (org rows and org_id IS NULL globals alike).
+
+  - content_hash (written by imports only):
+    sha256 of the row's imported fields (app.services.persistence.content_hashes). Imports
+    compare it with the sheet and write only added / changed / retired rows.
+
   - chk_materials_unit (DB-level check):
     unit_quantity_size ∈ {1, 100, 1000} (enforced in DB, not re-declared in ORM to prevent autogen churn).
 
 """
 
+# Separator for composite normalized keys (ASCII unit separator; never appears in catalog text)
+NORM_KEY_SEP = "\x1f"
+
+MATERIAL_NORM_KEY_SQL = (
+    "coalesce(lower(trim(material_type)), '') || '" + NORM_KEY_SEP + "' || "
+    "coalesce(lower(trim(item_description)), '')"
+)
+
+
+def norm_key_part(value: Optional[str]) -> str:
+    # SQL trim() strips spaces only (not tabs / newlines / NBSP, unlike str.strip())
+    return (value or "").strip(" ").lower()
+
+
+def material_norm_key(material_type: Optional[str], item_description: Optional[str]) -> str:
+    """Python mirror of MATERIAL_NORM_KEY_SQL (for building IN-lists)."""
+    return NORM_KEY_SEP.join((norm_key_part(material_type), norm_key_part(item_description)))
+
+
+def norm_key_column() -> db.Column:
+    """Overlay key column: plain TEXT maintained by trg_<table>_norm_key (never written by the ORM)."""
+    return db.Column(db.Text, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
+
+
+def attach_norm_key_trigger(table, column: str, expr: str, source_cols: str) -> None:
+    """
+    Give create_all() the trigger migration 8d41f6c2b9e7 installs, so both build the same schema.
+    Postgres: the migration's BEFORE trigger. SQLite (tests / local dev) cannot assign NEW.*
+    in a trigger, so it re-derives the key with AFTER INSERT / UPDATE triggers instead.
+    """
+    name = table.name
+    pg_expr = expr.replace("trim(", "trim(NEW.")
+    ddl = [
+        DDL(f"""
+            CREATE OR REPLACE FUNCTION {name}_set_norm_key() RETURNS trigger AS $$
+            BEGIN
+                NEW.{column} := {pg_expr};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """).execute_if(dialect="postgresql"),
+        DDL(f"""
+            CREATE TRIGGER trg_{name}_norm_key
+            BEFORE INSERT OR UPDATE OF {source_cols} ON {name}
+            FOR EACH ROW EXECUTE FUNCTION {name}_set_norm_key()
+        """).execute_if(dialect="postgresql"),
+    ]
+    refresh = f"UPDATE {name} SET {column} = {expr} WHERE id = NEW.id;"
+    ddl += [
+        DDL(f"CREATE TRIGGER trg_{name}_norm_key_ins AFTER INSERT ON {name} BEGIN {refresh} END")
+        .execute_if(dialect="sqlite"),
+        DDL(f"CREATE TRIGGER trg_{name}_norm_key_upd AFTER UPDATE OF {source_cols} ON {name} BEGIN {refresh} END")
+        .execute_if(dialect="sqlite"),
+    ]
+    for stmt in ddl:
+        event.listen(table, "after_create", stmt)
+
+
 class Material(db.Model):
     __tablename__ = "materials"
     __allow_unmapped__ = True
@@ -64,6 +138,9 @@ class Material(db.Model):
     seed_version = db.Column(db.Integer, nullable=True)
     seed_key = db.Column(db.String, nullable=True)
     seeded_at = db.Column(TIMESTAMP(timezone=True), nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Overlay match key (see module doc), kept current by trigger trg_materials_norm_key
+    norm_type_desc_key = norm_key_column()
     created_at = db.Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
@@ -90,6 +167,13 @@ class Material(db.Model):
         Index(
             "ix_materials_type_active_desc", material_type, is_active, item_description
         ),
+        # Overlay anti-join / per-key refresh
+        Index(
+            "ix_materials_org_norm_key_active",
+            org_id,
+            norm_type_desc_key,
+            postgresql_where=text("is_active = true"),
+        ),
         # Per‑org uniqueness for active materials (tenant‑scoped)
         Index(
             "ux_materials_org_type_desc_active_true",
@@ -126,3 +210,6 @@ class Material(db.Model):
     def __repr__(self) -> str:
         desc = (self.item_description or "").strip()
         return f"<Material id={self.id} type={self.material_type!r} desc={desc[:40]!r} active={self.is_active}>"
+
+
+attach_norm_key_trigger(Material.__table__, "norm_type_desc_key", MATERIAL_NORM_KEY_SQL, "material_type, item_description")
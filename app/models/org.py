@@ -7,6 +7,8 @@ class Org(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)  # simple label; can refine later
     is_active = db.Column(db.Boolean, nullable=False, server_default=db.text("true"))
+    # Bumped on every library (materials / DJE) write; drives Estimator catalog ETags
+    catalog_version = db.Column(db.BigInteger, nullable=False, server_default=db.text("0"))
 
     created_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
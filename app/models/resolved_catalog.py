@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from sqlalchemy import Index
+
+from app.extensions import db
+
+"""
+Resolved catalog — per-org materialization of the org-override-vs-global overlay (doc only)
+
+• resolved_materials / resolved_dje_items
+  - One row per (org, winning catalog row). The winner for a normalized key is the org's own
+    active row when one exists, otherwise the active global (org_id IS NULL) row.
+  - Maintained by app.services.catalog (incremental per-key refresh on library writes, full
+    per-org rebuild after starter-pack imports, all-org rebuild after global imports).
+  - Readers join by PK to the source table; no correlated NOT EXISTS on the read path.
+
+  - ix_resolved_materials_org_key / ix_resolved_dje_items_org_key:
+    (org_id, normalized key...) for the overlay lookup and for per-key incremental refresh.
+
+Normalized keys use coalesce(lower(trim(col)), '') so they can be NOT NULL.
+"""
+
+
+class ResolvedMaterial(db.Model):
+    __tablename__ = "resolved_materials"
+
+    org_id = db.Column(
+        db.Integer, db.ForeignKey("orgs.id", ondelete="CASCADE"), primary_key=True
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("materials.id", ondelete="CASCADE"), primary_key=True
+    )
+    type_key = db.Column(db.Text, nullable=False)
+    desc_key = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_resolved_materials_org_key", org_id, type_key, desc_key),
+        Index("ix_resolved_materials_material_id", material_id),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ResolvedMaterial org_id={self.org_id} material_id={self.material_id} key={self.type_key!r}|{self.desc_key!r}>"
+
+
+class ResolvedDjeItem(db.Model):
+    __tablename__ = "resolved_dje_items"
+
+    org_id = db.Column(
+        db.Integer, db.ForeignKey("orgs.id", ondelete="CASCADE"), primary_key=True
+    )
+    dje_item_id = db.Column(
+        db.Integer, db.ForeignKey("dje_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    category_key = db.Column(db.Text, nullable=False)
+    desc_key = db.Column(db.Text, nullable=False)
+    vendor_key = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_resolved_dje_items_org_key", org_id, category_key, desc_key, vendor_key),
+        Index("ix_resolved_dje_items_dje_item_id", dje_item_id),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ResolvedDjeItem org_id={self.org_id} dje_item_id={self.dje_item_id} key={self.category_key!r}|{self.desc_key!r}|{self.vendor_key!r}>"
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+
+try:  # pinned in requirements (limiter storage); in-process only if unavailable
+    import redis  # type: ignore
+except Exception:  # pragma: no cover
+    redis = None
+
+"""
+Cross-request entitlement cache: org_id → (subscription status, entitlements, period end).
+
+Subscriptions only change when /webhooks/stripe (or the post-checkout reconcile) writes them,
+so the subscription gates read this snapshot instead of SQL. Layers:
+  - in-process dict per worker, TTL ENTITLEMENT_CACHE_TTL_SECONDS
+  - Redis (REDIS_URL) shared by all workers, same TTL; when Redis is in use the in-process
+    layer is capped at ENTITLEMENT_CACHE_LOCAL_TTL_SECONDS so an invalidation issued by another
+    worker is seen quickly
+Writers call invalidate_entitlements(org_id) after commit. TTL 0 disables the cache.
+Redis errors never fail a request; they fall through to SQL.
+"""
+
+_REDIS_PREFIX = "entitlements:v1:"
+
+
+@dataclass(frozen=True)
+class EntitlementSnapshot:
+    status: Optional[str] = None               # None → no subscription row
+    entitlements: Tuple[str, ...] = ()
+    current_period_end: Optional[str] = None   # ISO-8601
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"status": self.status, "entitlements": list(self.entitlements), "cpe": self.current_period_end},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, raw) -> "EntitlementSnapshot":
+        data = json.loads(raw)
+        return cls(
+            status=data.get("status"),
+            entitlements=tuple(data.get("entitlements") or ()),
+            current_period_end=data.get("cpe"),
+        )
+
+
+class EntitlementCache:
+    def __init__(self, ttl: int, *, redis_client=None, local_ttl: Optional[int] = None):
+        self.ttl = int(ttl)
+        self.redis = redis_client
+        self.local_ttl = min(self.ttl, int(local_ttl)) if (redis_client is not None and local_ttl is not None) else self.ttl
+        self._local: Dict[int, Tuple[float, EntitlementSnapshot]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, org_id: int) -> Optional[EntitlementSnapshot]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._local.get(org_id)
+            if hit is not None:
+                if hit[0] > now:
+                    return hit[1]
+                self._local.pop(org_id, None)
+
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(_REDIS_PREFIX + str(org_id))
+        except Exception:
+            current_app.logger.warning("entitlement cache: redis get failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        snap = EntitlementSnapshot.from_json(raw)
+        self._put_local(org_id, snap)
+        return snap
+
+    def put(self, org_id: int, snap: EntitlementSnapshot) -> None:
+        self._put_local(org_id, snap)
+        if self.redis is not None:
+            try:
+                self.redis.set(_REDIS_PREFIX + str(org_id), snap.to_json(), ex=self.ttl)
+            except Exception:
+                current_app.logger.warning("entitlement cache: redis set failed", exc_info=True)
+
+    def invalidate(self, org_id: int) -> None:
+        with self._lock:
+            self._local.pop(org_id, None)
+        if self.redis is not None:
+            try:
+                self.redis.delete(_REDIS_PREFIX + str(org_id))
+            except Exception:
+                current_app.logger.warning("entitlement cache: redis delete failed", exc_info=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _put_local(self, org_id: int, snap: EntitlementSnapshot) -> None:
+        with self._lock:
+            self._local[org_id] = (time.monotonic() + self.local_ttl, snap)
+
+
+def get_entitlement_cache() -> Optional[EntitlementCache]:
+    """Per-app cache; None when disabled (ENTITLEMENT_CACHE_TTL_SECONDS <= 0)."""
+    ttl = int(current_app.config.get("ENTITLEMENT_CACHE_TTL_SECONDS", 0) or 0)
+    if ttl <= 0:
+        return None
+    cache = current_app.extensions.get("entitlement_cache")
+    if cache is None:
+        client = None
+        url = current_app.config.get("ENTITLEMENT_CACHE_REDIS_URL")
+        if url and redis is not None:
+            client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        cache = EntitlementCache(
+            ttl,
+            redis_client=client,
+            local_ttl=current_app.config.get("ENTITLEMENT_CACHE_LOCAL_TTL_SECONDS", 5),
+        )
+        current_app.extensions["entitlement_cache"] = cache
+    return cache
+
+
+def invalidate_entitlements(org_id: Optional[int]) -> None:
+    """Call after committing a Subscription change for org_id."""
+    if not org_id:
+        return
+    cache = get_entitlement_cache()
+    if cache is not None:
+        cache.invalidate(int(org_id))
@@ -2,9 +2,7 @@ from functools import wraps
 from typing import Callable
 from flask import abort, request, redirect, url_for, flash
 from flask_login import current_user
-from app.models import Subscription
-
-_ACTIVE = {"active", "trialing"}
+from app.security.org_context import ACTIVE_SUBSCRIPTION_STATUSES as _ACTIVE, get_subscription_snapshot
 
 def require_entitlement(feature_key: str) -> Callable:
     """
@@ -19,11 +17,10 @@ def require_entitlement(feature_key: str) -> Callable:
             org_id = getattr(current_user, "org_id", None)
             if not org_id:
                 abort(403, description="Organization required")
-            sub = Subscription.query.filter_by(org_id=org_id).first()
-            if not (sub and (sub.status in _ACTIVE)):
+            snap = get_subscription_snapshot(org_id)
+            if snap.status not in _ACTIVE:
                 abort(403, description="Subscription required")
-            entitlements = (sub.entitlements_json or [])
-            if feature_key not in entitlements:
+            if feature_key not in snap.entitlements:
                 abort(403, description="Feature not included in current plan")
             return fn(*args, **kwargs)
         return wrapper
@@ -41,8 +38,7 @@ def enforce_active_subscription():
     org_id = getattr(current_user, "org_id", None)
     # This helper is only called *after* an auth/login gate in blueprints.
     # If somehow no org, treat as blocked.
-    sub = Subscription.query.filter_by(org_id=org_id).first() if org_id else None
-    is_active = bool(sub and (sub.status in _ACTIVE))
+    is_active = bool(org_id) and get_subscription_snapshot(org_id).status in _ACTIVE
 
     if is_active:
         return None
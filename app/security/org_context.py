@@ -0,0 +1,192 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from flask import g, has_request_context, session
+from flask_login import current_user
+from sqlalchemy import and_, select
+
+from app.extensions import db
+from app.models.org import Org
+from app.models.org_membership import OrgMembership, ROLE_ADMIN, ROLE_OWNER
+from app.models.subscription import Subscription
+from app.security.entitlement_cache import EntitlementSnapshot, get_entitlement_cache
+
+"""
+Request-scoped org context: the current user's membership role and the org's subscription,
+memoized on flask.g the first time a guard asks for it.
+
+  - Subscription-only gates (enforce_active_subscription, require_entitlement) read
+    get_subscription_snapshot(): request memo → entitlement cache → one SQL lookup.
+    With a warm cache they cost no SQL.
+  - Membership readers (libraries ACL, policy.require_member / role_required, inject_globals)
+    read get_org_context(): membership only when the subscription is already known, otherwise
+    membership + subscription in ONE joined query (which also fills the entitlement cache).
+
+Code that changes a membership or subscription mid-request and then re-checks it should call
+clear_org_context() (and invalidate_entitlements() after committing a subscription change).
+"""
+
+ACTIVE_SUBSCRIPTION_STATUSES = frozenset({"active", "trialing"})
+
+
+@dataclass(frozen=True)
+class OrgContext:
+    org_id: Optional[int]
+    user_id: Optional[int]
+    role: Optional[str] = None                  # None → not a member of org_id
+    subscription_status: Optional[str] = None   # None → no subscription row
+    entitlements: Tuple[str, ...] = ()
+    current_period_end: Optional[str] = None
+
+    @property
+    def is_member(self) -> bool:
+        return self.role is not None
+
+    @property
+    def can_write(self) -> bool:
+        return self.role in (ROLE_ADMIN, ROLE_OWNER)
+
+    @property
+    def has_active_subscription(self) -> bool:
+        return self.subscription_status in ACTIVE_SUBSCRIPTION_STATUSES
+
+    def has_entitlement(self, feature_key: str) -> bool:
+        return self.has_active_subscription and feature_key in self.entitlements
+
+
+def current_org_id() -> Optional[int]:
+    oid = session.get("current_org_id")
+    if not oid and getattr(current_user, "is_authenticated", False):
+        oid = getattr(current_user, "org_id", None)
+    return oid
+
+
+def _snapshot(status, entitlements, current_period_end) -> EntitlementSnapshot:
+    return EntitlementSnapshot(
+        status=status,
+        entitlements=tuple(entitlements or ()),
+        current_period_end=current_period_end.isoformat() if current_period_end else None,
+    )
+
+
+def _context(org_id, user_id, role, snap: EntitlementSnapshot) -> OrgContext:
+    return OrgContext(
+        org_id=org_id,
+        user_id=user_id,
+        role=role,
+        subscription_status=snap.status,
+        entitlements=snap.entitlements,
+        current_period_end=snap.current_period_end,
+    )
+
+
+def load_subscription_snapshot(org_id: int) -> EntitlementSnapshot:
+    row = db.session.execute(
+        select(Subscription.status, Subscription.entitlements_json, Subscription.current_period_end)
+        .where(Subscription.org_id == org_id)
+        .limit(1)
+    ).first()
+    return _snapshot(*row) if row is not None else EntitlementSnapshot()
+
+
+def load_org_context(org_id: Optional[int], user_id: Optional[int]) -> OrgContext:
+    """Membership (for user_id) + subscription for org_id in a single round trip."""
+    if not org_id:
+        return OrgContext(org_id=None, user_id=user_id)
+    row = db.session.execute(
+        select(
+            OrgMembership.role,
+            Subscription.status,
+            Subscription.entitlements_json,
+            Subscription.current_period_end,
+        )
+        .select_from(Org)
+        .outerjoin(
+            OrgMembership,
+            and_(OrgMembership.org_id == Org.id, OrgMembership.user_id == user_id),
+        )
+        .outerjoin(Subscription, Subscription.org_id == Org.id)
+        .where(Org.id == org_id)
+        .limit(1)
+    ).first()
+    if row is None:
+        return OrgContext(org_id=org_id, user_id=user_id)
+    role, status, entitlements, cpe = row
+    return _context(org_id, user_id, role, _snapshot(status, entitlements, cpe))
+
+
+def _load_membership_role(org_id: int, user_id: Optional[int]) -> Optional[str]:
+    if user_id is None:
+        return None
+    return db.session.execute(
+        select(OrgMembership.role)
+        .where(OrgMembership.org_id == org_id, OrgMembership.user_id == user_id)
+        .limit(1)
+    ).scalar()
+
+
+def _known_snapshot(org_id: int) -> Optional[EntitlementSnapshot]:
+    memo = g.setdefault("_org_subscriptions", {})
+    snap = memo.get(org_id)
+    if snap is None:
+        cache = get_entitlement_cache()
+        snap = cache.get(org_id) if cache is not None else None
+        if snap is not None:
+            memo[org_id] = snap
+    return snap
+
+
+def _remember_snapshot(org_id: int, snap: EntitlementSnapshot) -> None:
+    g.setdefault("_org_subscriptions", {})[org_id] = snap
+    cache = get_entitlement_cache()
+    if cache is not None:
+        cache.put(org_id, snap)
+
+
+def get_subscription_snapshot(org_id: Optional[int]) -> EntitlementSnapshot:
+    """The org's subscription status/entitlements; zero SQL on a cache hit."""
+    if not org_id:
+        return EntitlementSnapshot()
+    if not has_request_context():
+        return load_subscription_snapshot(org_id)
+    snap = _known_snapshot(org_id)
+    if snap is None:
+        snap = load_subscription_snapshot(org_id)
+        _remember_snapshot(org_id, snap)
+    return snap
+
+
+def get_org_context(org_id: Optional[int] = None) -> OrgContext:
+    """
+    Context for the current user in org_id (default: session org, else user.org_id).
+    Memoized per request; outside a request it is loaded fresh every call.
+    """
+    if org_id is None and has_request_context():
+        org_id = current_org_id()
+    user_id = getattr(current_user, "id", None) if getattr(current_user, "is_authenticated", False) else None
+    if not has_request_context():
+        return load_org_context(org_id, user_id)
+
+    contexts = g.setdefault("_org_contexts", {})
+    key = (org_id, user_id)
+    ctx = contexts.get(key)
+    if ctx is None:
+        snap = _known_snapshot(org_id) if org_id else None
+        if snap is not None:
+            ctx = _context(org_id, user_id, _load_membership_role(org_id, user_id), snap)
+        else:
+            ctx = load_org_context(org_id, user_id)
+            if org_id:
+                _remember_snapshot(org_id, EntitlementSnapshot(
+                    status=ctx.subscription_status,
+                    entitlements=ctx.entitlements,
+                    current_period_end=ctx.current_period_end,
+                ))
+        contexts[key] = ctx
+    return ctx
+
+
+def clear_org_context() -> None:
+    if has_request_context():
+        g.pop("_org_contexts", None)
+        g.pop("_org_subscriptions", None)
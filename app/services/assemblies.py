@@ -4,20 +4,13 @@ from app.extensions import db
 from app.models.assembly import Assembly, AssemblyComponent
 from app.models.material import Material
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, case
 from sqlalchemy.sql import func
 
 
-def _to_int_or_default(value, default=1):
-    try:
-        v = int(value or 0)
-        return v if v > 0 else default
-    except Exception:
-        return default
-
-
 def _to_decimal(value):
     try:
         return Decimal(str(value or "0"))
@@ -36,51 +29,81 @@ def get_assembly_rollup(assembly_id: int, *, org_id: Optional[int] = None) -> di
 
     Returns a dict with Decimal totals quantized to 4 places.
     """
-    
+    rollups = get_assembly_rollups([assembly_id], org_id=org_id)
+    if assembly_id in rollups:
+        return rollups[assembly_id]
     if org_id is not None:
-        exists = db.session.query(Assembly.id).filter(
-            Assembly.id == assembly_id,
-            Assembly.org_id == org_id,
-        ).scalar()
-        if not exists:
-            raise ServiceError("not_found")
-    
-    rows = (
+        raise ServiceError("not_found")
+    # Unscoped lookups keep the legacy behavior: unknown id → empty rollup
+    return {
+        "assembly_id": assembly_id,
+        "material_cost_total": _q4(Decimal("0")),
+        "labor_hours_total": _q4(Decimal("0")),
+        "component_count": 0,
+    }
+
+
+def get_assembly_rollups(assembly_ids: Iterable[int], *, org_id: Optional[int] = None) -> Dict[int, dict]:
+    """
+    Batch form of get_assembly_rollup(): one grouped aggregate for many assemblies.
+
+    The org check is folded into the query (assemblies outside org_id are simply
+    absent from the result), so callers get {assembly_id: rollup} for the ids
+    they are allowed to see. Assemblies without active components roll up to 0.
+    """
+    ids = sorted({int(i) for i in assembly_ids if i is not None})
+    if not ids:
+        return {}
+
+    # unit_quantity_size ∈ {1, 100, 1000} in the DB; guard anyway so bad rows divide by 1
+    unit = case(
+        (Material.unit_quantity_size > 0, Material.unit_quantity_size),
+        else_=1,
+    )
+    qty = func.coalesce(AssemblyComponent.qty_per_assembly, 0)
+    material_sum = func.coalesce(
+        func.sum(qty * func.coalesce(Material.price, 0) / unit), 0
+    )
+    labor_sum = func.coalesce(
+        func.sum(qty * func.coalesce(Material.labor_unit, 0) / unit), 0
+    )
+
+    query = (
         db.session.query(
-            AssemblyComponent.qty_per_assembly,
-            Material.price,
-            Material.labor_unit,
-            Material.unit_quantity_size,
+            Assembly.id,
+            material_sum.label("material_cost_total"),
+            labor_sum.label("labor_hours_total"),
+            func.count(Material.id).label("component_count"),
         )
-        .join(Material, Material.id == AssemblyComponent.material_id)
-        .filter(AssemblyComponent.assembly_id == assembly_id)
-        .filter(AssemblyComponent.is_active == True)
-        .all()
+        .outerjoin(
+            AssemblyComponent,
+            and_(
+                AssemblyComponent.assembly_id == Assembly.id,
+                AssemblyComponent.is_active.is_(True),
+            ),
+        )
+        .outerjoin(Material, Material.id == AssemblyComponent.material_id)
+        .filter(Assembly.id.in_(ids))
     )
+    if org_id is not None:
+        query = query.filter(Assembly.org_id == org_id)
 
-    material_total = Decimal("0")
-    labor_total = Decimal("0")
-    count = 0
+    rows = query.group_by(Assembly.id).all()
 
-    for qty, price, labor_unit, unit_qty in rows:
-        count += 1
-        u = _to_int_or_default(unit_qty, default=1)
-        price_each = _to_decimal(price) / Decimal(u)
-        labor_each = _to_decimal(labor_unit) / Decimal(u)
+    return {
+        asm_id: {
+            "assembly_id": asm_id,
+            "material_cost_total": _q4(_to_decimal(material_total)),
+            "labor_hours_total": _q4(_to_decimal(labor_total)),
+            "component_count": int(count or 0),
+        }
+        for asm_id, material_total, labor_total, count in rows
+    }
 
-        q = _to_decimal(qty)
-        material_total += q * price_each
-        labor_total += q * labor_each
 
+def _q4(d: Decimal) -> Decimal:
     # round to 4 decimals (consistent with NUMERIC(12,4))
-    q4 = lambda d: d.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
-
-    return {
-        "assembly_id": assembly_id,
-        "material_cost_total": q4(material_total),
-        "labor_hours_total": q4(labor_total),
-        "component_count": count,
-    }
+    return d.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
 
 
 class ServiceError(RuntimeError):
@@ -1,4 +1,10 @@
-from typing import List, Dict
+import math
+import re
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from app.utils.helpers import safe_float, round_currency
 
 def calc_line(item_description, quantity, price, labor_hours, hourly_rate):
@@ -59,3 +65,406 @@ def margin_to_markup(margin_percent: int) -> float:
 
 def estimated_sales_price(break_even: float, margin_percent: int) -> float:
     return safe_float(break_even, 0) * margin_to_markup(margin_percent)
+
+
+# =============================================================================
+# Server pricing engine — Estimator grid (estimator.js) + Summary Steps A–L (summary.js)
+#
+# Mirrors the browser math exactly, including where the UI rounds: every value the
+# JS writes to the DOM and reads back (Cost ea, Mat Ext, Labor Hrs, header totals,
+# labor $, DJE) is rounded here at the same point, with the same rule. The two JS
+# rules differ: toFixed rounds the exact binary double, Intl (formatUSD) rounds the
+# shortest round-trip decimal (2.675 → "2.67" vs "$2.68"). Arithmetic is IEEE
+# float64 in the JS evaluation order, so results match to the cent.
+#
+# Inputs:
+#   - work_payload:   {"grid": {"rows": [...]}, "estimateData": {...}} as saved by main.js
+#   - settings_snapshot: Estimate.settings_snapshot ({"pricing": {...}})
+#   - catalog: app.services.catalog.build_catalog_bundle(org_id) (what the Estimator hydrates from)
+# =============================================================================
+
+LABOR_ADJ_OPTIONS = ("0.25", "0.5", "1", "1.5", "2")
+DEFAULT_OVERHEAD_PERCENT = 30
+ADDER_KEYS = ("misc_percent", "small_tools_percent", "large_tools_percent", "waste_theft_percent", "sales_tax_percent")
+
+_INT_RE = re.compile(r"^\s*([+-]?\d+)")
+_FLOAT_RE = re.compile(r"^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+
+
+def js_round(x: float, places: int = 2) -> float:
+    """Number(x.toFixed(places)) — half away from zero on the exact double value."""
+    if not math.isfinite(x):
+        return 0.0
+    q = Decimal(1).scaleb(-places)
+    return float(Decimal(x).quantize(q, rounding=ROUND_HALF_UP))
+
+
+def usd_round(x: float) -> float:
+    """Number read back from formatUSD(x): Intl rounds the shortest decimal repr half-up."""
+    if not math.isfinite(x):
+        return 0.0
+    return float(Decimal(repr(x)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def js_to_fixed(x: float, places: int = 2) -> str:
+    """x.toFixed(places) (sign kept for negatives that round to zero, as in JS)."""
+    if not math.isfinite(x):
+        return "NaN"
+    q = Decimal(1).scaleb(-places)
+    d = Decimal(abs(x)).quantize(q, rounding=ROUND_HALF_UP)
+    return f"{'-' if x < 0 else ''}{d}"
+
+
+def format_usd(x: float) -> str:
+    """window.formatUSD: Intl.NumberFormat('en-US', {style:'currency', currency:'USD'}) of Number(x) || 0."""
+    if not math.isfinite(x):
+        x = 0.0
+    d = Decimal(repr(abs(x))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return f"{'-' if x < 0 else ''}${d:,.2f}"
+
+
+# summary.js marginToMarkup (anything else → 1)
+MARGIN_TO_MARKUP: Dict[int, float] = {
+    **{i: js_round(1 / (1 - i / 100), 2) for i in list(range(1, 26)) + [30, 40, 50]},
+    100: 200.0,
+}
+
+
+def _js_parse_int(v: Any) -> Optional[int]:
+    """parseInt(v) → None for NaN."""
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return int(v) if math.isfinite(v) else None
+    m = _INT_RE.match(str(v))
+    return int(m.group(1)) if m else None
+
+
+def _js_parse_float(v: Any) -> Optional[float]:
+    if isinstance(v, bool) or v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return float(v) if math.isfinite(v) else None
+    m = _FLOAT_RE.match(str(v))
+    return float(m.group(1)) if m else None
+
+
+def _js_number_or_zero(v: Any) -> float:
+    """Number(v) || 0 for the JSON-ish values we store (numbers / numeric strings)."""
+    if isinstance(v, bool):
+        return float(v)
+    if isinstance(v, (int, float)):
+        return float(v) if math.isfinite(v) else 0.0
+    if isinstance(v, str):
+        s = v.strip()
+        if not s:
+            return 0.0
+        try:
+            f = float(s)
+        except ValueError:
+            return 0.0
+        return f if math.isfinite(f) else 0.0
+    return 0.0
+
+
+def _to_number_loose(v: Any) -> float:
+    """estimator.js toNumberLoose()."""
+    if v is None:
+        return 0.0
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return float(v) if math.isfinite(v) else 0.0
+    f = _js_parse_float(str(v).replace("$", "").replace(",", ""))
+    return f if f is not None and math.isfinite(f) else 0.0
+
+
+def _to_int_loose(v: Any) -> int:
+    """estimator.js toIntLoose()."""
+    n = _to_number_loose(v)
+    return int(math.floor(n)) if n > 0 else 0
+
+
+# ---- catalog lookup ----------------------------------------------------------
+
+class CatalogIndex:
+    """
+    Per-type description options exactly as the Estimator dropdowns see them (catalog bundle):
+      type → [(value, text, cost_each_display, labor_unit)]
+    cost_each is already rounded the way the Cost ea cell shows it.
+    """
+
+    def __init__(self, bundle: dict):
+        self.by_type: Dict[str, List[Tuple[str, str, float, float]]] = {}
+        mats = bundle.get("materials") or {}
+        fields = mats.get("fields") or []
+        for r in mats.get("rows") or []:
+            m = dict(zip(fields, r))
+            t = m.get("material_type")
+            if not t:
+                continue
+            self.by_type.setdefault(t, []).append((
+                str(m.get("id")),
+                str(m.get("item_description") or ""),
+                usd_round(_to_number_loose(m.get("price_each"))),
+                _to_number_loose(m.get("labor_each")),
+            ))
+        asm = bundle.get("assemblies") or {}
+        afields = asm.get("fields") or []
+        self.by_type["Assemblies"] = [
+            (
+                str(a.get("id")),
+                str(a.get("name") or ""),
+                usd_round(_to_number_loose(a.get("material_cost_total"))),
+                _to_number_loose(a.get("labor_hours_total")),
+            )
+            for a in (dict(zip(afields, r)) for r in asm.get("rows") or [])
+        ]
+        self._by_value = {t: {o[0]: o for o in opts} for t, opts in self.by_type.items()}
+
+    def resolve(self, type_: str, desc_value: Any, desc_text: Any):
+        """Select by saved value, else first option with the saved text (hydrateGridFromStorage)."""
+        if not type_:
+            return None
+        if desc_value not in (None, ""):
+            hit = self._by_value.get(type_, {}).get(str(desc_value))
+            if hit:
+                return hit
+        if desc_text:
+            for opt in self.by_type.get(type_, ()):
+                if opt[1] == desc_text:
+                    return opt
+        return None
+
+
+# ---- lines (Estimator grid) --------------------------------------------------
+
+def _grid_rows(work_payload: dict) -> List[dict]:
+    grid = (work_payload or {}).get("grid") or {}
+    rows = grid.get("rows") if isinstance(grid, dict) else None
+    return [r if isinstance(r, dict) else {} for r in (rows or [])]
+
+
+def price_lines(rows: Sequence[dict], catalog: CatalogIndex) -> dict:
+    """
+    Vectorized line math for one grid: Mat Ext = qty × Cost ea; Labor Hrs = qty × LUnit × Ladj.
+    Returns per-line arrays plus header totals (sum of the displayed, rounded cells, in row order).
+    """
+    n = len(rows)
+    qty = np.zeros(n, dtype=np.float64)
+    cost = np.zeros(n, dtype=np.float64)
+    lunit = np.zeros(n, dtype=np.float64)
+    ladj = np.zeros(n, dtype=np.float64)
+    selected: List[Optional[tuple]] = []
+
+    for i, r in enumerate(rows):
+        opt = catalog.resolve(r.get("type") or "", r.get("descValue"), r.get("descText"))
+        selected.append(opt)
+        qty[i] = _to_int_loose(r.get("qty"))
+        raw_ladj = r.get("ladj")
+        raw_ladj = "1" if raw_ladj is None else str(raw_ladj)
+        ladj[i] = _to_number_loose(raw_ladj) if raw_ladj in LABOR_ADJ_OPTIONS else 0.0
+        if opt is not None:
+            cost[i] = opt[2]
+            lunit[i] = opt[3]
+
+    ext_raw = qty * cost
+    hrs_raw = qty * lunit * ladj
+    ext = np.fromiter((usd_round(float(x)) for x in ext_raw), dtype=np.float64, count=n)
+    hrs = np.fromiter((js_round(float(x), 2) for x in hrs_raw), dtype=np.float64, count=n)
+
+    # Header totals: sequential left-to-right sums (cumsum), like the JS loop
+    material_total = float(np.cumsum(ext)[-1]) if n else 0.0
+    hours_total = float(np.cumsum(hrs)[-1]) if n else 0.0
+
+    return {
+        "qty": qty, "cost_each": cost, "labor_unit": lunit, "labor_adj": ladj,
+        "material_ext": ext, "labor_hours": hrs, "selected": selected,
+        "material_total": material_total, "labor_hours_total": hours_total,
+    }
+
+
+# ---- summary (Steps A–L) -----------------------------------------------------
+
+def resolve_controls(work_payload: dict, settings_snapshot: dict) -> dict:
+    """
+    Summary controls as a saved estimate's Summary page ends up with them: the settings
+    snapshot is applied on load (eeApplySettingsToSummary); overhead / labor rate fall
+    back to the persisted estimateData values when the snapshot lacks a usable one.
+    """
+    pricing = ((settings_snapshot or {}).get("pricing") or {}) if isinstance(settings_snapshot, dict) else {}
+    ed = (work_payload or {}).get("estimateData") or {}
+    ed_materials = ed.get("materials") or {}
+    ed_totals = ed.get("totals") or {}
+
+    controls = {k: (_js_parse_int(pricing.get(k)) or 0) for k in ADDER_KEYS}
+    controls["margin_percent"] = _js_parse_int(pricing.get("margin_percent")) or 0
+
+    overhead = _js_parse_int(pricing.get("overhead_percent"))
+    if overhead is None:
+        overhead = _js_parse_int(ed_materials.get("overhead_percent"))
+        if overhead is None or overhead < 0:
+            overhead = DEFAULT_OVERHEAD_PERCENT
+    controls["overhead_percent"] = overhead
+
+    rate = _js_parse_float(pricing.get("labor_rate"))
+    if rate is None:
+        rate = _js_number_or_zero(ed_totals.get("laborRate"))
+    controls["labor_rate"] = rate
+
+    costs = ed.get("costs") or {}
+    controls["dje"] = _js_number_or_zero(costs.get("dje"))
+    controls["adjustments"] = _js_number_or_zero(ed_totals.get("adjustments"))
+    controls["additional"] = _js_number_or_zero(ed_totals.get("additional"))
+    return controls
+
+
+def compute_summary_steps(
+    material_total: np.ndarray,
+    labor_hours_total: np.ndarray,
+    controls: Dict[str, np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Steps A–L over N estimates at once (each argument is a float64 array of length N).
+    Operation order follows summary.js line by line; `_fixed2` / `_usd` mark DOM round-trips.
+    """
+    _fixed2 = np.vectorize(lambda x: js_round(float(x), 2), otypes=[np.float64])
+    _usd = np.vectorize(lambda x: usd_round(float(x)), otypes=[np.float64])
+    pct = lambda k: controls[k].astype(np.float64)  # noqa: E731
+
+    # A — hours (header painted with toFixed(2), read back without sign)
+    base_hours = np.abs(_fixed2(labor_hours_total))
+    adjusted = controls["adjustments"]
+    additional = controls["additional"]
+    total_hours = base_hours + adjusted + additional
+    # B — labor $
+    labor_cost = total_hours * controls["labor_rate"]
+    labor_cost_read = np.abs(_usd(labor_cost))
+    # C — material adders
+    base = _usd(material_total)
+    misc = (pct("misc_percent") / 100) * base
+    small = (pct("small_tools_percent") / 100) * base
+    large = (pct("large_tools_percent") / 100) * base
+    waste = (pct("waste_theft_percent") / 100) * base
+    taxable = base + misc + small + large + waste
+    sales_tax = (pct("sales_tax_percent") / 100) * taxable
+    total_material = taxable + sales_tax
+    # D — DJE (painted as currency, read back)
+    dje = _usd(controls["dje"])
+    # E — prime cost
+    prime = labor_cost_read + total_material + dje
+    # F — overhead
+    overhead = (pct("overhead_percent") / 100) * prime
+    # G — break-even
+    break_even = prime + overhead
+    # H — margin → markup; profit
+    markup = np.array([MARGIN_TO_MARKUP.get(int(m), 1.0) for m in controls["margin_percent"]], dtype=np.float64)
+    profit = break_even * (markup - 1)
+    # I — estimated sales price
+    sales_price = break_even + profit
+    # J–L — crew-day views
+    final_hours = base_hours + adjusted + additional
+    one_man = final_hours / 8
+    two_man = one_man / 2
+    four_man = two_man / 2
+
+    return {
+        "base_hours": base_hours, "adjusted_hours": adjusted, "additional_hours": additional,
+        "total_hours": total_hours, "labor_cost": labor_cost, "labor_rate": controls["labor_rate"],
+        "material_base": base, "misc": misc, "small_tools": small, "large_tools": large,
+        "waste_theft": waste, "taxable": taxable, "sales_tax": sales_tax, "total_material": total_material,
+        "dje": dje, "prime_cost": prime, "overhead": overhead, "break_even": break_even,
+        "markup": markup, "profit": profit, "sales_price": sales_price,
+        "one_man_days": one_man, "two_man_days": two_man, "four_man_days": four_man,
+    }
+
+
+def _format_days(value: float) -> str:
+    s = js_to_fixed(value, 1)
+    clean = str(int(float(s))) if s.endswith(".0") else s
+    return f"{clean} day{'' if float(clean) == 1 else 's'}"
+
+
+def summary_cells(steps: Dict[str, np.ndarray], i: int = 0) -> Dict[str, str]:
+    """Summary DOM cell strings for estimate i (same ids/format as summary_export.cells)."""
+    v = lambda k: float(steps[k][i])  # noqa: E731
+    return {
+        "labor-hours-pricing-sheet": js_to_fixed(v("base_hours"), 2),
+        "summaryAdjustedHours": js_to_fixed(v("adjusted_hours"), 2),
+        "summaryAdditionalHours": js_to_fixed(v("additional_hours"), 2),
+        "summaryTotalHours": js_to_fixed(v("total_hours"), 2),
+        "summaryTotalLaborCost": format_usd(v("labor_cost")),
+        "material-cost-price-sheet": format_usd(v("material_base")),
+        "miscMaterialValue": format_usd(v("misc")),
+        "smallToolsValue": format_usd(v("small_tools")),
+        "largeToolsValue": format_usd(v("large_tools")),
+        "wasteTheftValue": format_usd(v("waste_theft")),
+        "taxableMaterialValue": format_usd(v("taxable")),
+        "salesTaxValue": format_usd(v("sales_tax")),
+        "totalMaterialCostValue": format_usd(v("total_material")),
+        "djeValue": format_usd(v("dje")),
+        "primeCostValue": format_usd(v("prime_cost")),
+        "overheadValue": format_usd(v("overhead")),
+        "breakEvenValue": format_usd(v("break_even")),
+        "markupValue": f"{js_to_fixed(v('markup') * 100 - 100, 2)}%",
+        "profitMarginValue": format_usd(v("profit")),
+        "estimatedSalesPriceValue": format_usd(v("sales_price")),
+        "oneManDays": _format_days(v("one_man_days")),
+        "twoManDays": _format_days(v("two_man_days")),
+        "fourManDays": _format_days(v("four_man_days")),
+        "laborRateInput": format_usd(v("labor_rate")),
+    }
+
+
+def price_estimates(
+    items: Iterable[Tuple[dict, dict]], catalog_bundle: dict, *, include_lines: bool = False
+) -> List[dict]:
+    """
+    Price many estimates of one org in a single pass.
+    items: (work_payload, settings_snapshot) pairs. Returns per estimate:
+      {"controls", "material_total", "labor_hours_total", "steps": {k: float}, "cells", ["lines"]}
+    """
+    catalog = CatalogIndex(catalog_bundle or {})
+    items = list(items)
+    priced = [price_lines(_grid_rows(wp), catalog) for wp, _ in items]
+    ctrl = [resolve_controls(wp, snap) for wp, snap in items]
+
+    keys = ADDER_KEYS + ("margin_percent", "overhead_percent", "labor_rate", "dje", "adjustments", "additional")
+    controls = {k: np.array([c[k] for c in ctrl], dtype=np.float64) for k in keys}
+    steps = compute_summary_steps(
+        np.array([p["material_total"] for p in priced], dtype=np.float64),
+        np.array([p["labor_hours_total"] for p in priced], dtype=np.float64),
+        controls,
+    )
+
+    out = []
+    for i, p in enumerate(priced):
+        doc = {
+            "controls": ctrl[i],
+            "material_total": p["material_total"],
+            "labor_hours_total": p["labor_hours_total"],
+            "steps": {k: float(a[i]) for k, a in steps.items()},
+            "cells": summary_cells(steps, i),
+        }
+        if include_lines:
+            rows = _grid_rows(items[i][0])
+            doc["lines"] = [
+                {
+                    "index": j,
+                    "type": rows[j].get("type") or "",
+                    "description_id": (p["selected"][j][0] if p["selected"][j] else None),
+                    "description": (p["selected"][j][1] if p["selected"][j] else (rows[j].get("descText") or "")),
+                    "qty": float(p["qty"][j]),
+                    "labor_adj": float(p["labor_adj"][j]),
+                    "cost_each": float(p["cost_each"][j]),
+                    "material_ext": float(p["material_ext"][j]),
+                    "labor_unit": float(p["labor_unit"][j]),
+                    "labor_hours": float(p["labor_hours"][j]),
+                }
+                for j in range(len(rows))
+            ]
+        out.append(doc)
+    return out
+
+
+def price_estimate(work_payload: dict, settings_snapshot: dict, catalog_bundle: dict) -> dict:
+    """Single-estimate convenience wrapper around price_estimates() (includes lines)."""
+    return price_estimates([(work_payload, settings_snapshot)], catalog_bundle, include_lines=True)[0]
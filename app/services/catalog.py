@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, exists, insert, or_, select, true, tuple_, union_all, update
+from sqlalchemy.sql import func
+
+from app.extensions import db
+from app.models.assembly import Assembly
+from app.models.dje_item import DjeItem, dje_norm_key
+from app.models.material import Material, material_norm_key
+from app.models.org import Org
+from app.models.resolved_catalog import ResolvedDjeItem, ResolvedMaterial
+from app.services.assemblies import get_assembly_rollups
+
+"""
+Resolved catalog maintenance (see app/models/resolved_catalog.py).
+
+Write paths call these inside their own transaction (after flush, before commit):
+  - single-row library writes → refresh only the affected normalized keys for the org
+  - starter-pack imports / new orgs → rebuild the org's slice
+  - global (org_id IS NULL) imports → rebuild every org's slice
+
+Every refresh also bumps orgs.catalog_version for the affected org(s); Estimator catalog
+endpoints key their ETags and per-worker response cache on it (see CatalogResponseCache).
+
+Overlay anti-joins compare the stored norm_* key columns, backed by the partial
+(org_id, key) WHERE is_active indexes on materials / dje_items.
+
+`conn` defaults to db.session; standalone scripts may pass a SQLAlchemy Connection.
+"""
+
+MaterialKey = Tuple[str, str]
+DjeKey = Tuple[str, str, str]
+
+
+def _norm(col):
+    # Matches the overlay predicate lower(trim(col)); NULL → '' so keys can be NOT NULL
+    return func.coalesce(func.lower(func.trim(col)), "")
+
+
+# ---- materials ---------------------------------------------------------------
+
+def _material_key_cols(m):
+    return _norm(m.c.material_type), _norm(m.c.item_description)
+
+
+def resolved_material_keys(material_ids: Iterable[int], *, conn=None) -> Set[MaterialKey]:
+    """
+    Normalized keys touched by these materials: their current key in `materials` plus
+    whatever key they are still resolved under (captures the old key of an in-place edit).
+    """
+    conn = conn if conn is not None else db.session
+    ids = [int(i) for i in material_ids if i is not None]
+    if not ids:
+        return set()
+    m = Material.__table__
+    r = ResolvedMaterial.__table__
+    rows = conn.execute(
+        union_all(
+            select(*_material_key_cols(m)).where(m.c.id.in_(ids)),
+            select(r.c.type_key, r.c.desc_key).where(r.c.material_id.in_(ids)),
+        )
+    ).all()
+    return {(t, d) for t, d in rows}
+
+
+def _winning_materials(org_id: Optional[int], keys: Optional[Set[MaterialKey]]):
+    m = Material.__table__
+    g = m.alias("g")
+    o = m.alias("o")
+    orgs = Org.__table__
+
+    # Org rows (overrides and org-only items) always win for their own org
+    org_rows = select(m.c.org_id, m.c.id, *_material_key_cols(m)).where(
+        m.c.is_active.is_(True), m.c.org_id.isnot(None)
+    )
+    # Global rows, per org, unless that org has an active row with the same key
+    global_rows = (
+        select(orgs.c.id, g.c.id, *_material_key_cols(g))
+        .select_from(orgs.join(g, true()))
+        .where(g.c.is_active.is_(True), g.c.org_id.is_(None))
+        .where(
+            ~exists().where(
+                and_(
+                    o.c.org_id == orgs.c.id,
+                    o.c.norm_type_desc_key == g.c.norm_type_desc_key,
+                    o.c.is_active.is_(True),
+                )
+            )
+        )
+    )
+    if org_id is not None:
+        org_rows = org_rows.where(m.c.org_id == org_id)
+        global_rows = global_rows.where(orgs.c.id == org_id)
+    if keys is not None:
+        norm_keys = [material_norm_key(*k) for k in keys]
+        org_rows = org_rows.where(m.c.norm_type_desc_key.in_(norm_keys))
+        global_rows = global_rows.where(g.c.norm_type_desc_key.in_(norm_keys))
+    return union_all(org_rows, global_rows)
+
+
+def refresh_resolved_materials(
+    *,
+    org_id: Optional[int] = None,
+    material_ids: Optional[Iterable[int]] = None,
+    keys: Optional[Iterable[MaterialKey]] = None,
+    conn=None,
+) -> None:
+    """
+    Recompute resolved_materials.
+      - org_id=None → every org (use after global rows change)
+      - material_ids / keys → only those normalized keys; neither → the whole slice
+    Pass `keys` captured via resolved_material_keys() before deleting a row.
+    """
+    conn = conn if conn is not None else db.session
+    scoped: Optional[Set[MaterialKey]] = None
+    if material_ids is not None or keys is not None:
+        scoped = set(keys or ())
+        if material_ids is not None:
+            scoped |= resolved_material_keys(material_ids, conn=conn)
+        if not scoped:
+            return
+
+    bump_catalog_version(org_id=org_id, conn=conn)
+
+    r = ResolvedMaterial.__table__
+    delete = r.delete()
+    if org_id is not None:
+        delete = delete.where(r.c.org_id == org_id)
+    if scoped is not None:
+        delete = delete.where(tuple_(r.c.type_key, r.c.desc_key).in_(list(scoped)))
+    conn.execute(delete)
+    conn.execute(
+        insert(r).from_select(
+            ["org_id", "material_id", "type_key", "desc_key"],
+            _winning_materials(org_id, scoped),
+        )
+    )
+
+
+# ---- DJE ---------------------------------------------------------------------
+
+def _dje_key_cols(d):
+    return _norm(d.c.category), _norm(d.c.description), _norm(d.c.vendor)
+
+
+def resolved_dje_keys(item_ids: Iterable[int], *, conn=None) -> Set[DjeKey]:
+    """DJE counterpart of resolved_material_keys()."""
+    conn = conn if conn is not None else db.session
+    ids = [int(i) for i in item_ids if i is not None]
+    if not ids:
+        return set()
+    d = DjeItem.__table__
+    r = ResolvedDjeItem.__table__
+    rows = conn.execute(
+        union_all(
+            select(*_dje_key_cols(d)).where(d.c.id.in_(ids)),
+            select(r.c.category_key, r.c.desc_key, r.c.vendor_key).where(r.c.dje_item_id.in_(ids)),
+        )
+    ).all()
+    return {(c, dsc, v) for c, dsc, v in rows}
+
+
+def _winning_dje(org_id: Optional[int], keys: Optional[Set[DjeKey]]):
+    d = DjeItem.__table__
+    g = d.alias("g")
+    o = d.alias("o")
+    orgs = Org.__table__
+
+    org_rows = select(d.c.org_id, d.c.id, *_dje_key_cols(d)).where(
+        d.c.is_active.is_(True), d.c.org_id.isnot(None)
+    )
+    global_rows = (
+        select(orgs.c.id, g.c.id, *_dje_key_cols(g))
+        .select_from(orgs.join(g, true()))
+        .where(g.c.is_active.is_(True), g.c.org_id.is_(None))
+        .where(
+            ~exists().where(
+                and_(
+                    o.c.org_id == orgs.c.id,
+                    o.c.norm_cat_desc_vendor_key == g.c.norm_cat_desc_vendor_key,
+                    o.c.is_active.is_(True),
+                )
+            )
+        )
+    )
+    if org_id is not None:
+        org_rows = org_rows.where(d.c.org_id == org_id)
+        global_rows = global_rows.where(orgs.c.id == org_id)
+    if keys is not None:
+        norm_keys = [dje_norm_key(*k) for k in keys]
+        org_rows = org_rows.where(d.c.norm_cat_desc_vendor_key.in_(norm_keys))
+        global_rows = global_rows.where(g.c.norm_cat_desc_vendor_key.in_(norm_keys))
+    return union_all(org_rows, global_rows)
+
+
+def refresh_resolved_dje(
+    *,
+    org_id: Optional[int] = None,
+    item_ids: Optional[Iterable[int]] = None,
+    keys: Optional[Iterable[DjeKey]] = None,
+    conn=None,
+) -> None:
+    """DJE counterpart of refresh_resolved_materials()."""
+    conn = conn if conn is not None else db.session
+    scoped: Optional[Set[DjeKey]] = None
+    if item_ids is not None or keys is not None:
+        scoped = set(keys or ())
+        if item_ids is not None:
+            scoped |= resolved_dje_keys(item_ids, conn=conn)
+        if not scoped:
+            return
+
+    bump_catalog_version(org_id=org_id, conn=conn)
+
+    r = ResolvedDjeItem.__table__
+    delete = r.delete()
+    if org_id is not None:
+        delete = delete.where(r.c.org_id == org_id)
+    if scoped is not None:
+        delete = delete.where(tuple_(r.c.category_key, r.c.desc_key, r.c.vendor_key).in_(list(scoped)))
+    conn.execute(delete)
+    conn.execute(
+        insert(r).from_select(
+            ["org_id", "dje_item_id", "category_key", "desc_key", "vendor_key"],
+            _winning_dje(org_id, scoped),
+        )
+    )
+
+
+def refresh_resolved_catalog(org_id: Optional[int] = None, *, conn=None) -> None:
+    """Rebuild both resolved tables for one org (or all orgs when org_id is None)."""
+    refresh_resolved_materials(org_id=org_id, conn=conn)
+    refresh_resolved_dje(org_id=org_id, conn=conn)
+
+
+# ---- catalog version + response cache ----------------------------------------
+
+def bump_catalog_version(*, org_id: Optional[int] = None, conn=None) -> None:
+    """Invalidate cached catalog responses for one org (or every org when org_id is None)."""
+    conn = conn if conn is not None else db.session
+    orgs = Org.__table__
+    stmt = update(orgs).values(catalog_version=orgs.c.catalog_version + 1)
+    if org_id is not None:
+        stmt = stmt.where(orgs.c.id == org_id)
+    conn.execute(stmt)
+
+
+def get_catalog_version(org_id: Optional[int]) -> int:
+    if org_id is None:
+        return 0
+    orgs = Org.__table__
+    v = db.session.execute(select(orgs.c.catalog_version).where(orgs.c.id == org_id)).scalar()
+    return int(v or 0)
+
+
+class CatalogResponseCache:
+    """
+    Bounded, thread-safe LRU of serialized catalog responses (one per worker process).
+    Keys include the org's catalog version, so a bump simply stops old entries from
+    being hit; they age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is not None:
+                self._data.move_to_end(key)
+            return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        with self._lock:
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---- Estimator bundle --------------------------------------------------------
+
+MATERIAL_BUNDLE_FIELDS = (
+    "id", "material_type", "item_description", "price", "labor_unit",
+    "unit_quantity_size", "price_each", "labor_each",
+)
+DJE_BUNDLE_FIELDS = ("id", "description", "cost")
+ASSEMBLY_BUNDLE_FIELDS = (
+    "id", "name", "category", "subcategory",
+    "material_cost_total", "labor_hours_total", "component_count",
+)
+
+
+def _bundle_material_rows(org_id: int, *criteria) -> list:
+    mat_rows = (
+        db.session.query(
+            Material.id,
+            Material.material_type,
+            Material.item_description,
+            Material.price,
+            Material.labor_unit,
+            Material.unit_quantity_size,
+        )
+        .join(ResolvedMaterial, ResolvedMaterial.material_id == Material.id)
+        .filter(ResolvedMaterial.org_id == org_id, *criteria)
+        .order_by(func.lower(Material.material_type).asc(), func.lower(Material.item_description).asc())
+        .all()
+    )
+    materials = []
+    for mid, mtype, desc, price, labor, unit in mat_rows:
+        u = unit if unit and unit > 0 else 1
+        p = float(price or 0)
+        lab = float(labor or 0)
+        materials.append([mid, mtype, desc, p, lab, unit or 1, round(p / u, 4), round(lab / u, 4)])
+    return materials
+
+
+def _bundle_assembly_rows(org_id: int, *criteria) -> list:
+    asm_rows = (
+        db.session.query(Assembly.id, Assembly.name, Assembly.category, Assembly.subcategory)
+        .filter(Assembly.org_id == org_id, Assembly.is_active.is_(True), *criteria)
+        .order_by(func.lower(Assembly.category).nullsfirst(), func.lower(Assembly.name))
+        .all()
+    )
+    rollups = get_assembly_rollups([r[0] for r in asm_rows], org_id=org_id)
+    assemblies = []
+    for aid, name, cat, sub in asm_rows:
+        r = rollups.get(aid) or {}
+        assemblies.append([
+            aid, name, cat, sub,
+            float(r.get("material_cost_total") or 0),
+            float(r.get("labor_hours_total") or 0),
+            int(r.get("component_count") or 0),
+        ])
+    return assemblies
+
+
+def build_catalog_bundle(org_id: int) -> dict:
+    """
+    The org's whole resolved Estimator catalog in one document (columnar rows; see *_BUNDLE_FIELDS):
+      - materials: resolved winners with per-each price/labor (same math as /api/material-descriptions)
+      - dje: [{category, subcategories: [{subcategory, items: [...]}]}] from resolved DJE winners
+      - assemblies: active org assemblies with batch rollups
+    """
+    materials = _bundle_material_rows(org_id)
+
+    dje_rows = (
+        db.session.query(DjeItem.id, DjeItem.category, DjeItem.subcategory, DjeItem.description, DjeItem.default_unit_cost)
+        .join(ResolvedDjeItem, ResolvedDjeItem.dje_item_id == DjeItem.id)
+        .filter(ResolvedDjeItem.org_id == org_id)
+        .order_by(
+            DjeItem.category.asc(),
+            DjeItem.subcategory.asc(),
+            func.lower(DjeItem.description).asc(),
+        )
+        .all()
+    )
+    dje: list = []
+    for rid, cat, sub, desc, cost in dje_rows:
+        if not dje or dje[-1]["category"] != cat:
+            dje.append({"category": cat, "subcategories": []})
+        subs = dje[-1]["subcategories"]
+        sub = sub or ""
+        if not subs or subs[-1]["subcategory"] != sub:
+            subs.append({"subcategory": sub, "items": []})
+        subs[-1]["items"].append([rid, desc, float(cost or 0)])
+
+    assemblies = _bundle_assembly_rows(org_id)
+
+    return {
+        "materials": {"fields": list(MATERIAL_BUNDLE_FIELDS), "rows": materials},
+        "dje": {"fields": list(DJE_BUNDLE_FIELDS), "tree": dje},
+        "assemblies": {"fields": list(ASSEMBLY_BUNDLE_FIELDS), "rows": assemblies},
+    }
+
+
+def build_line_catalog_bundle(org_id: int, rows: Iterable[dict]) -> dict:
+    """
+    The slice of build_catalog_bundle() that the given grid rows can resolve to: same fields and
+    order, restricted to the saved description ids/texts, so CatalogIndex prices those rows exactly
+    as it would against the whole catalog without loading it (used on every payload save).
+    """
+    mat_ids: Set[int] = set()
+    mat_texts: Set[str] = set()
+    asm_ids: Set[int] = set()
+    asm_texts: Set[str] = set()
+    for r in rows:
+        if not isinstance(r, dict) or not r.get("type"):
+            continue
+        ids, texts = (asm_ids, asm_texts) if r.get("type") == "Assemblies" else (mat_ids, mat_texts)
+        value = str(r.get("descValue") or "")
+        if value.isdigit():
+            ids.add(int(value))
+        if r.get("descText"):
+            texts.add(str(r.get("descText")))
+
+    materials = []
+    if mat_ids or mat_texts:
+        materials = _bundle_material_rows(
+            org_id, or_(Material.id.in_(mat_ids), Material.item_description.in_(mat_texts))
+        )
+    assemblies = []
+    if asm_ids or asm_texts:
+        assemblies = _bundle_assembly_rows(
+            org_id, or_(Assembly.id.in_(asm_ids), Assembly.name.in_(asm_texts))
+        )
+    return {
+        "materials": {"fields": list(MATERIAL_BUNDLE_FIELDS), "rows": materials},
+        "assemblies": {"fields": list(ASSEMBLY_BUNDLE_FIELDS), "rows": assemblies},
+    }
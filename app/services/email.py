@@ -1,13 +1,11 @@
 from typing import Optional, Dict, Any
 from urllib.parse import urljoin
 from flask import current_app, render_template
-from flask_mail import Message
-from app.extensions import db, mail
+from app.extensions import db
 from app.models import EmailLog
 from . import tokens
 from datetime import datetime, timedelta
 import json
-import time
 
 # NEW: suppression lookback window
 SUPPRESSION_WINDOW_DAYS = 90
@@ -55,22 +53,17 @@ def absolute_url(path: str) -> str:
     path = path.lstrip("/")
     return urljoin(base, path)
 
-def send_email(to_email: str, subject: str, template: str, context: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None) -> Optional[str]:
+def send_email(to_email: str, subject: str, template: str, context: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None) -> Optional[int]:
     """
     template: basename under templates/email/ without extension (e.g., 'verify' or 'reset')
-    Renders both HTML and plaintext. Returns provider message id if available.
+    Renders both HTML and plaintext into a queued EmailLog row (the outbox) and returns its id;
+    `flask mail worker` (app/services/mail_outbox.py) does the SMTP send. None if suppressed.
+    The row is only flushed: it joins the caller's transaction, so a rolled-back request sends nothing.
     """
     context = context or {}
     html_body = render_template(f"email/{template}.html", **context)
     text_body = render_template(f"email/{template}.txt", **context)
 
-    msg = Message(
-        recipients=[to_email],
-        subject=subject,
-    )
-    msg.body = text_body
-    msg.html = html_body
-    
     # Do-not-send suppression gate (derived from recent EmailLog events)
     if is_suppressed(to_email):
         db.session.add(
@@ -83,54 +76,25 @@ def send_email(to_email: str, subject: str, template: str, context: Optional[Dic
                 meta={"reason": "suppressed"},
             )
         )
-        db.session.commit()
+        db.session.flush()
         return None
 
-    # Persist an initial log
     elog = EmailLog(
         user_id=user_id,
         to_email=to_email.lower(),
         template=template,
         subject=subject,
         status="queued",
-        meta={}
+        meta={},
+        html_body=html_body,
+        text_body=text_body,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
     )
     db.session.add(elog)
-    db.session.commit()
-
-    start = time.perf_counter()
-    try:
-        resp = mail.send(msg)  # Flask-Mail returns None; provider capture varies by backend
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        provider_id = None
-        elog.status = "sent"
-        elog.provider_msg_id = provider_id
-        db.session.commit()
-        current_app.logger.info(json.dumps({
-            "event": "mail_send",
-            "template": template,
-            "to": to_email.lower(),
-            "subject": subject,
-            "outcome": "sent",
-            "provider_msg_id": provider_id,
-            "latency_ms": latency_ms
-        }))
-        return provider_id
-    except Exception as ex:
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        elog.status = "failed"
-        elog.meta = {"error": str(ex)}
-        db.session.commit()
-        current_app.logger.warning(json.dumps({
-            "event": "mail_send",
-            "template": template,
-            "to": to_email.lower(),
-            "subject": subject,
-            "outcome": "smtp_error",
-            "latency_ms": latency_ms,
-            "smtp_error": str(ex)
-        }))
-        return None
+    db.session.flush()
+    _log_structured("mail_queued", template=template, to=to_email.lower(), subject=subject, email_log_id=elog.id)
+    return elog.id
 
 def send_verification_email(user, token_ttl_minutes: int = 30) -> None:
     token = tokens.generate("verify", user.email.lower())
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert
+
+from app.extensions import db
+from app.models.estimate import Estimate
+from app.models.estimate_line import EstimateLine, LINE_SOURCE_ASSEMBLY, LINE_SOURCE_MATERIAL
+from app.services.calculations import _grid_rows, js_round, price_estimate, usd_round
+from app.services.catalog import build_line_catalog_bundle
+
+"""
+Keeps the data derived from Estimate.work_payload in step with it:
+  - estimate_lines (app/models/estimate_line.py)
+  - the typed totals columns on estimates (material_total, labor_hours_total, break_even, sell_price)
+
+Payload writers price the payload once (price_saved_payload), put estimate_totals() into the
+same UPDATE that stores the payload, then call replace_estimate_lines() before commit, so
+lines, totals and payload can never disagree. Pricing uses the server engine against only
+the catalog entries the grid references (build_line_catalog_bundle); the lines are replaced
+with one DELETE and one executemany INSERT.
+
+The typed columns are fixed-precision (Numeric(14, 4) / (14, 2)); check_priced_values() rejects
+a pricing that would overflow them (e.g. a 12-digit qty) before anything is written.
+"""
+
+# pricing["lines"] key → estimate_lines column
+_LINE_VALUE_COLUMNS = {
+    "qty": "qty",
+    "labor_adj": "labor_adj",
+    "cost_each": "price_each",
+    "labor_unit": "labor_each",
+    "material_ext": "material_ext",
+    "labor_hours": "labor_hours",
+}
+
+
+class PricedValueError(ValueError):
+    """A priced value does not fit its Numeric column."""
+
+    def __init__(self, column: str, value, position: Optional[int] = None):
+        self.column, self.value, self.position = column, value, position
+        where = f" (row {position})" if position is not None else ""
+        super().__init__(f"{column}{where} is out of range: {value!r}")
+
+
+def _fits(column, value) -> bool:
+    if value is None:
+        return True
+    v = float(value)
+    if not math.isfinite(v):
+        return False
+    return abs(round(v, column.type.scale)) < 10 ** (column.type.precision - column.type.scale)
+
+
+def price_saved_payload(org_id: Optional[int], work_payload: dict, settings_snapshot: dict) -> dict:
+    """price_estimate() of a payload against the slice of the org's catalog it references."""
+    bundle = build_line_catalog_bundle(org_id, _grid_rows(work_payload)) if org_id else {}
+    return price_estimate(work_payload or {}, settings_snapshot or {}, bundle)
+
+
+def estimate_totals(pricing: dict) -> Dict[str, float]:
+    """Values for the estimates totals columns, rounded the way the Summary page shows them."""
+    steps = pricing["steps"]
+    return {
+        "material_total": usd_round(steps["material_base"]),
+        "labor_hours_total": js_round(steps["base_hours"], 2),
+        "break_even": usd_round(steps["break_even"]),
+        "sell_price": usd_round(steps["sales_price"]),
+    }
+
+
+def check_priced_values(pricing: dict) -> None:
+    """Raise PricedValueError if a total or a line value would overflow its column."""
+    for name, value in estimate_totals(pricing).items():
+        if not _fits(Estimate.__table__.c[name], value):
+            raise PricedValueError(name, value)
+    line_columns = EstimateLine.__table__.c
+    for line in pricing["lines"]:
+        if not line["type"]:
+            continue
+        for key, column in _LINE_VALUE_COLUMNS.items():
+            if not _fits(line_columns[column], line[key]):
+                raise PricedValueError(column, line[key], line["index"])
+
+
+def build_estimate_lines(estimate_id: int, org_id: Optional[int], work_payload: dict, pricing: dict) -> List[dict]:
+    """estimate_lines rows (as dicts) for one priced payload; blank grid rows (no type) are skipped."""
+    rows = _grid_rows(work_payload)
+    lines = []
+    for line in pricing["lines"]:
+        item_type = str(line["type"] or "")
+        if not item_type:
+            continue
+        row_id = rows[line["index"]].get("id")
+        is_assembly = item_type == "Assemblies"
+        ref = line["description_id"]
+        ref = int(ref) if ref is not None and str(ref).isdigit() else None
+        lines.append({
+            "estimate_id": estimate_id,
+            "org_id": org_id,
+            "position": line["index"],
+            "row_id": str(row_id)[:64] if row_id not in (None, "") else None,
+            "source_kind": LINE_SOURCE_ASSEMBLY if is_assembly else LINE_SOURCE_MATERIAL,
+            "item_type": item_type[:255],
+            "material_id": None if is_assembly else ref,
+            "assembly_id": ref if is_assembly else None,
+            "description": (str(line["description"] or "")[:255] or None),
+            "qty": line["qty"],
+            "labor_adj": line["labor_adj"],
+            "price_each": line["cost_each"],
+            "labor_each": line["labor_unit"],
+            "material_ext": line["material_ext"],
+            "labor_hours": line["labor_hours"],
+        })
+    return lines
+
+
+def replace_estimate_lines(estimate_id: int, org_id: Optional[int], work_payload: dict, pricing: dict) -> int:
+    """Rewrite one estimate's lines from its priced payload; the caller commits. Returns the line count."""
+    lines = build_estimate_lines(estimate_id, org_id, work_payload, pricing)
+    db.session.execute(delete(EstimateLine).where(EstimateLine.estimate_id == estimate_id))
+    if lines:
+        db.session.execute(insert(EstimateLine), lines)
+    return len(lines)
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models.export_job import (
+    EXPORT_JOB_DONE,
+    EXPORT_JOB_FAILED,
+    EXPORT_JOB_QUEUED,
+    EXPORT_JOB_RUNNING,
+    ExportJob,
+)
+from app.services.exports import (
+    get_pdf_cache,
+    render_pdf_bytes,
+    summary_pdf_stylesheets,
+    warm_pdf_render_process,
+)
+
+"""
+PDF export jobs (see app/models/export_job.py).
+
+The request thread only renders the Jinja HTML and inserts an export_jobs row; WeasyPrint runs
+outside the gunicorn request cycle. The table is the source of truth for status and results, so
+any web worker can answer the poll/download endpoints.
+
+PDF_JOBS_BACKEND:
+  - "local" (default): enqueue hands the job id to a small per-process dispatcher thread, which
+    claims the row and renders in a ProcessPoolExecutor (PDF_RENDER_PROCESSES; 0 renders in the
+    dispatcher thread). No extra infrastructure needed.
+  - "worker": enqueue only inserts the row; `flask pdf worker` processes claim and render.
+
+Jobs stuck in "running" (e.g., a web worker restarted mid-render) are requeued by the worker
+when idle; with the local backend, enqueue and status polls do it (at most every
+RECOVERY_INTERVAL_SECONDS per process) and hand the orphans to the dispatcher. Finished rows,
+which hold the whole PDF, are deleted after PDF_JOB_RETENTION_SECONDS.
+"""
+
+MAX_ATTEMPTS = 3
+RECOVERY_INTERVAL_SECONDS = 30
+
+_lock = threading.Lock()
+_dispatcher: Optional[ThreadPoolExecutor] = None
+_render_pool: Optional[ProcessPoolExecutor] = None
+_last_recovery = 0.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _get_dispatcher(app) -> ThreadPoolExecutor:
+    # Created lazily so each gunicorn worker (post-fork) owns its own threads
+    global _dispatcher
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = ThreadPoolExecutor(
+                max_workers=app.config.get("PDF_JOB_THREADS", 2), thread_name_prefix="pdf-job"
+            )
+        return _dispatcher
+
+
+def _get_render_pool(app) -> Optional[ProcessPoolExecutor]:
+    global _render_pool
+    processes = int(app.config.get("PDF_RENDER_PROCESSES", 2) or 0)
+    if processes <= 0:
+        return None
+    with _lock:
+        if _render_pool is None:
+            # spawn: never fork a process holding DB connections / dispatcher threads
+            _render_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_pdf_render_process,
+                initargs=(summary_pdf_stylesheets(app.root_path),),
+            )
+        return _render_pool
+
+
+def _reset_render_pool() -> None:
+    global _render_pool
+    with _lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pdf(html: str, base_url: Optional[str]) -> bytes:
+    """Render in the process pool when configured, else in the calling thread."""
+    app = current_app._get_current_object()
+    stylesheets = summary_pdf_stylesheets(app.root_path)
+    pool = _get_render_pool(app)
+    if pool is None:
+        return render_pdf_bytes(html, base_url, stylesheets)
+    timeout = app.config.get("PDF_RENDER_TIMEOUT_SECONDS", 120)
+    try:
+        return pool.submit(render_pdf_bytes, html, base_url, stylesheets).result(timeout=timeout)
+    except BrokenProcessPool:
+        # A render process died (OOM, segfault in a native lib); start fresh next time
+        _reset_render_pool()
+        raise
+
+
+def enqueue_pdf(
+    *,
+    org_id: int,
+    html: str,
+    filename: str,
+    base_url: Optional[str] = None,
+    user_id: Optional[int] = None,
+    estimate_id: Optional[int] = None,
+    cache_key: Optional[str] = None,
+) -> ExportJob:
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        org_id=org_id,
+        user_id=user_id,
+        estimate_id=estimate_id,
+        kind="summary_pdf",
+        status=EXPORT_JOB_QUEUED,
+        attempts=0,
+        filename=filename,
+        base_url=base_url,
+        html=html,
+        cache_key=cache_key,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get("PDF_JOBS_BACKEND", "local") == "local":
+        _get_dispatcher(app).submit(_run_in_app, app, job.id)
+    recover_local_jobs()
+    return job
+
+
+def _run_in_app(app, job_id: Optional[str] = None) -> None:
+    # job_id=None: take the oldest queued job (orphans handed over by recover_local_jobs)
+    with app.app_context():
+        try:
+            run_job(job_id) if job_id else run_next_job()
+        except Exception:
+            app.logger.exception("export job %s failed", job_id or "(next)")
+        finally:
+            db.session.remove()
+
+
+def claim_job(job_id: str) -> bool:
+    """queued → running; False if another worker got there first."""
+    res = db.session.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == EXPORT_JOB_QUEUED)
+        .values(status=EXPORT_JOB_RUNNING, started_at=_utcnow(), attempts=ExportJob.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return res.rowcount == 1
+
+
+def claim_next_job() -> Optional[str]:
+    """Claim the oldest queued job (FOR UPDATE SKIP LOCKED on Postgres)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        oldest = (
+            select(ExportJob.id)
+            .where(ExportJob.status == EXPORT_JOB_QUEUED)
+            .order_by(ExportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job_id = db.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == oldest)
+            .values(status=EXPORT_JOB_RUNNING, started_at=_utcnow(), attempts=ExportJob.attempts + 1)
+            .returning(ExportJob.id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        db.session.commit()
+        return job_id
+
+    candidates = db.session.execute(
+        select(ExportJob.id)
+        .where(ExportJob.status == EXPORT_JOB_QUEUED)
+        .order_by(ExportJob.created_at)
+        .limit(5)
+    ).scalars().all()
+    for job_id in candidates:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def _render_claimed(job_id: str) -> ExportJob:
+    job = db.session.get(ExportJob, job_id)
+    try:
+        pdf = render_pdf(job.html or "", job.base_url)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(ExportJob, job_id)
+        job.status = EXPORT_JOB_FAILED
+        job.error = str(e)[:2000] or e.__class__.__name__
+        job.finished_at = _utcnow()
+        db.session.commit()
+        raise
+
+    cache = get_pdf_cache(current_app) if job.cache_key else None
+    if cache is not None:
+        try:
+            cache.put(job.cache_key, pdf)
+        except OSError:
+            current_app.logger.warning("pdf cache write failed for job %s", job_id, exc_info=True)
+
+    job.result = pdf
+    job.html = None
+    job.status = EXPORT_JOB_DONE
+    job.error = None
+    job.finished_at = _utcnow()
+    db.session.commit()
+    return job
+
+
+def run_job(job_id: str) -> Optional[ExportJob]:
+    if not claim_job(job_id):
+        return None
+    return _render_claimed(job_id)
+
+
+def run_next_job() -> Optional[ExportJob]:
+    job_id = claim_next_job()
+    if job_id is None:
+        return None
+    return _render_claimed(job_id)
+
+
+def requeue_stale_jobs(max_age_seconds: int) -> int:
+    """running for too long → queued again (or failed after MAX_ATTEMPTS)."""
+    cutoff = _utcnow() - timedelta(seconds=max_age_seconds)
+    stale = (ExportJob.status == EXPORT_JOB_RUNNING, ExportJob.started_at < cutoff)
+    failed = db.session.execute(
+        update(ExportJob)
+        .where(*stale, ExportJob.attempts >= MAX_ATTEMPTS)
+        .values(status=EXPORT_JOB_FAILED, error="render timed out", finished_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(ExportJob)
+        .where(*stale, ExportJob.attempts < MAX_ATTEMPTS)
+        .values(status=EXPORT_JOB_QUEUED, started_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return failed + requeued
+
+
+def purge_finished_jobs(max_age_seconds: int) -> int:
+    """Delete done/failed jobs (and their PDF bytes) finished more than max_age_seconds ago."""
+    cutoff = _utcnow() - timedelta(seconds=max_age_seconds)
+    deleted = db.session.execute(
+        ExportJob.__table__.delete().where(
+            ExportJob.status.in_((EXPORT_JOB_DONE, EXPORT_JOB_FAILED)),
+            ExportJob.finished_at < cutoff,
+        )
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def _stale_after(app) -> int:
+    return int(app.config.get("PDF_RENDER_TIMEOUT_SECONDS", 120)) * 2
+
+
+def _housekeeping(app) -> None:
+    requeue_stale_jobs(_stale_after(app))
+    purge_finished_jobs(int(app.config.get("PDF_JOB_RETENTION_SECONDS", 86400)))
+
+
+def recover_local_jobs() -> int:
+    """
+    Local backend only (nobody else runs housekeeping): requeue jobs a restarted web worker left
+    running, purge expired results, and dispatch queued jobs that have waited past the stall
+    cutoff. Throttled per process; returns the number of jobs handed to the dispatcher.
+    """
+    global _last_recovery
+    app = current_app._get_current_object()
+    if app.config.get("PDF_JOBS_BACKEND", "local") != "local":
+        return 0
+    now = time.monotonic()
+    with _lock:
+        if now - _last_recovery < RECOVERY_INTERVAL_SECONDS:
+            return 0
+        _last_recovery = now
+    try:
+        _housekeeping(app)
+        cutoff = _utcnow() - timedelta(seconds=_stale_after(app))
+        orphaned = db.session.execute(
+            select(func.count()).select_from(ExportJob)
+            .where(ExportJob.status == EXPORT_JOB_QUEUED, ExportJob.created_at < cutoff)
+        ).scalar() or 0
+    except Exception:
+        db.session.rollback()
+        app.logger.exception("export job recovery failed")
+        return 0
+    dispatcher = _get_dispatcher(app)
+    for _ in range(orphaned):
+        dispatcher.submit(_run_in_app, app)
+    return orphaned
+
+
+def work(*, poll_interval: float = 1.0, once: bool = False) -> int:
+    """Worker loop for `flask pdf worker`; returns the number of jobs processed."""
+    app = current_app._get_current_object()
+    processed = 0
+    while True:
+        job_id = None
+        try:
+            job_id = claim_next_job()
+            if job_id is not None:
+                _render_claimed(job_id)
+        except Exception:
+            # A claimed job's failure is recorded on its row; otherwise the claim itself failed
+            app.logger.exception("export job %s failed", job_id or "claim")
+        finally:
+            db.session.remove()
+
+        if job_id is not None:
+            processed += 1
+            continue
+        if once:
+            return processed
+        try:
+            _housekeeping(app)
+        except Exception:
+            app.logger.exception("export job housekeeping failed")
+        finally:
+            db.session.remove()
+        time.sleep(poll_interval)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from flask import render_template
+
+"""
+Summary PDF export service, shared by the export routes (sync mode) and export jobs.
+
+Rendering:
+  - Stylesheets are parsed once per process and reused (keyed by path + mtime, so an edited
+    file is re-parsed); all renders share one WeasyPrint FontConfiguration, so fontconfig/Pango
+    font discovery is paid once per worker instead of per export.
+  - render_pdf_bytes takes only picklable arguments and imports WeasyPrint lazily, so it can be
+    submitted to a ProcessPoolExecutor; warm_pdf_renderer primes a process (boot hook / pool
+    initializer) so the first real export is not the slow one.
+  - Renders are serialized per process: WeasyPrint/Pango are not documented as thread-safe and
+    the shared FontConfiguration is mutable.
+
+Saved-estimate PDFs are cached on local disk, content-addressed by summary_pdf_cache_key:
+  (template version + template/CSS mtimes, estimate id, work_payload hash, settings_snapshot hash)
+Any edit to the estimate or a deploy touching the templates/CSS yields a new key; stale entries
+simply age out of the size-bounded LRU (PdfCache). The key doubles as the HTTP ETag.
+"""
+
+# Bump when the summary PDF markup/context changes in a way file mtimes would not capture
+SUMMARY_PDF_TEMPLATE_VERSION = "1"
+
+_SUMMARY_PDF_TEMPLATES = ("summary_pdf.html", "_summary_tables.html")
+
+_WARMUP_HTML = "<!doctype html><html><body class=\"pdf-summary\"><h1>Warm-up</h1></body></html>"
+
+_render_lock = threading.RLock()
+_font_config = None
+_stylesheets: Dict[str, Tuple[int, object]] = {}
+
+
+def summary_pdf_stylesheets(root_path: str) -> List[str]:
+    return [
+        os.path.join(root_path, "static", "css", "site.css"),
+        os.path.join(root_path, "static", "css", "pdf.css"),
+    ]
+
+
+def _get_font_config():
+    global _font_config
+    if _font_config is None:
+        from weasyprint.text.fonts import FontConfiguration
+
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def _get_stylesheet(path: str):
+    from weasyprint import CSS
+
+    mtime = _mtime_ns(path)
+    cached = _stylesheets.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    sheet = CSS(filename=path, font_config=_get_font_config())
+    _stylesheets[path] = (mtime, sheet)
+    return sheet
+
+
+def render_pdf_bytes(html: str, base_url: Optional[str], stylesheets: Sequence[str]) -> bytes:
+    from weasyprint import HTML
+
+    with _render_lock:
+        return HTML(string=html, base_url=base_url).write_pdf(
+            stylesheets=[_get_stylesheet(path) for path in stylesheets],
+            font_config=_get_font_config(),
+        )
+
+
+def warm_pdf_renderer(stylesheets: Sequence[str]) -> float:
+    """Parse stylesheets, load fonts and render a tiny document; returns seconds spent."""
+    started = time.perf_counter()
+    render_pdf_bytes(_WARMUP_HTML, None, stylesheets)
+    return time.perf_counter() - started
+
+
+def warm_pdf_on_boot(app) -> None:
+    """PDF_WARMUP_ON_BOOT: prime WeasyPrint in a web worker (called from gunicorn.conf.py)."""
+    if not app.config.get("PDF_WARMUP_ON_BOOT"):
+        return
+    try:
+        secs = warm_pdf_renderer(summary_pdf_stylesheets(app.root_path))
+        app.logger.info("pdf renderer warmed in %.0f ms", secs * 1000)
+    except Exception:
+        app.logger.warning("pdf renderer warm-up failed", exc_info=True)
+
+
+def warm_pdf_render_process(stylesheets: Sequence[str]) -> None:
+    # ProcessPoolExecutor initializer: an exception here would break the pool, so a failed
+    # warm-up only means the first real render pays the setup cost.
+    try:
+        warm_pdf_renderer(stylesheets)
+    except Exception:
+        pass
+
+
+def _locate_saved_summary(payload: dict):
+    # Try common summary snapshot locations (prefer summary_export)
+    summary = ((payload.get("estimateData") or {}).get("summary_export")
+            or payload.get("summary_export")
+            or payload.get("summary_totals")
+            or payload.get("summary")
+            or payload.get("summary_snapshot")
+            or payload)
+
+    # HF2a: gracefully fall back to full payload so Saved Export still works.
+    # No math here — the Jinja template renders defensively for now.
+    return summary or payload
+
+
+def render_saved_summary_html(estimate) -> str:
+    return render_template(
+        "exports/summary_pdf.html",
+        estimate=estimate,
+        summary=_locate_saved_summary(estimate.work_payload or {}),
+        mode="SAVED",
+    )
+
+
+def render_fast_summary_html(data: dict) -> str:
+    return render_template(
+        "exports/summary_pdf.html",
+        estimate=None,     # not saved; no Estimate record
+        summary=data,      # validated fast payload
+        mode="FAST",
+    )
+
+
+def _json_digest(value) -> str:
+    raw = json.dumps(value or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def summary_pdf_cache_key(root_path: str, estimate) -> str:
+    templates = [os.path.join(root_path, "templates", "exports", name) for name in _SUMMARY_PDF_TEMPLATES]
+    parts = [
+        f"v{SUMMARY_PDF_TEMPLATE_VERSION}",
+        *(f"{os.path.basename(p)}:{_mtime_ns(p)}" for p in templates + summary_pdf_stylesheets(root_path)),
+        f"estimate:{estimate.id}",
+        f"payload:{_json_digest(estimate.work_payload)}",
+        f"settings:{_json_digest(estimate.settings_snapshot)}",
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """
+    Size-bounded LRU of rendered PDFs on local disk, safe across threads and processes
+    sharing the directory. Writes are atomic (tmp file + rename). Recency is tracked in
+    atime (set explicitly on hits) so mtime stays the render time for Last-Modified.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """(pdf bytes, render time as epoch seconds) or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            mtime = os.stat(path).st_mtime
+            os.utime(path, (time.time(), mtime))
+        except OSError:
+            return None
+        return data, mtime
+
+    def put(self, key: str, data: bytes) -> float:
+        path = self._path(key)
+        tmp = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        self._evict()
+        return os.stat(path).st_mtime
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_atime, st.st_size, entry.path))
+                    total += st.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+
+def get_pdf_cache(app) -> Optional[PdfCache]:
+    """Per-app PdfCache; None when disabled (PDF_CACHE_MAX_BYTES <= 0)."""
+    max_bytes = int(app.config.get("PDF_CACHE_MAX_BYTES", 0) or 0)
+    if max_bytes <= 0:
+        return None
+    cache = app.extensions.get("pdf_cache")
+    if cache is None:
+        directory = app.config.get("PDF_CACHE_DIR") or os.path.join(app.instance_path, "pdf_cache")
+        cache = PdfCache(directory, max_bytes)
+        app.extensions["pdf_cache"] = cache
+    return cache
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models.import_job import (
+    IMPORT_JOB_DONE,
+    IMPORT_JOB_FAILED,
+    IMPORT_JOB_QUEUED,
+    IMPORT_JOB_RUNNING,
+    IMPORT_SOURCE_STARTER_PACK,
+    ImportJob,
+)
+from app.services.persistence import (
+    import_dje_starter_pack,
+    import_materials_starter_pack,
+    import_upload,
+)
+
+"""
+Catalog import jobs (see app/models/import_job.py).
+
+The request only inserts an import_jobs row (plus the uploaded file, if any) and answers 202;
+the pandas import runs outside the gunicorn request cycle, committing every IMPORT_CHUNK_ROWS
+rows and writing progress to the job row after each chunk. The table is the source of truth,
+so any web worker can answer GET /libraries/imports/<job_id>.json.
+
+IMPORT_JOBS_BACKEND (same model as PDF_JOBS_BACKEND):
+  - "local" (default): enqueue hands the job id to a small per-process thread pool
+    (IMPORT_JOB_THREADS), which claims the row and runs the import.
+  - "worker": enqueue only inserts the row; `flask imports worker` processes claim and run it.
+
+Jobs whose progress stopped (e.g., a web worker restarted mid-import) are requeued by the worker
+when idle; with the local backend, enqueue and status polls do it (at most every
+RECOVERY_INTERVAL_SECONDS per process) and hand the orphans to the dispatcher.
+"""
+
+MAX_ATTEMPTS = 3
+RECOVERY_INTERVAL_SECONDS = 30
+
+_STARTER_PACKS = {
+    "materials": import_materials_starter_pack,
+    "dje_items": import_dje_starter_pack,
+}
+
+_lock = threading.Lock()
+_dispatcher: Optional[ThreadPoolExecutor] = None
+_last_recovery = 0.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _get_dispatcher(app) -> ThreadPoolExecutor:
+    # Created lazily so each gunicorn worker (post-fork) owns its own threads
+    global _dispatcher
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = ThreadPoolExecutor(
+                max_workers=app.config.get("IMPORT_JOB_THREADS", 1), thread_name_prefix="import-job"
+            )
+        return _dispatcher
+
+
+def enqueue_import(
+    *,
+    org_id: int,
+    kind: str,
+    source: str = IMPORT_SOURCE_STARTER_PACK,
+    user_id: Optional[int] = None,
+    dry_run: bool = False,
+    filename: Optional[str] = None,
+    upload: Optional[bytes] = None,
+) -> ImportJob:
+    if kind not in _STARTER_PACKS:
+        raise ValueError(f"Unknown import kind {kind!r}")
+    job = ImportJob(
+        id=uuid.uuid4().hex,
+        org_id=org_id,
+        user_id=user_id,
+        kind=kind,
+        source=source,
+        status=IMPORT_JOB_QUEUED,
+        attempts=0,
+        dry_run=dry_run,
+        filename=filename,
+        upload=upload,
+        rows_done=0,
+        chunks_done=0,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get("IMPORT_JOBS_BACKEND", "local") == "local":
+        _get_dispatcher(app).submit(_run_in_app, app, job.id)
+    recover_local_jobs()
+    return job
+
+
+def _run_in_app(app, job_id: Optional[str] = None) -> None:
+    # job_id=None: take the oldest queued job (orphans handed over by recover_local_jobs)
+    with app.app_context():
+        try:
+            run_job(job_id) if job_id else run_next_job()
+        except Exception:
+            app.logger.exception("import job %s failed", job_id or "(next)")
+        finally:
+            db.session.remove()
+
+
+def claim_job(job_id: str) -> bool:
+    """queued → running; False if another worker got there first."""
+    res = db.session.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id, ImportJob.status == IMPORT_JOB_QUEUED)
+        .values(
+            status=IMPORT_JOB_RUNNING, started_at=_utcnow(), updated_at=_utcnow(),
+            attempts=ImportJob.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return res.rowcount == 1
+
+
+def claim_next_job() -> Optional[str]:
+    """Claim the oldest queued job (FOR UPDATE SKIP LOCKED on Postgres)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        oldest = (
+            select(ImportJob.id)
+            .where(ImportJob.status == IMPORT_JOB_QUEUED)
+            .order_by(ImportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job_id = db.session.execute(
+            update(ImportJob)
+            .where(ImportJob.id == oldest)
+            .values(
+                status=IMPORT_JOB_RUNNING, started_at=_utcnow(), updated_at=_utcnow(),
+                attempts=ImportJob.attempts + 1,
+            )
+            .returning(ImportJob.id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        db.session.commit()
+        return job_id
+
+    candidates = db.session.execute(
+        select(ImportJob.id)
+        .where(ImportJob.status == IMPORT_JOB_QUEUED)
+        .order_by(ImportJob.created_at)
+        .limit(5)
+    ).scalars().all()
+    for job_id in candidates:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def _record_progress(job_id: str, rows_done: int, rows_total: Optional[int], report) -> None:
+    # Runs between chunk commits of the import (the session has nothing else pending)
+    values = dict(
+        rows_done=rows_done,
+        chunks_done=ImportJob.chunks_done + 1,
+        report=report.as_dict(),
+        updated_at=_utcnow(),
+    )
+    if rows_total is not None:
+        values["rows_total"] = rows_total
+    db.session.execute(
+        update(ImportJob).where(ImportJob.id == job_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def _finish(job_id: str, **values) -> None:
+    db.session.execute(
+        update(ImportJob).where(ImportJob.id == job_id)
+        .values(upload=None, finished_at=_utcnow(), updated_at=_utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def _run_claimed(job_id: str) -> ImportJob:
+    job = db.session.get(ImportJob, job_id)
+    kind, org_id, dry_run = job.kind, job.org_id, bool(job.dry_run)
+
+    def progress(rows_done, rows_total, report):
+        _record_progress(job_id, rows_done, rows_total, report)
+
+    try:
+        if job.source == IMPORT_SOURCE_STARTER_PACK:
+            report = _STARTER_PACKS[kind](dry_run=dry_run, org_id=org_id, on_chunk=progress)
+        else:
+            report = import_upload(
+                kind, job.upload or b"", job.filename or "",
+                org_id=org_id, dry_run=dry_run, on_chunk=progress,
+            )
+    except Exception as e:
+        db.session.rollback()
+        _finish(job_id, status=IMPORT_JOB_FAILED, error=str(e)[:2000] or e.__class__.__name__)
+        raise
+
+    _finish(job_id, status=IMPORT_JOB_DONE, error=None, report=report.as_dict())
+    db.session.expire_all()
+    return db.session.get(ImportJob, job_id)
+
+
+def run_job(job_id: str) -> Optional[ImportJob]:
+    if not claim_job(job_id):
+        return None
+    return _run_claimed(job_id)
+
+
+def run_next_job() -> Optional[ImportJob]:
+    job_id = claim_next_job()
+    if job_id is None:
+        return None
+    return _run_claimed(job_id)
+
+
+def requeue_stale_jobs(max_age_seconds: int) -> int:
+    """running with no progress for too long → queued again (or failed after MAX_ATTEMPTS)."""
+    cutoff = _utcnow() - timedelta(seconds=max_age_seconds)
+    stale = (ImportJob.status == IMPORT_JOB_RUNNING, ImportJob.updated_at < cutoff)
+    failed = db.session.execute(
+        update(ImportJob)
+        .where(*stale, ImportJob.attempts >= MAX_ATTEMPTS)
+        .values(status=IMPORT_JOB_FAILED, error="import stalled", upload=None, finished_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(ImportJob)
+        .where(*stale, ImportJob.attempts < MAX_ATTEMPTS)
+        .values(status=IMPORT_JOB_QUEUED, started_at=None, rows_done=0, chunks_done=0)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return failed + requeued
+
+
+def recover_local_jobs() -> int:
+    """
+    Local backend only (no worker requeues anything): requeue imports a restarted web worker
+    left running and dispatch queued jobs that have waited past the stall cutoff. Throttled per
+    process; returns the number of jobs handed to the dispatcher.
+    """
+    global _last_recovery
+    app = current_app._get_current_object()
+    if app.config.get("IMPORT_JOBS_BACKEND", "local") != "local":
+        return 0
+    now = time.monotonic()
+    with _lock:
+        if now - _last_recovery < RECOVERY_INTERVAL_SECONDS:
+            return 0
+        _last_recovery = now
+    stale_after = int(app.config.get("IMPORT_JOB_STALL_SECONDS", 300))
+    try:
+        requeue_stale_jobs(stale_after)
+        cutoff = _utcnow() - timedelta(seconds=stale_after)
+        orphaned = db.session.execute(
+            select(func.count()).select_from(ImportJob)
+            .where(ImportJob.status == IMPORT_JOB_QUEUED, ImportJob.created_at < cutoff)
+        ).scalar() or 0
+    except Exception:
+        db.session.rollback()
+        app.logger.exception("import job recovery failed")
+        return 0
+    dispatcher = _get_dispatcher(app)
+    for _ in range(orphaned):
+        dispatcher.submit(_run_in_app, app)
+    return orphaned
+
+
+def work(*, poll_interval: float = 1.0, once: bool = False) -> int:
+    """Worker loop for `flask imports worker`; returns the number of jobs processed."""
+    app = current_app._get_current_object()
+    stale_after = int(app.config.get("IMPORT_JOB_STALL_SECONDS", 300))
+    processed = 0
+    while True:
+        job_id = None
+        try:
+            job_id = claim_next_job()
+            if job_id is not None:
+                _run_claimed(job_id)
+        except Exception:
+            # A claimed job's failure is recorded on its row; otherwise the claim itself failed
+            app.logger.exception("import job %s failed", job_id or "claim")
+        finally:
+            db.session.remove()
+
+        if job_id is not None:
+            processed += 1
+            continue
+        if once:
+            return processed
+        try:
+            requeue_stale_jobs(stale_after)
+        except Exception:
+            app.logger.exception("import job requeue failed")
+        finally:
+            db.session.remove()
+        time.sleep(poll_interval)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import smtplib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import select, update
+
+from app.extensions import db, mail
+from app.models import EmailLog
+
+"""
+Email outbox drained by `flask mail worker`.
+
+send_email() (app/services/email.py) renders the message into a queued email_logs row and
+commits; nothing talks to SMTP inside the request. The worker claims due rows in batches
+(FOR UPDATE SKIP LOCKED on Postgres, so several workers can run), sends each batch over one
+SMTP connection and records every message's outcome with the usual `mail_send` log line.
+
+Row lifecycle (status / next_attempt_at):
+  queued   due at next_attempt_at
+  sending  claimed by a worker; next_attempt_at is the lease expiry. Rows whose lease ran out
+           (worker killed mid-batch) go back to queued, or failed after MAX_ATTEMPTS.
+  sent     bodies cleared, sent_at set, provider_msg_id = the Message-ID header
+  failed   permanent SMTP reply (5xx) or MAIL_OUTBOX_MAX_ATTEMPTS transient failures
+Transient failures (4xx, connection errors) are retried after
+MAIL_OUTBOX_RETRY_SECONDS * 2**(attempts - 1), capped at MAIL_OUTBOX_MAX_RETRY_SECONDS.
+"""
+
+
+@dataclass
+class _Outgoing:
+    id: int
+    to_email: str
+    template: str
+    subject: str
+    attempts: int
+    meta: Dict[str, Any]
+    message: Message
+
+
+def _utcnow() -> datetime:
+    # email_logs timestamps are naive UTC
+    return datetime.utcnow()
+
+
+def _setting(name: str, default: int) -> int:
+    return int(current_app.config.get(name, default))
+
+
+def claim_batch(limit: int) -> List[int]:
+    """Due queued rows → sending (attempts + 1, leased for MAIL_OUTBOX_LEASE_SECONDS)."""
+    now = _utcnow()
+    claimed = dict(
+        status="sending",
+        attempts=EmailLog.attempts + 1,
+        next_attempt_at=now + timedelta(seconds=_setting("MAIL_OUTBOX_LEASE_SECONDS", 300)),
+    )
+    due = (
+        select(EmailLog.id)
+        .where(EmailLog.status == "queued", EmailLog.next_attempt_at <= now)
+        .order_by(EmailLog.next_attempt_at, EmailLog.id)
+        .limit(limit)
+    )
+    if db.session.get_bind().dialect.name == "postgresql":
+        ids = db.session.execute(
+            update(EmailLog)
+            .where(EmailLog.id.in_(due.with_for_update(skip_locked=True)))
+            .values(**claimed)
+            .returning(EmailLog.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+        return sorted(ids)
+
+    ids = []
+    for email_id in db.session.execute(due).scalars().all():
+        res = db.session.execute(
+            update(EmailLog)
+            .where(EmailLog.id == email_id, EmailLog.status == "queued")
+            .values(**claimed)
+            .execution_options(synchronize_session=False)
+        )
+        if res.rowcount == 1:
+            ids.append(email_id)
+    db.session.commit()
+    return ids
+
+
+def _load(ids: List[int]) -> List[_Outgoing]:
+    # Snapshot the rows up front: outcomes are written with UPDATEs and committed one by one
+    rows = db.session.execute(select(EmailLog).where(EmailLog.id.in_(ids)).order_by(EmailLog.id)).scalars().all()
+    outgoing = []
+    for row in rows:
+        msg = Message(recipients=[row.to_email], subject=row.subject)
+        msg.body = row.text_body
+        msg.html = row.html_body
+        outgoing.append(_Outgoing(
+            id=row.id, to_email=row.to_email, template=row.template, subject=row.subject,
+            attempts=row.attempts, meta=dict(row.meta or {}), message=msg,
+        ))
+    return outgoing
+
+
+def _is_permanent(ex: Exception) -> bool:
+    if isinstance(ex, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in ex.recipients.values())
+    if isinstance(ex, smtplib.SMTPResponseException):
+        return ex.smtp_code >= 500
+    # Connection problems are worth retrying; anything else (bad headers, no sender) is not
+    return not isinstance(ex, (smtplib.SMTPException, OSError))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    base = _setting("MAIL_OUTBOX_RETRY_SECONDS", 60)
+    cap = _setting("MAIL_OUTBOX_MAX_RETRY_SECONDS", 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def _record(email_id: int, **values) -> None:
+    db.session.execute(
+        update(EmailLog).where(EmailLog.id == email_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def _sent(out: _Outgoing, latency_ms: int) -> None:
+    provider_id = (out.message.msgId or "")[:128] or None
+    _record(
+        out.id, status="sent", sent_at=_utcnow(), next_attempt_at=None,
+        provider_msg_id=provider_id, html_body=None, text_body=None,
+    )
+    current_app.logger.info(json.dumps({
+        "event": "mail_send",
+        "template": out.template,
+        "to": out.to_email,
+        "subject": out.subject,
+        "outcome": "sent",
+        "provider_msg_id": provider_id,
+        "latency_ms": latency_ms,
+        "attempt": out.attempts,
+    }))
+
+
+def _failed(out: _Outgoing, ex: Exception, latency_ms: int) -> None:
+    will_retry = not _is_permanent(ex) and out.attempts < _setting("MAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    meta = {**out.meta, "error": str(ex)}
+    if will_retry:
+        _record(out.id, status="queued", next_attempt_at=_utcnow() + retry_delay(out.attempts), meta=meta)
+    else:
+        _record(out.id, status="failed", next_attempt_at=None, html_body=None, text_body=None, meta=meta)
+    current_app.logger.warning(json.dumps({
+        "event": "mail_send",
+        "template": out.template,
+        "to": out.to_email,
+        "subject": out.subject,
+        "outcome": "smtp_error",
+        "latency_ms": latency_ms,
+        "smtp_error": str(ex),
+        "attempt": out.attempts,
+        "will_retry": will_retry,
+    }))
+
+
+def send_batch(batch_size: Optional[int] = None) -> int:
+    """Claim up to batch_size due messages and send them over one SMTP connection."""
+    ids = claim_batch(batch_size or _setting("MAIL_OUTBOX_BATCH_SIZE", 50))
+    if not ids:
+        return 0
+
+    pending = _load(ids)
+    try:
+        with mail.connect() as conn:
+            while pending:
+                out = pending[0]
+                start = time.perf_counter()
+                try:
+                    conn.send(out.message)
+                except smtplib.SMTPServerDisconnected:
+                    raise  # the connection is gone: fail this and the rest of the batch below
+                except Exception as ex:
+                    pending.pop(0)
+                    _failed(out, ex, int((time.perf_counter() - start) * 1000))
+                    continue
+                pending.pop(0)
+                _sent(out, int((time.perf_counter() - start) * 1000))
+    except Exception as ex:  # connect/STARTTLS/login failed, or the server hung up mid-batch
+        db.session.rollback()
+        for out in pending:
+            _failed(out, ex, 0)
+    return len(ids)
+
+
+def requeue_stale(max_attempts: Optional[int] = None) -> int:
+    """sending rows whose lease expired → queued again (or failed after MAX_ATTEMPTS)."""
+    max_attempts = max_attempts or _setting("MAIL_OUTBOX_MAX_ATTEMPTS", 5)
+    now = _utcnow()
+    stale = (EmailLog.status == "sending", EmailLog.next_attempt_at < now)
+    failed = db.session.execute(
+        update(EmailLog)
+        .where(*stale, EmailLog.attempts >= max_attempts)
+        .values(status="failed", next_attempt_at=None, html_body=None, text_body=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(EmailLog)
+        .where(*stale, EmailLog.attempts < max_attempts)
+        .values(status="queued", next_attempt_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return failed + requeued
+
+
+def work(*, poll_interval: float = 1.0, once: bool = False, batch_size: Optional[int] = None) -> int:
+    """Worker loop for `flask mail worker`; returns the number of messages processed."""
+    app = current_app._get_current_object()
+    processed = 0
+    while True:
+        try:
+            handled = send_batch(batch_size)
+        except Exception:
+            app.logger.exception("mail outbox batch failed")
+            handled = 0
+        finally:
+            db.session.remove()
+
+        if handled:
+            processed += handled
+            continue
+        if once:
+            return processed
+        try:
+            requeue_stale()
+        except Exception:
+            app.logger.exception("mail outbox requeue failed")
+        finally:
+            db.session.remove()
+        time.sleep(poll_interval)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional
+
+"""
+Incremental saves for Estimate.work_payload (PATCH /estimates/<id>/payload).
+
+Two body formats, both applied to a deep copy of the stored payload:
+
+  - JSON Patch (RFC 6902), Content-Type: application/json-patch+json
+        [{"op": "replace", "path": "/totals/laborRate", "value": 95}, ...]
+    Supported ops: add, remove, replace, move, copy, test.
+
+  - Row deltas, Content-Type: application/json
+        {
+          "revision": 7,
+          "rows":    {"upsert": [{"id": "r1", ...}], "delete": ["r3"], "order": ["r1", "r2"]},
+          "replace": {"summary_export": {...}, "totals": {...}}
+        }
+    Grid rows (work_payload.grid.rows) are addressed by their "id". Upserts replace the row
+    with the same id in place, or append it; "order" (optional) must list every row id.
+    "replace" swaps whole top-level sections; the grid is only changed through "rows".
+
+Invalid patches raise PatchError (→ 400); nothing is written.
+"""
+
+
+class PatchError(ValueError):
+    """Patch document is malformed or does not apply to the stored payload."""
+
+
+# ---- JSON Patch (RFC 6902) ---------------------------------------------------
+
+def _parse_pointer(path: Any) -> List[str]:
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise PatchError(f"invalid JSON pointer: {path!r}")
+    if path == "":
+        return []
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _list_index(container: list, token: str, *, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"invalid array index: {token!r}")
+    idx = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if idx > limit:
+        raise PatchError(f"array index out of range: {idx}")
+    return idx
+
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    cur = doc
+    for token in tokens:
+        if isinstance(cur, dict):
+            if token not in cur:
+                raise PatchError(f"path not found: /{'/'.join(tokens)}")
+            cur = cur[token]
+        elif isinstance(cur, list):
+            cur = cur[_list_index(cur, token, allow_end=False)]
+        else:
+            raise PatchError(f"path not found: /{'/'.join(tokens)}")
+    return cur
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise PatchError(f"cannot add to non-container at /{'/'.join(tokens[:-1])}")
+    return doc
+
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise PatchError("cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f"path not found: /{'/'.join(tokens)}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key, allow_end=False))
+    raise PatchError(f"path not found: /{'/'.join(tokens)}")
+
+
+def apply_json_patch(doc: Any, ops: Any) -> Any:
+    """Apply RFC 6902 operations to a deep copy of doc and return it."""
+    if not isinstance(ops, list):
+        raise PatchError("JSON Patch body must be an array of operations")
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise PatchError("each operation needs 'op' and 'path'")
+        name = op["op"]
+        tokens = _parse_pointer(op["path"])
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"'{name}' needs a 'value'")
+
+        if name == "add":
+            doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif name == "remove":
+            _remove(doc, tokens)
+        elif name == "replace":
+            _resolve(doc, tokens)  # must exist
+            if tokens:
+                _remove(doc, tokens)
+            doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif name in ("move", "copy"):
+            src = _parse_pointer(op.get("from"))
+            if name == "move" and tokens[: len(src)] == src and tokens != src:
+                raise PatchError("cannot move a value into one of its children")
+            value = _remove(doc, src) if name == "move" else copy.deepcopy(_resolve(doc, src))
+            doc = _add(doc, tokens, value)
+        elif name == "test":
+            if _resolve(doc, tokens) != op["value"]:
+                raise PatchError(f"test failed at {op['path']}")
+        else:
+            raise PatchError(f"unsupported op: {name!r}")
+    return doc
+
+
+# ---- Row deltas ----------------------------------------------------------------
+
+def _row_id(row: Any) -> Optional[str]:
+    if isinstance(row, dict):
+        rid = row.get("id")
+        if isinstance(rid, (str, int)) and str(rid) != "":
+            return str(rid)
+    return None
+
+
+def apply_row_delta(payload: Dict[str, Any], delta: Any) -> Dict[str, Any]:
+    """Apply a row-level delta (see module docstring) to a deep copy of payload."""
+    if not isinstance(delta, dict):
+        raise PatchError("delta body must be an object")
+    payload = copy.deepcopy(payload) if isinstance(payload, dict) else {}
+
+    replace = delta.get("replace") or {}
+    if not isinstance(replace, dict):
+        raise PatchError("'replace' must be an object")
+    if "grid" in replace:
+        raise PatchError("grid rows are changed through 'rows', not 'replace'")
+    for key, value in replace.items():
+        payload[key] = copy.deepcopy(value)
+
+    rows_delta = delta.get("rows")
+    if rows_delta is None:
+        return payload
+    if not isinstance(rows_delta, dict):
+        raise PatchError("'rows' must be an object")
+
+    grid = payload.get("grid")
+    if not isinstance(grid, dict):
+        grid = {"v": 1, "rows": []}
+    rows = grid.get("rows")
+    rows = list(rows) if isinstance(rows, list) else []
+
+    deletes = rows_delta.get("delete") or []
+    if not isinstance(deletes, list):
+        raise PatchError("'rows.delete' must be an array of row ids")
+    doomed = {str(d) for d in deletes}
+    if doomed:
+        rows = [r for r in rows if _row_id(r) not in doomed]
+
+    upserts = rows_delta.get("upsert") or []
+    if not isinstance(upserts, list):
+        raise PatchError("'rows.upsert' must be an array of rows")
+    position = {rid: i for i, rid in enumerate(_row_id(r) for r in rows) if rid is not None}
+    for row in upserts:
+        rid = _row_id(row)
+        if rid is None:
+            raise PatchError("every upserted row needs an 'id'")
+        if rid in position:
+            rows[position[rid]] = copy.deepcopy(row)
+        else:
+            position[rid] = len(rows)
+            rows.append(copy.deepcopy(row))
+
+    order = rows_delta.get("order")
+    if order is not None:
+        if not isinstance(order, list):
+            raise PatchError("'rows.order' must be an array of row ids")
+        by_id = {_row_id(r): r for r in rows}
+        wanted = [str(o) for o in order]
+        if None in by_id or len(wanted) != len(rows) or set(wanted) != set(by_id):
+            raise PatchError("'rows.order' must list every row id exactly once")
+        rows = [by_id[rid] for rid in wanted]
+
+    grid["rows"] = rows
+    payload["grid"] = grid
+    return payload
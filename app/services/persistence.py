@@ -1,16 +1,158 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import re
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import sqlalchemy as sa
+from flask import current_app
 from sqlalchemy import text
 
 from app.extensions import db
+from app.services.catalog import refresh_resolved_materials, refresh_resolved_dje
+from app.services.seed_cache import read_seed_workbook, seed_cache_dir
 from flask_login import current_user
 
+"""
+Starter-pack and upload imports (per-org seed rows in materials / dje_items).
+
+Imports are diff-aware: each row's imported fields are hashed (content_hashes) and compared
+with the stored content_hash, so only added / changed / retired rows are written and an
+unchanged sheet writes nothing. The ImportReport carries the counts; dry_run stops after the diff.
+
+Sheets are processed in chunks of IMPORT_CHUNK_ROWS rows (normalize → diff → upsert → commit),
+so background jobs (app/services/import_jobs.py) can report progress and large uploads are
+never one DataFrame.
+
+Stages, summed over chunks and logged as one JSON line (event=starter_pack_import, timings_ms):
+  read       the workbook (Parquet cache unless the file changed, see seed_cache) / upload chunk
+  normalize  seed_key + coercions with vectorized pandas string/numeric ops (no per-row Python)
+  diff       content hashes vs. the org's seed rows
+  stage      Postgres: COPY of the rows to write (CSV) into a temp staging table
+  upsert     one set-based INSERT … SELECT … ON CONFLICT (org_id, seed_key) from staging;
+             other dialects (the SQLite test suite): one executemany of the same upsert
+  retire     is_active = false for unedited seed rows whose key left the sheet
+  resolve    resolved-catalog refresh for the org
+  commit     per written chunk, and once after retire/resolve
+"""
+
+MATERIAL_SEED_COLUMNS = {
+    "Category": "material_type",
+    "Item Description": "item_description",
+    "Labor hrs": "labor_unit",
+    "Cost": "price",
+    "Unit": "unit_quantity_size",
+    "SKU #": "sku",
+    "Manufacturer": "manufacturer",
+    "Vendor": "vendor",
+    "Material Cost Code": "material_cost_code",
+    "Mat Cost-Code Description": "mat_cost_code_desc",
+    "Labor Cost Code": "labor_cost_code",
+    "Labor Cost-Code Description": "labor_cost_code_desc",
+}
+
+# DJE workbook/upload headers → DB columns (the starter pack already uses DB names)
+DJE_SEED_COLUMNS = {
+    "Category": "category",
+    "Subcategory": "subcategory",
+    "Description": "description",
+    "Vendor": "vendor",
+    "Default Unit Cost": "default_unit_cost",
+    "Cost Code": "cost_code",
+}
+
+_MATERIAL_UPSERT_COLUMNS = (
+    "org_id", "material_type", "item_description", "labor_unit", "price", "unit_quantity_size",
+    "sku", "manufacturer", "vendor",
+    "material_cost_code", "mat_cost_code_desc", "labor_cost_code", "labor_cost_code_desc",
+    "is_active", "seed_pack", "seed_version", "seed_key", "seeded_at",
+)
+
+_DJE_UPSERT_COLUMNS = (
+    "org_id", "category", "subcategory", "description", "default_unit_cost", "vendor", "cost_code",
+    "is_active", "seed_pack", "seed_version", "seed_key", "seeded_at",
+)
+
+# Fields whose change makes a seed row "changed" (content_hash input, in this order)
+_MATERIAL_HASH_COLUMNS = (
+    "material_type", "item_description", "labor_unit", "price", "unit_quantity_size",
+    "sku", "manufacturer", "vendor",
+    "material_cost_code", "mat_cost_code_desc", "labor_cost_code", "labor_cost_code_desc", "is_active",
+)
+_DJE_HASH_COLUMNS = (
+    "category", "subcategory", "description", "default_unit_cost", "vendor", "cost_code", "is_active",
+)
+
+# Hash text per typed column: pandas infers int64 or float64 (and CSV uploads start as text), so
+# 5, 5.0 and "5" must hash alike or one fractional price would mark a whole chunk "changed"
+_HASH_TEXT: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "price": lambda s: s.astype(float).map("{:.2f}".format),
+    "labor_unit": lambda s: s.astype(float).map("{:.2f}".format),
+    "default_unit_cost": lambda s: s.astype(float).map("{:.2f}".format),
+    "unit_quantity_size": lambda s: s.astype(int).astype(str),
+    "is_active": lambda s: s.astype(bool).map({True: "1", False: "0"}),
+}
+
+# seed_keys per retire UPDATE (expanding IN list)
+RETIRE_BATCH_SIZE = 1000
+
+# Rows per normalize/diff/upsert/commit chunk (app config IMPORT_CHUNK_ROWS overrides)
+IMPORT_CHUNK_ROWS = 1000
+
+# seed_pack of rows imported from user uploads (never retired by the starter pack)
+UPLOAD_SEED_PACK = "upload"
+
+_FALSE_STRINGS = ("false", "f", "no", "n", "0", "0.0")
+
+# Only rows the org has not edited since they were seeded are refreshed.
+# Seed writes stamp updated_at = seeded_at, so "edited" is exactly updated_at > seeded_at.
+_MATERIAL_ON_CONFLICT = """
+    ON CONFLICT (org_id, seed_key) WHERE (is_seed = true AND org_id IS NOT NULL) DO UPDATE SET
+        material_type        = EXCLUDED.material_type,
+        item_description     = EXCLUDED.item_description,
+        labor_unit           = EXCLUDED.labor_unit,
+        price                = EXCLUDED.price,
+        unit_quantity_size   = EXCLUDED.unit_quantity_size,
+        sku                  = EXCLUDED.sku,
+        manufacturer         = EXCLUDED.manufacturer,
+        vendor               = EXCLUDED.vendor,
+        material_cost_code   = EXCLUDED.material_cost_code,
+        mat_cost_code_desc   = EXCLUDED.mat_cost_code_desc,
+        labor_cost_code      = EXCLUDED.labor_cost_code,
+        labor_cost_code_desc = EXCLUDED.labor_cost_code_desc,
+        is_active            = EXCLUDED.is_active,
+        seed_pack            = EXCLUDED.seed_pack,
+        seed_version         = EXCLUDED.seed_version,
+        seeded_at            = EXCLUDED.seeded_at,
+        content_hash         = EXCLUDED.content_hash,
+        updated_at           = EXCLUDED.updated_at
+    WHERE (materials.seeded_at IS NULL OR materials.updated_at <= materials.seeded_at)
+"""
+
+_DJE_ON_CONFLICT = """
+    ON CONFLICT (org_id, seed_key) WHERE (is_seed = true AND org_id IS NOT NULL) DO UPDATE SET
+        category          = EXCLUDED.category,
+        subcategory       = EXCLUDED.subcategory,
+        description       = EXCLUDED.description,
+        default_unit_cost = EXCLUDED.default_unit_cost,
+        vendor            = EXCLUDED.vendor,
+        cost_code         = EXCLUDED.cost_code,
+        is_active         = EXCLUDED.is_active,
+        seed_pack         = EXCLUDED.seed_pack,
+        seed_version      = EXCLUDED.seed_version,
+        seeded_at         = EXCLUDED.seeded_at,
+        content_hash      = EXCLUDED.content_hash,
+        updated_at        = EXCLUDED.updated_at
+    WHERE (dje_items.seeded_at IS NULL OR dje_items.updated_at <= dje_items.seeded_at)
+"""
+
 
 def _norm(val: object) -> str:
     """Lower/trim and collapse inner whitespace; None -> ''."""
@@ -19,256 +161,467 @@ def _norm(val: object) -> str:
     return s
 
 
+def _norm_series(col: pd.Series) -> pd.Series:
+    """Vectorized _norm over a column (same output per cell, including str() of NaN/numbers)."""
+    s = col.astype(str)
+    s = s.where(~(col.to_numpy(dtype=object) == None), "")  # noqa: E711 (elementwise None test)
+    return s.str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+
+
+def _seed_keys(df: pd.DataFrame, parts: Sequence[str]) -> pd.Series:
+    """Sheet-provided seed_key where it is a non-blank string, else '|'.join of the normalized parts."""
+    empty = pd.Series("", index=df.index, dtype=object)
+    computed = _norm_series(df[parts[0]] if parts[0] in df.columns else empty)
+    for part in parts[1:]:
+        computed = computed + "|" + _norm_series(df[part] if part in df.columns else empty)
+    given = df["seed_key"] if "seed_key" in df.columns else empty
+    keep = given.map(type).eq(str) & given.astype(str).str.strip().ne("")
+    return given.where(keep, computed)
+
+
+def _text(df: pd.DataFrame, col: str, *, blank=None) -> pd.Series:
+    """Stripped text column; missing/NaN/blank cells become `blank`."""
+    if col not in df.columns:
+        return pd.Series(blank, index=df.index, dtype=object)
+    raw = df[col]
+    s = raw.astype(str).str.strip().astype(object)
+    return s.where(raw.notna() & s.ne(""), blank)
+
+
+def _numeric(df: pd.DataFrame, col: str, default) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(default, index=df.index)
+    return pd.to_numeric(df[col], errors="coerce").fillna(default)
+
+
+def _is_active(df: pd.DataFrame) -> pd.Series:
+    """Blank → True; False/0/"false"/"no" (any case, CSV uploads are text) → False."""
+    if "is_active" not in df.columns:
+        return pd.Series(True, index=df.index)
+    raw = df["is_active"]
+    falsy = raw.astype(str).str.strip().str.lower().isin(_FALSE_STRINGS)
+    return ~(raw.notna() & falsy)
+
+
 def _utcnow():
     return datetime.now(timezone.utc)
 
 
-def import_materials_starter_pack(seed_pack: str = "starter", seed_version: int = 1) -> Tuple[int, int]:
-    """
-    Import/refresh the global Materials seed pack from data/Materials_DB_Seed.xlsx.
-    Returns: (inserted_count, updated_count)
-    """
-    df = pd.read_excel("data/Materials_DB_Seed.xlsx")
-    # Return a proper tuple even when the sheet is empty
-    if df is None or df.empty:
-        return 0, 0
-
-    # Map workbook columns -> DB columns
-    df = df.rename(
-        columns={
-            "Category": "material_type",
-            "Item Description": "item_description",
-            "Labor hrs": "labor_unit",
-            "Cost": "price",
-            "Unit": "unit_quantity_size",
-            "SKU #": "sku",
-            "Manufacturer": "manufacturer",
-            "Vendor": "vendor",
-            "Material Cost Code": "material_cost_code",
-            "Mat Cost-Code Description": "mat_cost_code_desc",
-            "Labor Cost Code": "labor_cost_code",
-            "Labor Cost-Code Description": "labor_cost_code_desc",
-        }
+def _lap(timings: Dict[str, float], stage: str, started: float) -> float:
+    """Add the time since started to timings[stage] (ms; stages repeat once per chunk)."""
+    now = time.perf_counter()
+    timings[stage] = round(timings.get(stage, 0) + (now - started) * 1000, 1)
+    return now
+
+
+def _records(frame: pd.DataFrame) -> List[dict]:
+    """Bind parameters for executemany: NaN → None, numpy scalars → Python."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _bulk_upsert(table: str, frame: pd.DataFrame, on_conflict: str, timings: Dict[str, float]) -> None:
+    """Upsert the seed frame into table (columns = frame columns; is_seed/created_at fixed, updated_at = seeded_at)."""
+    cols = ", ".join(frame.columns)
+    started = time.perf_counter()
+    conn = db.session.connection()
+
+    if conn.dialect.name != "postgresql":
+        values = ", ".join(f":{c}" for c in frame.columns)
+        started = _lap(timings, "stage", started)
+        db.session.execute(
+            sa.text(
+                f"INSERT INTO {table} ({cols}, is_seed, created_at, updated_at) "
+                f"VALUES ({values}, true, now(), :seeded_at) {on_conflict}"
+            ),
+            _records(frame),
+        )
+        _lap(timings, "upsert", started)
+        return
+
+    # COPY the frame into a transaction-scoped staging table, then one set-based upsert
+    stage = f"_{table}_seed_stage"
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {stage}")
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA"
     )
+    buf = io.StringIO()
+    frame.to_csv(buf, header=False, index=False, na_rep="\\N")
+    buf.seek(0)
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+    started = _lap(timings, "stage", started)
 
-    # Compute seed_key if not provided or missing
-    if "seed_key" not in df.columns:
-        df["seed_key"] = ""
-    df["seed_key"] = df.apply(
-        lambda r: r.get("seed_key") if isinstance(r.get("seed_key"), str) and r.get("seed_key").strip() else
-        f"{_norm(r.get('material_type'))}|{_norm(r.get('item_description'))}|{_norm(r.get('manufacturer'))}|{_norm(r.get('sku'))}",
-        axis=1,
+    conn.exec_driver_sql(
+        f"INSERT INTO {table} ({cols}, is_seed, created_at, updated_at) "
+        f"SELECT {cols}, true, now(), seeded_at FROM {stage} {on_conflict}"
     )
+    _lap(timings, "upsert", started)
+
+
+def content_hashes(frame: pd.DataFrame, columns: Sequence[str]) -> pd.Series:
+    """sha256 hex per row over columns (NULL → '', typed columns via _HASH_TEXT), U+001F-joined."""
+    joined = None
+    for col in columns:
+        if col in _HASH_TEXT:
+            part = _HASH_TEXT[col](frame[col])
+        else:
+            part = frame[col].astype(object).where(frame[col].notna(), "").astype(str)
+        joined = part if joined is None else joined + "\x1f" + part
+    return pd.Series(
+        [hashlib.sha256(v.encode("utf-8")).hexdigest() for v in joined], index=frame.index, dtype=object
+    )
+
+
+@dataclass(frozen=True)
+class ImportReport:
+    """Outcome of a diff-aware import (counts are seed rows)."""
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    retired: int = 0
+    dry_run: bool = False
+
+    @property
+    def written(self) -> int:
+        return self.added + self.changed + self.retired
+
+    def as_dict(self) -> dict:
+        return {
+            "added": self.added, "changed": self.changed, "unchanged": self.unchanged,
+            "retired": self.retired, "dry_run": self.dry_run,
+        }
+
+
+def _log_import(
+    table: str, org_id: int, source: str, rows: int, report: ImportReport, timings: Dict[str, float]
+) -> None:
+    current_app.logger.info(json.dumps({
+        "event": "starter_pack_import",
+        "table": table,
+        "org_id": org_id,
+        "source": source,
+        "rows": rows,
+        **report.as_dict(),
+        "timings_ms": timings,
+    }))
+
+
+def _materials_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Sheet rows → materials seed columns (workbook or DB headers); validates units and keys."""
+    df = df.rename(columns=MATERIAL_SEED_COLUMNS)
+    frame = pd.DataFrame({
+        "material_type": _text(df, "material_type"),
+        "item_description": _text(df, "item_description"),
+        "labor_unit": _numeric(df, "labor_unit", 0).round(2),
+        "price": _numeric(df, "price", 0).round(2),
+        "unit_quantity_size": _numeric(df, "unit_quantity_size", 1).astype(int),
+        "sku": _text(df, "sku"),
+        "manufacturer": _text(df, "manufacturer"),
+        "vendor": _text(df, "vendor"),
+        "material_cost_code": _text(df, "material_cost_code"),
+        "mat_cost_code_desc": _text(df, "mat_cost_code_desc"),
+        "labor_cost_code": _text(df, "labor_cost_code"),
+        "labor_cost_code_desc": _text(df, "labor_cost_code_desc"),
+        "is_active": _is_active(df),
+        "seed_key": _seed_keys(df, ("material_type", "item_description", "manufacturer", "sku")),
+    })
 
-    # Defaults / coercions
-    df["is_active"] = df.get("is_active", True).fillna(True).astype(bool)
-    df["labor_unit"] = pd.to_numeric(df.get("labor_unit"), errors="coerce").fillna(0).round(2)
-    df["price"] = pd.to_numeric(df.get("price"), errors="coerce").fillna(0).round(2)
-    df["unit_quantity_size"] = pd.to_numeric(df.get("unit_quantity_size"), errors="coerce").fillna(1).astype(int)
     # Guard rails for unit_quantity_size
-    invalid_units = ~df["unit_quantity_size"].isin([1, 100, 1000])
+    invalid_units = ~frame["unit_quantity_size"].isin([1, 100, 1000])
     if invalid_units.any():
-        bad = df[invalid_units].iloc[0]
+        bad = frame[invalid_units].iloc[0]
         raise ValueError(f"Invalid Unit Qty Size for seed_key={bad['seed_key']!r}; must be one of 1, 100, 1000.")
+    if frame["seed_key"].isna().any() or frame["seed_key"].eq("").any():
+        raise ValueError("Missing seed_key after normalization for a materials row.")
+    return frame
 
-    # Require an organization context
-    org_id = getattr(current_user, "org_id", None)
-    if not org_id:
-        raise ValueError("Import requires an organization context (current_user.org_id is missing).")
 
-    existing = {
-        row[0]
-        for row in db.session.execute(
-            text("SELECT seed_key FROM materials WHERE is_seed = true AND org_id = :org_id"),
-            {"org_id": org_id},
-        ).all()
-    }
-
-    now = _utcnow()
-    to_params = []
-    inserted = 0
-    updated = 0
-    for _, r in df.iterrows():
-        sk = r["seed_key"]
-        if not sk:
-            raise ValueError("Missing seed_key after normalization for a materials row.")
-
-        # Count classification before upsert
-        if sk in existing:
-            updated += 1
-        else:
-            inserted += 1
-
-        to_params.append(
-            {
-                "org_id": org_id,  # per‑org seed
-                "material_type": (r.get("material_type") or "").strip() or None,
-                "item_description": (r.get("item_description") or "").strip() or None,
-                "labor_unit": float(r.get("labor_unit") or 0),
-                "price": float(r.get("price") or 0),
-                "unit_quantity_size": int(r.get("unit_quantity_size") or 1),
-                "sku": (r.get("sku") or None),
-                "manufacturer": (r.get("manufacturer") or None),
-                "vendor": (r.get("vendor") or None),
-                "material_cost_code": (r.get("material_cost_code") or None),
-                "mat_cost_code_desc": (r.get("mat_cost_code_desc") or None),
-                "labor_cost_code": (r.get("labor_cost_code") or None),
-                "labor_cost_code_desc": (r.get("labor_cost_code_desc") or None),
-                "is_active": bool(r.get("is_active")),
-                "seed_pack": seed_pack,
-                "seed_version": int(seed_version),
-                "seed_key": sk,
-                "seeded_at": now,
-            }
-        )
+def _dje_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Sheet rows → dje_items seed columns (workbook or title-case headers); validates keys."""
+    df = df.rename(columns=DJE_SEED_COLUMNS)
+    frame = pd.DataFrame({
+        "category": _text(df, "category", blank=""),
+        "subcategory": _text(df, "subcategory"),
+        "description": _text(df, "description", blank=""),
+        "default_unit_cost": _numeric(df, "default_unit_cost", 0).round(2),
+        "vendor": _text(df, "vendor"),
+        "cost_code": _text(df, "cost_code"),
+        "is_active": _is_active(df),
+        "seed_key": _seed_keys(df, ("category", "description", "vendor")),
+    })
+    if frame["seed_key"].isna().any() or frame["seed_key"].eq("").any():
+        raise ValueError("Missing seed_key after normalization for a DJE row.")
+    return frame
 
-    # Idempotent upsert using the unique seed_key index for global seeds
-    # (relies on revision ce28d9cfd6bd which created the partial unique index).  :contentReference[oaicite:2]{index=2}
-    sql = sa.text(
-        """
-        INSERT INTO materials (
-            org_id, material_type, item_description, labor_unit, price, unit_quantity_size,
-            sku, manufacturer, vendor,
-            material_cost_code, mat_cost_code_desc, labor_cost_code, labor_cost_code_desc,
-            is_active, is_seed, seed_pack, seed_version, seed_key, seeded_at, created_at, updated_at
-        )
-        VALUES (
-            :org_id, :material_type, :item_description, :labor_unit, :price, :unit_quantity_size,
-            :sku, :manufacturer, :vendor,
-            :material_cost_code, :mat_cost_code_desc, :labor_cost_code, :labor_cost_code_desc,
-            :is_active, true, :seed_pack, :seed_version, :seed_key, :seeded_at, now(), now()
-        )
-        ON CONFLICT (org_id, seed_key) WHERE (is_seed = true AND org_id IS NOT NULL) DO UPDATE SET
-            material_type        = EXCLUDED.material_type,
-            item_description     = EXCLUDED.item_description,
-            labor_unit           = EXCLUDED.labor_unit,
-            price                = EXCLUDED.price,
-            unit_quantity_size   = EXCLUDED.unit_quantity_size,
-            sku                  = EXCLUDED.sku,
-            manufacturer         = EXCLUDED.manufacturer,
-            vendor               = EXCLUDED.vendor,
-            material_cost_code   = EXCLUDED.material_cost_code,
-            mat_cost_code_desc   = EXCLUDED.mat_cost_code_desc,
-            labor_cost_code      = EXCLUDED.labor_cost_code,
-            labor_cost_code_desc = EXCLUDED.labor_cost_code_desc,
-            is_active            = EXCLUDED.is_active,
-            seed_pack            = EXCLUDED.seed_pack,
-            seed_version         = EXCLUDED.seed_version,
-            seeded_at            = EXCLUDED.seeded_at,
-            updated_at           = now()
-        WHERE (materials.seeded_at IS NULL OR materials.updated_at <= materials.seeded_at)
-        """
+
+@dataclass(frozen=True)
+class SeedTable:
+    """How one catalog table is imported (see SEED_TABLES)."""
+    table: str
+    build_frame: Callable[[pd.DataFrame], pd.DataFrame]
+    columns: Sequence[str]
+    hash_columns: Sequence[str]
+    on_conflict: str
+    refresh: Callable
+
+
+SEED_TABLES = {
+    "materials": SeedTable(
+        "materials", _materials_frame, _MATERIAL_UPSERT_COLUMNS, _MATERIAL_HASH_COLUMNS,
+        _MATERIAL_ON_CONFLICT, refresh_resolved_materials,
+    ),
+    "dje_items": SeedTable(
+        "dje_items", _dje_frame, _DJE_UPSERT_COLUMNS, _DJE_HASH_COLUMNS,
+        _DJE_ON_CONFLICT, refresh_resolved_dje,
+    ),
+}
+
+
+def _diff_chunk(spec: SeedTable, frame: pd.DataFrame, org_id: int) -> Tuple[int, int, pd.DataFrame]:
+    """
+    (added, changed, rows to write) for one chunk against the org's seed rows with the same keys:
+      added      seed_key not seeded yet
+      changed    content_hash differs and the org has not edited the row since it was seeded
+      unchanged  same hash, or edited by the org (the upsert never overwrites those)
+    """
+    existing = pd.DataFrame(
+        db.session.execute(
+            text(
+                f"SELECT seed_key, content_hash AS stored_hash, "
+                f"(seeded_at IS NULL OR updated_at <= seeded_at) AS pristine "
+                f"FROM {spec.table} WHERE is_seed = true AND org_id = :org_id AND seed_key IN :keys"
+            ).bindparams(sa.bindparam("keys", expanding=True)),
+            {"org_id": org_id, "keys": frame["seed_key"].tolist()},
+        ).all(),
+        columns=["seed_key", "stored_hash", "pristine"],
     )
+    merged = frame[["seed_key", "content_hash"]].merge(existing, on="seed_key", how="left", indicator=True)
+    is_new = (merged["_merge"] == "left_only").to_numpy()
+    pristine = merged["pristine"].eq(True).to_numpy()
+    is_changed = ~is_new & pristine & (merged["content_hash"] != merged["stored_hash"]).to_numpy()
+    return int(is_new.sum()), int(is_changed.sum()), frame[is_new | is_changed]
+
+
+def _retire_candidates(table: str, org_id: int, seed_pack: str, seen: set) -> List[str]:
+    """Active, unedited seed rows of seed_pack whose key was not in this import."""
+    keys = db.session.execute(
+        text(
+            f"SELECT seed_key FROM {table} WHERE is_seed = true AND org_id = :org_id "
+            f"AND seed_pack = :seed_pack AND is_active = true "
+            f"AND (seeded_at IS NULL OR updated_at <= seeded_at)"
+        ),
+        {"org_id": org_id, "seed_pack": seed_pack},
+    ).scalars()
+    return sorted(k for k in keys if k not in seen)
+
+
+def import_seed_frames(
+    kind: str,
+    frames: Iterable[pd.DataFrame],
+    *,
+    org_id: int,
+    seed_pack: str,
+    seed_version: int = 1,
+    dry_run: bool = False,
+    retire_missing: bool = True,
+    total_rows: Optional[int] = None,
+    on_chunk: Optional[Callable[[int, Optional[int], ImportReport], None]] = None,
+    source: str = "starter_pack",
+) -> ImportReport:
+    """
+    Diff-aware import of sheet chunks into SEED_TABLES[kind] for org_id, one commit per chunk.
+
+    Each chunk is normalized, diffed and only its added/changed rows upserted, then committed;
+    on_chunk(rows_done, total_rows, report_so_far) runs after every chunk (job progress).
+    retire_missing (full snapshots such as the starter pack) deactivates this seed_pack's rows
+    whose key never appeared. The resolved catalog is refreshed once, after the last chunk.
+    A failure leaves earlier chunks committed; re-running only writes what is still different.
+    """
+    spec = SEED_TABLES[kind]
+    timings: Dict[str, float] = {}
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    seen: set = set()
+    rows = 0
+    seeded_at = _utcnow()
 
     try:
-        if to_params:
-            db.session.execute(sql, to_params)  # vectorized params; safe when non-empty
-        db.session.commit()
-        return int(inserted), int(updated)
+        chunks = iter(frames)
+        while True:
+            started = time.perf_counter()
+            df = next(chunks, None)
+            if df is None:
+                break
+            started = _lap(timings, "read", started)
+            if df.empty:
+                continue
+
+            frame = spec.build_frame(df)
+            # One upsert may touch a key only once; the last sheet row for a key wins
+            frame = frame.drop_duplicates("seed_key", keep="last")
+            frame["org_id"] = org_id  # per‑org seed
+            frame["seed_pack"] = seed_pack
+            frame["seed_version"] = int(seed_version)
+            frame["seeded_at"] = pd.Series(seeded_at, index=frame.index, dtype=object)
+            frame = frame[list(spec.columns)]
+            frame = frame.assign(content_hash=content_hashes(frame, spec.hash_columns))
+            started = _lap(timings, "normalize", started)
+
+            added, changed, writes = _diff_chunk(spec, frame, org_id)
+            counts["added"] += added
+            counts["changed"] += changed
+            counts["unchanged"] += len(frame) - added - changed
+            seen.update(frame["seed_key"])
+            rows += len(df)
+            _lap(timings, "diff", started)
+
+            if not dry_run and len(writes):
+                _bulk_upsert(spec.table, writes, spec.on_conflict, timings)
+                started = time.perf_counter()
+                db.session.commit()
+                _lap(timings, "commit", started)
+            if on_chunk is not None:
+                on_chunk(rows, total_rows, ImportReport(**counts, dry_run=dry_run))
+
+        # An empty sheet retires nothing (never wipe a pack because a file came through blank)
+        started = time.perf_counter()
+        retire_keys = _retire_candidates(spec.table, org_id, seed_pack, seen) if retire_missing and rows else []
+        report = ImportReport(**counts, retired=len(retire_keys), dry_run=dry_run)
+        if not dry_run and report.written:
+            for i in range(0, len(retire_keys), RETIRE_BATCH_SIZE):
+                db.session.execute(
+                    text(
+                        f"UPDATE {spec.table} SET is_active = false, content_hash = NULL, "
+                        f"seeded_at = :now, updated_at = :now "
+                        f"WHERE is_seed = true AND org_id = :org_id AND seed_key IN :keys"
+                    ).bindparams(sa.bindparam("keys", expanding=True)),
+                    {"org_id": org_id, "now": _utcnow(), "keys": retire_keys[i:i + RETIRE_BATCH_SIZE]},
+                )
+            started = _lap(timings, "retire", started)
+            spec.refresh(org_id=org_id)
+            started = _lap(timings, "resolve", started)
+            db.session.commit()
+            _lap(timings, "commit", started)
     except Exception:
         db.session.rollback()
         raise
 
-def import_dje_starter_pack(seed_pack: str = "starter", seed_version: int = 1) -> Tuple[int, int]:
-    """
-    Import/refresh the global DJE seed pack from data/dje_items.xlsx.
-    Returns: (inserted_count, updated_count)
-    """
-    df = pd.read_excel("data/dje_items.xlsx")
-    # Return a proper tuple even when the sheet is empty
-    if df is None or df.empty:
-        return 0, 0
-
-    # Compute seed_key if not provided or missing
-    if "seed_key" not in df.columns:
-        df["seed_key"] = ""
-    df["seed_key"] = df.apply(
-        lambda r: r.get("seed_key") if isinstance(r.get("seed_key"), str) and r.get("seed_key").strip() else
-        f"{_norm(r.get('category'))}|{_norm(r.get('description'))}|{_norm(r.get('vendor'))}",
-        axis=1,
-    )
+    _log_import(spec.table, org_id, source, rows, report, timings)
+    return report
 
-    # Defaults / coercions
-    df["is_active"] = df.get("is_active", True).fillna(True).astype(bool)
-    df["default_unit_cost"] = pd.to_numeric(df.get("default_unit_cost"), errors="coerce").fillna(0).round(2)
 
-    # Require an organization context
-    org_id = getattr(current_user, "org_id", None)
+def _chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _require_org(org_id: Optional[int]) -> int:
+    org_id = org_id or getattr(current_user, "org_id", None)
     if not org_id:
         raise ValueError("Import requires an organization context (current_user.org_id is missing).")
+    return org_id
 
-    existing = {
-        row[0]
-        for row in db.session.execute(
-            text("SELECT seed_key FROM dje_items WHERE is_seed = true AND org_id = :org_id"),
-            {"org_id": org_id},
-        ).all()
-    }
-
-    now = _utcnow()
-    to_params = []
-    inserted = 0
-    updated = 0
-    for _, r in df.iterrows():
-        sk = r["seed_key"]
-        if not sk:
-            raise ValueError("Missing seed_key after normalization for a DJE row.")
-
-        if sk in existing:
-            updated += 1
-        else:
-            inserted += 1
-
-        to_params.append(
-            {
-                "org_id": org_id,
-                "category": (r.get("category") or "").strip(),
-                "subcategory": (r.get("subcategory") or None),
-                "description": (r.get("description") or "").strip(),
-                "default_unit_cost": float(r.get("default_unit_cost") or 0),
-                "vendor": (r.get("vendor") or None),
-                "cost_code": (r.get("cost_code") or None),
-                "is_active": bool(r.get("is_active")),
-                "seed_pack": seed_pack,
-                "seed_version": int(seed_version),
-                "seed_key": sk,
-                "seeded_at": now,
-            }
-        )
 
-    # Idempotent upsert using the unique seed_key index for global seeds
-    # (relies on revision ce28d9cfd6bd).  :contentReference[oaicite:3]{index=3}
-    sql = sa.text(
-        """
-        INSERT INTO dje_items (
-            org_id, category, subcategory, description, default_unit_cost, vendor, cost_code,
-            is_active, is_seed, seed_pack, seed_version, seed_key, seeded_at, created_at, updated_at
-        )
-        VALUES (
-            :org_id, :category, :subcategory, :description, :default_unit_cost, :vendor, :cost_code,
-            :is_active, true, :seed_pack, :seed_version, :seed_key, :seeded_at, now(), now()
-        )
-        ON CONFLICT (org_id, seed_key) WHERE (is_seed = true AND org_id IS NOT NULL) DO UPDATE SET
-            category          = EXCLUDED.category,
-            subcategory       = EXCLUDED.subcategory,
-            description       = EXCLUDED.description,
-            default_unit_cost = EXCLUDED.default_unit_cost,
-            vendor            = EXCLUDED.vendor,
-            cost_code         = EXCLUDED.cost_code,
-            is_active         = EXCLUDED.is_active,
-            seed_pack         = EXCLUDED.seed_pack,
-            seed_version      = EXCLUDED.seed_version,
-            seeded_at         = EXCLUDED.seeded_at,
-            updated_at        = now()
-         WHERE (dje_items.seeded_at IS NULL OR dje_items.updated_at <= dje_items.seeded_at)
-        """
+def _import_starter_pack(kind: str, path: str, seed_pack: str, seed_version: int, dry_run: bool,
+                         org_id: Optional[int], on_chunk) -> ImportReport:
+    df = read_seed_workbook(path, cache_dir=seed_cache_dir(current_app))
+    # Return an empty report even when the sheet is empty
+    if df is None or df.empty:
+        return ImportReport(dry_run=dry_run)
+    chunk_rows = int(current_app.config.get("IMPORT_CHUNK_ROWS", IMPORT_CHUNK_ROWS))
+    return import_seed_frames(
+        kind, _chunks(df, chunk_rows),
+        org_id=_require_org(org_id), seed_pack=seed_pack, seed_version=seed_version,
+        dry_run=dry_run, retire_missing=True, total_rows=len(df), on_chunk=on_chunk,
     )
 
-    try:
-        if to_params:
-            db.session.execute(sql, to_params)
-        db.session.commit()
-        return int(inserted), int(updated)
-    except Exception:
-        db.session.rollback()
-        raise
+
+def import_materials_starter_pack(
+    seed_pack: str = "starter", seed_version: int = 1, *, dry_run: bool = False,
+    org_id: Optional[int] = None, on_chunk=None,
+) -> ImportReport:
+    """
+    Import/refresh the Materials seed pack from data/Materials_DB_Seed.xlsx into the org
+    (org_id, else current_user's). Only added / changed / retired rows are written;
+    dry_run=True computes the report and writes nothing.
+    """
+    return _import_starter_pack(
+        "materials", "data/Materials_DB_Seed.xlsx", seed_pack, seed_version, dry_run, org_id, on_chunk
+    )
+
+def import_dje_starter_pack(
+    seed_pack: str = "starter", seed_version: int = 1, *, dry_run: bool = False,
+    org_id: Optional[int] = None, on_chunk=None,
+) -> ImportReport:
+    """
+    Import/refresh the DJE seed pack from data/dje_items.xlsx into the org (org_id, else
+    current_user's). Only added / changed / retired rows are written; dry_run=True computes
+    the report and writes nothing.
+    """
+    return _import_starter_pack(
+        "dje_items", "data/dje_items.xlsx", seed_pack, seed_version, dry_run, org_id, on_chunk
+    )
+
+
+def _xlsx_chunks(data: bytes, chunk_rows: int) -> Tuple[Optional[int], Iterator[pd.DataFrame]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    total = ws.max_row - 1 if ws.max_row else None
+
+    def frames():
+        try:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(h).strip() if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+            batch = []
+            for row in rows:
+                if any(v is not None and str(v).strip() != "" for v in row):
+                    batch.append(row[:len(columns)])
+                if len(batch) >= chunk_rows:
+                    yield _sheet_frame(batch, columns)
+                    batch = []
+            if batch:
+                yield _sheet_frame(batch, columns)
+        finally:
+            wb.close()
+
+    return total, frames()
+
+
+def _sheet_frame(rows: list, columns: List[str]) -> pd.DataFrame:
+    # Match pd.read_excel: blank cells are NaN (seed_keys render NaN as "nan", None as "")
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    return df.astype(object).where(df.notna(), np.nan).infer_objects()
+
+
+def upload_chunks(data: bytes, filename: str, chunk_rows: int) -> Tuple[Optional[int], Iterator[pd.DataFrame]]:
+    """
+    (row count if known, iterator of DataFrames of ≤ chunk_rows) for an uploaded .csv / .xlsx.
+    CSV goes through pd.read_csv(chunksize=…); XLSX through openpyxl's read-only row stream,
+    so neither is materialized as one frame.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return None, pd.read_csv(io.BytesIO(data), chunksize=chunk_rows, dtype=str, skipinitialspace=True)
+    if name.endswith(".xlsx"):
+        return _xlsx_chunks(data, chunk_rows)
+    raise ValueError("Unsupported file type; upload a .csv or .xlsx file.")
+
+
+def import_upload(
+    kind: str, data: bytes, filename: str, *, org_id: int, dry_run: bool = False, on_chunk=None,
+) -> ImportReport:
+    """
+    Import an uploaded sheet as the org's "upload" seed rows (same headers as the starter
+    packs). Uploads are partial by nature, so nothing is retired.
+    """
+    chunk_rows = int(current_app.config.get("IMPORT_CHUNK_ROWS", IMPORT_CHUNK_ROWS))
+    total, frames = upload_chunks(data, filename, chunk_rows)
+    return import_seed_frames(
+        kind, frames,
+        org_id=_require_org(org_id), seed_pack=UPLOAD_SEED_PACK, dry_run=dry_run,
+        retire_missing=False, total_rows=total, on_chunk=on_chunk, source="upload",
+    )
@@ -1,8 +1,8 @@
 from functools import wraps
 from flask import abort, session, request
 from flask_login import current_user
-from app.extensions import db
-from app.models.org_membership import OrgMembership, ROLE_OWNER, ROLE_ADMIN
+from app.models.org_membership import ROLE_OWNER, ROLE_ADMIN
+from app.security.org_context import get_org_context
 
 def _current_org_id():
     oid = session.get("current_org_id")
@@ -18,8 +18,7 @@ def require_member(fn):
         org_id = _current_org_id()
         if not org_id:
             return _abort_smart(401)
-        m = db.session.query(OrgMembership).filter_by(org_id=org_id, user_id=current_user.id).one_or_none()
-        if not m:
+        if not get_org_context(org_id).is_member:
             return _abort_smart(404)  # anti-enumeration
         return fn(*args, **kwargs)
     return _wrap
@@ -33,10 +32,10 @@ def role_required(*roles):
             org_id = _current_org_id()
             if not org_id:
                 return _abort_smart(401)
-            m = db.session.query(OrgMembership).filter_by(org_id=org_id, user_id=current_user.id).one_or_none()
-            if not m:
+            ctx = get_org_context(org_id)
+            if not ctx.is_member:
                 return _abort_smart(404)
-            if m.role not in roles:
+            if ctx.role not in roles:
                 return _abort_smart(403)
             return fn(*args, **kwargs)
         return _wrap
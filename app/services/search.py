@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+from sqlalchemy import case, literal, or_
+from sqlalchemy.sql import func
+
+from app.extensions import db
+
+"""
+Free-text search over a few text columns, ranked by relevance.
+
+Postgres: pg_trgm. Every searched column has a GIN (lower(col) gin_trgm_ops) index
+(migration 1c7f0e4b8d62), which serves both predicates used here:
+  - lower(col) LIKE '%q%'  (substring match; the btree pattern indexes only help prefixes)
+  - lower(col) % q         (trigram similarity ≥ pg_trgm.similarity_threshold → typo tolerance)
+Rank = greatest(similarity(lower(col), q)) with substring hits boosted above fuzzy-only ones.
+
+Other dialects (the SQLite test suite): substring LIKE only, ranked exact > prefix > substring.
+
+Callers filter with the returned clause, ORDER BY the rank DESC and cap the result size.
+"""
+
+SEARCH_SUBSTRING_BOOST = 1.0
+
+
+def like_escape(q: str) -> str:
+    """q with LIKE wildcards escaped (use with escape="\\")."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_contains(column, q: str):
+    """Case-insensitive literal substring match of q in column (no wildcards, no fuzzy match)."""
+    return func.lower(column).like(f"%{like_escape(q.lower())}%", escape="\\")
+
+
+def _uses_trigram() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+
+def text_search(columns: Sequence, q: str) -> Tuple:
+    """(WHERE clause, rank expression) for q across columns (case-insensitive)."""
+    q = (q or "").strip().lower()
+    lowered = [func.lower(c) for c in columns]
+    esc = like_escape(q)
+    contains = [col.like(f"%{esc}%", escape="\\") for col in lowered]
+
+    if _uses_trigram():
+        fuzzy = [col.op("%")(q) for col in lowered]
+        clause = or_(*contains, *fuzzy)
+        rank = func.greatest(*(
+            func.coalesce(func.similarity(col, q), 0)
+            + case((hit, literal(SEARCH_SUBSTRING_BOOST)), else_=literal(0.0))
+            for col, hit in zip(lowered, contains)
+        ))
+        return clause, rank
+
+    clause = or_(*contains)
+    rank = sum(
+        (
+            case(
+                (col == q, 3),
+                (col.like(f"{esc}%", escape="\\"), 2),
+                (hit, 1),
+                else_=0,
+            )
+            for col, hit in zip(lowered, contains)
+        ),
+        literal(0),
+    )
+    return clause, rank
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+"""
+Columnar cache of the seed workbooks (data/*.xlsx).
+
+Parsing XLSX through openpyxl is the slowest step of a starter-pack import, and the
+workbooks only change with a deploy. read_seed_workbook() keys a Parquet copy of the parsed
+sheet by the sha256 of the workbook bytes:
+  hit   <cache_dir>/<stem>-<sha256[:16]>.parquet → pd.read_parquet (milliseconds)
+  miss  pd.read_excel, write the Parquet file (tmp + os.replace), prune older copies
+
+Frames are returned in a "columnar-safe" form on both paths, so a hit and a miss give
+identical data (and therefore identical seed_keys / content hashes):
+  - headers are str
+  - object columns mixing Python types (e.g. SKU # with ints and strings) hold str(value)
+    per non-null cell; NaN stays NaN
+The importers' normalization (str/strip/lower, to_numeric) reads those cells the same way.
+
+Without pyarrow, or with cache_dir=None, the workbook is simply parsed.
+"""
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _file_sha256(path: Path, salt: str = "") -> str:
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _columnar_safe(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns=str)
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        values = df[col]
+        present = values.notna()
+        if values[present].map(type).nunique() > 1:
+            df[col] = values.astype(str).where(present, np.nan)
+    return df
+
+
+def _restore_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    # Arrow hands string/bool nulls back as None; read_excel gives NaN
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_seed_workbook(
+    path: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = None,
+    sheet_name: Optional[str] = None,
+) -> pd.DataFrame:
+    """The parsed workbook (first sheet unless sheet_name), served from the Parquet cache when fresh."""
+    path = Path(path)
+    read_kwargs = {"sheet_name": sheet_name} if sheet_name else {}
+    if cache_dir is None or not _parquet_available():
+        return _columnar_safe(pd.read_excel(path, **read_kwargs))
+
+    cache_dir = Path(cache_dir)
+    digest = _file_sha256(path, salt=sheet_name or "")
+    cached = cache_dir / f"{path.stem}-{digest[:16]}.parquet"
+    if cached.exists():
+        try:
+            return _restore_nulls(pd.read_parquet(cached))
+        except Exception as e:  # corrupt/partial file → rebuild below
+            logger.warning("seed_cache_read_failed path=%s error=%s", cached, e)
+
+    df = _columnar_safe(pd.read_excel(path, **read_kwargs))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cached)
+        for stale in cache_dir.glob(f"{path.stem}-*.parquet"):
+            if stale != cached:
+                stale.unlink(missing_ok=True)
+        logger.info("seed_cache_built path=%s rows=%s", cached, len(df))
+    except Exception as e:  # cache is best-effort; the parsed frame is still good
+        logger.warning("seed_cache_write_failed path=%s error=%s", cached, e)
+    return df
+
+
+def seed_cache_dir(app) -> Optional[str]:
+    """SEED_CACHE_DIR (default <instance>/seed_cache); None when SEED_CACHE_ENABLED is off."""
+    if not app.config.get("SEED_CACHE_ENABLED", False):
+        return None
+    return app.config.get("SEED_CACHE_DIR") or os.path.join(app.instance_path, "seed_cache")
@@ -257,40 +257,73 @@
 
     const catPicker = document.getElementById('compMatCategory');
     const descPicker = document.getElementById('compMaterial');
+    const searchEl = document.getElementById('compMatSearch');
 
-    // Cache all material options with their type/category
-    const allMatOpts = Array
-      .from(document.querySelectorAll('#compMaterial option[data-type]'))
-      .map(o => ({ id: o.value, label: o.textContent, type: o.dataset.type }));
+    // Material categories are fetched once, the first time the modal opens
+    let typesLoaded = false;
+    async function loadMaterialTypes() {
+      if (typesLoaded || !catPicker) return;
+      try {
+        const res = await fetch('/admin/assemblies/material-types.json', { credentials: 'same-origin' });
+        const data = await res.json();
+        if (!res.ok) throw new Error();
+        for (const t of (data.types || [])) catPicker.add(new Option(t, t));
+        typesLoaded = true;
+      } catch {
+        // non-fatal: typing in the search box still finds materials
+      }
+    }
+
+    function resetDescPicker() {
+      if (!descPicker) return;
+      descPicker.innerHTML = '';
+      descPicker.add(new Option('Select…', ''));
+    }
 
-    // Ensure Description is empty until a category is picked
+    // Ensure Description is empty until a category is picked or a search is typed
     modalEl?.addEventListener('show.bs.modal', () => {
       if (catPicker) catPicker.value = '';
-      if (descPicker) {
-        descPicker.innerHTML = '';
-        descPicker.add(new Option('Select…', ''));
-      }
+      if (searchEl) searchEl.value = '';
+      resetDescPicker();
+      loadMaterialTypes();
     });
 
-    function rebuildDescForCategory(cat) {
+    // Typeahead: server-side search (limit 50) by text and/or category; stale responses dropped
+    let searchSeq = 0;
+    async function searchMaterials() {
       if (!descPicker) return;
-      const sel = (cat || '').toLowerCase();
-      descPicker.innerHTML = '';
-      descPicker.add(new Option('Select…', ''));
-      if (!sel) {
-        // No category selected → keep only the placeholder
-        return;
-      }
-      for (const o of allMatOpts) {
-        if ((o.type || '').toLowerCase() === sel) {
-          descPicker.add(new Option(o.label, o.id));
+      const q = (searchEl?.value || '').trim();
+      const type = catPicker?.value || '';
+      const seq = ++searchSeq;
+      if (!q && !type) { resetDescPicker(); return; }
+      const params = new URLSearchParams();
+      if (q) params.set('q', q);
+      if (type) params.set('type', type);
+      try {
+        const res = await fetch('/admin/assemblies/materials.json?' + params.toString(), { credentials: 'same-origin' });
+        const data = await res.json();
+        if (seq !== searchSeq) return;
+        resetDescPicker();
+        for (const m of (data.rows || [])) {
+          const label = m.item_description || '(no description)';
+          const opt = new Option(type ? label : `${label} — ${m.material_type || ''}`, m.id);
+          opt.dataset.type = m.material_type || '';
+          descPicker.add(opt);
         }
+      } catch {
+        if (seq === searchSeq) resetDescPicker();
       }
     }
 
+    let searchTimer;
+    searchEl?.addEventListener('input', () => {
+      clearTimeout(searchTimer);
+      searchTimer = setTimeout(searchMaterials, 200);
+    });
+
     // wire category change
     catPicker?.addEventListener('change', () => {
-      rebuildDescForCategory(catPicker.value);
+      searchMaterials();
       descPicker?.focus();
     });
 
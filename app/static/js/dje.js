@@ -5,6 +5,7 @@
 
 (() => {
   const API = {
+    bundle: "/estimator/api/catalog.json",
     cats: "/estimator/api/dje-categories",
     subs: (category) =>
       `/estimator/api/dje-subcategories?category=${encodeURIComponent(
@@ -42,13 +43,50 @@
     if (!r.ok) throw new Error(`HTTP ${r.status} ${url}`);
     return r.json();
   }
+  // One request seeds every cache below; on failure the per-level endpoints are used
+  let BUNDLE_PROMISE = null;
+  function loadBundle() {
+    if (!BUNDLE_PROMISE) {
+      BUNDLE_PROMISE = getJSON(API.bundle)
+        .then((data) => {
+          const dje = data && data.dje;
+          if (!dje || !Array.isArray(dje.tree)) return false;
+          const fields = dje.fields || ["id", "description", "cost"];
+          const cats = [];
+          for (const node of dje.tree) {
+            const subs = [];
+            for (const sub of node.subcategories || []) {
+              const items = (sub.items || []).map((r) => {
+                const o = {};
+                fields.forEach((f, i) => { o[f] = r[i]; });
+                return o;
+              });
+              if (sub.subcategory) subs.push(sub.subcategory);
+              DESC_CACHE.set(`${node.category}::${sub.subcategory}`, items);
+            }
+            cats.push(node.category);
+            SUB_CACHE.set(node.category, subs);
+          }
+          CATS = cats;
+          return true;
+        })
+        .catch((err) => {
+          console.error("[DJE] catalog bundle failed; using per-level fetches:", err);
+          return false;
+        });
+    }
+    return BUNDLE_PROMISE;
+  }
+
   async function loadCats() {
+    await loadBundle();
     if (CATS.length) return CATS;
     CATS = await getJSON(API.cats);
     return CATS;
   }
   async function loadSubs(category) {
     if (!category) return [];
+    if (await loadBundle() && !SUB_CACHE.has(category)) return [];
     if (SUB_CACHE.has(category)) return SUB_CACHE.get(category);
     const list = await getJSON(API.subs(category)); // returns ["EMT", ...]
     SUB_CACHE.set(category, list);
@@ -57,6 +95,7 @@
   async function loadDescs(category, subcategory) {
     const key = `${category}::${subcategory}`;
     if (!category || !subcategory) return [];
+    if (await loadBundle() && !DESC_CACHE.has(key)) return [];
     if (DESC_CACHE.has(key)) return DESC_CACHE.get(key);
     const list = await getJSON(API.descs(category, subcategory)); // returns [{id, description, cost}]
     DESC_CACHE.set(key, list);
@@ -7,6 +7,11 @@
   const statusSelect = $('estFilterStatus');
   const updatedFrom = $('estFilterFrom');
   const clearBtn = $('estFilterClear');
+  const loadMoreBtn = $('estimatesLoadMore');
+  const countEl = $('estimatesCount');
+
+  // Keyset paging state: next_cursor from the last page; seq drops responses for stale filters
+  const page = { cursor: null, loaded: 0, total: null, estimate: false, loading: false, seq: 0 };
 
   function badge(status) {
     const s = (status || '').toLowerCase();
@@ -69,8 +74,7 @@
     </tr>`;
   }
 
-  async function loadEstimates() {
-    if (!tbody) return;
+  function filterParams() {
     const params = new URLSearchParams();
     const q = (qInput && qInput.value.trim()) || '';
     const custId = (custSelect && custSelect.value) || '';
@@ -81,14 +85,60 @@
     if (custId) params.set('customer_id', custId);
     if (st) params.set('status', st);
     if (from) params.set('updated_from', from);
+    return params;
+  }
 
+  function paintFooter() {
+    if (loadMoreBtn) loadMoreBtn.classList.toggle('d-none', !page.cursor);
+    if (!countEl) return;
+    if (page.total == null) { countEl.textContent = ''; return; }
+    const total = (page.estimate ? '~' : '') + page.total.toLocaleString();
+    countEl.textContent = `Showing ${page.loaded.toLocaleString()} of ${total}`;
+  }
+
+  // First page (reset) or the next page after page.cursor
+  async function loadEstimates(reset = true) {
+    if (!tbody) return;
+    if (!reset && (page.loading || !page.cursor)) return;
+    const seq = reset ? ++page.seq : page.seq;
+    const params = filterParams();
+    if (reset) params.set('with_total', '1');
+    else params.set('cursor', page.cursor);
+
+    page.loading = true;
     try {
       const res = await fetch('/estimates/list.json?' + params.toString());
       const data = await res.json();
+      if (seq !== page.seq) return;   // filters changed while this page was in flight
       const rows = (data && data.rows) || [];
-      tbody.innerHTML = rows.map(rowHtml).join('') || '<tr><td colspan="5" class="text-center text-muted py-4">No estimates yet.</td></tr>';
+      if (reset) {
+        page.loaded = 0;
+        page.total = (data && typeof data.total === 'number') ? data.total : null;
+        page.estimate = !!(data && data.total_is_estimate);
+        tbody.innerHTML = rows.length ? '' : '<tr><td colspan="5" class="text-center text-muted py-4">No estimates yet.</td></tr>';
+      }
+      tbody.insertAdjacentHTML('beforeend', rows.map(rowHtml).join(''));
+      page.loaded += rows.length;
+      page.cursor = (data && data.next_cursor) || null;
     } catch (e) {
-      tbody.innerHTML = '<tr><td colspan="5" class="text-center text-danger py-4">Failed to load estimates.</td></tr>';
+      if (seq !== page.seq) return;
+      if (reset) tbody.innerHTML = '<tr><td colspan="5" class="text-center text-danger py-4">Failed to load estimates.</td></tr>';
+      page.cursor = null;
+    } finally {
+      if (seq === page.seq) page.loading = false;
+      paintFooter();
+    }
+  }
+
+  function wirePaging() {
+    if (!loadMoreBtn) return;
+    loadMoreBtn.addEventListener('click', () => loadEstimates(false));
+    // Infinite scroll: fetch the next page as the footer scrolls into view
+    if ('IntersectionObserver' in window) {
+      const io = new IntersectionObserver((entries) => {
+        if (entries.some(en => en.isIntersecting)) loadEstimates(false);
+      }, { rootMargin: '200px' });
+      io.observe(loadMoreBtn);
     }
   }
 
@@ -128,10 +178,11 @@
   }
 
   function wireFilters() {
-    if (qInput) qInput.addEventListener('input', debounce(loadEstimates, 250));
-    if (custSelect) custSelect.addEventListener('change', loadEstimates);
-    if (statusSelect) statusSelect.addEventListener('change', loadEstimates);
-    if (updatedFrom) updatedFrom.addEventListener('change', loadEstimates);
+    const reload = () => loadEstimates();
+    if (qInput) qInput.addEventListener('input', debounce(reload, 250));
+    if (custSelect) custSelect.addEventListener('change', reload);
+    if (statusSelect) statusSelect.addEventListener('change', reload);
+    if (updatedFrom) updatedFrom.addEventListener('change', reload);
     if (clearBtn) clearBtn.addEventListener('click', () => {
       if (qInput) qInput.value = '';
       if (custSelect) custSelect.value = '';
@@ -148,6 +199,7 @@
   document.addEventListener('DOMContentLoaded', async () => {
     await loadCustomers();
     wireFilters();
+    wirePaging();
     $('estimatesTable')?.addEventListener('click', onTableClick);
     loadEstimates();
   });
@@ -15,6 +15,10 @@ function scheduleSaveGrid() {
   eeSaveTimer = setTimeout(saveGridToStorage, 200); // debounce to reduce churn
 }
 
+function newGridRowId() {
+  return 'r' + Date.now().toString(36) + Math.random().toString(36).slice(2, 8);
+}
+
 function saveGridToStorage() {
   try {
     const table = document.querySelector('table');
@@ -36,7 +40,10 @@ function saveGridToStorage() {
       const qty = tr.cells[3].querySelector('input.cell-qty')?.value ?? '';
       const ladj = tr.cells[4].querySelector('select.cell-labor-adj')?.value ?? '1';
 
-      rows.push({ notes, type, descValue, descText, qty, ladj });
+      // Stable row id → server-side saves can PATCH just the rows that changed
+      const id = tr.dataset.rowId || (tr.dataset.rowId = newGridRowId());
+
+      rows.push({ id, notes, type, descValue, descText, qty, ladj });
     }
 
     localStorage.setItem(GRID_KEY, JSON.stringify({ v: 1, rows }));
@@ -45,6 +52,54 @@ function saveGridToStorage() {
   }
 }
 
+// ===== Catalog bundle — one request hydrates every dropdown =====
+// Resolves to { types, byType: Map(type → items[]), assemblies: items[], rollups: Map(id → rollup) }
+// or null (then the per-dropdown endpoints below are used as before).
+let __CATALOG_PROMISE = null;
+
+function loadCatalogBundle() {
+  if (!__CATALOG_PROMISE) {
+    __CATALOG_PROMISE = fetch('/estimator/api/catalog.json', { headers: { 'Accept': 'application/json' } })
+      .then(res => res.ok ? res.json() : Promise.reject(new Error(`HTTP ${res.status}`)))
+      .then(indexCatalogBundle)
+      .catch(err => {
+        console.error('[Catalog] bundle load failed; falling back to per-type fetches:', err);
+        return null;
+      });
+  }
+  return __CATALOG_PROMISE;
+}
+
+function rowsToObjects(fields, rows) {
+  return (rows || []).map(r => {
+    const o = {};
+    fields.forEach((f, i) => { o[f] = r[i]; });
+    return o;
+  });
+}
+
+function indexCatalogBundle(data) {
+  if (!data || !data.materials || !data.assemblies) return null;
+  const byType = new Map();
+  for (const m of rowsToObjects(data.materials.fields, data.materials.rows)) {
+    if (!m.material_type) continue;
+    if (!byType.has(m.material_type)) byType.set(m.material_type, []);
+    byType.get(m.material_type).push(m);
+  }
+  const types = Array.from(byType.keys()).sort();
+  const assemblies = rowsToObjects(data.assemblies.fields, data.assemblies.rows);
+  const rollups = new Map();
+  for (const a of assemblies) {
+    rollups.set(String(a.id), {
+      assembly_id: a.id,
+      material_cost_total: a.material_cost_total,
+      labor_hours_total: a.labor_hours_total,
+      component_count: a.component_count
+    });
+  }
+  return { types, byType, assemblies, rollups };
+}
+
 // ===== Row persistence — RESTORE (Bite 2) =====
 const __DESC_CACHE = new Map(); // type → Promise<items[]>
 
@@ -85,6 +140,35 @@ function ensureRowCount(minCount) {
   }
 }
 
+// Batch rollups for every Assemblies row in one request (id → rollup)
+async function fetchAssemblyRollups(ids) {
+  const unique = Array.from(new Set(ids.filter(Boolean).map(String)));
+  const byId = new Map();
+  if (!unique.length) return byId;
+  const catalog = await loadCatalogBundle();
+  if (catalog) {
+    for (const id of unique) {
+      if (catalog.rollups.has(id)) byId.set(id, catalog.rollups.get(id));
+    }
+    if (byId.size === unique.length) return byId;
+  }
+  try {
+    const res = await fetch('/estimator/api/assemblies/rollups', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'application/json' },
+      body: JSON.stringify({ ids: unique.map(Number) })
+    });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    const items = await res.json();
+    if (Array.isArray(items)) {
+      for (const it of items) byId.set(String(it.assembly_id), it);
+    }
+  } catch (e) {
+    console.error('[ASM] batch rollup fetch failed:', e);
+  }
+  return byId;
+}
+
 async function hydrateGridFromStorage() {
   const saved = loadGridFromStorage();
   if (!saved || !saved.length) return;
@@ -94,6 +178,11 @@ async function hydrateGridFromStorage() {
     // Make sure enough rows exist
     ensureRowCount(saved.length);
 
+    // One round trip for all assembly rollups instead of one per row
+    const asmRollups = await fetchAssemblyRollups(
+      saved.filter(r => r && r.type === 'Assemblies').map(r => r.descValue)
+    );
+
     const table = document.querySelector('table');
     if (!table) return;
     const tbody = table.tBodies[0] || table;
@@ -102,6 +191,7 @@ async function hydrateGridFromStorage() {
       const row = saved[i];
       const tr = tbody.rows[i];
       if (!tr || !tr.cells || tr.cells.length < 10) continue;
+      if (row.id) tr.dataset.rowId = row.id;
 
       // Cols: 0 Notes | 1 Type | 2 Desc | 3 Qty | 4 Ladj | 5 Cost | 6 Ext | 7 LUnit | 8 LHrs | 9 Unit
       const notesInput = tr.cells[0].querySelector('input.cell-notes');
@@ -146,9 +236,13 @@ async function hydrateGridFromStorage() {
 
           if (currentType === 'Assemblies') {
             try {
-              const res = await fetch(`/estimator/api/assemblies/${encodeURIComponent(descSel.value)}/rollup`, { headers: { 'Accept': 'application/json' } });
-              if (!res.ok) throw new Error(`HTTP ${res.status}`);
-              const info = await res.json();
+              let info = asmRollups.get(String(descSel.value));
+              if (!info) {
+                // Not in the batch (e.g. matched by text fallback) — fetch this one directly
+                const res = await fetch(`/estimator/api/assemblies/${encodeURIComponent(descSel.value)}/rollup`, { headers: { 'Accept': 'application/json' } });
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                info = await res.json();
+              }
               if (tdCostEa) { tdCostEa.textContent = formatCurrency(info?.material_cost_total || 0); tdCostEa.style.textAlign = 'right'; }
               if (tdLaborUnit) { tdLaborUnit.textContent = String(info?.labor_hours_total || 0); }
               if (tdUnit) { tdUnit.textContent = '1'; }
@@ -218,8 +312,10 @@ async function fetchEstimateSnapshot(eid) {
 document.addEventListener("DOMContentLoaded", () => {
   paintHeaderFromStorage();   // ← show last known totals immediately
   if (EID) { fetchEstimateSnapshot(EID).catch(() => {}); }
-  fetch("/estimator/api/material-types")
-    .then(response => response.json())
+  loadCatalogBundle()
+    .then(catalog => catalog
+      ? catalog.types
+      : fetch("/estimator/api/material-types").then(response => response.json()))
     .then(async data => {
       // S1-05b: cache for populating Material Type on new rows
       let types = Array.isArray(data) ? data.slice() : [];
@@ -405,6 +501,14 @@ function renderLoadingDescSelect(descTd) {
 // --- Bite 2 helper: fetch descriptions for a given Material Type from the API ---
 // Returns a Promise resolving to an array (possibly empty). Keeps errors handled upstream.
 async function fetchDescriptionsByType(selectedType) {
+  const catalog = await loadCatalogBundle();
+  if (catalog) {
+    if (selectedType === 'Assemblies') {
+      return catalog.assemblies.map(a => ({ id: a.id, item_description: a.name || '' }));
+    }
+    return catalog.byType.get(selectedType) || [];
+  }
+
   // Assemblies: list assemblies as description options (id + name)
   if (selectedType === 'Assemblies') {
     const res = await fetch('/estimator/api/assemblies', { headers: { 'Accept': 'application/json' } });
@@ -979,8 +1083,13 @@ function handleDescChange(e) {
   if (currentType === 'Assemblies') {
     if (!tdCostEa || !tdLaborUnit || !tdUnit) return; // structure guard
     tdUnit.textContent = '1';
-    fetch(`/estimator/api/assemblies/${encodeURIComponent(el.value)}/rollup`, { headers: { 'Accept': 'application/json' } })
-      .then(res => res.ok ? res.json() : Promise.reject(res.status))
+    loadCatalogBundle()
+      .then(catalog => {
+        const cached = catalog && catalog.rollups.get(String(el.value));
+        if (cached) return cached;
+        return fetch(`/estimator/api/assemblies/${encodeURIComponent(el.value)}/rollup`, { headers: { 'Accept': 'application/json' } })
+          .then(res => res.ok ? res.json() : Promise.reject(res.status));
+      })
       .then(info => {
         const priceEach = Number(info?.material_cost_total || 0);
         const laborEach = Number(info?.labor_hours_total || 0);
@@ -0,0 +1,64 @@
+// Polls an import job (#importJobStatus[data-status-url]) until it finishes, then refreshes the list.
+(() => {
+  const el = document.getElementById('importJobStatus');
+  const url = el?.dataset.statusUrl;
+  if (!url) return;
+
+  const POLL_MS = 1000;
+
+  const setStatus = (text, kind) => {
+    el.textContent = text;
+    el.className = `alert alert-${kind} py-2`;
+  };
+
+  const progressText = (job) => {
+    const done = job.rows_done || 0;
+    if (job.status === 'queued') return 'Import queued…';
+    if (job.rows_total) {
+      const pct = Math.min(100, Math.round((done / job.rows_total) * 100));
+      return `Importing… ${done.toLocaleString()} of ${job.rows_total.toLocaleString()} rows (${pct}%)`;
+    }
+    return `Importing… ${done.toLocaleString()} rows`;
+  };
+
+  const finish = (job) => {
+    if (job.status === 'failed') {
+      setStatus(`Import failed — ${job.error || 'please try again.'}`, 'danger');
+      return;
+    }
+    setStatus(job.message || 'Import complete.', 'success');
+    // Drop ?import_job= so a reload does not poll again
+    const next = new URL(window.location.href);
+    next.searchParams.delete('import_job');
+    window.history.replaceState(null, '', next.toString());
+    if (job.dry_run) return;
+    if (window.MaterialsTable) {
+      window.MaterialsTable.reload();
+    } else {
+      // Server-rendered list: offer a reload rather than dropping the summary line
+      const link = document.createElement('a');
+      link.href = next.toString();
+      link.className = 'ms-2';
+      link.textContent = 'Reload list';
+      el.appendChild(link);
+    }
+  };
+
+  const poll = async () => {
+    try {
+      const resp = await fetch(url, { headers: { Accept: 'application/json' } });
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      const job = await resp.json();
+      if (job.status === 'done' || job.status === 'failed') {
+        finish(job);
+        return;
+      }
+      setStatus(progressText(job), 'info');
+    } catch (err) {
+      setStatus('Import status unavailable — retrying…', 'warning');
+    }
+    window.setTimeout(poll, POLL_MS);
+  };
+
+  poll();
+})();
@@ -190,20 +190,68 @@ document.addEventListener('DOMContentLoaded', function () {
     return out;
   }
 
+  // Last payload the server acknowledged → later saves PATCH only what changed since
+  var savedState = { eid: null, revision: null, payload: null };
+
+  function sameJSON(a, b) { return JSON.stringify(a) === JSON.stringify(b); }
+
+  // Row delta for PATCH /estimates/<id>/payload, or null when a full PUT is needed
+  function payloadDelta(prev, next) {
+    var prevRows = (prev.grid && prev.grid.rows) || [];
+    var nextRows = (next.grid && next.grid.rows) || [];
+    if (!next.grid && prev.grid) return null;
+    var hasIds = function (r) { return r && r.id; };
+    if (!prevRows.every(hasIds) || !nextRows.every(hasIds)) return null;
+
+    var delta = { replace: {}, rows: { upsert: [], delete: [] } };
+    Object.keys(next).forEach(function (k) {
+      if (k !== 'grid' && !sameJSON(prev[k], next[k])) delta.replace[k] = next[k];
+    });
+
+    var prevById = {}, seen = {};
+    prevRows.forEach(function (r) { prevById[r.id] = r; });
+    nextRows.forEach(function (r) {
+      seen[r.id] = true;
+      if (!sameJSON(prevById[r.id], r)) delta.rows.upsert.push(r);
+    });
+    var expected = [];
+    prevRows.forEach(function (r) {
+      if (seen[r.id]) expected.push(r.id); else delta.rows.delete.push(r.id);
+    });
+    delta.rows.upsert.forEach(function (r) { if (!prevById[r.id]) expected.push(r.id); });
+    var order = nextRows.map(function (r) { return r.id; });
+    if (!sameJSON(expected, order)) delta.rows.order = order;
+    return delta;
+  }
+
   function saveServer(eid, payload) {
     if (!eid) { window.location.href = "/estimates/new"; return; }
+    var url = "/estimates/" + encodeURIComponent(eid) + "/payload";
+    var delta = (savedState.eid === eid && savedState.payload) ? payloadDelta(savedState.payload, payload) : null;
+    var req = delta
+      ? { method: "PATCH", body: JSON.stringify(delta),
+          headers: { "Content-Type": "application/json", "If-Match": '"' + savedState.revision + '"' } }
+      : { method: "PUT", body: JSON.stringify(payload), headers: { "Content-Type": "application/json" } };
     try {
-      fetch("/estimates/" + encodeURIComponent(eid) + "/payload", {
-        method: "PUT",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(payload)
-      })
+      fetch(url, req)
       .then(function (res) {
+        if (res && res.status === 409) throw new Error("stale");
         if (!res || !res.ok) throw new Error("save_failed");
+        return res.json();
+      })
+      .then(function (j) {
+        savedState = { eid: eid, revision: j.revision, payload: JSON.parse(JSON.stringify(payload)) };
         try { EM_NOTIFY.show({ body: "Estimate saved", variant: "success", delay: 2200 }); } catch (_) {}
       })
-      .catch(function () {
-        try { EM_NOTIFY.show({ body: "Save failed", variant: "danger", delay: 2200 }); } catch (_) {}
+      .catch(function (err) {
+        var stale = err && err.message === "stale";
+        try {
+          EM_NOTIFY.show({
+            body: stale ? "This estimate was changed in another window. Reload before saving." : "Save failed",
+            variant: stale ? "warning" : "danger",
+            delay: stale ? 5000 : 2200
+          });
+        } catch (_) {}
       });
     } catch (_) {
       try { EM_NOTIFY.show({ body: "Save failed", variant: "danger", delay: 2200 }); } catch (__){ }
@@ -369,6 +417,42 @@ document.addEventListener("keydown", (e) => {
   }
 });
 
+// PDF exports may render as background jobs: the server queues documents above
+// PDF_SYNC_MAX_HTML_BYTES and answers 202 → poll status_url until done, then open download_url.
+// 200 → rendered inline (small docs).
+function pollPdfJob(job, attempt) {
+  return new Promise(function (resolve) { setTimeout(resolve, Math.min(500 + attempt * 250, 2000)); })
+    .then(function () { return fetch(job.status_url, { headers: { 'Accept': 'application/json' } }); })
+    .then(function (r) { if (!r.ok) throw new Error('export_failed'); return r.json(); })
+    .then(function (s) {
+      if (s.status === 'done' && s.download_url) return s;
+      if (s.status === 'failed' || attempt >= 120) throw new Error('export_failed');
+      return pollPdfJob(job, attempt + 1);
+    });
+}
+
+function runPdfExport(url, init) {
+  // Open the tab now (user gesture) so popup blockers allow it; point it at the PDF later
+  var win = window.open('', '_blank');
+  var show = function (href) { if (win) { win.location.href = href; } else { window.open(href, '_blank'); } };
+
+  init = init || {};
+  return fetch(url, init)
+    .then(function (r) {
+      if (r.status === 202) {
+        return r.json()
+          .then(function (job) { return pollPdfJob(job, 0); })
+          .then(function (job) { show(job.download_url); });
+      }
+      if (!r.ok) throw new Error('export_failed');
+      return r.blob().then(function (b) { show(URL.createObjectURL(b)); });
+    })
+    .catch(function (err) {
+      try { if (win) win.close(); } catch(_) {}
+      throw err;
+    });
+}
+
 // Smart export: if eid present -> Saved GET; else -> Fast POST with summary_export
 function exportSummaryPdfSmart(e, eid) {
   try { if (e && typeof e.preventDefault === 'function') e.preventDefault(); } catch(_) {}
@@ -376,7 +460,8 @@ function exportSummaryPdfSmart(e, eid) {
 
   // Saved path = simple GET
   if (eid) {
-    window.open('/estimates/' + encodeURIComponent(eid) + '/export/summary.pdf', '_blank');
+    runPdfExport('/estimates/' + encodeURIComponent(eid) + '/export/summary.pdf')
+      .catch(function () { try { EM_NOTIFY.show({ body: 'Export PDF failed', variant: 'danger', delay: 2200 }); } catch(_) {} });
     return;
   }
 
@@ -390,13 +475,11 @@ function exportSummaryPdfSmart(e, eid) {
     ? (captureSummaryControls() || {})
     : harvestControlsFallback();
 
-  fetch('/estimates/exports/summary.pdf', {
+  runPdfExport('/estimates/exports/summary.pdf', {
     method: 'POST',
     headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrf },
     body: JSON.stringify({ summary_export: { cells: cells, controls: controls } })
   })
-  .then(function (r) { if (!r.ok) throw new Error('export_failed'); return r.blob(); })
-  .then(function (b) { var u = URL.createObjectURL(b); window.open(u, '_blank'); })
   .catch(function () { try { EM_NOTIFY.show({ body: 'Export PDF failed', variant: 'danger', delay: 2200 }); } catch(_) {} });
 }
 
@@ -136,7 +136,8 @@
     var CAN_WRITE = !!(meta && meta.content === '1');
     if (!CAN_WRITE) {
       var scope = document.getElementById('materials-grid') || document;
-      scope.querySelectorAll('input, select, textarea, button').forEach(function (el) {
+      // Search / category filter / sort stay usable for read-only members
+      scope.querySelectorAll('input:not([data-readonly-ok]), select:not([data-readonly-ok]), textarea, button').forEach(function (el) {
         el.setAttribute('disabled', 'disabled');
         el.setAttribute('aria-disabled', 'true');
       });
@@ -207,9 +208,8 @@
         throw new Error(msg);
       }
 
-      // Remove the row
-      const row = document.getElementById(`mat-${id}`);
-      if (row) row.remove();
+      // Drop the row from the virtualized table
+      window.MaterialsTable?.remove(Number(id));
 
       // Hide modal
       const modalEl = document.getElementById("confirmDeleteModal");
@@ -338,6 +338,186 @@
     });
 })();
 
+// -- Virtualized materials table (pages from /libraries/materials.json) --
+window.MaterialsTable = (() => {
+  const $ = (id) => document.getElementById(id);
+  const scroller = $('materialsScroll');
+  const tbody = $('materialsTableBody');
+  const qInput = $('matFilterQ');
+  const typeSelect = $('matFilterType');
+  const countEl = $('materialsCount');
+  if (!scroller || !tbody) return null;
+
+  const meta = document.querySelector('meta[name="x-can-write"]');
+  const CAN_WRITE = !!(meta && meta.content === '1');
+
+  const OVERSCAN = 10;        // rows rendered above/below the viewport
+  const PREFETCH_ROWS = 100;  // fetch the next page when the window gets this close to the end
+  let rowHeight = 41;         // re-measured after the first paint
+
+  // Loaded rows + keyset paging state; seq drops responses for stale filters/sorts
+  const state = { rows: [], cursor: null, total: null, loading: false, seq: 0, sort: null, dir: 'asc' };
+
+  function esc(v) {
+    return String(v == null ? '' : v)
+      .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+  }
+  function money(n) {
+    const x = Number(n || 0);
+    return '$' + x.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+  }
+
+  function rowHtml(m) {
+    const dis = CAN_WRITE ? '' : ' disabled aria-disabled="true"';
+    return `<tr id="mat-${m.id}">
+      <td class="text-nowrap">${esc(m.material_type)}</td>
+      <td>${esc(m.item_description)}</td>
+      <td class="text-nowrap">${esc(m.unit_quantity_size)}</td>
+      <td class="text-end">${money(m.price)}</td>
+      <td class="text-end">${Number(m.labor_unit || 0).toFixed(2)}</td>
+      <td class="text-end">
+        <div class="btn-group">
+          <button class="btn btn-sm btn-outline-secondary" data-action="edit-material"
+            data-material-id="${m.id}" data-type="${esc(m.material_type)}" data-desc="${esc(m.item_description)}"
+            data-sku="${esc(m.sku)}" data-mfr="${esc(m.manufacturer)}" data-vendor="${esc(m.vendor)}"
+            data-price="${esc(m.price)}" data-labor="${esc(m.labor_unit)}" data-uqs="${esc(m.unit_quantity_size)}"
+            data-mcc="${esc(m.material_cost_code)}" data-mccd="${esc(m.mat_cost_code_desc)}"
+            data-lcc="${esc(m.labor_cost_code)}" data-lccd="${esc(m.labor_cost_code_desc)}"
+            data-active="${m.is_active ? 1 : 0}" title="Edit"${dis}>Edit</button>
+          <button class="btn btn-sm btn-outline-danger" data-action="delete-material"
+            data-material-id="${m.id}" title="Delete"${dis}>Delete</button>
+        </div>
+      </td>
+    </tr>`;
+  }
+
+  function spacer(px) {
+    return px > 0 ? `<tr aria-hidden="true" style="height:${px}px"><td colspan="6" class="p-0 border-0"></td></tr>` : '';
+  }
+
+  function message(text, cls) {
+    tbody.innerHTML = `<tr><td colspan="6" class="text-center ${cls} py-4">${esc(text)}</td></tr>`;
+  }
+
+  // Render only rows in (or near) the viewport; spacer rows keep the scrollbar honest
+  function paint() {
+    const n = state.rows.length;
+    if (!n) {
+      if (!state.loading) message('No materials found.', 'text-muted');
+      return;
+    }
+    const top = scroller.scrollTop;
+    const start = Math.max(0, Math.floor(top / rowHeight) - OVERSCAN);
+    const end = Math.min(n, Math.ceil((top + scroller.clientHeight) / rowHeight) + OVERSCAN);
+    tbody.innerHTML = spacer(start * rowHeight)
+      + state.rows.slice(start, end).map(rowHtml).join('')
+      + spacer((n - end) * rowHeight);
+
+    const first = tbody.querySelector('tr[id^="mat-"]');
+    if (first && first.offsetHeight && Math.abs(first.offsetHeight - rowHeight) > 1) {
+      rowHeight = first.offsetHeight;
+      return paint();
+    }
+    if (end >= n - PREFETCH_ROWS) load(false);
+  }
+
+  let frame = 0;
+  function schedulePaint() {
+    if (frame) return;
+    frame = requestAnimationFrame(() => { frame = 0; paint(); });
+  }
+
+  function paintFooter() {
+    if (!countEl) return;
+    countEl.textContent = state.total == null ? ''
+      : `Showing ${state.rows.length.toLocaleString()} of ${state.total.toLocaleString()}`;
+  }
+
+  function paintFacets(facets) {
+    if (!typeSelect || !facets) return;
+    const current = typeSelect.value || typeSelect.dataset.initial || '';
+    typeSelect.dataset.initial = '';
+    typeSelect.innerHTML = '<option value="">All categories</option>' + facets.map(f =>
+      `<option value="${esc(f.type)}">${esc(f.type)} (${Number(f.count).toLocaleString()})</option>`
+    ).join('');
+    typeSelect.value = facets.some(f => f.type === current) ? current : '';
+  }
+
+  function params() {
+    const p = new URLSearchParams();
+    const q = (qInput && qInput.value.trim()) || '';
+    const type = (typeSelect && (typeSelect.value || typeSelect.dataset.initial)) || '';
+    if (q) p.set('q', q);
+    if (type) p.set('type', type);
+    if (state.sort) { p.set('sort', state.sort); p.set('dir', state.dir); }
+    return p;
+  }
+
+  // First page (reset) or the next page after state.cursor
+  async function load(reset = true) {
+    if (!reset && (state.loading || !state.cursor)) return;
+    const seq = reset ? ++state.seq : state.seq;
+    const p = params();
+    if (!reset) p.set('cursor', state.cursor);
+
+    state.loading = true;
+    try {
+      const res = await fetch('/libraries/materials.json?' + p.toString(), { headers: { Accept: 'application/json' } });
+      const data = await res.json();
+      if (seq !== state.seq) return;
+      const rows = (data && data.rows) || [];
+      if (reset) {
+        state.rows = rows;
+        state.total = (data && typeof data.total === 'number') ? data.total : null;
+        paintFacets(data && data.facets && data.facets.material_type);
+        scroller.scrollTop = 0;
+      } else {
+        state.rows = state.rows.concat(rows);
+      }
+      state.cursor = (data && data.next_cursor) || null;
+    } catch (e) {
+      if (seq !== state.seq) return;
+      state.cursor = null;
+      if (reset) { state.rows = []; message('Failed to load materials.', 'text-danger'); }
+    } finally {
+      if (seq === state.seq) {
+        state.loading = false;
+        paintFooter();
+        if (state.rows.length || reset) schedulePaint();
+      }
+    }
+  }
+
+  function remove(id) {
+    const before = state.rows.length;
+    state.rows = state.rows.filter(m => m.id !== id);
+    if (state.total != null && state.rows.length < before) state.total -= 1;
+    paintFooter();
+    paint();
+  }
+
+  function debounce(fn, ms) {
+    let t; return function () { clearTimeout(t); t = setTimeout(fn, ms); };
+  }
+
+  scroller.addEventListener('scroll', schedulePaint, { passive: true });
+  window.addEventListener('resize', schedulePaint);
+  qInput?.addEventListener('input', debounce(() => load(), 250));
+  typeSelect?.addEventListener('change', () => load());
+  scroller.querySelectorAll('th[data-sort]').forEach((th) => {
+    th.addEventListener('click', () => {
+      const key = th.dataset.sort;
+      state.dir = (state.sort === key && state.dir === 'asc') ? 'desc' : 'asc';
+      state.sort = key;
+      load();
+    });
+  });
+
+  load();
+  return { reload: () => load(), remove };
+})();
+
 // -- Back link (query-param handshake) --
 (() => {
   const el = document.getElementById('materialsBackLink');
@@ -1,6 +1,8 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
+import io
 import os
+import time
 from pathlib import Path
 import numpy as np
 from decimal import Decimal, InvalidOperation
@@ -9,6 +11,9 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 os.chdir(os.path.dirname(os.path.dirname(__file__)))
 from dotenv import load_dotenv; load_dotenv()
+from app.services.catalog import refresh_resolved_materials
+from app.services.persistence import content_hashes
+from app.services.seed_cache import read_seed_workbook
 
 import logging
 
@@ -50,6 +55,125 @@ def _assert_guardrail(conn):
 
 # ---------------------------------------------------------------------------
 
+# Merge target for both modes: ux_materials_active_norm_key
+_CONFLICT_SQL = """
+    ON CONFLICT (
+        (lower(trim(material_type))),
+        (lower(trim(item_description)))
+    )
+    WHERE (is_active = true)
+    DO UPDATE SET
+        sku = EXCLUDED.sku,
+        manufacturer = EXCLUDED.manufacturer,
+        vendor = EXCLUDED.vendor,
+        price = EXCLUDED.price,
+        labor_unit = EXCLUDED.labor_unit,
+        unit_quantity_size = EXCLUDED.unit_quantity_size,
+        material_cost_code = EXCLUDED.material_cost_code,
+        mat_cost_code_desc = EXCLUDED.mat_cost_code_desc,
+        labor_cost_code = EXCLUDED.labor_cost_code,
+        labor_cost_code_desc = EXCLUDED.labor_cost_code_desc,
+        content_hash = EXCLUDED.content_hash,
+        updated_at = NOW()
+"""
+
+STAGE_TABLE = "_materials_import_stage"
+
+
+def _log_stage(stage: str, rows: int, started: float) -> float:
+    """Log one stage's duration and throughput; returns the next stage's start time."""
+    now = time.perf_counter()
+    secs = now - started
+    logger.info(
+        "stage=%s rows=%s seconds=%.3f rows_per_sec=%s",
+        stage, rows, secs, int(rows / secs) if secs > 0 else rows,
+    )
+    return now
+
+
+# Same key in SQL (U+001F-joined), matched against _norm_key
+_KEY_SQL = "lower(trim(material_type)) || chr(31) || lower(trim(item_description))"
+
+
+def _norm_key(dfw) -> pd.Series:
+    """Conflict key of ux_materials_active_norm_key, as one string per row."""
+    # strip(" "): SQL trim() removes spaces only
+    norm = lambda c: dfw[c].fillna("").astype(str).str.strip(" ").str.lower()  # noqa: E731
+    return norm("material_type") + "\x1f" + norm("item_description")
+
+
+def _diff(conn, dfw, cols):
+    """
+    Compare the sheet with the active global rows by conflict key + content_hash.
+    Returns (rows to write incl. content_hash, keys missing from the sheet, report counts).
+    """
+    dfw = dfw.assign(content_hash=content_hashes(dfw, cols))
+    dfw = dfw[~_norm_key(dfw).duplicated(keep="last")]
+    stored = dict(
+        conn.execute(
+            text(
+                f"SELECT {_KEY_SQL}, content_hash "
+                f"FROM materials WHERE is_active = true AND org_id IS NULL"
+            )
+        ).all()
+    )
+    keys = _norm_key(dfw)
+    is_new = ~keys.isin(stored.keys())
+    is_changed = ~is_new & (dfw["content_hash"] != keys.map(stored))
+    missing = sorted(set(stored) - set(keys))
+    report = {
+        "added": int(is_new.sum()),
+        "changed": int(is_changed.sum()),
+        "unchanged": int(len(dfw) - is_new.sum() - is_changed.sum()),
+        "missing": len(missing),
+    }
+    return dfw[is_new | is_changed], missing, report
+
+
+def _retire(conn, keys) -> int:
+    """--retire-missing: deactivate global rows whose conflict key left the sheet."""
+    retired = 0
+    for i in range(0, len(keys), 1000):
+        retired += conn.execute(
+            text(
+                f"UPDATE materials SET is_active = false, content_hash = NULL, updated_at = NOW() "
+                f"WHERE is_active = true AND org_id IS NULL AND {_KEY_SQL} IN :keys"
+            ).bindparams(bindparam("keys", expanding=True)),
+            {"keys": keys[i:i + 1000]},
+        ).rowcount
+    return retired
+
+
+def _copy_upsert(conn, dfw, cols) -> None:
+    """
+    --mode copy: stream dfw as CSV into COPY … FROM STDIN on a temp table, then merge with
+    one INSERT … SELECT … ON CONFLICT. Rows sharing a conflict key would make that single
+    statement touch a row twice, so the last sheet row per key is kept.
+    """
+    started = time.perf_counter()
+    dfw = dfw[~_norm_key(dfw).duplicated(keep="last")]
+    buf = io.StringIO()
+    dfw.to_csv(buf, columns=cols, header=False, index=False, na_rep="\\N")
+    buf.seek(0)
+    started = _log_stage("prepare", len(dfw), started)
+
+    col_list = ", ".join(cols)
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE {STAGE_TABLE} ON COMMIT DROP AS "
+        f"SELECT {col_list} FROM materials WITH NO DATA"
+    )
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {STAGE_TABLE} ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+        )
+    started = _log_stage("copy", len(dfw), started)
+
+    conn.exec_driver_sql(
+        f"INSERT INTO materials (org_id, {col_list}, is_active) "
+        f"SELECT NULL, {col_list}, true FROM {STAGE_TABLE} {_CONFLICT_SQL}"
+    )
+    _log_stage("merge", len(dfw), started)
+
 
 def clean_str(value):
     if value is None:
@@ -71,9 +195,14 @@ def to_decimal(value, default=Decimal("0")):
 
 
 SEED_PATH = Path(os.getenv("MATERIALS_SEED_PATH", "data/Materials_DB_Seed.xlsx"))
+SEED_CACHE_DIR = (
+    os.getenv("SEED_CACHE_DIR", "instance/seed_cache")
+    if os.getenv("SEED_CACHE_ENABLED", "true").lower() == "true"
+    else None
+)
 
-# Load your Excel file
-df = pd.read_excel(SEED_PATH)
+# Load your Excel file (Parquet copy when the workbook is unchanged; see app/services/seed_cache.py)
+df = read_seed_workbook(SEED_PATH, cache_dir=SEED_CACHE_DIR)
 
 # Rename columns to match DB schema
 df = df.rename(
@@ -160,15 +289,21 @@ def _run(
     limit: int | None = None,
     verbose: bool = False,
     fail_fast: bool = False,
+    mode: str = "values",
+    retire_missing: bool = False,
 ) -> None:
     df_local = df.copy()
     if limit is not None:
         df_local = df_local.head(int(limit))
-    _upsert_materials(df_local, dry_run=dry_run, verbose=verbose, fail_fast=fail_fast)
+    _upsert_materials(
+        df_local, dry_run=dry_run, verbose=verbose, fail_fast=fail_fast, mode=mode,
+        retire_missing=retire_missing,
+    )
 
 
 def _upsert_materials(
-    df_local, *, dry_run: bool, verbose: bool, fail_fast: bool
+    df_local, *, dry_run: bool, verbose: bool, fail_fast: bool, mode: str = "values",
+    retire_missing: bool = False,
 ) -> None:
     # Build rows with only the columns we actually write
     cols = [
@@ -188,17 +323,14 @@ def _upsert_materials(
     dfw = df_local.reindex(columns=cols)
 
     # Basic observability
-    logger.info("rows_prepared=%s", len(dfw))
+    logger.info("rows_prepared=%s mode=%s", len(dfw), mode)
     if verbose:
         logger.debug("preview:\n%s", dfw.head(min(5, len(dfw))).to_string(index=False))
         nn = {k: int(v) for k, v in dfw.notnull().sum().to_dict().items()}
         logger.debug("non_null=%s", nn)
 
     if dry_run:
-        logger.info(
-            logger.info("dry_run=true table=materials conflict=(lower(trim(material_type)),lower(trim(item_description))) predicate=is_active=true")
-        )
-        return
+        logger.info("dry_run=true table=materials conflict=(lower(trim(material_type)),lower(trim(item_description))) predicate=is_active=true")
 
     engine = create_engine(get_database_url())
     with engine.begin() as conn:
@@ -222,51 +354,55 @@ def _upsert_materials(
         before = conn.execute(
             text("SELECT COUNT(*) FROM materials WHERE is_active = true AND org_id IS NULL")
         ).scalar_one()
-        # psycopg2 cursor for fast bulk upsert
-        raw = conn.connection
-        rows = [
-            (
-                r.material_type,
-                r.sku,
-                r.manufacturer,
-                r.item_description,
-                r.vendor,
-                r.price,
-                r.labor_unit,
-                int(r.unit_quantity_size) if r.unit_quantity_size is not None else None,
-                r.material_cost_code,
-                r.mat_cost_code_desc,
-                r.labor_cost_code,
-                r.labor_cost_code_desc,
-            )
-            for r in dfw.itertuples(index=False, name="Row")
-        ]
-        if rows:
-            sql = """
+        started = time.perf_counter()
+        dfw, missing, report = _diff(conn, dfw, cols)
+        started = _log_stage("diff", len(dfw), started)
+        logger.info(
+            "change_report table=materials added=%s changed=%s unchanged=%s missing=%s",
+            report["added"], report["changed"], report["unchanged"], report["missing"],
+        )
+        if dry_run:
+            return
+        write_cols = cols + ["content_hash"]
+        if mode == "copy" and len(dfw):
+            try:
+                _copy_upsert(conn, dfw, write_cols)
+            except Exception as e:
+                if fail_fast:
+                    raise
+                logger.error("upsert_failed mode=copy error=%s", e)
+                raise SystemExit(2)
+        elif len(dfw):
+            # psycopg2 cursor for fast bulk upsert
+            raw = conn.connection
+            rows = [
+                (
+                    r.material_type,
+                    r.sku,
+                    r.manufacturer,
+                    r.item_description,
+                    r.vendor,
+                    r.price,
+                    r.labor_unit,
+                    int(r.unit_quantity_size) if r.unit_quantity_size is not None else None,
+                    r.material_cost_code,
+                    r.mat_cost_code_desc,
+                    r.labor_cost_code,
+                    r.labor_cost_code_desc,
+                    r.content_hash,
+                )
+                for r in dfw.itertuples(index=False, name="Row")
+            ]
+            started = _log_stage("prepare", len(rows), started)
+            sql = f"""
                 INSERT INTO materials (
                     org_id,
                     material_type, sku, manufacturer, item_description, vendor,
                     price, labor_unit, unit_quantity_size,
                     material_cost_code, mat_cost_code_desc, labor_cost_code, labor_cost_code_desc,
-                    is_active
+                    content_hash, is_active
                 ) VALUES %s
-                ON CONFLICT (
-                    (lower(trim(material_type))),
-                    (lower(trim(item_description)))
-                )
-                WHERE (is_active = true)
-                DO UPDATE SET
-                    sku = EXCLUDED.sku,
-                    manufacturer = EXCLUDED.manufacturer,
-                    vendor = EXCLUDED.vendor,
-                    price = EXCLUDED.price,
-                    labor_unit = EXCLUDED.labor_unit,
-                    unit_quantity_size = EXCLUDED.unit_quantity_size,
-                    material_cost_code = EXCLUDED.material_cost_code,
-                    mat_cost_code_desc = EXCLUDED.mat_cost_code_desc,
-                    labor_cost_code = EXCLUDED.labor_cost_code,
-                    labor_cost_code_desc = EXCLUDED.labor_cost_code_desc,
-                    updated_at = NOW()
+                {_CONFLICT_SQL}
             """
             with raw.cursor() as cur:
                 # Append constant is_active=True as a separate column value
@@ -278,10 +414,24 @@ def _upsert_materials(
                         raise
                     logger.error("upsert_failed error=%s", e)
                     raise SystemExit(2)
+            _log_stage("merge", len(rows), started)
+        retired = 0
+        if retire_missing and missing:
+            started = time.perf_counter()
+            retired = _retire(conn, missing)
+            _log_stage("retire", retired, started)
+        if not len(dfw) and not retired:
+            logger.info("upsert_skipped table=materials reason=no_changes")
+            return
         after = conn.execute(
             text("SELECT COUNT(*) FROM materials WHERE is_active = true AND org_id IS NULL")
         ).scalar_one()
         inserted = max(0, (after - before))
+        # Global rows changed → re-resolve the overlay for every org (same transaction)
+        started = time.perf_counter()
+        refresh_resolved_materials(conn=conn)
+        _log_stage("resolve", after, started)
+        logger.info("resolved_refresh table=resolved_materials scope=all_orgs")
         logger.info(
             "upsert_complete table=materials before=%s after=%s inserted_est=%s",
             before,
@@ -297,7 +447,7 @@ if __name__ == "__main__":
         description="Import materials into DB safely (idempotent UPSERT)."
     )
     p.add_argument(
-        "--dry-run", action="store_true", help="Plan only; print what would happen."
+        "--dry-run", action="store_true", help="Plan only; log the change report, write nothing."
     )
     p.add_argument(
         "--limit", type=int, default=None, help="Limit number of rows to process."
@@ -308,6 +458,17 @@ if __name__ == "__main__":
     p.add_argument(
         "--fail-fast", action="store_true", help="Raise immediately on the first error."
     )
+    p.add_argument(
+        "--retire-missing",
+        action="store_true",
+        help="Deactivate global rows whose key is no longer in the sheet.",
+    )
+    p.add_argument(
+        "--mode",
+        choices=("values", "copy"),
+        default="values",
+        help="values: execute_values pages (default); copy: COPY into a temp table + one merge.",
+    )
     args = p.parse_args()
 
     logging.basicConfig(
@@ -320,5 +481,7 @@ if __name__ == "__main__":
         limit=args.limit,
         verbose=args.verbose,
         fail_fast=args.fail_fast,
+        mode=args.mode,
+        retire_missing=args.retire_missing,
     )
     raise SystemExit(0)
@@ -0,0 +1,10 @@
+# Gunicorn settings shared by Procfile and render.yaml (command-line flags still apply).
+
+
+def post_worker_init(worker):
+    # Prime WeasyPrint (stylesheets + fonts) so each web worker's first PDF export is not the
+    # slow one. Lives here rather than in create_app() so CLI commands (db upgrade, workers)
+    # do not pay for it.
+    from app.services.exports import warm_pdf_on_boot
+
+    warm_pdf_on_boot(worker.wsgi)
@@ -0,0 +1,40 @@
+"""estimates: (org_id, updated_at DESC, id DESC) index for list.json keyset pagination
+
+Revision ID: 0b5e9d3f7a21
+Revises: f4a8d2c6e013
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5e9d3f7a21'
+down_revision = 'f4a8d2c6e013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps estimates writable during the build; it cannot run inside the
+    # migration transaction (same pattern as 8d41f6c2b9e7). Ignored off Postgres.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_estimates_org_updated_at_id',
+            'estimates',
+            ['org_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_estimates_org_updated_at_id',
+            table_name='estimates',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
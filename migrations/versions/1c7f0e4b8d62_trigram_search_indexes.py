@@ -0,0 +1,52 @@
+"""pg_trgm GIN indexes for estimate, customer and material search
+
+Revision ID: 1c7f0e4b8d62
+Revises: 0b5e9d3f7a21
+Create Date: 2026-10-18 17:45:00.000000
+
+Indexes are on lower(col) to match app/services/search.py (LIKE '%q%' and the % similarity
+operator both use them). Postgres only; other dialects have no trigram support.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7f0e4b8d62'
+down_revision = '0b5e9d3f7a21'
+branch_labels = None
+depends_on = None
+
+TRGM_INDEXES = (
+    ('ix_estimates_name_trgm', 'estimates', 'name'),
+    ('ix_estimates_project_ref_trgm', 'estimates', 'project_ref'),
+    ('ix_customers_company_name_trgm', 'customers', 'company_name'),
+    ('ix_customers_contact_name_trgm', 'customers', 'contact_name'),
+    ('ix_customers_email_trgm', 'customers', 'email'),
+    ('ix_materials_item_description_trgm', 'materials', 'item_description'),
+    ('ix_materials_sku_trgm', 'materials', 'sku'),
+    ('ix_materials_manufacturer_trgm', 'materials', 'manufacturer'),
+    ('ix_materials_vendor_trgm', 'materials', 'vendor'),
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built CONCURRENTLY outside the migration transaction so the tables stay writable
+    # (same pattern as 8d41f6c2b9e7)
+    with op.get_context().autocommit_block():
+        for name, table, column in TRGM_INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                f'ON {table} USING gin (lower({column}) gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(TRGM_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    # pg_trgm is left installed; other objects may depend on it
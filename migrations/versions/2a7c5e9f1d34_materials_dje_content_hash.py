@@ -0,0 +1,31 @@
+"""materials / dje_items: add content_hash (diff-aware imports write only changed rows)
+
+Revision ID: 2a7c5e9f1d34
+Revises: 1c7f0e4b8d62
+Create Date: 2026-10-18 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a7c5e9f1d34'
+down_revision = '1c7f0e4b8d62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL until the next import writes the row; a NULL never matches, so that import rewrites it once
+    with op.batch_alter_table('materials', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+    with op.batch_alter_table('dje_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('dje_items', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
+    with op.batch_alter_table('materials', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
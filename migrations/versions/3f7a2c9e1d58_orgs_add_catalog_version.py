@@ -0,0 +1,28 @@
+"""orgs: add catalog_version (Estimator catalog ETag / cache key)
+
+Revision ID: 3f7a2c9e1d58
+Revises: 8d41f6c2b9e7
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7a2c9e1d58'
+down_revision = '8d41f6c2b9e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orgs', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('catalog_version', sa.BigInteger(), nullable=False, server_default=sa.text('0'))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('orgs', schema=None) as batch_op:
+        batch_op.drop_column('catalog_version')
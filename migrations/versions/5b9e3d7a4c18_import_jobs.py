@@ -0,0 +1,54 @@
+"""import_jobs: queued starter-pack / upload imports with progress
+
+Revision ID: 5b9e3d7a4c18
+Revises: 2a7c5e9f1d34
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e3d7a4c18'
+down_revision = '2a7c5e9f1d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("org_id", sa.Integer(), sa.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False, server_default=sa.text("'starter_pack'")),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default=sa.text("'queued'")),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("dry_run", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("upload", sa.LargeBinary(), nullable=True),
+        sa.Column("rows_total", sa.Integer(), nullable=True),
+        sa.Column("rows_done", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("chunks_done", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("report", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", postgresql.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("started_at", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("updated_at", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("finished_at", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_import_jobs_queued", "import_jobs", ["created_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index("ix_import_jobs_org_id", "import_jobs", ["org_id"])
+
+
+def downgrade():
+    op.drop_index("ix_import_jobs_org_id", table_name="import_jobs")
+    op.drop_index("ix_import_jobs_queued", table_name="import_jobs")
+    op.drop_table("import_jobs")
@@ -0,0 +1,109 @@
+"""resolved catalog: per-org materialized overlay for materials + dje
+
+Revision ID: 5e8c1b7d2a40
+Revises: b2a9f2f8c3d1
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8c1b7d2a40'
+down_revision = 'b2a9f2f8c3d1'
+branch_labels = None
+depends_on = None
+
+
+# Same winner rule as the former NOT EXISTS overlay: org row wins, else the global row.
+_BACKFILL_MATERIALS = """
+INSERT INTO resolved_materials (org_id, material_id, type_key, desc_key)
+SELECT m.org_id, m.id,
+       COALESCE(LOWER(TRIM(m.material_type)), ''),
+       COALESCE(LOWER(TRIM(m.item_description)), '')
+FROM materials m
+WHERE m.is_active = TRUE AND m.org_id IS NOT NULL
+UNION ALL
+SELECT o.id, g.id,
+       COALESCE(LOWER(TRIM(g.material_type)), ''),
+       COALESCE(LOWER(TRIM(g.item_description)), '')
+FROM orgs o
+JOIN materials g ON TRUE
+WHERE g.is_active = TRUE AND g.org_id IS NULL
+  AND NOT EXISTS (
+    SELECT 1 FROM materials x
+    WHERE x.is_active = TRUE
+      AND x.org_id = o.id
+      AND LOWER(TRIM(x.material_type)) = LOWER(TRIM(g.material_type))
+      AND LOWER(TRIM(x.item_description)) = LOWER(TRIM(g.item_description))
+  )
+"""
+
+_BACKFILL_DJE = """
+INSERT INTO resolved_dje_items (org_id, dje_item_id, category_key, desc_key, vendor_key)
+SELECT d.org_id, d.id,
+       COALESCE(LOWER(TRIM(d.category)), ''),
+       COALESCE(LOWER(TRIM(d.description)), ''),
+       COALESCE(LOWER(TRIM(d.vendor)), '')
+FROM dje_items d
+WHERE d.is_active = TRUE AND d.org_id IS NOT NULL
+UNION ALL
+SELECT o.id, g.id,
+       COALESCE(LOWER(TRIM(g.category)), ''),
+       COALESCE(LOWER(TRIM(g.description)), ''),
+       COALESCE(LOWER(TRIM(g.vendor)), '')
+FROM orgs o
+JOIN dje_items g ON TRUE
+WHERE g.is_active = TRUE AND g.org_id IS NULL
+  AND NOT EXISTS (
+    SELECT 1 FROM dje_items x
+    WHERE x.is_active = TRUE
+      AND x.org_id = o.id
+      AND LOWER(TRIM(x.category)) = LOWER(TRIM(g.category))
+      AND LOWER(TRIM(x.description)) = LOWER(TRIM(g.description))
+      AND COALESCE(LOWER(TRIM(x.vendor)), '') = COALESCE(LOWER(TRIM(g.vendor)), '')
+  )
+"""
+
+
+def upgrade():
+    op.create_table(
+        "resolved_materials",
+        sa.Column("org_id", sa.Integer(), sa.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("material_id", sa.Integer(), sa.ForeignKey("materials.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type_key", sa.Text(), nullable=False),
+        sa.Column("desc_key", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("org_id", "material_id"),
+    )
+    op.create_index("ix_resolved_materials_org_key", "resolved_materials", ["org_id", "type_key", "desc_key"])
+    op.create_index("ix_resolved_materials_material_id", "resolved_materials", ["material_id"])
+
+    op.create_table(
+        "resolved_dje_items",
+        sa.Column("org_id", sa.Integer(), sa.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("dje_item_id", sa.Integer(), sa.ForeignKey("dje_items.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("category_key", sa.Text(), nullable=False),
+        sa.Column("desc_key", sa.Text(), nullable=False),
+        sa.Column("vendor_key", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("org_id", "dje_item_id"),
+    )
+    op.create_index(
+        "ix_resolved_dje_items_org_key",
+        "resolved_dje_items",
+        ["org_id", "category_key", "desc_key", "vendor_key"],
+    )
+    op.create_index("ix_resolved_dje_items_dje_item_id", "resolved_dje_items", ["dje_item_id"])
+
+    # Initial build for every existing org
+    op.execute(_BACKFILL_MATERIALS)
+    op.execute(_BACKFILL_DJE)
+
+
+def downgrade():
+    op.drop_index("ix_resolved_dje_items_dje_item_id", table_name="resolved_dje_items")
+    op.drop_index("ix_resolved_dje_items_org_key", table_name="resolved_dje_items")
+    op.drop_table("resolved_dje_items")
+    op.drop_index("ix_resolved_materials_material_id", table_name="resolved_materials")
+    op.drop_index("ix_resolved_materials_org_key", table_name="resolved_materials")
+    op.drop_table("resolved_materials")
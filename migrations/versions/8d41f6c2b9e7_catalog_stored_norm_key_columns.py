@@ -0,0 +1,112 @@
+"""catalog: stored normalized overlay keys on materials + dje_items
+
+Revision ID: 8d41f6c2b9e7
+Revises: 5e8c1b7d2a40
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f6c2b9e7'
+down_revision = '5e8c1b7d2a40'
+branch_labels = None
+depends_on = None
+
+
+# Rows per UPDATE during backfill; each batch commits on its own (Postgres).
+BATCH_SIZE = 5000
+
+# Must match MATERIAL_NORM_KEY_SQL / DJE_NORM_KEY_SQL in app/models (U+001F separator).
+_SEP = "\x1f"
+_MATERIAL_KEY = (
+    "coalesce(lower(trim({p}material_type)), '') || '" + _SEP + "' || "
+    "coalesce(lower(trim({p}item_description)), '')"
+)
+_DJE_KEY = (
+    "coalesce(lower(trim({p}category)), '') || '" + _SEP + "' || "
+    "coalesce(lower(trim({p}description)), '') || '" + _SEP + "' || "
+    "coalesce(lower(trim({p}vendor)), '')"
+)
+
+# (table, column, key expression, trigger source columns, index name)
+_TARGETS = (
+    ("materials", "norm_type_desc_key", _MATERIAL_KEY,
+     "material_type, item_description", "ix_materials_org_norm_key_active"),
+    ("dje_items", "norm_cat_desc_vendor_key", _DJE_KEY,
+     "category, description, vendor", "ix_dje_items_org_norm_key_active"),
+)
+
+
+def _create_trigger(table, column, expr, source_cols):
+    # A STORED generated column would rewrite the table under ACCESS EXCLUSIVE;
+    # a plain column + trigger can be backfilled while the table stays writable.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_set_norm_key() RETURNS trigger AS $$
+        BEGIN
+            NEW.{column} := {expr.format(p="NEW.")};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_norm_key ON {table}")
+    op.execute(f"""
+        CREATE TRIGGER trg_{table}_norm_key
+        BEFORE INSERT OR UPDATE OF {source_cols} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_set_norm_key();
+    """)
+
+
+def _backfill_in_batches(bind, table, column, expr):
+    max_id = bind.execute(sa.text(f"SELECT coalesce(max(id), 0) FROM {table}")).scalar()
+    lo = 0
+    while lo < max_id:
+        hi = lo + BATCH_SIZE
+        bind.execute(
+            sa.text(
+                f"UPDATE {table} SET {column} = {expr.format(p='')} "
+                f"WHERE id > :lo AND id <= :hi AND {column} IS NULL"
+            ),
+            {"lo": lo, "hi": hi},
+        )
+        lo = hi
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    for table, column, expr, source_cols, index_name in _TARGETS:
+        create_index = (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+            f"ON {table} (org_id, {column}) WHERE is_active = TRUE"
+        )
+        if dialect == "postgresql":
+            # Nullable, no default: catalog-only change, no rewrite.
+            op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} TEXT")
+            _create_trigger(table, column, expr, source_cols)
+            # Backfill + concurrent index outside the migration transaction
+            # so each batch commits and releases its row locks.
+            with op.get_context().autocommit_block():
+                _backfill_in_batches(bind, table, column, expr)
+                op.execute(create_index)
+        else:
+            # Non-Postgres (e.g., SQLite in local dev) — plain column, single pass.
+            op.add_column(table, sa.Column(column, sa.Text(), nullable=True))
+            op.execute(f"UPDATE {table} SET {column} = {expr.format(p='')}")
+            op.execute(create_index.replace(" CONCURRENTLY", ""))
+
+
+def downgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    for table, column, _expr, _cols, index_name in reversed(_TARGETS):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+        if dialect == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_norm_key ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {table}_set_norm_key()")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column(column)
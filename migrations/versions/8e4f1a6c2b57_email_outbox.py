@@ -0,0 +1,38 @@
+"""email_logs as a transactional outbox: rendered bodies + retry schedule
+
+Revision ID: 8e4f1a6c2b57
+Revises: 5b9e3d7a4c18
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f1a6c2b57'
+down_revision = '5b9e3d7a4c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("email_logs", sa.Column("html_body", sa.Text(), nullable=True))
+    op.add_column("email_logs", sa.Column("text_body", sa.Text(), nullable=True))
+    op.add_column("email_logs", sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.add_column("email_logs", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+    op.add_column("email_logs", sa.Column("sent_at", sa.DateTime(), nullable=True))
+    # The worker's poll: due rows only (sent/bounced history stays out of the index)
+    op.create_index(
+        "ix_email_logs_outbox", "email_logs", ["next_attempt_at"],
+        postgresql_where=sa.text("status IN ('queued', 'sending')"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_email_logs_outbox", table_name="email_logs")
+    op.drop_column("email_logs", "sent_at")
+    op.drop_column("email_logs", "next_attempt_at")
+    op.drop_column("email_logs", "attempts")
+    op.drop_column("email_logs", "text_body")
+    op.drop_column("email_logs", "html_body")
@@ -0,0 +1,50 @@
+"""export_jobs: queued PDF renders
+
+Revision ID: a6d3e8f1b2c4
+Revises: 3f7a2c9e1d58
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3e8f1b2c4'
+down_revision = '3f7a2c9e1d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("org_id", sa.Integer(), sa.ForeignKey("orgs.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("estimate_id", sa.Integer(), sa.ForeignKey("estimates.id", ondelete="CASCADE"), nullable=True),
+        sa.Column("kind", sa.String(length=32), nullable=False, server_default=sa.text("'summary_pdf'")),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default=sa.text("'queued'")),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("base_url", sa.String(length=255), nullable=True),
+        sa.Column("html", sa.Text(), nullable=True),
+        sa.Column("result", sa.LargeBinary(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", postgresql.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("started_at", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("finished_at", postgresql.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_export_jobs_queued", "export_jobs", ["created_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index("ix_export_jobs_org_id", "export_jobs", ["org_id"])
+
+
+def downgrade():
+    op.drop_index("ix_export_jobs_org_id", table_name="export_jobs")
+    op.drop_index("ix_export_jobs_queued", table_name="export_jobs")
+    op.drop_table("export_jobs")
@@ -0,0 +1,26 @@
+"""export_jobs: add cache_key (content-addressed summary PDF cache)
+
+Revision ID: c81f4a9d6e27
+Revises: a6d3e8f1b2c4
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4a9d6e27'
+down_revision = 'a6d3e8f1b2c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cache_key', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_column('cache_key')
@@ -0,0 +1,26 @@
+"""estimates: add payload_revision (optimistic concurrency for PATCH /payload)
+
+Revision ID: d2b7e5a9c304
+Revises: c81f4a9d6e27
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e5a9c304'
+down_revision = 'c81f4a9d6e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('estimates', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('payload_revision', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('estimates', schema=None) as batch_op:
+        batch_op.drop_column('payload_revision')
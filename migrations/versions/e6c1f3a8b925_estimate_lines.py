@@ -0,0 +1,63 @@
+"""estimate_lines: normalized grid rows of estimates.work_payload
+
+Revision ID: e6c1f3a8b925
+Revises: d2b7e5a9c304
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1f3a8b925'
+down_revision = 'd2b7e5a9c304'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'estimate_lines',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('estimate_id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('row_id', sa.String(length=64), nullable=True),
+        sa.Column('source_kind', sa.String(length=16), nullable=False),
+        sa.Column('item_type', sa.String(length=255), nullable=False),
+        sa.Column('material_id', sa.Integer(), nullable=True),
+        sa.Column('assembly_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('qty', sa.Numeric(14, 4), server_default=sa.text('0'), nullable=False),
+        sa.Column('labor_adj', sa.Numeric(6, 2), server_default=sa.text('1'), nullable=False),
+        sa.Column('price_each', sa.Numeric(14, 4), server_default=sa.text('0'), nullable=False),
+        sa.Column('labor_each', sa.Numeric(14, 4), server_default=sa.text('0'), nullable=False),
+        sa.Column('material_ext', sa.Numeric(14, 2), server_default=sa.text('0'), nullable=False),
+        sa.Column('labor_hours', sa.Numeric(14, 2), server_default=sa.text('0'), nullable=False),
+        sa.ForeignKeyConstraint(['estimate_id'], ['estimates.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['org_id'], ['orgs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['material_id'], ['materials.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['assembly_id'], ['assemblies.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('uq_estimate_lines_estimate_position', 'estimate_lines', ['estimate_id', 'position'], unique=True)
+    op.create_index('ix_estimate_lines_org_id', 'estimate_lines', ['org_id'], unique=False)
+    op.create_index(
+        'ix_estimate_lines_material_id', 'estimate_lines', ['material_id'], unique=False,
+        postgresql_where=sa.text('material_id IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_estimate_lines_assembly_id', 'estimate_lines', ['assembly_id'], unique=False,
+        postgresql_where=sa.text('assembly_id IS NOT NULL'),
+    )
+    # Existing estimates are backfilled with `flask estimates reprice`
+    # (pricing needs the resolved catalog, which is application code, not SQL).
+
+
+def downgrade():
+    op.drop_index('ix_estimate_lines_assembly_id', table_name='estimate_lines')
+    op.drop_index('ix_estimate_lines_material_id', table_name='estimate_lines')
+    op.drop_index('ix_estimate_lines_org_id', table_name='estimate_lines')
+    op.drop_index('uq_estimate_lines_estimate_position', table_name='estimate_lines')
+    op.drop_table('estimate_lines')
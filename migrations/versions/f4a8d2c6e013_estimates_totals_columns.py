@@ -0,0 +1,100 @@
+"""estimates: typed summary totals (material_total, labor_hours_total, break_even, sell_price)
+
+Revision ID: f4a8d2c6e013
+Revises: e6c1f3a8b925
+Create Date: 2026-10-18 16:10:00.000000
+
+Backfill reads the values the Summary page last saved into work_payload (totals.* and
+summary_export.cells), so it needs no catalog access. Saves after this migration store the
+server-priced values; `flask estimates reprice` recomputes every estimate from its grid.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a8d2c6e013'
+down_revision = 'e6c1f3a8b925'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ('material_total', 'labor_hours_total', 'break_even', 'sell_price')
+_BATCH = 1000
+
+
+def _num(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        d = Decimal(str(value).replace('$', '').replace(',', '').strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return d.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) if d.is_finite() and abs(d) < Decimal('1e12') else None
+
+
+def _saved_totals(payload):
+    payload = payload if isinstance(payload, dict) else {}
+    totals = payload.get('totals') if isinstance(payload.get('totals'), dict) else {}
+    export = payload.get('summary_export') if isinstance(payload.get('summary_export'), dict) else {}
+    cells = export.get('cells') if isinstance(export.get('cells'), dict) else None
+    if cells is None:
+        cells = payload.get('cells') if isinstance(payload.get('cells'), dict) else {}
+
+    def first(*values):
+        for v in values:
+            n = _num(v)
+            if n is not None:
+                return n
+        return Decimal('0')
+
+    return {
+        'material_total': first(totals.get('material_cost_price_sheet'), cells.get('material-cost-price-sheet')),
+        'labor_hours_total': first(totals.get('labor_hours_pricing_sheet'), cells.get('labor-hours-pricing-sheet')),
+        'break_even': first(cells.get('breakEvenValue')),
+        'sell_price': first(cells.get('estimatedSalesPriceValue')),
+    }
+
+
+def upgrade():
+    with op.batch_alter_table('estimates', schema=None) as batch_op:
+        for name in _COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Numeric(14, 2), server_default=sa.text('0'), nullable=False))
+
+    bind = op.get_bind()
+    estimates = sa.table(
+        'estimates',
+        sa.column('id', sa.Integer),
+        sa.column('work_payload', sa.JSON),
+        *(sa.column(name, sa.Numeric(14, 2)) for name in _COLUMNS),
+    )
+    update = (
+        estimates.update()
+        .where(estimates.c.id == sa.bindparam('b_id'))
+        .values({name: sa.bindparam(f'b_{name}') for name in _COLUMNS})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(estimates.c.id, estimates.c.work_payload)
+            .where(estimates.c.id > last_id)
+            .order_by(estimates.c.id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for eid, payload in rows:
+            values = _saved_totals(payload)
+            if any(values.values()):
+                params.append({'b_id': eid, **{f'b_{k}': v for k, v in values.items()}})
+        if params:
+            bind.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('estimates', schema=None) as batch_op:
+        for name in reversed(_COLUMNS):
+            batch_op.drop_column(name)
@@ -50,3 +50,29 @@ def _db_clean(app):
         for tbl in reversed(db.metadata.sorted_tables):
             db.session.execute(tbl.delete())
         db.session.commit()
+
+class QueryCounter:
+    """SQL statements executed on the app engine (reset before the request under test)."""
+    def __init__(self):
+        self.statements = []
+
+    def reset(self):
+        self.statements.clear()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def count(self, *tables):
+        if not tables:
+            return len(self.statements)
+        return sum(1 for s in self.statements if any(t in s for t in tables))
+
+@pytest.fixture()
+def query_counter(app):
+    from sqlalchemy import event
+    counter = QueryCounter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from app.blueprints.admin import assemblies as asm_routes
+from app.extensions import db
+from app.models import Org, User, Subscription, OrgMembership, Material, Assembly, ROLE_ADMIN
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _seed(app, n_assemblies=5):
+    with app.app_context():
+        org = Org(name="Picker Org"); other = Org(name="Other Org")
+        db.session.add_all([org, other]); db.session.commit()
+        u = User(email="picker@example.com", org_id=org.id); u.set_password("x")
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_picker", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        db.session.add_all([
+            Material(org_id=org.id, material_type="Wire", item_description="12 THHN", sku="W12",
+                     price=Decimal("50"), unit_quantity_size=100),
+            Material(org_id=org.id, material_type="Wire", item_description="Solid 12 THHN",
+                     price=Decimal("55"), unit_quantity_size=100),
+            Material(org_id=org.id, material_type="Boxes", item_description="4S Box",
+                     price=Decimal("2.50"), unit_quantity_size=1),
+            Material(org_id=other.id, material_type="Conduit", item_description="12 Foreign",
+                     unit_quantity_size=1),
+            # globals are not eligible as components (same rule as add_component)
+            Material(org_id=None, material_type="Wire", item_description="12 Global THHN",
+                     unit_quantity_size=100),
+        ])
+        db.session.add_all([
+            Assembly(org_id=org.id, name=f"Asm {i:02d}", category="Power", subcategory="Rough-in" if i % 2 else None)
+            for i in range(n_assemblies)
+        ])
+        db.session.add(Assembly(org_id=other.id, name="Foreign Asm", category="Secret"))
+        db.session.commit()
+        return u.id
+
+
+def test_material_typeahead_scoped_ranked_and_capped(app, client, monkeypatch):
+    _login(client, _seed(app))
+
+    rows = client.get("/admin/assemblies/materials.json?q=12").get_json()["rows"]
+    assert [r["item_description"] for r in rows] == ["12 THHN", "Solid 12 THHN"]
+
+    rows = client.get("/admin/assemblies/materials.json?type=boxes").get_json()["rows"]
+    assert [r["item_description"] for r in rows] == ["4S Box"]
+    assert client.get("/admin/assemblies/materials.json").get_json()["rows"] == []
+
+    monkeypatch.setattr(asm_routes, "MATERIAL_PICKER_LIMIT", 1)
+    rows = client.get("/admin/assemblies/materials.json?q=thhn&type=Wire").get_json()["rows"]
+    assert len(rows) == 1
+
+    types = client.get("/admin/assemblies/material-types.json").get_json()["types"]
+    assert types == ["Boxes", "Wire"]
+
+
+def test_assemblies_page_is_paged_and_ships_no_materials(app, client, monkeypatch):
+    _login(client, _seed(app))
+    monkeypatch.setattr(asm_routes, "ASSEMBLIES_PAGE_SIZE", 2)
+
+    html = client.get("/admin/assemblies").get_data(as_text=True)
+    assert "Asm 00" in html and "Asm 01" in html and "Asm 02" not in html
+    assert 'id="asmNextPage"' in html and 'id="asmPrevPage"' not in html
+    assert "THHN" not in html and "Foreign" not in html
+    assert '<option value="Rough-in" data-cat="Power">' in html
+
+    html = client.get("/admin/assemblies?page=3").get_data(as_text=True)
+    assert "Asm 04" in html and 'id="asmNextPage"' not in html and 'id="asmPrevPage"' in html
+
+    html = client.get("/admin/assemblies?q=asm+03").get_data(as_text=True)
+    assert "Asm 03" in html and "Asm 01" not in html
@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, User, Subscription, OrgMembership, Material, Assembly, AssemblyComponent, ROLE_ADMIN
+from app.services.assemblies import get_assembly_rollup, get_assembly_rollups, ServiceError
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _seed(app):
+    with app.app_context():
+        org = Org(name="Rollup Org"); other = Org(name="Other Org")
+        db.session.add_all([org, other]); db.session.commit()
+
+        wire = Material(org_id=org.id, material_type="Wire", item_description="12 THHN",
+                        price=Decimal("50.00"), labor_unit=Decimal("0.50"), unit_quantity_size=100)
+        box = Material(org_id=org.id, material_type="Boxes", item_description="4S Box",
+                       price=Decimal("2.50"), labor_unit=Decimal("0.25"), unit_quantity_size=1)
+        db.session.add_all([wire, box]); db.session.commit()
+
+        asm = Assembly(org_id=org.id, name="Duplex Rough-in")
+        empty = Assembly(org_id=org.id, name="Empty")
+        foreign = Assembly(org_id=other.id, name="Foreign")
+        db.session.add_all([asm, empty, foreign]); db.session.commit()
+
+        db.session.add_all([
+            AssemblyComponent(assembly_id=asm.id, material_id=wire.id, qty_per_assembly=Decimal("25")),
+            AssemblyComponent(assembly_id=asm.id, material_id=box.id, qty_per_assembly=Decimal("1")),
+            # inactive components never count
+            AssemblyComponent(assembly_id=empty.id, material_id=box.id, qty_per_assembly=Decimal("9"), is_active=False),
+            AssemblyComponent(assembly_id=foreign.id, material_id=box.id, qty_per_assembly=Decimal("1")),
+        ])
+        db.session.commit()
+        return org.id, asm.id, empty.id, foreign.id
+
+
+def test_batch_rollups_match_single_and_scope_to_org(app):
+    org_id, asm_id, empty_id, foreign_id = _seed(app)
+    with app.app_context():
+        rollups = get_assembly_rollups([asm_id, empty_id, foreign_id, 999999], org_id=org_id)
+
+        assert set(rollups) == {asm_id, empty_id}
+        # 25 * 50/100 + 1 * 2.50 ; 25 * 0.50/100 + 1 * 0.25
+        assert rollups[asm_id]["material_cost_total"] == Decimal("15.0000")
+        assert rollups[asm_id]["labor_hours_total"] == Decimal("0.3750")
+        assert rollups[asm_id]["component_count"] == 2
+        assert rollups[empty_id]["material_cost_total"] == Decimal("0.0000")
+        assert rollups[empty_id]["component_count"] == 0
+
+        assert get_assembly_rollup(asm_id, org_id=org_id) == rollups[asm_id]
+        try:
+            get_assembly_rollup(foreign_id, org_id=org_id)
+            assert False, "foreign assembly must not resolve"
+        except ServiceError:
+            pass
+
+
+def test_batch_rollups_endpoint(app, client):
+    org_id, asm_id, empty_id, foreign_id = _seed(app)
+    with app.app_context():
+        u = User(email="rollups@example.com"); u.set_password("x"); u.org_id = org_id
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org_id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org_id, stripe_subscription_id="sub_rollups", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        db.session.commit()
+        u_id = u.id
+    _login(client, u_id)
+
+    resp = client.post("/estimator/api/assemblies/rollups", json={"ids": [asm_id, foreign_id]})
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert [r["assembly_id"] for r in data] == [asm_id]
+    assert data[0]["material_cost_total"] == 15.0
+
+    bad = client.post("/estimator/api/assemblies/rollups", json={"ids": "nope"})
+    assert bad.status_code == 400
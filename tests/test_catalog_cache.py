@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, User, Subscription, OrgMembership, Material, ROLE_ADMIN
+from app.services.catalog import CatalogResponseCache, refresh_resolved_catalog, refresh_resolved_materials
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _seed(app):
+    with app.app_context():
+        org = Org(name="Cache Org"); db.session.add(org); db.session.commit()
+        db.session.add(Material(org_id=None, material_type="Wire", item_description="12 THHN",
+                                price=Decimal("50"), labor_unit=Decimal("0.5"), unit_quantity_size=100))
+        u = User(email="cache@example.com"); u.set_password("x"); u.org_id = org.id
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_cache", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        refresh_resolved_catalog(org.id)
+        db.session.commit()
+        return org.id, u.id
+
+
+def test_lru_evicts_least_recently_used():
+    cache = CatalogResponseCache(max_entries=2)
+    cache.put("a", b"1"); cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+
+
+def test_etag_304_and_version_bump_invalidates(app, client):
+    org_id, uid = _seed(app)
+    _login(client, uid)
+
+    first = client.get("/estimator/api/material-descriptions?type=Wire")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert [r["item_description"] for r in first.get_json()] == ["12 THHN"]
+
+    again = client.get("/estimator/api/material-descriptions?type=Wire", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    # Params are part of the tag
+    other = client.get("/estimator/api/material-descriptions?type=Boxes", headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.get_json() == []
+
+    # A library write bumps the org's catalog version → new tag, fresh body
+    with app.app_context():
+        m = Material(org_id=org_id, material_type="Wire", item_description="10 THHN",
+                     price=Decimal("70"), unit_quantity_size=100)
+        db.session.add(m); db.session.flush()
+        refresh_resolved_materials(org_id=org_id, material_ids=[m.id]); db.session.commit()
+
+    after = client.get("/estimator/api/material-descriptions?type=Wire", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert {r["item_description"] for r in after.get_json()} == {"12 THHN", "10 THHN"}
+
+
+def test_catalog_bundle_is_compressed_and_cached(app, client):
+    import gzip
+    from app.models import Assembly, AssemblyComponent, DjeItem
+
+    org_id, uid = _seed(app)
+    with app.app_context():
+        wire = Material.query.filter_by(item_description="12 THHN").one()
+        asm = Assembly(org_id=org_id, name="Home Run")
+        db.session.add(asm)
+        db.session.add(DjeItem(org_id=None, category="Rentals", subcategory="Lifts", description="Scissor",
+                               default_unit_cost=Decimal("125")))
+        db.session.commit()
+        db.session.add(AssemblyComponent(assembly_id=asm.id, material_id=wire.id, qty_per_assembly=Decimal("50")))
+        refresh_resolved_catalog(org_id)
+        db.session.commit()
+    _login(client, uid)
+
+    resp = client.get("/estimator/api/catalog.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+
+    import json
+    data = json.loads(gzip.decompress(resp.data))
+    mats = [dict(zip(data["materials"]["fields"], r)) for r in data["materials"]["rows"]]
+    assert mats[0]["item_description"] == "12 THHN" and mats[0]["price_each"] == 0.5
+    assert data["dje"]["tree"][0]["category"] == "Rentals"
+    assert data["dje"]["tree"][0]["subcategories"][0]["items"][0][1] == "Scissor"
+    asms = [dict(zip(data["assemblies"]["fields"], r)) for r in data["assemblies"]["rows"]]
+    assert asms[0]["material_cost_total"] == 25.0
+
+    again = client.get("/estimator/api/catalog.json", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+    plain = client.get("/estimator/api/catalog.json", headers={"Accept-Encoding": "identity"})
+    assert plain.headers.get("Content-Encoding") is None
+    assert plain.headers["ETag"] != resp.headers["ETag"]
+    assert plain.get_json() == data
@@ -0,0 +1,142 @@
+from decimal import Decimal
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models import Org, User, Estimate, EstimateLine, Material, Subscription
+from app.services.calculations import price_estimate
+from app.services.catalog import build_catalog_bundle, refresh_resolved_catalog
+
+
+def _setup(app):
+    with app.app_context():
+        org = Org(name="Lines Org"); db.session.add(org); db.session.commit()
+        wire = Material(org_id=org.id, material_type="Wire", item_description="12 THHN",
+                        price=Decimal("50"), labor_unit=Decimal("0.5"), unit_quantity_size=100)
+        emt = Material(org_id=org.id, material_type="EMT", item_description="3/4 EMT",
+                       price=Decimal("7.5"), labor_unit=Decimal("0.06"), unit_quantity_size=1)
+        db.session.add_all([wire, emt])
+        u = User(email="lines@example.com"); u.set_password("x"); u.org_id = org.id
+        db.session.add(u)
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_lines", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        est = Estimate(name="Lines Job", org_id=org.id, work_payload={})
+        db.session.add(est)
+        db.session.commit()
+        refresh_resolved_catalog(org.id)
+        db.session.commit()
+        return org.id, u.id, est.id, wire.id, emt.id
+
+
+def test_save_payload_writes_priced_lines(app, client):
+    org_id, uid, est_id, wire_id, emt_id = _setup(app)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+
+    payload = {"grid": {"v": 1, "rows": [
+        {"id": "r1", "type": "Wire", "descValue": str(wire_id), "qty": "200", "ladj": "1"},
+        {"id": "r2", "type": "", "qty": ""},                                        # blank row
+        {"id": "r3", "type": "EMT", "descText": "3/4 EMT", "qty": "10", "ladj": "2"},  # text fallback
+    ]}}
+    assert client.put(f"/estimates/{est_id}/payload", json=payload).status_code == 200
+
+    with app.app_context():
+        lines = EstimateLine.query.filter_by(estimate_id=est_id).order_by(EstimateLine.position).all()
+        assert [(l.position, l.row_id, l.material_id) for l in lines] == [(0, "r1", wire_id), (2, "r3", emt_id)]
+
+        # Same numbers as the pricing engine over the whole catalog
+        engine = price_estimate(payload, {}, build_catalog_bundle(org_id))["lines"]
+        for line in lines:
+            ref = engine[line.position]
+            assert float(line.material_ext) == ref["material_ext"]
+            assert float(line.labor_hours) == ref["labor_hours"]
+            assert float(line.price_each) == ref["cost_each"]
+
+        # Set-based reporting: which estimates use a material
+        used_by = db.session.execute(
+            db.select(EstimateLine.estimate_id).where(EstimateLine.material_id == emt_id)
+        ).scalars().all()
+        assert used_by == [est_id]
+
+    # A row-delta PATCH rewrites the lines in the same transaction
+    rev = client.get(f"/estimates/{est_id}/payload.json").get_json()["revision"]
+    resp = client.patch(f"/estimates/{est_id}/payload", json={"revision": rev, "rows": {"delete": ["r1"]}})
+    assert resp.status_code == 200
+    with app.app_context():
+        total_hours = db.session.execute(
+            db.select(func.sum(EstimateLine.labor_hours)).where(EstimateLine.estimate_id == est_id)
+        ).scalar()
+        assert float(total_hours) == 1.2
+        assert EstimateLine.query.filter_by(estimate_id=est_id).count() == 1
+
+
+def test_reprice_cli_backfills_lines_and_totals(app):
+    org_id, uid, est_id, wire_id, emt_id = _setup(app)
+    with app.app_context():
+        est = db.session.get(Estimate, est_id)
+        est.work_payload = {"grid": {"rows": [{"type": "Wire", "descValue": str(wire_id), "qty": "5"}]}}
+        db.session.commit()
+        assert EstimateLine.query.count() == 0  # written outside save_payload
+
+    result = app.test_cli_runner().invoke(args=["estimates", "reprice", "--org-id", str(org_id)])
+    assert "Repriced 1 estimate(s), 1 line(s)" in result.output
+    with app.app_context():
+        assert EstimateLine.query.filter_by(estimate_id=est_id, material_id=wire_id).count() == 1
+        est = db.session.get(Estimate, est_id)
+        assert float(est.material_total) == 2.5
+        assert float(est.labor_hours_total) == 0.03
+
+
+def test_save_maintains_totals_and_list_sorts_by_value(app, client):
+    org_id, uid, est_id, wire_id, emt_id = _setup(app)
+    with app.app_context():
+        snapshot = {"pricing": {"labor_rate": 100, "margin_percent": 10}}
+        db.session.get(Estimate, est_id).settings_snapshot = snapshot
+        small = Estimate(name="Small Job", org_id=org_id, work_payload={}, settings_snapshot=snapshot)
+        db.session.add(small)
+        db.session.commit()
+        small_id = small.id
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+
+    big = {"grid": {"rows": [{"type": "Wire", "descValue": str(wire_id), "qty": "200", "ladj": "1"}]}}
+    little = {"grid": {"rows": [{"type": "EMT", "descValue": str(emt_id), "qty": "1", "ladj": "1"}]}}
+    assert client.put(f"/estimates/{est_id}/payload", json=big).status_code == 200
+    assert client.put(f"/estimates/{small_id}/payload", json=little).status_code == 200
+
+    with app.app_context():
+        est = db.session.get(Estimate, est_id)
+        steps = price_estimate(big, est.settings_snapshot, build_catalog_bundle(org_id))["steps"]
+        assert float(est.material_total) == 100.0
+        assert float(est.labor_hours_total) == 1.0
+        assert float(est.break_even) == round(steps["break_even"], 2)
+        assert float(est.sell_price) == round(steps["sales_price"], 2)
+
+    rows = client.get("/estimates/list.json?sort=sell_price&dir=asc").get_json()["rows"]
+    assert [r["id"] for r in rows] == [small_id, est_id]
+    assert rows[1]["material_total"] == 100.0
+
+    rows = client.get("/estimates/list.json?min_sell_price=50").get_json()["rows"]
+    assert [r["id"] for r in rows] == [est_id]
+
+
+def test_save_rejects_non_object_payload_and_values_that_overflow_columns(app, client):
+    _, uid, est_id, wire_id, _ = _setup(app)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+
+    assert client.put(f"/estimates/{est_id}/payload", json=[1, 2]).status_code == 400
+
+    huge = {"grid": {"rows": [{"id": "r1", "type": "Wire", "descValue": str(wire_id), "qty": "999999999999"}]}}
+    resp = client.put(f"/estimates/{est_id}/payload", json=huge)
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "value_out_of_range"
+
+    rev = client.get(f"/estimates/{est_id}/payload.json").get_json()["revision"]
+    resp = client.patch(f"/estimates/{est_id}/payload", json={"revision": rev, "rows": {"upsert": huge["grid"]["rows"]}})
+    assert resp.status_code == 400
+
+    with app.app_context():
+        est = db.session.get(Estimate, est_id)
+        assert est.work_payload == {} and est.payload_revision == rev  # nothing written
+        assert EstimateLine.query.filter_by(estimate_id=est_id).count() == 0
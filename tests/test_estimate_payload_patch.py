@@ -0,0 +1,122 @@
+import json
+
+from app.extensions import db
+from app.models import Org, User, Estimate, Subscription
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _setup(app):
+    with app.app_context():
+        org = Org(name="Patch Org")
+        db.session.add(org)
+        db.session.commit()
+        u = User(email="patch@example.com", org_id=org.id)
+        u.set_password("testpass")
+        db.session.add(u)
+        db.session.add(Subscription(
+            org_id=org.id, stripe_subscription_id="sub_patch", product_id="prod",
+            price_id="price", status="active", entitlements_json=[],
+        ))
+        est = Estimate(name="Patch Estimate", org_id=org.id)
+        est.work_payload = {
+            "v": 1,
+            "grid": {"v": 1, "rows": [
+                {"id": "a", "type": "EMT", "qty": "1"},
+                {"id": "b", "type": "PVC", "qty": "2"},
+                {"id": "c", "type": "MC", "qty": "3"},
+            ]},
+            "totals": {"laborRate": 90},
+            "summary_export": {"cells": {}, "controls": {"margin_percent": 10}},
+        }
+        db.session.add(est)
+        db.session.commit()
+        return u.id, est.id
+
+
+def _payload(client, est_id):
+    j = client.get(f"/estimates/{est_id}/payload.json").get_json()
+    return j["revision"], j["payload"]
+
+
+def test_row_delta_patch_applies_and_bumps_revision(app, client):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+    rev, _ = _payload(client, est_id)
+
+    delta = {
+        "revision": rev,
+        "rows": {"upsert": [{"id": "b", "type": "PVC", "qty": "20"}, {"id": "d", "type": "Wire", "qty": "4"}],
+                 "delete": ["a"]},
+        "replace": {"summary_export": {"cells": {}, "controls": {"margin_percent": 15}}},
+    }
+    resp = client.patch(f"/estimates/{est_id}/payload", json=delta)
+    assert resp.status_code == 200
+    assert resp.get_json()["revision"] == rev + 1
+    assert resp.headers["ETag"] == f'"{rev + 1}"'
+
+    new_rev, payload = _payload(client, est_id)
+    assert new_rev == rev + 1
+    assert [(r["id"], r["qty"]) for r in payload["grid"]["rows"]] == [("b", "20"), ("c", "3"), ("d", "4")]
+    assert payload["summary_export"]["controls"]["margin_percent"] == 15
+    assert payload["totals"] == {"laborRate": 90}  # untouched sections survive
+
+    order = {"revision": new_rev, "rows": {"order": ["d", "c", "b"]}}
+    resp = client.patch(f"/estimates/{est_id}/payload", json=order)
+    assert resp.status_code == 200
+    assert [r["id"] for r in _payload(client, est_id)[1]["grid"]["rows"]] == ["d", "c", "b"]
+
+
+def test_json_patch_uses_if_match(app, client):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+    rev, _ = _payload(client, est_id)
+
+    ops = [
+        {"op": "test", "path": "/totals/laborRate", "value": 90},
+        {"op": "replace", "path": "/totals/laborRate", "value": 95},
+        {"op": "remove", "path": "/grid/rows/0"},
+        {"op": "add", "path": "/grid/rows/-", "value": {"id": "z", "qty": "9"}},
+    ]
+    resp = client.patch(
+        f"/estimates/{est_id}/payload",
+        data=json.dumps(ops),
+        headers={"Content-Type": "application/json-patch+json", "If-Match": f'"{rev}"'},
+    )
+    assert resp.status_code == 200
+    _, payload = _payload(client, est_id)
+    assert payload["totals"]["laborRate"] == 95
+    assert [r["id"] for r in payload["grid"]["rows"]] == ["b", "c", "z"]
+
+    bad = [{"op": "test", "path": "/totals/laborRate", "value": 1}]
+    resp = client.patch(
+        f"/estimates/{est_id}/payload",
+        data=json.dumps(bad),
+        headers={"Content-Type": "application/json-patch+json", "If-Match": f'"{rev + 1}"'},
+    )
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "invalid_patch"
+    assert _payload(client, est_id)[0] == rev + 1  # nothing written
+
+
+def test_stale_or_missing_revision_is_rejected(app, client):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+    rev, _ = _payload(client, est_id)
+
+    # Another writer saves the full payload first
+    assert client.put(f"/estimates/{est_id}/payload", json={"v": 1, "grid": {"v": 1, "rows": []}}).status_code == 200
+
+    resp = client.patch(f"/estimates/{est_id}/payload", json={"revision": rev, "replace": {"totals": {}}})
+    assert resp.status_code == 409
+    assert resp.get_json() == {"error": "stale_revision", "revision": rev + 1}
+
+    resp = client.patch(f"/estimates/{est_id}/payload", json={"replace": {"totals": {}}})
+    assert resp.status_code == 428
+
+    # A stale If-Match on the full PUT is rejected too
+    resp = client.put(f"/estimates/{est_id}/payload", json={"v": 1}, headers={"If-Match": f'"{rev}"'})
+    assert resp.status_code == 409
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, User, Estimate, Subscription
+
+
+def _setup(app, n=7):
+    with app.app_context():
+        org = Org(name="Paging Org"); db.session.add(org); db.session.commit()
+        u = User(email="paging@example.com", org_id=org.id); u.set_password("x")
+        db.session.add(u)
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_paging", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        for i in range(n):
+            db.session.add(Estimate(
+                name=f"Job {i}", org_id=org.id, work_payload={},
+                # two estimates share each timestamp / price → ties broken by id
+                updated_at=base + timedelta(hours=i // 2),
+                sell_price=Decimal(100 * (i // 2)),
+            ))
+        db.session.commit()
+        ids = [e.id for e in Estimate.query.filter_by(org_id=org.id).order_by(Estimate.id)]
+        return u.id, ids
+
+
+def _walk(client, query):
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = f"/estimates/list.json?{query}" + (f"&cursor={cursor}" if cursor else "&with_total=1")
+        body = client.get(url).get_json()
+        if cursor is None:
+            assert body["total"] == 7 and body["total_is_estimate"] is False
+        seen += [r["id"] for r in body["rows"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return seen, pages
+
+
+def test_keyset_pages_cover_every_row_once(app, client):
+    uid, ids = _setup(app)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+
+    seen, pages = _walk(client, "limit=2")
+    assert pages == 4
+    assert seen == sorted(ids, reverse=True)  # updated_at DESC, id DESC
+
+    seen, _ = _walk(client, "limit=3&sort=sell_price&dir=asc")
+    assert seen == sorted(ids)                # sell_price ASC, id ASC
+
+    seen, _ = _walk(client, "limit=2&sort=name&dir=asc")
+    assert seen == sorted(ids)
+
+
+def test_cursor_must_match_sort(app, client):
+    uid, ids = _setup(app, n=3)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+    cursor = client.get("/estimates/list.json?limit=1").get_json()["next_cursor"]
+    assert cursor
+    assert client.get(f"/estimates/list.json?limit=1&sort=name&cursor={cursor}").status_code == 400
+    assert client.get("/estimates/list.json?cursor=not-a-cursor").status_code == 400
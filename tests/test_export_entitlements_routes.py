@@ -65,3 +65,39 @@ def test_fast_export_csv_blocks_without_entitlement(app, client):
         headers={"Accept": "application/json"}
     )
     assert resp.status_code == 403
+
+def test_index_csv_streams_filtered_rows_with_totals_columns(app, client):
+    from decimal import Decimal
+    from app.models import Customer
+    org_id, u_id = _make_org_user(app)
+    with app.app_context():
+        db.session.add(Subscription(
+            org_id=org_id, stripe_subscription_id="sub_test_idx", product_id="prod_test",
+            price_id="price_test", status="active", entitlements_json=["exports.csv"],
+        ))
+        cust = Customer(org_id=org_id, company_name="Acme Electric")
+        db.session.add(cust); db.session.commit()
+        db.session.add_all([
+            Estimate(name="Warehouse", org_id=org_id, customer_id=cust.id, work_payload={},
+                     material_total=Decimal("1234.57"), labor_hours_total=Decimal("12.5")),
+            Estimate(name="Acme Office", org_id=org_id, work_payload={}),
+            Estimate(name="Other Job", org_id=org_id, work_payload={}, material_total=Decimal("9")),
+        ])
+        db.session.commit()
+
+    _login(client, u_id)
+    resp = client.get("/estimates/export/index.csv?q=acme")
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    lines = resp.get_data(as_text=True).strip().splitlines()
+    assert lines[0] == "id,name,customer,status,created_at,updated_at,material_total,labor_hours_total"
+    rows = sorted((line.split(",") for line in lines[1:]), key=lambda r: r[1])
+    # matched by customer company and by name; 'Other Job' filtered out in SQL
+    assert [(r[1], r[2], r[6], r[7]) for r in rows] == [
+        ("Acme Office", "", "0.00", "0.0000"),
+        ("Warehouse", "Acme Electric", "1234.57", "12.5000"),
+    ]
+
+    # LIKE wildcards in q are literal ('_' must not match the space in "Other Job")
+    assert len(client.get("/estimates/export/index.csv?q=other_job").get_data(as_text=True).strip().splitlines()) == 1
+    assert len(client.get("/estimates/export/index.csv?q=%25").get_data(as_text=True).strip().splitlines()) == 1
@@ -0,0 +1,218 @@
+from app.extensions import db
+from app.models import Org, User, Estimate, Subscription, ExportJob
+from app.services import export_jobs
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _setup(app, email="jobs@example.com", org_name="Jobs Org"):
+    with app.app_context():
+        org = Org(name=org_name)
+        db.session.add(org); db.session.commit()
+        u = User(email=email, org_id=org.id)
+        u.set_password("testpass")
+        db.session.add(u)
+        db.session.add(Subscription(
+            org_id=org.id, stripe_subscription_id=f"sub_{email}", product_id="prod_test",
+            price_id="price_test", status="active", entitlements_json=["exports.pdf"],
+        ))
+        est = Estimate(name="Job Estimate", org_id=org.id, work_payload={})
+        db.session.add(est); db.session.commit()
+        return u.id, est.id
+
+
+def test_small_pdf_renders_inline(app, client):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+    resp = client.get(f"/estimates/{est_id}/export/summary.pdf")
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "application/pdf"
+    with app.app_context():
+        assert db.session.query(ExportJob).count() == 0
+
+
+def test_async_pdf_job_lifecycle(app, client):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+
+    resp = client.get(f"/estimates/{est_id}/export/summary.pdf", headers={"Prefer": "respond-async"})
+    assert resp.status_code == 202
+    job = resp.get_json()
+    assert job["status"] == "queued" and "download_url" not in job
+    assert resp.headers["Location"] == job["status_url"]
+
+    # Not rendered yet → download answers 202 and points back at the status URL
+    pending = client.get(f"/estimates/exports/jobs/{job['job_id']}.pdf")
+    assert pending.status_code == 202
+
+    with app.app_context():
+        assert export_jobs.work(once=True) == 1
+        stored = db.session.get(ExportJob, job["job_id"])
+        assert stored.status == "done" and stored.attempts == 1 and stored.html is None
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["status"] == "done"
+    pdf = client.get(status["download_url"])
+    assert pdf.status_code == 200
+    assert pdf.data.startswith(b"%PDF")
+    assert f"estimate_{est_id}_summary_" in pdf.headers["Content-Disposition"]
+
+
+def test_job_claimed_once(app, client):
+    uid, _ = _setup(app)
+    _login(client, uid)
+    resp = client.post("/estimates/exports/summary.pdf?async=1",
+                       json={"summary_export": {"controls": {}, "cells": {}}})
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job_id"]
+    with app.app_context():
+        assert export_jobs.claim_job(job_id) is True
+        assert export_jobs.claim_job(job_id) is False
+        assert export_jobs.claim_next_job() is None
+
+
+def test_failed_render_recorded(app, client, monkeypatch):
+    uid, est_id = _setup(app)
+    _login(client, uid)
+    job_id = client.get(f"/estimates/{est_id}/export/summary.pdf?async=1").get_json()["job_id"]
+
+    def boom(*a, **k):
+        raise RuntimeError("cairo exploded")
+    monkeypatch.setattr(export_jobs, "render_pdf_bytes", boom)
+    with app.app_context():
+        export_jobs.work(once=True)
+
+    assert client.get(f"/estimates/exports/jobs/{job_id}.json").get_json()["status"] == "failed"
+    resp = client.get(f"/estimates/exports/jobs/{job_id}.pdf")
+    assert resp.status_code == 500
+    assert resp.get_json()["detail"] == "cairo exploded"
+
+
+def test_worker_does_not_spin_when_claim_fails(app, monkeypatch):
+    calls = []
+
+    def broken_claim():
+        calls.append(1)
+        raise RuntimeError("db down")
+    monkeypatch.setattr(export_jobs, "claim_next_job", broken_claim)
+    with app.app_context():
+        assert export_jobs.work(once=True) == 0
+    assert len(calls) == 1
+
+
+def test_local_backend_recovers_orphaned_jobs_and_purges_old_results(app, client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    uid, _ = _setup(app)
+    _login(client, uid)
+    job_id = "e" * 32
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+    with app.app_context():
+        org_id = db.session.get(User, uid).org_id
+        db.session.add_all([
+            # left running by a web worker that restarted mid-render
+            ExportJob(id=job_id, org_id=org_id, kind="summary_pdf", status="running", attempts=1,
+                      filename="a.pdf", html="<p>x</p>", created_at=old, started_at=old),
+            ExportJob(id="f" * 32, org_id=org_id, kind="summary_pdf", status="done", attempts=1,
+                      filename="old.pdf", result=b"%PDF", finished_at=old - timedelta(days=2)),
+        ])
+        db.session.commit()
+
+    submitted = []
+    monkeypatch.setattr(export_jobs, "_get_dispatcher",
+                        lambda app: type("D", (), {"submit": lambda self, *a: submitted.append(a)})())
+    monkeypatch.setattr(export_jobs, "_last_recovery", 0.0)
+    app.config["PDF_JOBS_BACKEND"] = "local"
+    try:
+        assert client.get(f"/estimates/exports/jobs/{job_id}.json").get_json()["status"] == "running"
+    finally:
+        app.config["PDF_JOBS_BACKEND"] = "worker"
+
+    assert len(submitted) == 1  # requeued and handed to the dispatcher
+    with app.app_context():
+        assert db.session.get(ExportJob, job_id).status == "queued"
+        assert db.session.get(ExportJob, "f" * 32) is None
+
+
+def test_jobs_are_org_scoped(app, client):
+    uid, est_id = _setup(app)
+    other_uid, _ = _setup(app, email="other@example.com", org_name="Other Org")
+    _login(client, uid)
+    job_id = client.get(f"/estimates/{est_id}/export/summary.pdf?async=1").get_json()["job_id"]
+
+    _login(client, other_uid)
+    assert client.get(f"/estimates/exports/jobs/{job_id}.json").status_code == 404
+    assert client.get(f"/estimates/exports/jobs/{job_id}.pdf").status_code == 404
+
+
+def test_saved_pdf_cache_etag_and_invalidation(app, client, tmp_path, monkeypatch):
+    from app.services import exports
+
+    monkeypatch.setitem(app.config, "PDF_CACHE_MAX_BYTES", 1024 * 1024)
+    monkeypatch.setitem(app.config, "PDF_CACHE_DIR", str(tmp_path))
+    app.extensions.pop("pdf_cache", None)
+    renders = []
+    real_render = exports.render_pdf_bytes
+
+    def counting_render(*a, **k):
+        renders.append(1)
+        return real_render(*a, **k)
+
+    import app.blueprints.estimates.routes as est_routes
+    monkeypatch.setattr(est_routes, "render_pdf_bytes", counting_render)
+    try:
+        uid, est_id = _setup(app)
+        _login(client, uid)
+        url = f"/estimates/{est_id}/export/summary.pdf"
+
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers.get("ETag")
+        assert first.headers.get("Last-Modified")
+        second = client.get(url)
+        assert second.data == first.data and len(renders) == 1   # served from cache
+
+        etag = first.headers["ETag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        # Payload change → new key → re-render
+        with app.app_context():
+            est = db.session.get(Estimate, est_id)
+            est.work_payload = {"summary_export": {"cells": {"djeValue": "$1.00"}}}
+            db.session.commit()
+        third = client.get(url, headers={"If-None-Match": etag})
+        assert third.status_code == 200 and third.headers["ETag"] != etag
+        assert len(renders) == 2
+    finally:
+        app.extensions.pop("pdf_cache", None)
+
+
+def test_pdf_cache_lru_eviction(tmp_path):
+    import os
+    from app.services.exports import PdfCache
+
+    cache = PdfCache(str(tmp_path), max_bytes=250)
+    cache.put("a", b"x" * 100)
+    cache.put("b", b"x" * 100)
+    # Touch "a" so "b" is the least recently used
+    os.utime(tmp_path / "b.pdf", (1, os.stat(tmp_path / "b.pdf").st_mtime))
+    assert cache.get("a") is not None
+    cache.put("c", b"x" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_stylesheets_parsed_once_per_process(tmp_path):
+    import os
+    from app.services import exports
+
+    css = tmp_path / "x.css"
+    css.write_text("body { color: black }")
+    first = exports._get_stylesheet(str(css))
+    assert exports._get_stylesheet(str(css)) is first
+    # Edited file → re-parsed
+    st = os.stat(css)
+    os.utime(css, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert exports._get_stylesheet(str(css)) is not first
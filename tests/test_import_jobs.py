@@ -0,0 +1,152 @@
+import io
+
+import pandas as pd
+
+from app.extensions import db
+from app.models import Org, User, OrgMembership, Subscription, Material, DjeItem, ImportJob, ROLE_ADMIN
+from app.services import import_jobs
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _setup(app, email="imports@example.com", org_name="Import Org"):
+    with app.app_context():
+        org = Org(name=org_name)
+        db.session.add(org); db.session.commit()
+        u = User(email=email, org_id=org.id); u.set_password("x")
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id=f"sub_{email}", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        db.session.commit()
+        return u.id, org.id
+
+
+def _csv(rows):
+    return pd.DataFrame(rows, columns=["Category", "Item Description", "Labor hrs", "Cost", "Unit", "SKU #"]) \
+        .to_csv(index=False).encode()
+
+
+JSON = {"Accept": "application/json"}
+
+
+def test_starter_pack_job_commits_in_chunks_with_progress(app, client):
+    uid, org_id = _setup(app)
+    _login(client, uid)
+    app.config["IMPORT_CHUNK_ROWS"] = 100
+
+    resp = client.post("/libraries/materials/import-starter-pack", headers=JSON)
+    assert resp.status_code == 202
+    job = resp.get_json()
+    assert job["status"] == "queued" and resp.headers["Location"] == job["status_url"]
+    with app.app_context():
+        assert Material.query.filter_by(org_id=org_id).count() == 0
+
+    with app.app_context():
+        assert import_jobs.work(once=True) == 1
+
+    done = client.get(job["status_url"]).get_json()
+    assert done["status"] == "done" and done["chunks_done"] == 5
+    assert done["rows_done"] == done["rows_total"] == 448
+    assert done["report"]["added"] == done["inserted"] > 0 and "added" in done["message"]
+    with app.app_context():
+        assert Material.query.filter_by(org_id=org_id).count() == done["report"]["added"]
+        assert db.session.get(ImportJob, job["job_id"]).upload is None
+
+
+def test_upload_jobs_stream_csv_and_xlsx_chunks(app, client):
+    uid, org_id = _setup(app)
+    _login(client, uid)
+    app.config["IMPORT_CHUNK_ROWS"] = 2
+    rows = [["Wire", f"{n} THHN", 0.5, 10 + n, 100, f"W{n}"] for n in range(5)]
+
+    resp = client.post("/libraries/materials/import-upload", headers=JSON,
+                       data={"file": (io.BytesIO(_csv(rows)), "wire.csv")}, content_type="multipart/form-data")
+    assert resp.status_code == 202
+    with app.app_context():
+        import_jobs.work(once=True)
+    job = client.get(resp.get_json()["status_url"]).get_json()
+    assert (job["status"], job["chunks_done"], job["rows_done"], job["rows_total"]) == ("done", 3, 5, None)
+    assert job["report"]["added"] == 5
+
+    # Same rows as .xlsx: streamed through openpyxl, nothing to write
+    book = io.BytesIO()
+    pd.read_csv(io.BytesIO(_csv(rows))).to_excel(book, index=False)
+    book.seek(0)
+    resp = client.post("/libraries/materials/import-upload", headers=JSON,
+                       data={"file": (book, "wire.xlsx")}, content_type="multipart/form-data")
+    with app.app_context():
+        import_jobs.work(once=True)
+    job = client.get(resp.get_json()["status_url"]).get_json()
+    assert job["rows_total"] == 5 and job["report"]["unchanged"] == 5 and job["report"]["retired"] == 0
+
+    with app.app_context():
+        mats = Material.query.filter_by(org_id=org_id).all()
+        assert len(mats) == 5 and {m.seed_pack for m in mats} == {"upload"}
+
+    bad = client.post("/libraries/materials/import-upload", headers=JSON,
+                      data={"file": (io.BytesIO(b"x"), "wire.txt")}, content_type="multipart/form-data")
+    assert bad.status_code == 400
+
+
+def test_failed_job_recorded_and_status_is_org_scoped(app, client):
+    uid, _ = _setup(app)
+    other_uid, _ = _setup(app, email="other@example.com", org_name="Other Org")
+    _login(client, uid)
+    rows = [["Wire", "12 THHN", 0.5, 10, 12, "W12"]]   # 12 is not a valid unit size
+
+    resp = client.post("/libraries/materials/import-upload", headers=JSON,
+                       data={"file": (io.BytesIO(_csv(rows)), "bad.csv")}, content_type="multipart/form-data")
+    status_url = resp.get_json()["status_url"]
+    with app.app_context():
+        assert import_jobs.work(once=True) == 1
+    job = client.get(status_url).get_json()
+    assert job["status"] == "failed" and "Unit Qty Size" in job["error"]
+
+    dje = client.post("/libraries/dje/import-starter-pack?dry_run=1")
+    assert dje.status_code == 302 and "import_job=" in dje.headers["Location"]
+    assert 'id="importJobStatus"' in client.get(dje.headers["Location"]).get_data(as_text=True)
+    with app.app_context():
+        import_jobs.work(once=True)
+        assert DjeItem.query.count() == 0
+
+    _login(client, other_uid)
+    assert client.get(status_url).status_code == 404
+
+
+def test_worker_survives_claim_errors_and_local_backend_recovers_stalled_jobs(app, client, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    def broken_claim():
+        raise RuntimeError("db down")
+    with monkeypatch.context() as m:
+        m.setattr(import_jobs, "claim_next_job", broken_claim)
+        with app.app_context():
+            assert import_jobs.work(once=True) == 0
+
+    uid, org_id = _setup(app)
+    _login(client, uid)
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    with app.app_context():
+        # left running by a web worker that restarted mid-import
+        db.session.add(ImportJob(id="a" * 32, org_id=org_id, kind="materials", status="running", attempts=1,
+                                 rows_done=500, chunks_done=1, created_at=old, updated_at=old))
+        db.session.commit()
+
+    submitted = []
+    monkeypatch.setattr(import_jobs, "_get_dispatcher",
+                        lambda app: type("D", (), {"submit": lambda self, *a: submitted.append(a)})())
+    monkeypatch.setattr(import_jobs, "_last_recovery", 0.0)
+    app.config["IMPORT_JOBS_BACKEND"] = "local"
+    try:
+        assert client.get(f"/libraries/imports/{'a' * 32}.json").get_json()["status"] == "running"
+    finally:
+        app.config["IMPORT_JOBS_BACKEND"] = "worker"
+
+    assert len(submitted) == 1
+    with app.app_context():
+        job = db.session.get(ImportJob, "a" * 32)
+        assert (job.status, job.rows_done) == ("queued", 0)
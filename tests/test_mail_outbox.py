@@ -0,0 +1,166 @@
+import json
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import EmailLog
+from app.services import mail_outbox
+from app.services.email import send_email
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO/MAIL/RCPT/DATA/RSET/QUIT."""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif verb == "DATA":
+                self.reply("354 end with <CRLF>.<CRLF>")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                answer = server.replies.pop(0) if server.replies else "250 queued"
+                if answer.startswith("250"):
+                    server.messages.append(b"".join(data).decode())
+                self.reply(answer)
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP
+                self.reply("250 ok")
+
+
+@pytest.fixture()
+def smtp(app, monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.messages, server.replies = 0, [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    state = app.extensions["mail"]
+    for attr, value in dict(server="127.0.0.1", port=server.server_address[1], use_tls=False,
+                            use_ssl=False, username=None, suppress=False).items():
+        monkeypatch.setattr(state, attr, value)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _queue(app, n, to="user{}@example.com"):
+    ctx = {"action_url": "http://example.test/reset?t=abc", "user_name": "U", "token_ttl_minutes": 5}
+    ids = [send_email(to.format(i), "Reset your password", "reset", ctx) for i in range(n)]
+    db.session.commit()  # send_email only flushes; the caller's commit publishes the rows
+    return ids
+
+
+def test_request_only_queues_and_worker_sends_batch_over_one_connection(app, smtp, caplog):
+    with app.test_request_context("/"):
+        ids = _queue(app, 3)
+        assert smtp.connections == 0 and smtp.messages == []
+        row = db.session.get(EmailLog, ids[0])
+        assert row.status == "queued" and "reset?t=abc" in row.html_body
+
+        with caplog.at_level("INFO"):
+            assert mail_outbox.work(once=True) == 3
+        assert smtp.connections == 1 and len(smtp.messages) == 3
+        assert "reset?t=abc" in smtp.messages[0]
+
+        db.session.expire_all()
+        rows = EmailLog.query.order_by(EmailLog.id).all()
+        assert {r.status for r in rows} == {"sent"}
+        assert all(r.html_body is None and r.sent_at and r.provider_msg_id for r in rows)
+        logged = [json.loads(r.getMessage()) for r in caplog.records if '"mail_send"' in r.getMessage()]
+        assert [e["outcome"] for e in logged] == ["sent"] * 3
+
+
+def test_transient_failure_backs_off_then_permanent_failure_gives_up(app, smtp):
+    app.config.update(MAIL_OUTBOX_RETRY_SECONDS=60)
+    with app.test_request_context("/"):
+        retry_id, dead_id, ok_id = _queue(app, 3)
+        smtp.replies = ["451 try again later", "550 no such user"]
+        before = datetime.utcnow()
+        assert mail_outbox.send_batch() == 3
+
+        db.session.expire_all()
+        retry, dead, ok = (db.session.get(EmailLog, i) for i in (retry_id, dead_id, ok_id))
+        assert retry.status == "queued" and retry.attempts == 1
+        assert retry.next_attempt_at >= before + timedelta(seconds=59)
+        assert "451" in retry.meta["error"] and retry.html_body
+        assert dead.status == "failed" and dead.html_body is None
+        assert ok.status == "sent"
+
+        assert mail_outbox.send_batch() == 0  # not due yet
+        retry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert mail_outbox.send_batch() == 1
+        db.session.expire_all()
+        retry = db.session.get(EmailLog, retry_id)
+        assert (retry.status, retry.attempts) == ("sent", 2)
+        assert mail_outbox.retry_delay(3) == timedelta(seconds=240)
+
+
+def test_unreachable_server_requeues_and_stale_leases_expire(app, smtp, monkeypatch):
+    monkeypatch.setattr(app.extensions["mail"], "port", 1)  # nothing listens there
+    with app.test_request_context("/"):
+        (email_id,) = _queue(app, 1)
+        assert mail_outbox.send_batch() == 1
+        db.session.expire_all()
+        row = db.session.get(EmailLog, email_id)
+        assert row.status == "queued" and row.attempts == 1
+
+        # A worker died holding the row: the lease runs out and it is due again
+        row.status, row.next_attempt_at = "sending", datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert mail_outbox.requeue_stale() == 1
+        db.session.expire_all()
+        assert db.session.get(EmailLog, email_id).status == "queued"
+
+
+def test_suppressed_address_is_not_queued(app, smtp):
+    with app.test_request_context("/"):
+        db.session.add(EmailLog(to_email="gone@example.com", template="reset", subject="", status="bounced", meta={}))
+        db.session.commit()
+        assert send_email("gone@example.com", "Reset", "reset", {"action_url": "x"}) is None
+        assert mail_outbox.work(once=True) == 0
+        assert smtp.connections == 0
+
+
+def test_rolled_back_request_sends_nothing(app, smtp):
+    with app.test_request_context("/"):
+        assert send_email("later@example.com", "Reset", "reset", {"action_url": "x"}) is not None
+        db.session.rollback()
+        assert EmailLog.query.count() == 0
+        assert mail_outbox.work(once=True) == 0
+        assert smtp.connections == 0
+
+
+def test_worker_survives_failed_requeue(app, monkeypatch, caplog):
+    class _Stop(Exception):
+        pass
+
+    def boom(*a, **k):
+        raise RuntimeError("db went away")
+
+    def stop(_seconds):
+        raise _Stop
+
+    monkeypatch.setattr(mail_outbox, "requeue_stale", boom)
+    monkeypatch.setattr(mail_outbox.time, "sleep", stop)
+    with app.app_context():
+        with caplog.at_level("ERROR"), pytest.raises(_Stop):
+            mail_outbox.work()
+    assert "mail outbox requeue failed" in caplog.text
@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, User, OrgMembership, Subscription, Material
+from app.models.org_membership import ROLE_MEMBER
+from app.services.catalog import refresh_resolved_catalog
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _setup(app, n_wire=7):
+    with app.app_context():
+        org = Org(name="Mat List Org"); other = Org(name="Other Org")
+        db.session.add_all([org, other]); db.session.commit()
+        u = User(email="matlist@example.com", org_id=org.id); u.set_password("x")
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_MEMBER))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_matlist", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        db.session.add_all([
+            Material(org_id=None, material_type="Wire", item_description=f"{i} AWG THHN",
+                     price=Decimal(10 + i), unit_quantity_size=1000)
+            for i in range(n_wire)
+        ])
+        db.session.add_all([
+            Material(org_id=None, material_type="Boxes", item_description="4S Box", sku="BX-4S",
+                     price=None, unit_quantity_size=1),
+            # Overrides the global 0 AWG row for this org only
+            Material(org_id=org.id, material_type="wire", item_description="0 awg thhn",
+                     price=Decimal("99"), unit_quantity_size=1000),
+            Material(org_id=other.id, material_type="Fittings", item_description="Not mine", unit_quantity_size=1),
+        ])
+        db.session.commit()
+        refresh_resolved_catalog(); db.session.commit()
+        return u.id
+
+
+def _pages(client, url):
+    rows, first, cursor = [], None, None
+    while True:
+        data = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        first = first or data
+        rows += data["rows"]
+        cursor = data["next_cursor"]
+        if not cursor:
+            return rows, first
+
+
+def test_keyset_pages_cover_resolved_catalog_once_in_order(app, client):
+    _login(client, _setup(app))
+
+    rows, first = _pages(client, "/libraries/materials.json?limit=3")
+    assert len(rows) == len({r["id"] for r in rows}) == 8
+    keys = [((r["material_type"] or "").lower(), (r["item_description"] or "").lower()) for r in rows]
+    assert keys == sorted(keys)
+    assert "Not mine" not in {r["item_description"] for r in rows}
+    assert [r["price"] for r in rows if r["item_description"] == "0 awg thhn"] == [99.0]
+
+    # Facets come with the first page only and cover the whole filtered set
+    assert first["facets"]["material_type"] == [{"type": "Boxes", "count": 1},
+                                                {"type": "Wire", "count": 6},
+                                                {"type": "wire", "count": 1}]
+    assert first["total"] == 8
+
+    # NULL prices sort as 0; descending pages run strictly downward
+    rows, _ = _pages(client, "/libraries/materials.json?limit=2&sort=price&dir=desc")
+    prices = [r["price"] or 0 for r in rows]
+    assert prices == sorted(prices, reverse=True) and len(rows) == 8
+
+
+def test_type_filter_search_and_bad_cursor(app, client):
+    _login(client, _setup(app))
+
+    data = client.get("/libraries/materials.json?type=Wire&limit=50").get_json()
+    assert {r["material_type"] for r in data["rows"]} == {"Wire"}
+    assert data["total"] == 6 and data["next_cursor"] is None
+    # Facets ignore the type filter
+    assert {f["type"] for f in data["facets"]["material_type"]} == {"Boxes", "wire", "Wire"}
+
+    data = client.get("/libraries/materials.json?q=bx-4").get_json()
+    assert [r["sku"] for r in data["rows"]] == ["BX-4S"]
+    assert data["facets"]["material_type"] == [{"type": "Boxes", "count": 1}]
+
+    resp = client.get("/libraries/materials.json?limit=2&sort=price")
+    cursor = resp.get_json()["next_cursor"]
+    assert client.get(f"/libraries/materials.json?sort=description&cursor={cursor}").status_code == 400
+    assert client.get("/libraries/materials.json?cursor=garbage").status_code == 400
+
+
+def test_materials_page_renders_shell_without_rows(app, client):
+    _login(client, _setup(app, n_wire=3))
+    html = client.get("/libraries/materials").get_data(as_text=True)
+    assert 'id="materialsTableBody"' in html
+    assert "THHN" not in html
+    assert '<option value="Boxes"' in html
+
+
+def test_total_counts_rows_without_a_type(app, client):
+    user_id = _setup(app)
+    with app.app_context():
+        db.session.add(Material(org_id=None, material_type=None, item_description="Misc", unit_quantity_size=1))
+        db.session.commit()
+        refresh_resolved_catalog(); db.session.commit()
+    _login(client, user_id)
+
+    data = client.get("/libraries/materials.json?limit=50").get_json()
+    assert len(data["rows"]) == data["total"] == 9
+    assert sum(f["count"] for f in data["facets"]["material_type"]) == 8
@@ -0,0 +1,111 @@
+from app.extensions import db
+from app.models import Org, User, OrgMembership, Subscription, Estimate, ROLE_ADMIN, ROLE_MEMBER
+from app.security.org_context import get_org_context
+
+
+def _login(client, user_id: int):
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user_id)
+
+
+def _setup(app, role=ROLE_ADMIN, status="active"):
+    with app.app_context():
+        org = Org(name="Ctx Org")
+        db.session.add(org); db.session.commit()
+        u = User(email=f"ctx-{role}@example.com", org_id=org.id)
+        u.set_password("x")
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=role))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id=f"sub_ctx_{role}", product_id="prod",
+                                    price_id="price", status=status, entitlements_json=["exports.csv"]))
+        est = Estimate(name="Ctx", org_id=org.id, work_payload={})
+        db.session.add(est); db.session.commit()
+        return org.id, u.id, est.id
+
+
+def test_libraries_page_loads_org_context_once(app, client, query_counter):
+    _, uid, _ = _setup(app)
+    _login(client, uid)
+    query_counter.reset()
+    resp = client.get("/libraries/materials")
+    assert resp.status_code == 200
+    # ACL + subscription gate + inject_globals (can_write, billing banner) share one lookup
+    assert query_counter.count("org_memberships", "subscriptions") == 1
+
+
+def test_entitlement_route_loads_org_context_once(app, client, query_counter):
+    _, uid, est_id = _setup(app)
+    _login(client, uid)
+    query_counter.reset()
+    resp = client.get(f"/estimates/{est_id}/export/summary.csv")
+    assert resp.status_code == 200
+    # enforce_active_subscription (blueprint) + require_entitlement (route)
+    assert query_counter.count("org_memberships", "subscriptions") == 1
+
+
+def test_member_write_forbidden_and_inactive_subscription(app, client):
+    org_id, uid, _ = _setup(app, role=ROLE_MEMBER, status="past_due")
+    with app.test_request_context("/"):
+        from flask_login import login_user
+        login_user(db.session.get(User, uid))
+        ctx = get_org_context(org_id)
+        assert ctx.is_member and not ctx.can_write
+        assert not ctx.has_active_subscription and not ctx.has_entitlement("exports.csv")
+        assert get_org_context(org_id) is ctx   # memoized for the request
+
+
+def test_entitlement_cache_zero_sql_until_webhook_invalidates(app, client, query_counter, monkeypatch):
+    import json
+    import stripe
+
+    monkeypatch.setitem(app.config, "ENTITLEMENT_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setitem(app.config, "STRIPE_WEBHOOK_SECRET", "whsec_test_x")
+    app.extensions.pop("entitlement_cache", None)
+    monkeypatch.setattr(stripe.Webhook, "construct_event", staticmethod(lambda payload, sig_header, secret: json.loads(payload)))
+    try:
+        org_id, uid, est_id = _setup(app)
+        _login(client, uid)
+        url = f"/estimates/{est_id}/export/summary.csv"
+        assert client.get(url).status_code == 200          # cold: fills the cache
+
+        query_counter.reset()
+        assert client.get(url).status_code == 200
+        assert query_counter.count("subscriptions") == 0    # warm: gates cost no SQL
+
+        event = {
+            "id": "evt_cache_1",
+            "type": "customer.subscription.updated",
+            "data": {"object": {
+                "id": "sub_ctx_admin", "status": "canceled", "customer": "cus_ctx",
+                "metadata": {"org_id": str(org_id)},
+                "items": {"data": [{"quantity": 1, "price": {"id": "price", "product": "prod"}}]},
+            }},
+        }
+        resp = client.post("/webhooks/stripe", data=json.dumps(event), headers={"Stripe-Signature": "t=1,v1=x"})
+        assert resp.status_code == 200
+
+        resp = client.get(url, headers={"Accept": "application/json"})
+        assert resp.status_code == 403
+    finally:
+        app.extensions.pop("entitlement_cache", None)
+
+
+def test_entitlement_cache_shares_through_redis(app):
+    from app.security.entitlement_cache import EntitlementCache, EntitlementSnapshot
+
+    class DictRedis:
+        def __init__(self): self.data = {}
+        def get(self, k): return self.data.get(k)
+        def set(self, k, v, ex=None): self.data[k] = v
+        def delete(self, k): self.data.pop(k, None)
+
+    shared = DictRedis()
+    worker_a = EntitlementCache(60, redis_client=shared, local_ttl=5)
+    worker_b = EntitlementCache(60, redis_client=shared, local_ttl=5)
+    snap = EntitlementSnapshot(status="active", entitlements=("exports.pdf",), current_period_end="2026-11-18T00:00:00")
+    with app.app_context():
+        worker_a.put(7, snap)
+        assert worker_b.get(7) == snap
+        worker_a.invalidate(7)
+        worker_b.clear()            # its local copy would otherwise live for local_ttl
+        assert worker_b.get(7) is None
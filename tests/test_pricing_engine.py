@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, User, Subscription, OrgMembership, Material, Estimate, ROLE_ADMIN
+from app.services.calculations import format_usd, js_to_fixed, price_estimate, price_estimates, usd_round
+from app.services.catalog import refresh_resolved_catalog
+
+BUNDLE = {
+    "materials": {
+        "fields": ["id", "material_type", "item_description", "price", "labor_unit",
+                   "unit_quantity_size", "price_each", "labor_each"],
+        "rows": [
+            [1, "Wire", "12 THHN", 50.0, 0.5, 100, 0.5, 0.005],
+            [2, "Boxes", "4S Box", 2.675, 0.2, 1, 2.675, 0.2],
+            [3, "Boxes", "Mud Ring", 1.1, 0.1, 1, 1.1, 0.1],
+        ],
+    },
+    "dje": {"fields": ["id", "description", "cost"], "tree": []},
+    "assemblies": {
+        "fields": ["id", "name", "category", "subcategory",
+                   "material_cost_total", "labor_hours_total", "component_count"],
+        "rows": [[7, "Duplex", None, None, 15.0, 0.375, 2]],
+    },
+}
+
+PAYLOAD = {
+    "grid": {"v": 1, "rows": [
+        {"type": "Wire", "descValue": "1", "descText": "12 THHN", "qty": "250", "ladj": "1"},
+        {"type": "Boxes", "descValue": "2", "descText": "4S Box", "qty": "3", "ladj": "1.5"},
+        {"type": "Assemblies", "descValue": "7", "descText": "Duplex", "qty": "2", "ladj": "0.5"},
+        # stale id → matched by text, like the Estimator hydrate
+        {"type": "Boxes", "descValue": "999", "descText": "Mud Ring", "qty": "7", "ladj": "0.25"},
+        # unknown labor adj option → select value '' → 0 hours
+        {"type": "Boxes", "descValue": "3", "descText": "Mud Ring", "qty": "1", "ladj": "3"},
+        {"type": "", "descValue": "", "descText": "", "qty": "", "ladj": "1"},
+    ]},
+    "estimateData": {
+        "costs": {"dje": 123.456},
+        "totals": {"adjustments": 2.5, "additional": 1.25, "laborRate": 10},
+        "materials": {"overhead_percent": 25},
+    },
+}
+
+SNAPSHOT = {"pricing": {
+    "misc_percent": 10, "small_tools_percent": 5, "large_tools_percent": 3, "waste_theft_percent": 10,
+    "sales_tax_percent": "8.25", "margin_percent": 15, "labor_rate": 87.5,
+}}
+
+# Produced by summary.js / estimator.js for the same inputs
+EXPECTED_CELLS = {
+    "labor-hours-pricing-sheet": "2.71",
+    "summaryAdjustedHours": "2.50",
+    "summaryAdditionalHours": "1.25",
+    "summaryTotalHours": "6.46",
+    "summaryTotalLaborCost": "$565.25",
+    "material-cost-price-sheet": "$171.84",
+    "miscMaterialValue": "$17.18",
+    "smallToolsValue": "$8.59",
+    "largeToolsValue": "$5.16",
+    "wasteTheftValue": "$17.18",
+    "taxableMaterialValue": "$219.96",
+    "salesTaxValue": "$17.60",
+    "totalMaterialCostValue": "$237.55",
+    "djeValue": "$123.46",
+    "primeCostValue": "$926.26",
+    "overheadValue": "$231.57",
+    "breakEvenValue": "$1,157.83",
+    "markupValue": "18.00%",
+    "profitMarginValue": "$208.41",
+    "estimatedSalesPriceValue": "$1,366.24",
+    "oneManDays": "0.8 days",
+    "twoManDays": "0.4 days",
+    "fourManDays": "0.2 days",
+    "laborRateInput": "$87.50",
+}
+
+
+def test_js_rounding_rules():
+    # toFixed rounds the binary double; Intl (formatUSD) rounds the shortest decimal
+    assert js_to_fixed(2.675, 2) == "2.67"
+    assert format_usd(2.675) == "$2.68" and usd_round(2.675) == 2.68
+    assert js_to_fixed(-0.001, 2) == "-0.00"
+    assert format_usd(1234567.125) == "$1,234,567.13"
+
+
+def test_engine_matches_summary_js_cells():
+    result = price_estimate(PAYLOAD, SNAPSHOT, BUNDLE)
+    assert result["cells"] == EXPECTED_CELLS
+
+    lines = result["lines"]
+    assert [ln["material_ext"] for ln in lines] == [125.0, 8.04, 30.0, 7.7, 1.1, 0.0]
+    assert [ln["labor_hours"] for ln in lines] == [1.25, 0.9, 0.38, 0.18, 0.0, 0.0]
+    assert lines[3]["description_id"] == "3"
+
+
+def test_bulk_matches_single():
+    other = {"grid": {"rows": [{"type": "Wire", "descValue": "1", "qty": "10", "ladj": "2"}]}}
+    bulk = price_estimates([(PAYLOAD, SNAPSHOT), (other, {})], BUNDLE)
+    assert bulk[0]["cells"] == EXPECTED_CELLS
+    # empty snapshot → adders/margin 0 (as applied by the Summary page), overhead default 30
+    assert bulk[1]["controls"]["overhead_percent"] == 30
+    assert bulk[1]["cells"]["material-cost-price-sheet"] == "$5.00"
+    assert bulk[1]["cells"]["labor-hours-pricing-sheet"] == "0.10"
+
+
+def test_pricing_endpoint_uses_org_catalog(app, client):
+    with app.app_context():
+        org = Org(name="Pricing Org"); db.session.add(org); db.session.commit()
+        wire = Material(org_id=org.id, material_type="Wire", item_description="12 THHN",
+                        price=Decimal("50"), labor_unit=Decimal("0.5"), unit_quantity_size=100)
+        db.session.add(wire)
+        u = User(email="pricing@example.com"); u.set_password("x"); u.org_id = org.id
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_pricing", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        est = Estimate(name="Job", org_id=org.id, user_id=u.id, settings_snapshot={"pricing": {"labor_rate": 100}},
+                       work_payload={"grid": {"rows": [
+                           {"type": "Wire", "descValue": str(wire.id), "qty": "200", "ladj": "1"}]}})
+        db.session.add(est)
+        refresh_resolved_catalog(org.id)
+        db.session.commit()
+        uid, eid = u.id, est.id
+
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+    resp = client.get(f"/estimates/{eid}/pricing.json")
+    assert resp.status_code == 200
+    cells = resp.get_json()["pricing"]["cells"]
+    assert cells["material-cost-price-sheet"] == "$100.00"
+    assert cells["summaryTotalLaborCost"] == "$100.00"
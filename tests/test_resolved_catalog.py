@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import Org, Material, DjeItem, ResolvedMaterial, ResolvedDjeItem
+from app.services.catalog import (
+    refresh_resolved_catalog,
+    refresh_resolved_materials,
+    refresh_resolved_dje,
+    resolved_material_keys,
+)
+
+
+def _resolved_material_ids(org_id):
+    return {r.material_id for r in ResolvedMaterial.query.filter_by(org_id=org_id).all()}
+
+
+def test_org_override_hides_global_and_delete_restores(app):
+    with app.app_context():
+        org = Org(name="Overlay Org"); other = Org(name="Other Org")
+        db.session.add_all([org, other]); db.session.commit()
+
+        glob = Material(org_id=None, material_type="Wire", item_description="12 THHN", price=Decimal("40"), unit_quantity_size=1)
+        solo = Material(org_id=None, material_type="Boxes", item_description="4S Box", price=Decimal("2"), unit_quantity_size=1)
+        db.session.add_all([glob, solo]); db.session.commit()
+        refresh_resolved_catalog(); db.session.commit()
+
+        assert _resolved_material_ids(org.id) == {glob.id, solo.id}
+
+        # Case/whitespace-different org row overrides the global for this org only
+        mine = Material(org_id=org.id, material_type=" wire ", item_description="12 thhn", price=Decimal("45"), unit_quantity_size=1)
+        db.session.add(mine); db.session.flush()
+        refresh_resolved_materials(org_id=org.id, material_ids=[mine.id]); db.session.commit()
+
+        assert _resolved_material_ids(org.id) == {mine.id, solo.id}
+        assert _resolved_material_ids(other.id) == {glob.id, solo.id}
+
+        keys = resolved_material_keys([mine.id])
+        db.session.delete(mine); db.session.flush()
+        refresh_resolved_materials(org_id=org.id, keys=keys); db.session.commit()
+
+        assert _resolved_material_ids(org.id) == {glob.id, solo.id}
+
+
+def test_new_org_gets_globals_and_dje_vendor_is_part_of_key(app):
+    with app.app_context():
+        g1 = DjeItem(org_id=None, category="Rentals", description="Lift", vendor="Acme", default_unit_cost=Decimal("100"))
+        g2 = DjeItem(org_id=None, category="Rentals", description="Lift", vendor=None, default_unit_cost=Decimal("90"))
+        db.session.add_all([g1, g2]); db.session.commit()
+
+        org = Org(name="Fresh Org"); db.session.add(org); db.session.flush()
+        refresh_resolved_catalog(org.id); db.session.commit()
+
+        ids = {r.dje_item_id for r in ResolvedDjeItem.query.filter_by(org_id=org.id).all()}
+        assert ids == {g1.id, g2.id}
+
+        # Overriding the vendor-less row leaves the Acme row resolved to the global
+        mine = DjeItem(org_id=org.id, category="rentals", description="lift", vendor="", default_unit_cost=Decimal("80"))
+        db.session.add(mine); db.session.flush()
+        refresh_resolved_dje(org_id=org.id, item_ids=[mine.id]); db.session.commit()
+
+        ids = {r.dje_item_id for r in ResolvedDjeItem.query.filter_by(org_id=org.id).all()}
+        assert ids == {g1.id, mine.id}
+
+
+def test_stored_norm_keys_match_python_mirror(app):
+    from app.models.material import material_norm_key
+    from app.models.dje_item import dje_norm_key
+
+    with app.app_context():
+        m = Material(org_id=None, material_type="  Wire ", item_description="12 THHN", unit_quantity_size=1)
+        d = DjeItem(org_id=None, category="Rentals", description=" Lift", vendor=None)
+        db.session.add_all([m, d]); db.session.commit()
+        db.session.refresh(m); db.session.refresh(d)
+
+        assert m.norm_type_desc_key == material_norm_key("wire", "12 thhn")
+        assert d.norm_cat_desc_vendor_key == dje_norm_key("rentals", "lift", "")
+
+        # The trigger keeps the key current on UPDATE; like SQL trim(), only spaces are stripped
+        m.item_description = "\t12 THHN "
+        db.session.commit(); db.session.refresh(m)
+        assert m.norm_type_desc_key == material_norm_key("  Wire", "\t12 THHN ")
+        assert m.norm_type_desc_key != material_norm_key("wire", "12 thhn")
@@ -0,0 +1,59 @@
+from sqlalchemy.dialects import postgresql
+
+from app.extensions import db
+from app.models import Org, User, Estimate, Customer, Subscription, OrgMembership
+from app.models.org_membership import ROLE_ADMIN
+from app.services import search
+from app.services.search import text_search
+
+
+def _setup(app):
+    with app.app_context():
+        org = Org(name="Search Org"); db.session.add(org); db.session.commit()
+        u = User(email="search@example.com", org_id=org.id); u.set_password("x")
+        db.session.add(u); db.session.commit()
+        db.session.add(OrgMembership(org_id=org.id, user_id=u.id, role=ROLE_ADMIN))
+        db.session.add(Subscription(org_id=org.id, stripe_subscription_id="sub_search", product_id="prod",
+                                    price_id="price", status="active", entitlements_json=[]))
+        db.session.add_all([
+            Customer(org_id=org.id, company_name="Northside Lighting Co"),
+            Customer(org_id=org.id, company_name="Lighting"),
+            Customer(org_id=org.id, company_name="Lighting Depot"),
+            Customer(org_id=org.id, company_name="Acme", contact_name="Pat Lightingale"),
+            Customer(org_id=org.id, company_name="Other 100%"),
+            Estimate(name="Warehouse lighting retrofit", org_id=org.id, work_payload={}),
+            Estimate(name="Lighting", org_id=org.id, work_payload={}),
+            Estimate(name="Panel swap", org_id=org.id, project_ref="LIGHTING-7", work_payload={}),
+            Estimate(name="Service upgrade", org_id=org.id, work_payload={}),
+        ])
+        db.session.commit()
+        return u.id
+
+
+def test_customers_and_estimates_rank_exact_then_prefix_then_substring(app, client):
+    uid = _setup(app)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+
+    rows = client.get("/libraries/customers.json?q=lighting").get_json()["rows"]
+    names = [r["company_name"] for r in rows]
+    assert names[:2] == ["Lighting", "Lighting Depot"]
+    assert set(names[2:]) == {"Acme", "Northside Lighting Co"}
+
+    # LIKE wildcards in q are literal
+    rows = client.get("/libraries/customers.json?q=0%25").get_json()["rows"]
+    assert [r["company_name"] for r in rows] == ["Other 100%"]
+
+    rows = client.get("/estimates/list.json?q=lighting").get_json()["rows"]
+    assert [r["name"] for r in rows][0] == "Lighting"
+    assert {r["name"] for r in rows} == {"Lighting", "Panel swap", "Warehouse lighting retrofit"}
+
+
+def test_postgres_path_uses_trigram_operators(app, monkeypatch):
+    monkeypatch.setattr(search, "_uses_trigram", lambda: True)
+    with app.app_context():
+        clause, rank = text_search((Customer.company_name, Customer.email), "acme")
+        sql = str(db.select(Customer.id).where(clause).order_by(rank.desc()).compile(dialect=postgresql.dialect()))
+    assert "lower(customers.company_name) LIKE" in sql
+    assert "lower(customers.company_name) %" in sql
+    assert "greatest(" in sql and "similarity(lower(customers.email)" in sql
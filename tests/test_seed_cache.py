@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from app.services import seed_cache
+from app.services.persistence import MATERIAL_SEED_COLUMNS, _seed_keys
+
+pytest.importorskip("pyarrow")
+
+WORKBOOK = "data/Materials_DB_Seed.xlsx"
+
+
+def test_parquet_hit_matches_workbook_parse(tmp_path, monkeypatch):
+    parsed = seed_cache.read_seed_workbook(WORKBOOK, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("Materials_DB_Seed-*.parquet"))) == 1
+
+    def no_excel(*a, **kw):
+        raise AssertionError("workbook parsed on a cache hit")
+
+    monkeypatch.setattr(seed_cache.pd, "read_excel", no_excel)
+    cached = seed_cache.read_seed_workbook(WORKBOOK, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(cached, parsed)
+
+    parts = ("material_type", "item_description", "manufacturer", "sku")
+    keys = lambda df: _seed_keys(df.rename(columns=MATERIAL_SEED_COLUMNS), parts).tolist()  # noqa: E731
+    assert keys(cached) == keys(parsed)
+
+
+def test_changed_workbook_rebuilds_and_prunes(tmp_path):
+    book = tmp_path / "seed.xlsx"
+    cache = tmp_path / "cache"
+    pd.DataFrame({"SKU #": [12345, "BX-4S", None], "Cost": [1.5, 2, 4]}).to_excel(book, index=False)
+    first = seed_cache.read_seed_workbook(book, cache_dir=cache)
+    assert first["SKU #"].tolist()[:2] == ["12345", "BX-4S"] and pd.isna(first["SKU #"].iloc[2])
+
+    pd.DataFrame({"SKU #": ["A"], "Cost": [3]}).to_excel(book, index=False)
+    assert seed_cache.read_seed_workbook(book, cache_dir=cache)["SKU #"].tolist() == ["A"]
+    assert len(list(cache.glob("seed-*.parquet"))) == 1
@@ -0,0 +1,144 @@
+import io
+import json
+import math
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from app.extensions import db
+from app.models import Org, User, Material, DjeItem, ResolvedMaterial
+from app.services import persistence
+from app.services.persistence import _norm, _seed_keys
+
+
+def _material_sheet():
+    return pd.DataFrame({
+        "Category": ["Wire", " Wire ", "Boxes", "Boxes"],
+        "Item Description": ["12  THHN", "10 THHN", "4S Box", "4S Box"],
+        "Labor hrs": [0.5, "x", 0.25, 0.3],
+        "Cost": [50.004, 60, None, 2.5],
+        "Unit": [100, 100, 1, 1],
+        "SKU #": [12345, math.nan, "BX-4S", "BX-4S"],
+        "Manufacturer": ["Southwire", None, math.nan, math.nan],
+        "Vendor": [math.nan, "Graybar", "  ", "Graybar"],
+    })
+
+
+def test_vectorized_seed_keys_match_row_wise_norm():
+    df = _material_sheet().rename(columns=persistence.MATERIAL_SEED_COLUMNS)
+    df["seed_key"] = [None, "  ", "custom-key", math.nan]
+    parts = ("material_type", "item_description", "manufacturer", "sku")
+
+    expected = df.apply(
+        lambda r: r.get("seed_key") if isinstance(r.get("seed_key"), str) and r.get("seed_key").strip() else
+        "|".join(_norm(r.get(p)) for p in parts),
+        axis=1,
+    )
+    assert _seed_keys(df, parts).tolist() == expected.tolist()
+    assert _seed_keys(df, parts + ("missing_col",)).iloc[0] == expected.iloc[0] + "|"
+
+
+def _login_org(app):
+    org = Org(name="Seed Org"); db.session.add(org); db.session.commit()
+    u = User(email="seed@example.com", org_id=org.id); u.set_password("x")
+    db.session.add(u); db.session.commit()
+    from flask_login import login_user
+    login_user(u)
+    return org.id
+
+
+def test_materials_import_upserts_once_per_key_and_logs_stage_timings(app, monkeypatch, caplog):
+    monkeypatch.setattr(persistence.pd, "read_excel", lambda path: _material_sheet())
+    with app.test_request_context("/"):
+        org_id = _login_org(app)
+        with caplog.at_level("INFO"):
+            report = persistence.import_materials_starter_pack()
+        assert (report.added, report.changed, report.unchanged, report.retired) == (3, 0, 0, 0)
+
+        rows = {m.seed_key: m for m in Material.query.filter_by(org_id=org_id).all()}
+        assert len(rows) == 3
+        box = rows["boxes|4s box|nan|bx-4s"]            # duplicate sheet rows: last one wins
+        assert float(box.price) == 2.5 and box.vendor == "Graybar" and box.manufacturer is None
+        wire = rows["wire|12 thhn|southwire|12345"]
+        assert float(wire.price) == 50.0 and wire.vendor is None and wire.sku == "12345"
+        assert float(rows["wire|10 thhn||nan"].labor_unit) == 0
+        assert ResolvedMaterial.query.filter_by(org_id=org_id).count() == 3
+
+        logged = [json.loads(r.getMessage()) for r in caplog.records if "starter_pack_import" in r.getMessage()]
+        assert set(logged[-1]["timings_ms"]) == {
+            "read", "normalize", "diff", "stage", "upsert", "retire", "resolve", "commit",
+        }
+        assert all(len(m.content_hash) == 64 for m in rows.values())
+
+        # Re-import of the same sheet: nothing to write
+        report = persistence.import_materials_starter_pack()
+        assert (report.unchanged, report.written) == (3, 0)
+
+
+def test_diff_import_writes_only_changes_and_retires_missing_keys(app, monkeypatch):
+    sheet = _material_sheet()
+    monkeypatch.setattr(persistence.pd, "read_excel", lambda path: sheet)
+    with app.test_request_context("/"):
+        org_id = _login_org(app)
+        persistence.import_materials_starter_pack()
+        edited = Material.query.filter_by(org_id=org_id, seed_key="wire|10 thhn||nan").one()
+        edited.price = 61; edited.updated_at = edited.seeded_at + timedelta(minutes=1)   # org edit
+        db.session.commit()
+
+        sheet.loc[0, "Cost"] = 55                    # changed
+        sheet.loc[1, "Cost"] = 70                    # changed, but edited by the org
+        sheet = sheet.drop(index=[2, 3])             # 4S Box left the sheet
+        sheet.loc[4] = ["Boxes", "Mud Ring", 0.1, 1.5, 1, "MR", None, None]
+
+        dry = persistence.import_materials_starter_pack(dry_run=True)
+        assert (dry.added, dry.changed, dry.unchanged, dry.retired, dry.dry_run) == (1, 1, 1, 1, True)
+        assert Material.query.filter_by(org_id=org_id).count() == 3
+
+        report = persistence.import_materials_starter_pack()
+        assert (report.added, report.changed, report.unchanged, report.retired) == (1, 1, 1, 1)
+        rows = {m.seed_key: m for m in Material.query.filter_by(org_id=org_id).all()}
+        assert float(rows["wire|12 thhn|southwire|12345"].price) == 55
+        assert float(rows["wire|10 thhn||nan"].price) == 61
+        assert rows["boxes|4s box|nan|bx-4s"].is_active is False
+        assert rows["boxes|mud ring||mr"].is_active is True
+
+        assert persistence.import_materials_starter_pack().written == 0
+
+
+def test_one_fractional_price_change_leaves_other_rows_unchanged(app, monkeypatch):
+    sheet = _material_sheet().drop(index=[3])
+    sheet["Cost"] = [50, 60, 2]                       # all whole numbers: pandas infers int64
+    sheet["Labor hrs"] = [1, 2, 0]
+    monkeypatch.setattr(persistence.pd, "read_excel", lambda path: sheet)
+    with app.test_request_context("/"):
+        _login_org(app)
+        assert persistence.import_materials_starter_pack().added == 3
+
+        sheet["Cost"] = [50, 60, 2.75]                # column becomes float64
+        report = persistence.import_materials_starter_pack()
+        assert (report.added, report.changed, report.unchanged, report.retired) == (0, 1, 2, 0)
+
+    frame = persistence._materials_frame(sheet)
+    as_text = persistence._materials_frame(pd.read_csv(io.StringIO(sheet.to_csv(index=False)), dtype=str))
+    cols = persistence._MATERIAL_HASH_COLUMNS
+    assert persistence.content_hashes(frame, cols).tolist() == persistence.content_hashes(as_text, cols).tolist()
+
+
+def test_invalid_unit_rejected_and_dje_import(app, monkeypatch):
+    bad = _material_sheet(); bad.loc[0, "Unit"] = 12
+    monkeypatch.setattr(persistence.pd, "read_excel", lambda path: bad)
+    with app.test_request_context("/"):
+        _login_org(app)
+        with pytest.raises(ValueError, match="Unit Qty Size"):
+            persistence.import_materials_starter_pack()
+
+        monkeypatch.setattr(persistence.pd, "read_excel", lambda path: pd.DataFrame({
+            "category": ["Rentals", "Rentals"],
+            "description": ["Lift", "Lift"],
+            "vendor": ["Acme", None],
+            "default_unit_cost": [100, "n/a"],
+        }))
+        assert persistence.import_dje_starter_pack().added == 2
+        costs = sorted(float(d.default_unit_cost) for d in DjeItem.query.all())
+        assert costs == [0.0, 100.0]